@@ -0,0 +1,43 @@
+/**
+ * Decoder of the compact WhisperLive result frames (result_format: 'msgpack')
+ *
+ * A frame is a MessagePack map { u: uid, c: committed, p: partial }:
+ *   c: segments committed since the previous frame, each [id, startMs, endMs, text]
+ *   p: (only when it changed) [id, startMs, endMs, keep, append], the in-progress segment whose text
+ *      is the first `keep` characters (code points) of the previous partial followed by `append`
+ */
+
+import { decode } from '@msgpack/msgpack';
+
+export class ResultDecoder {
+  constructor() {
+    this.partialText = [];
+  }
+
+  /**
+   * @param {ArrayBuffer} frame - A binary result frame.
+   * @returns {{uid: string, segments: Array}} The update in the shape of a JSON result message, with
+   *   numeric times in seconds and segment ids. The partial segment, if any, comes last.
+   */
+  decode(frame) {
+    const update = decode(new Uint8Array(frame));
+    const segments = (update.c || []).map(([id, start, end, text]) => toSegment(id, start, end, text, true));
+    if (update.p) {
+      const [id, start, end, keep, append] = update.p;
+      // code points, like the server counts them
+      this.partialText = this.partialText.slice(0, keep).concat(Array.from(append));
+      segments.push(toSegment(id, start, end, this.partialText.join(''), false));
+    }
+    return { uid: update.u, segments };
+  }
+}
+
+function toSegment(id, start, end, text, completed) {
+  return {
+    id,
+    start: start == null ? null : start / 1000,
+    end: end == null ? null : end / 1000,
+    text,
+    completed,
+  };
+}
@@ -4,6 +4,8 @@
  * Includes hybrid AEC (browser + server) for optimal echo cancellation
  */
 
+import { ResultDecoder } from './resultProtocol';
+
 export class WhisperLiveClient {
   constructor(options = {}) {
     this.serverUrl = options.serverUrl || 'ws://localhost:9090';
@@ -40,6 +42,7 @@ export class WhisperLiveClient {
     // Audio processing
     this.audioChunks = [];
     this.processingInterval = 100; // Send audio every 100ms
+    this.micSamplesSent = 0; // Position of the next mic sample, far-end frames are timestamped with it
 
     // Client configuration
     this.clientConfig = {
@@ -52,7 +55,13 @@ export class WhisperLiveClient {
       no_speech_thresh: options.noSpeechThresh || 0.6,  // Increased from 0.45 to 0.6 to be less aggressive (only filter out audio that's 60%+ likely silence)
       enable_translation: options.enableTranslation || false,
       target_language: options.targetLanguage || 'fr',
+      // 'msgpack': binary results with numeric times and partial-text deltas
+      result_format: options.resultFormat || 'json',
+      // 'int16': 16-bit PCM microphone audio, half the bandwidth of float32
+      audio_encoding: options.audioEncoding === 'int16' ? 'int16' : 'float32',
+      sample_rate: this.audioConfig.sampleRate,
     };
+    this.resultDecoder = new ResultDecoder();
 
     console.log('🎤 WhisperLive client initialized:', {
       serverUrl: this.serverUrl,
@@ -95,12 +104,15 @@ export class WhisperLiveClient {
 
         console.log('🌐 Creating WebSocket connection...');
         this.socket = new WebSocket(this.serverUrl);
+        this.socket.binaryType = 'arraybuffer'; // MessagePack result frames
+        this.resultDecoder = new ResultDecoder(); // partial deltas start over with the session
 
         this.socket.onopen = () => {
           clearTimeout(connectionTimeout);
           console.log('✅ WebSocket connected to WhisperLive');
           this.isConnected = true;
           this.reconnectAttempts = 0;
+          this.micSamplesSent = 0; // the server starts a new session
           this.onConnectionChange(true);
           
           // Send client configuration immediately after connection
@@ -296,7 +308,8 @@ export class WhisperLiveClient {
             // Ensure we're sending the Float32Array buffer correctly
             // The server expects binary data that can be converted to np.float32
             // Use amplified data instead of raw input
-            this.socket.send(amplifiedData.buffer);
+            this.socket.send(this.encodeAudio(amplifiedData));
+            this.micSamplesSent += amplifiedData.length;
             
             // Debug: Log audio sending periodically (every 100 chunks = ~4 seconds at 16kHz)
             if (!this.audioSendCounter) this.audioSendCounter = 0;
@@ -387,6 +400,54 @@ export class WhisperLiveClient {
     return result;
   }
 
+  /**
+   * Send far-end reference audio (TTS / avatar playback) so the server-side AEC can cancel its echo
+   * from the microphone audio.
+   *
+   * Frame layout: "FARE", uint64 little-endian position, then float32 PCM samples (16kHz mono).
+   * Only sent with the float32 audio encoding, the server cannot tell it from int16 microphone audio.
+   *
+   * @param {Float32Array} samples - Audio as played, resampled to 16kHz mono
+   * @param {number} [position] - Mic sample position (in samples sent so far) at which playback of
+   *   `samples` started. Defaults to now.
+   */
+  sendFarEnd(samples, position = this.micSamplesSent) {
+    if (!this.socket || this.socket.readyState !== WebSocket.OPEN || samples.length === 0) return;
+    if (this.clientConfig.audio_encoding !== 'float32') {
+      console.warn('⚠️ Far-end audio is not supported with the int16 audio encoding');
+      return;
+    }
+    const frame = new ArrayBuffer(12 + samples.length * 4);
+    const header = new DataView(frame);
+    header.setUint8(0, 0x46); // 'F'
+    header.setUint8(1, 0x41); // 'A'
+    header.setUint8(2, 0x52); // 'R'
+    header.setUint8(3, 0x45); // 'E'
+    header.setBigUint64(4, BigInt(Math.max(0, Math.round(position))), true);
+    new Float32Array(frame, 12).set(samples);
+    try {
+      this.socket.send(frame);
+    } catch (error) {
+      console.error('❌ Error sending far-end audio:', error);
+    }
+  }
+
+  /**
+   * Encode microphone audio in the negotiated audio_encoding
+   * @param {Float32Array} samples - Audio in [-1, 1]
+   * @returns {ArrayBuffer} The binary message
+   */
+  encodeAudio(samples) {
+    if (this.clientConfig.audio_encoding !== 'int16') {
+      return samples.buffer;
+    }
+    const pcm = new Int16Array(samples.length);
+    for (let i = 0; i < samples.length; i++) {
+      pcm[i] = Math.round(samples[i] * 32767);
+    }
+    return pcm.buffer;
+  }
+
   sendClientConfig() {
     if (this.socket && this.socket.readyState === WebSocket.OPEN) {
       const configMessage = JSON.stringify(this.clientConfig);
@@ -404,7 +465,9 @@ export class WhisperLiveClient {
 
   handleServerMessage(event) {
     try {
-      const message = JSON.parse(event.data);
+      const message = event.data instanceof ArrayBuffer
+        ? this.resultDecoder.decode(event.data)
+        : JSON.parse(event.data);
       
       // DEBUG: Log all incoming messages to verify communication
       console.log('📨 Received message from server:', {
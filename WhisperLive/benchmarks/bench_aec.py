@@ -0,0 +1,101 @@
+"""
+Synthetic echo-path benchmark for the adaptive echo canceller of `WebRTCAECProcessor`.
+
+A coloured-noise far-end signal goes through a random, exponentially decaying echo path (with a bulk
+delay) and is mixed with a little near-end noise. The previous time-domain LMS stage and the partitioned-
+block frequency-domain adaptive filter both process the microphone signal packet by packet, and the
+benchmark reports their echo return loss enhancement (ERLE) once converged and their CPU time per second
+of audio, with and without a far-end reference.
+
+    python benchmarks/bench_aec.py
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import signal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from whisper_live.preprocessing.fdaf import PartitionedBlockFDAF  # noqa: E402
+
+RATE = 16000
+
+
+class TimeDomainLMS:
+    """The previous `_apply_adaptive_aec`: np.convolve against a 1024-tap filter on every packet."""
+
+    def __init__(self, filter_length=1024, step_size=0.005, leak_factor=0.99):
+        self.filter_length = filter_length
+        self.step_size = step_size
+        self.leak_factor = leak_factor
+        self.adaptive_filter = np.zeros(filter_length, dtype=np.float32)
+        self.speaker_history = np.zeros(filter_length, dtype=np.float32)
+
+    def process(self, audio, far=None):
+        if far is None:
+            echo_estimate = np.convolve(audio, self.adaptive_filter[:len(audio)], mode='same').astype(np.float32)
+            return (audio - 0.3 * echo_estimate).astype(np.float32)
+        if len(far) >= self.filter_length:
+            self.speaker_history = far[-self.filter_length:].astype(np.float32)
+            echo_estimate = np.convolve(self.speaker_history, self.adaptive_filter, mode='valid').astype(np.float32)
+            error = (audio[:len(echo_estimate)] - echo_estimate).astype(np.float32)
+            filter_update = (self.step_size * np.convolve(error, self.speaker_history, mode='valid')).astype(np.float32)
+            self.adaptive_filter = (self.adaptive_filter + filter_update).astype(np.float32)
+            self.adaptive_filter = (self.adaptive_filter * self.leak_factor).astype(np.float32)
+            result = audio.copy().astype(np.float32)
+            result[:len(error)] = error
+            return result
+        return (audio * 0.8).astype(np.float32)
+
+
+def echo_scene(seconds, tail, delay, seed=0):
+    rng = np.random.default_rng(seed)
+    far = signal.lfilter([1.0], [1.0, -0.9], rng.standard_normal(seconds * RATE)) * 0.05
+    path = np.zeros(delay + tail)
+    path[delay:] = rng.standard_normal(tail) * np.exp(-np.arange(tail) / (tail / 6.0)) * 0.2
+    mic = signal.lfilter(path, [1.0], far) + 1e-3 * rng.standard_normal(len(far))
+    return mic.astype(np.float32), far.astype(np.float32)
+
+
+def run(canceller, mic, far, packet_size):
+    out = np.empty_like(mic)
+    start = time.perf_counter()
+    for i in range(0, len(mic), packet_size):
+        chunk = mic[i:i + packet_size]
+        out[i:i + len(chunk)] = canceller.process(chunk, None if far is None else far[i:i + len(chunk)])
+    return out, time.perf_counter() - start
+
+
+def erle_db(mic, out):
+    tail = slice(len(mic) // 2, None)
+    return 10 * np.log10(np.sum(mic[tail] ** 2) / max(np.sum(out[tail] ** 2), 1e-20))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=int, default=20, help="Length of the simulated audio.")
+    parser.add_argument("--packet_size", type=int, default=4096, help="Samples per websocket packet.")
+    parser.add_argument("--tail", type=int, default=2400, help="Length of the echo path in samples.")
+    parser.add_argument("--delay", type=int, default=160, help="Bulk delay of the echo path in samples.")
+    parser.add_argument("--partitions", type=int, default=16, help="FDAF partitions of 256 samples.")
+    args = parser.parse_args()
+
+    mic, far = echo_scene(args.seconds, args.tail, args.delay)
+    cancellers = {
+        "lms": lambda: TimeDomainLMS(),
+        "fdaf": lambda: PartitionedBlockFDAF(partitions=args.partitions),
+    }
+    print(f"echo path: {args.delay + args.tail} samples, FDAF filter: {256 * args.partitions} samples")
+    print(f"{'':>6} | {'ERLE':>8} | {'CPU, far-end':>19} | {'CPU, no far-end':>19}")
+    for name, create in cancellers.items():
+        out, elapsed = run(create(), mic, far, args.packet_size)
+        _, idle = run(create(), mic, None, args.packet_size)
+        print(f"{name:>6} | {erle_db(mic, out):>5.1f} dB | {elapsed / args.seconds * 1e3:>8.2f} ms/s audio | "
+              f"{idle / args.seconds * 1e3:>8.2f} ms/s audio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark for the enhancement stage of the audio preprocessing.
+
+Compares the previous per-sample Python loop of `AudioProcessor._enhance_audio` with the vectorized,
+stateful filter, in microseconds per packet.
+
+    python benchmarks/bench_enhance_audio.py
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from whisper_live.preprocessing.audio_processor import PreprocessingDesign  # noqa: E402
+
+
+def loop_enhance(audio):
+    """The old `_enhance_audio`: a per-sample loop, restarting from zero on every packet."""
+    if len(audio) > 1:
+        filtered = np.zeros_like(audio, dtype=np.float32)
+        filtered[0] = (audio[0] * 0.02).astype(np.float32)
+        for i in range(1, len(audio)):
+            filtered[i] = (0.98 * filtered[i-1] + 0.02 * audio[i]).astype(np.float32)
+        audio = filtered.astype(np.float32)
+    threshold = np.float32(0.8)
+    ratio = np.float32(2.0)
+    over_threshold = np.abs(audio) > threshold
+    if np.any(over_threshold):
+        sign = np.sign(audio[over_threshold]).astype(np.float32)
+        magnitude = np.abs(audio[over_threshold]).astype(np.float32)
+        compressed = (threshold + (magnitude - threshold) / ratio).astype(np.float32)
+        audio = np.where(over_threshold, sign * compressed, audio).astype(np.float32)
+    return audio.astype(np.float32)
+
+
+def run(enhance, packets):
+    timings = []
+    for packet in packets:
+        t0 = time.perf_counter()
+        enhance(packet)
+        timings.append(time.perf_counter() - t0)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packets", type=int, default=200, help="Number of packets to process.")
+    parser.add_argument("--packet_size", type=int, default=4096, help="Samples per websocket packet.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    packets = [rng.uniform(-1.0, 1.0, args.packet_size).astype(np.float32) for _ in range(args.packets)]
+    processor = PreprocessingDesign.create(enable_aec=False).create_processor()
+
+    results = {
+        "loop": run(loop_enhance, packets),
+        "vectorized": run(processor._enhance_audio, packets),
+    }
+    for name, timings in results.items():
+        print(f"{name:>10}: mean {timings.mean() * 1e6:9.1f} us/packet, p99 {np.percentile(timings, 99) * 1e6:9.1f} us/packet")
+    print(f"speedup: {results['loop'].mean() / results['vectorized'].mean():.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Per-packet cost of the noise suppression stage of `WebRTCAECProcessor`.
+
+Compares the previous per-packet RMS gate (15th-percentile noise floor recomputed from each packet on its
+own) with the streaming spectral suppressor, on syllable-like tone bursts in white noise. Reports the CPU
+time per packet and, once the noise estimate has settled, the noise left in the output and the level of
+the bursts relative to the input.
+
+    python benchmarks/bench_noise_suppression.py --packet_size 4096
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from whisper_live.preprocessing.noise_suppressor import SpectralNoiseSuppressor  # noqa: E402
+
+RATE = 16000
+
+
+class PercentileGate:
+    """The previous `_apply_noise_suppression`, stateless: every packet is gated against its own RMS percentile."""
+
+    delay = 0
+
+    def process(self, audio):
+        frame_length = 256
+        rms = np.sqrt(np.convolve(audio**2, np.ones(frame_length, dtype=np.float32)/frame_length, mode='same')).astype(np.float32, copy=False)
+        noise_floor = np.float32(np.percentile(rms, 15))
+        if noise_floor > 0:
+            gate_ratio = np.clip(rms / (noise_floor * np.float32(1.5)), np.float32(0), np.float32(1)).astype(np.float32, copy=False)
+        else:
+            gate_ratio = np.clip(rms / np.float32(0.001), np.float32(0), np.float32(1)).astype(np.float32, copy=False)
+        gate_ratio = np.convolve(gate_ratio, np.ones(frame_length, dtype=np.float32)/frame_length, mode='same').astype(np.float32, copy=False)
+        gate_ratio = np.clip(gate_ratio, np.float32(0.1), np.float32(1.0)).astype(np.float32, copy=False)
+        return (audio * gate_ratio).astype(np.float32, copy=False)
+
+
+class Spectral:
+    def __init__(self):
+        self.suppressor = SpectralNoiseSuppressor()
+        self.delay = self.suppressor.frame_size
+
+    def process(self, audio):
+        return self.suppressor.process(audio)
+
+
+def scene(seconds, noise_level, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * RATE) / RATE
+    pitch = np.array([220.0, 330.0, 440.0, 550.0, 660.0])[(t // 0.5).astype(int) % 5]
+    tone = (0.3 * np.sin(2 * np.pi * pitch * t) * ((t % 0.5) < 0.3)).astype(np.float32)
+    noise = (noise_level * rng.standard_normal(len(t))).astype(np.float32)
+    return tone, noise
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=int, default=20, help="Length of the simulated audio.")
+    parser.add_argument("--packet_size", type=int, default=4096, help="Samples per websocket packet.")
+    parser.add_argument("--noise", type=float, default=0.02, help="Standard deviation of the white noise.")
+    args = parser.parse_args()
+
+    tone, noise = scene(args.seconds, args.noise)
+    audio = tone + noise
+    settled = len(audio) // 4
+    print(f"{args.packet_size} samples per packet")
+    print(f"{'':>10} | {'mean':>10} | {'p99':>10} | {'noise left':>10} | {'bursts':>8}")
+    for name, suppressor in (("gate", PercentileGate()), ("spectral", Spectral())):
+        out = np.empty_like(audio)
+        times = []
+        for i in range(0, len(audio), args.packet_size):
+            packet = audio[i:i + args.packet_size]
+            start = time.perf_counter()
+            out[i:i + len(packet)] = suppressor.process(packet)
+            times.append(time.perf_counter() - start)
+        times = np.array(times) * 1e6
+
+        d = suppressor.delay
+        clean = tone[settled - d:len(tone) - d]
+        result = out[settled:]
+        residual = result - clean
+        noise_left = 10 * np.log10(np.mean(residual ** 2) / np.mean(noise[settled:] ** 2))
+        # level of the bursts themselves, as a ratio of the clean bursts
+        active = clean != 0
+        bursts = 20 * np.log10(np.sqrt(np.mean(result[active] ** 2)) / np.sqrt(np.mean(clean[active] ** 2)))
+        print(f"{name:>10} | {times.mean():>7.1f} us | {np.percentile(times, 99):>7.1f} us | "
+              f"{noise_left:>7.1f} dB | {bursts:>5.1f} dB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark for session audio buffering.
+
+Compares the per-packet cost of the previous `np.concatenate` based buffer (including the tail copies
+made for every inference window) with `AudioRingBuffer`, as a session gets longer.
+
+    python benchmarks/bench_ring_buffer.py
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from whisper_live.ring_buffer import AudioRingBuffer  # noqa: E402
+
+RATE = 16000
+
+
+def concatenate_session(packets, window_every):
+    """Replays the old add_frames / get_audio_chunk_for_processing behaviour."""
+    frames_np = None
+    timings = []
+    checksum = 0.0
+    for i, packet in enumerate(packets):
+        t0 = time.perf_counter()
+        if frames_np is not None and frames_np.shape[0] > 45 * RATE:
+            frames_np = frames_np[int(30 * RATE):]
+        if frames_np is None:
+            frames_np = packet.copy()
+        else:
+            frames_np = np.concatenate((frames_np, packet), axis=0)
+        if i % window_every == 0:
+            window = frames_np[max(0, frames_np.shape[0] - 10 * RATE):].copy()
+            window = window.copy()
+            checksum += window[0]
+        timings.append(time.perf_counter() - t0)
+    return np.array(timings)
+
+
+def ring_buffer_session(packets, window_every):
+    buffer = AudioRingBuffer(60 * RATE)
+    timings = []
+    checksum = 0.0
+    for i, packet in enumerate(packets):
+        t0 = time.perf_counter()
+        if len(buffer) > 45 * RATE:
+            buffer.discard_before(buffer.start + int(30 * RATE))
+        buffer.append(packet)
+        if i % window_every == 0:
+            window = buffer.view(buffer.end - 10 * RATE)
+            checksum += window[0]
+        timings.append(time.perf_counter() - t0)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=int, default=600, help="Length of the simulated session.")
+    parser.add_argument("--packet_size", type=int, default=4096, help="Samples per websocket packet.")
+    parser.add_argument("--window_every", type=int, default=2, help="Take an inference window every N packets.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    num_packets = args.seconds * RATE // args.packet_size
+    packets = [rng.standard_normal(args.packet_size).astype(np.float32) for _ in range(num_packets)]
+
+    results = {
+        "concatenate": concatenate_session(packets, args.window_every),
+        "ring_buffer": ring_buffer_session(packets, args.window_every),
+    }
+
+    # report the mean per-packet cost for each minute of session time
+    packets_per_minute = 60 * RATE // args.packet_size
+    print(f"{'minute':>6} | " + " | ".join(f"{name:>14}" for name in results))
+    for start in range(0, num_packets, packets_per_minute):
+        row = [timings[start:start + packets_per_minute].mean() * 1e6 for timings in results.values()]
+        print(f"{start // packets_per_minute:>6} | " + " | ".join(f"{us:>11.1f} us" for us in row))
+    for name, timings in results.items():
+        print(f"{name}: mean {timings.mean() * 1e6:.1f} us/packet, p99 {np.percentile(timings, 99) * 1e6:.1f} us/packet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Micro-benchmark of one Silero VAD window (512 samples at 16 kHz) and of `VoiceActivityDetector` on a frame.
+
+Compares the previous torch round trip (numpy -> torch -> numpy and `torch.cat` of the context on every
+window, only when torch is installed), a plain numpy `session.run` that allocates its inputs and outputs,
+and `VoiceActivityDetection`, which writes into buffers bound to the session once.
+
+    python benchmarks/bench_vad.py --model ~/.cache/whisper-live/silero_vad.onnx
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from whisper_live.vad import VoiceActivityDetection, VoiceActivityDetector  # noqa: E402
+
+RATE = 16000
+
+
+class TorchWindow:
+    """The previous `VoiceActivityDetection.__call__`, state and context kept as torch tensors."""
+
+    def __init__(self, session):
+        import torch
+        self.torch = torch
+        self.session = session
+        self.state = torch.zeros((2, 1, 128), dtype=torch.float32)
+        self.context = torch.zeros(1, 64, dtype=torch.float32)
+
+    def __call__(self, window):
+        torch = self.torch
+        x = torch.from_numpy(window.astype(np.float32)).unsqueeze(0)
+        x = torch.cat([self.context, x], dim=1)
+        x_np = x.float().numpy().astype(np.float32)
+        state_np = self.state.float().numpy().astype(np.float32)
+        out, state = self.session.run(None, {'input': x_np, 'state': state_np, 'sr': np.array(RATE, dtype='int64')})
+        self.state = torch.from_numpy(state)
+        self.context = x[..., -64:]
+        return torch.from_numpy(out)
+
+
+class NumpyWindow:
+    """Numpy inputs without torch, but new input, state and output arrays on every window."""
+
+    def __init__(self, session):
+        self.session = session
+        self.state = np.zeros((2, 1, 128), dtype=np.float32)
+        self.context = np.zeros((1, 64), dtype=np.float32)
+
+    def __call__(self, window):
+        x = np.concatenate([self.context, window[np.newaxis]], axis=1)
+        out, self.state = self.session.run(None, {'input': x, 'state': self.state, 'sr': np.array(RATE, dtype='int64')})
+        self.context = x[:, -64:]
+        return out
+
+
+def measure(fn, inputs, iterations):
+    times = np.empty(iterations)
+    for i in range(iterations):
+        item = inputs[i % len(inputs)]
+        start = time.perf_counter()
+        fn(item)
+        times[i] = time.perf_counter() - start
+    return times * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", type=str, default=None, help="Silero VAD ONNX model, downloaded if omitted.")
+    parser.add_argument("--iterations", type=int, default=5000, help="Windows (or frames) timed per path.")
+    parser.add_argument("--frame_size", type=int, default=4096, help="Samples per websocket frame.")
+    args = parser.parse_args()
+
+    model = VoiceActivityDetection(model_path=args.model)
+    rng = np.random.default_rng(0)
+    windows = [(0.1 * rng.standard_normal(512)).astype(np.float32) for _ in range(64)]
+
+    paths = {}
+    try:
+        paths["torch"] = TorchWindow(model.session)
+    except ImportError:
+        print("torch is not installed, skipping the previous torch path")
+    paths["numpy"] = NumpyWindow(model.session)
+    paths["bound"] = lambda window: model(window, RATE)
+
+    print(f"{'per window':>12} | {'mean':>9} | {'p99':>9}")
+    for name, fn in paths.items():
+        fn(windows[0])
+        times = measure(fn, windows, args.iterations)
+        print(f"{name:>12} | {times.mean():>6.1f} us | {np.percentile(times, 99):>6.1f} us")
+
+    detector = VoiceActivityDetector(frame_rate=RATE, model_path=args.model)
+    frames = [(0.1 * rng.standard_normal(args.frame_size)).astype(np.float32) for _ in range(8)]
+    times = measure(detector, frames, max(1, args.iterations // 8))
+    print(f"{args.frame_size}-sample frame through VoiceActivityDetector: mean {times.mean():.1f} us, "
+          f"p99 {np.percentile(times, 99):.1f} us")
+
+
+if __name__ == "__main__":
+    main()
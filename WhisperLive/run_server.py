@@ -46,6 +46,71 @@ if __name__ == "__main__":
                         type=str,
                         default="~/.cache/whisper-live/",
                         help='Path to cache the converted ctranslate2 models.')
+    parser.add_argument('--batch_inference',
+                        action="store_true",
+                        help='Batch transcription passes of all connections sharing the single faster_whisper model.')
+    parser.add_argument('--max_batch_size',
+                        type=int,
+                        default=8,
+                        help='Maximum number of connections decoded together when --batch_inference is set.')
+    parser.add_argument('--max_batch_wait_ms',
+                        type=float,
+                        default=10.0,
+                        help='Maximum time (in milliseconds) a pass waits for others to join its batch.')
+    parser.add_argument('--num_workers',
+                        type=int,
+                        default=4,
+                        help='Number of shared transcription worker threads. 0 runs a dedicated thread per connection.')
+    parser.add_argument('--min_audio_step',
+                        type=float,
+                        default=0.0,
+                        help='Minimum new audio (in seconds) before a connection is transcribed again. '
+                             'Widens automatically when passes get slow.')
+    parser.add_argument('--model_memory_budget',
+                        type=float,
+                        default=None,
+                        help='Memory budget (in MB) for loaded models. Idle models are unloaded, least recently '
+                             'used first, once it is exceeded. By default idle models stay loaded.')
+    parser.add_argument('--model_concurrency',
+                        type=int,
+                        default=None,
+                        help='Transcriptions that may run at once on each shared faster_whisper model '
+                             '(its CTranslate2 workers). Connections sharing a model wait for a free slot. '
+                             'Defaults to --num_workers.'),
+    parser.add_argument('--preload',
+                        type=str,
+                        nargs='*',
+                        default=None,
+                        help='Load and warm up these models before accepting connections, e.g. '
+                             '"--preload small large-v3". Without a value, preloads the default model.')
+    parser.add_argument('--num_processes',
+                        type=int,
+                        default=0,
+                        help='Run faster_whisper sessions in this many inference worker processes, each with '
+                             '--num_workers transcription threads. 0 runs them in the server process.')
+    parser.add_argument('--threads_per_process',
+                        type=int,
+                        default=None,
+                        help='CPU threads for the models of each inference worker process. '
+                             'Defaults to the CPU count divided by --num_processes.')
+    parser.add_argument('--metrics_port',
+                        type=int,
+                        default=None,
+                        help='Serve Prometheus metrics on http://<host>:<port>/metrics. With --num_processes, '
+                             'inference workers serve theirs on the following ports.')
+    parser.add_argument('--ingest_gate',
+                        action="store_true",
+                        help='Drop silence from the audio of every connection before it is buffered for transcription.')
+    parser.add_argument('--ingest_budget',
+                        type=float,
+                        default=10.0,
+                        help='Audio (in seconds) a connection may send ahead of transcription before clients that '
+                             'support flow control are paused. 0 disables flow control.')
+    parser.add_argument('--catch_up_threshold',
+                        type=float,
+                        default=0.0,
+                        help='Untranscribed audio (in seconds) above which a faster_whisper connection transcribes its '
+                             'backlog in one batched call before streaming again. 0 disables catch-up.')
     args = parser.parse_args()
 
     if args.backend == "tensorrt":
@@ -68,5 +133,19 @@ if __name__ == "__main__":
         single_model=not args.no_single_model,
         max_clients=args.max_clients,
         max_connection_time=args.max_connection_time,
-        cache_path=args.cache_path
+        cache_path=args.cache_path,
+        batch_inference=args.batch_inference,
+        max_batch_size=args.max_batch_size,
+        max_batch_wait_ms=args.max_batch_wait_ms,
+        num_workers=args.num_workers,
+        min_audio_step=args.min_audio_step,
+        model_memory_budget=args.model_memory_budget,
+        model_concurrency=args.model_concurrency,
+        preload=args.preload,
+        num_processes=args.num_processes,
+        threads_per_process=args.threads_per_process,
+        metrics_port=args.metrics_port,
+        ingest_gate=args.ingest_gate,
+        ingest_budget=args.ingest_budget,
+        catch_up_threshold=args.catch_up_threshold,
     )
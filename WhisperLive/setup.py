@@ -50,6 +50,7 @@ setup(
         "onnxruntime==1.17.0",
         "scipy",
         "websocket-client",
+        "msgpack",
         "numba",
         "openai-whisper==20240930",
         "kaldialign",
@@ -0,0 +1,58 @@
+import json
+import threading
+from collections import namedtuple
+
+from whisper_live.backend.base import ServeClientBase
+
+Segment = namedtuple("Segment", ["start", "end", "text", "no_speech_prob"])
+
+
+class RecordingWebSocket(object):
+    """Records what is sent to the client, and whether the connection was closed."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed = threading.Event()
+
+    def send(self, message):
+        self.sent.append(message)
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeSession(ServeClientBase):
+    """
+    Session without a model, driven pass by pass with `process_step`.
+
+    New audio schedules nothing. Every pass returns the segments of `segments_for`, by default one segment
+    with `text_out` spanning the window, and updates the session's segments; with `send_results` the
+    results are sent to the client as well.
+    """
+
+    def __init__(self, text_out=" hello", send_results=False, **kwargs):
+        super().__init__("uid", websocket=RecordingWebSocket(), **kwargs)
+        self.notify_new_audio = lambda: None
+        self.text_out = text_out
+        self.send_results = send_results
+        self.calls = 0
+        self.streamed = []
+        """(start, end) of the window of every pass, in absolute samples."""
+
+    def transcribe_audio(self, input_sample):
+        self.calls += 1
+        self.streamed.append((self.window_start, self.window_start + input_sample.shape[0]))
+        return self.segments_for(input_sample.shape[0] / self.RATE)
+
+    def segments_for(self, duration):
+        return [Segment(0.0, duration, self.text_out, 0.0)]
+
+    def handle_transcription_output(self, result, duration):
+        last_segment = self.update_segments(result, duration)
+        if self.send_results:
+            self.send_transcription_to_client(self.prepare_segments(last_segment))
+
+    def sent_messages(self):
+        """Everything sent to the client, decoded, once what is queued went out."""
+        self.outbox.close()
+        return [json.loads(message) for message in self.websocket.sent]
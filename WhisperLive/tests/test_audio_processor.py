@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+
+from whisper_live.preprocessing.audio_processor import PreprocessingDesign, aggregate_stats
+
+
+class TestPreprocessingDesign(unittest.TestCase):
+    def setUp(self):
+        self.design = PreprocessingDesign.create(sample_rate=16000, enable_aec=True)
+        self.audio = np.random.default_rng(0).uniform(-0.5, 0.5, 4096).astype(np.float32)
+
+    def test_sessions_share_coefficients_not_state(self):
+        first = self.design.create_processor()
+        second = self.design.create_processor()
+        self.assertIs(first.aec_processor.hp_sos, second.aec_processor.hp_sos)
+
+        first.process_audio_chunk(self.audio)
+        self.assertTrue(np.any(first.aec_processor.hp_zi))
+        self.assertFalse(np.any(second.aec_processor.hp_zi))
+        self.assertEqual(len(second.audio_buffer), 0)
+
+    def test_same_input_gives_same_output_per_session(self):
+        first = self.design.create_processor()
+        first.process_audio_chunk(self.audio[::-1].copy())
+        second = self.design.create_processor()
+        third = self.design.create_processor()
+        np.testing.assert_array_equal(second.process_audio_chunk(self.audio), third.process_audio_chunk(self.audio))
+
+    def test_processes_in_place_into_output(self):
+        out = np.empty_like(self.audio)
+        processed = self.design.create_processor().process_audio_chunk(self.audio, out=out)
+        self.assertIs(processed, out)
+        expected = self.design.create_processor().process_audio_chunk(self.audio)
+        np.testing.assert_array_equal(out, expected)
+
+        pcm = (self.audio * 32767).astype(np.int16)
+        converted = self.design.create_processor()._normalize_audio(pcm, out=np.empty(len(pcm), dtype=np.float32))
+        np.testing.assert_allclose(converted, self.audio, atol=1e-4)
+
+    def test_flush_returns_the_held_back_audio(self):
+        processor = self.design.create_processor()
+        processor.process_audio_chunk(self.audio)
+        tail = processor.flush()
+        self.assertEqual(len(tail), processor.aec_processor.noise_suppressor.frame_size)
+        self.assertTrue(np.any(tail))
+
+    def test_flush_without_audio_is_empty(self):
+        processor = self.design.create_processor()
+        self.assertEqual(len(processor.flush()), 0)
+        processor.process_audio_chunk(self.audio[:100])
+        self.assertTrue(np.isfinite(processor.flush()).all())
+
+    def test_aggregate_stats(self):
+        processors = [self.design.create_processor() for _ in range(2)]
+        processors[0].process_audio_chunk(self.audio)
+        processors[1].process_audio_chunk(self.audio)
+        processors[1].process_audio_chunk(self.audio)
+        stats = aggregate_stats(processors)
+        self.assertEqual(stats["sessions"], 2)
+        self.assertEqual(stats["chunks_processed"], 3)
+        self.assertAlmostEqual(stats["audio_seconds"], 3 * 4096 / 16000)
+
+
+class TestEnhanceAudio(unittest.TestCase):
+    def setUp(self):
+        self.processor = PreprocessingDesign.create(enable_aec=False).create_processor()
+        self.audio = np.random.default_rng(0).uniform(-1.0, 1.0, 8192).astype(np.float32)
+
+    def reference(self, audio):
+        filtered = np.zeros_like(audio)
+        filtered[0] = audio[0] * 0.02
+        for i in range(1, len(audio)):
+            filtered[i] = 0.98 * filtered[i - 1] + 0.02 * audio[i]
+        over = np.abs(filtered) > 0.8
+        filtered[over] = np.sign(filtered[over]) * (0.8 + (np.abs(filtered[over]) - 0.8) / 2.0)
+        return filtered
+
+    def test_matches_sample_loop(self):
+        enhanced = self.processor._enhance_audio(self.audio.copy())
+        self.assertEqual(enhanced.dtype, np.float32)
+        np.testing.assert_allclose(enhanced, self.reference(self.audio), atol=1e-6)
+
+    def test_state_carries_across_chunks(self):
+        chunks = [self.processor._enhance_audio(chunk.copy()) for chunk in np.split(self.audio, [1000, 4096, 4097])]
+        np.testing.assert_allclose(np.concatenate(chunks), self.reference(self.audio), atol=1e-6)
+
+    def test_compression(self):
+        enhanced = self.processor._enhance_audio(np.full(4096, 1.0, dtype=np.float32))
+        self.assertLessEqual(enhanced.max(), 0.9 + 1e-6)
+        np.testing.assert_allclose(self.processor._enhance_audio(np.full(4096, -1.0, dtype=np.float32))[-1], -0.9, atol=1e-3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+
+from tests.helpers import FakeSession, Segment
+from whisper_live.transcriber.speech_map import backlog_clips
+
+RATE = 16000
+
+
+class BatchedSession(FakeSession):
+    """Streaming passes return one partial segment, catch-up passes one segment per second of backlog."""
+
+    def __init__(self, **kwargs):
+        super().__init__(text_out=" streaming", send_results=True, **kwargs)
+        self.backlogs = []
+
+    def transcribe_backlog(self, start, end):
+        self.backlogs.append((start, end))
+        seconds = (end - start) // self.RATE
+        return [Segment(i, i + 1.0, f" second {i}", 0.0) for i in range(seconds)], seconds * self.RATE
+
+    def sent_segments(self):
+        return [s for m in self.sent_messages() for s in m.get("segments", [])]
+
+
+class TestBacklogClips(unittest.TestCase):
+    def test_close_chunks_share_a_clip(self):
+        chunks = [{"start": 0, "end": RATE}, {"start": RATE + 4000, "end": 2 * RATE}, {"start": 4 * RATE, "end": 5 * RATE}]
+        clips, consumed = backlog_clips(chunks, 8 * RATE, 30 * RATE)
+        self.assertEqual(clips, [{"start": 0, "end": 2 * RATE}, {"start": 4 * RATE, "end": 5 * RATE}])
+        self.assertEqual(consumed, 8 * RATE)
+
+    def test_speech_at_the_end_is_left_to_streaming(self):
+        chunks = [{"start": 0, "end": RATE}, {"start": 3 * RATE, "end": 8 * RATE}]
+        clips, consumed = backlog_clips(chunks, 8 * RATE, 30 * RATE)
+        self.assertEqual(clips, [{"start": 0, "end": RATE}])
+        self.assertEqual(consumed, 3 * RATE)
+
+    def test_long_speech_is_split_to_the_window(self):
+        clips, consumed = backlog_clips([{"start": 0, "end": 25 * RATE}], 40 * RATE, 10 * RATE)
+        self.assertEqual([(c["start"], c["end"]) for c in clips], [(0, 10 * RATE), (10 * RATE, 20 * RATE), (20 * RATE, 25 * RATE)])
+        self.assertEqual(consumed, 40 * RATE)
+
+        # speech going on at the end only keeps its whole windows
+        clips, consumed = backlog_clips([{"start": RATE, "end": 26 * RATE}], 26 * RATE, 10 * RATE)
+        self.assertEqual([(c["start"], c["end"]) for c in clips], [(RATE, 11 * RATE), (11 * RATE, 21 * RATE)])
+        self.assertEqual(consumed, 21 * RATE)
+
+    def test_silence_is_consumed(self):
+        self.assertEqual(backlog_clips([], 5 * RATE, 30 * RATE), ([], 5 * RATE))
+
+
+class TestCatchUp(unittest.TestCase):
+    def test_session_behind_catches_up_then_streams(self):
+        session = BatchedSession(catch_up_threshold=8.0)
+        session.add_frames(np.zeros(12 * RATE, dtype=np.float32))
+
+        self.assertTrue(session.process_step())
+        # everything but the last CATCH_UP_TARGET seconds went through one batched call
+        self.assertEqual(session.backlogs, [(0, 10 * RATE)])
+        self.assertEqual(session.streamed, [])
+        self.assertAlmostEqual(session.timestamp_offset, 10.0)
+        self.assertEqual(len(session.transcript), 10)
+        self.assertEqual(session.transcript[3]["start"], "3.000")
+        self.assertEqual(session.pass_stats["caught_up"], 1)
+
+        session.process_step()
+        self.assertEqual(session.backlogs, [(0, 10 * RATE)])
+        self.assertEqual(session.streamed, [(10 * RATE, 12 * RATE)])
+
+        segments = session.sent_segments()
+        self.assertEqual([s["text"] for s in segments if s["completed"]][:2], [" second 0", " second 1"])
+        self.assertEqual(segments[-1]["text"], " streaming")
+
+    def test_below_threshold_streams(self):
+        session = BatchedSession(catch_up_threshold=8.0)
+        session.add_frames(np.zeros(6 * RATE, dtype=np.float32))
+        session.process_step()
+        self.assertEqual(session.backlogs, [])
+        self.assertEqual(session.streamed, [(0, 6 * RATE)])
+        session.outbox.close()
+
+    def test_backend_without_batched_transcription_streams(self):
+        session = BatchedSession(catch_up_threshold=8.0)
+        session.transcribe_backlog = lambda start, end: None
+        session.add_frames(np.zeros(12 * RATE, dtype=np.float32))
+        session.process_step()
+        self.assertEqual(session.streamed, [(0, 12 * RATE)])
+        self.assertEqual(session.pass_stats["caught_up"], 0)
+        session.outbox.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@ import os
 import scipy
 import websocket
 import copy
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 from whisper_live.client import Client, TranscriptionClient, TranscriptionTeeClient
@@ -53,6 +54,11 @@ class TestClientCallbacks(BaseTestCase):
             "no_speech_thresh": 0.45,
             "clip_audio": False,
             "same_output_threshold": 10,
+            "commit_policy": "same_output",
+            "result_format": "json",
+            "audio_encoding": "float32",
+            "sample_rate": 16000,
+            "flow_control": False,
             "enable_translation": False,
             "target_language": "fr",
         })
@@ -117,6 +123,25 @@ class TestSendingAudioPacket(BaseTestCase):
         self.client.send_packet_to_server(self.mock_audio_packet)
         self.client.client_socket.send.assert_called_with(self.mock_audio_packet, websocket.ABNF.OPCODE_BINARY)
 
+    def test_pause_holds_audio_until_resume(self):
+        self.client.flow_control = True
+        self.client.on_message(self.mock_ws_app, json.dumps({"uid": self.client.uid, "message": "PAUSE"}))
+        sender = threading.Thread(target=self.client.send_packet_to_server, args=(self.mock_audio_packet,))
+        sender.start()
+        sender.join(0.2)
+        self.assertTrue(sender.is_alive())
+        self.client.client_socket.send.assert_not_called()
+
+        self.client.on_message(self.mock_ws_app, json.dumps({"uid": self.client.uid, "message": "RESUME"}))
+        sender.join(1.0)
+        self.assertFalse(sender.is_alive())
+        self.client.client_socket.send.assert_called_with(self.mock_audio_packet, websocket.ABNF.OPCODE_BINARY)
+
+    def test_pause_is_ignored_without_flow_control(self):
+        self.client.on_message(self.mock_ws_app, json.dumps({"uid": self.client.uid, "message": "PAUSE"}))
+        self.client.send_packet_to_server(self.mock_audio_packet)
+        self.client.client_socket.send.assert_called_with(self.mock_audio_packet, websocket.ABNF.OPCODE_BINARY)
+
 class TestTee(BaseTestCase):
     @patch('whisper_live.client.websocket.WebSocketApp')
     @patch('whisper_live.client.pyaudio.PyAudio')
@@ -149,6 +174,12 @@ class TestTee(BaseTestCase):
         self.client2.client_socket.send.assert_not_called()
         self.client3.client_socket.send.assert_called_with(self.mock_audio_packet, websocket.ABNF.OPCODE_BINARY)
 
+    @patch('whisper_live.client.pyaudio.PyAudio')
+    def test_several_clients_do_not_wait_for_pauses(self, mock_audio):
+        self.client2.flow_control = True
+        TranscriptionTeeClient([self.client2, self.client3])
+        self.assertFalse(self.client2.flow_control)
+
     def test_close_all(self):
         self.tee.close_all_clients()
         for client in self.tee.clients:
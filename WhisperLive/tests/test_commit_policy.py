@@ -0,0 +1,59 @@
+import unittest
+from collections import namedtuple
+
+from whisper_live.backend.base import ServeClientBase
+
+Word = namedtuple("Word", ["start", "end", "word"])
+Segment = namedtuple("Segment", ["start", "end", "text", "no_speech_prob", "words"])
+
+
+def make_segment(words):
+    return Segment(
+        start=words[0].start, end=words[-1].end, text="".join(w.word for w in words),
+        no_speech_prob=0.0, words=words,
+    )
+
+
+class TestLocalAgreementCommitPolicy(unittest.TestCase):
+    def setUp(self):
+        self.client = ServeClientBase("uid", websocket=None, commit_policy="local_agreement")
+
+    def test_unknown_policy_falls_back(self):
+        client = ServeClientBase("uid", websocket=None, commit_policy="bogus")
+        self.assertEqual(client.commit_policy, "same_output")
+
+    def test_first_pass_commits_nothing(self):
+        last = self.client.update_segments(
+            [make_segment([Word(0.0, 0.4, " Hello"), Word(0.5, 0.9, " world")])], 1.0
+        )
+        self.assertEqual(self.client.transcript, [])
+        self.assertEqual(last["text"], " Hello world")
+        self.assertFalse(last["completed"])
+        self.assertEqual(self.client.timestamp_offset, 0.0)
+
+    def test_agreed_prefix_is_committed_and_offset_advances(self):
+        self.client.update_segments(
+            [make_segment([Word(0.0, 0.4, " Hello"), Word(0.5, 0.9, " world"), Word(1.0, 1.2, " this")])], 1.3
+        )
+        last = self.client.update_segments(
+            [make_segment([Word(0.0, 0.4, " hello"), Word(0.5, 0.9, " world,"), Word(1.0, 1.3, " that"),
+                           Word(1.4, 1.6, " is")])], 1.8
+        )
+        self.assertEqual(len(self.client.transcript), 1)
+        self.assertEqual(self.client.transcript[0]["text"], " hello world,")
+        self.assertTrue(self.client.transcript[0]["completed"])
+        self.assertAlmostEqual(self.client.timestamp_offset, 0.9)
+        self.assertEqual(last["text"], " that is")
+        self.assertEqual(self.client.get_committed_text(), "hello world,")
+
+        # the next window starts at the end of the committed words
+        self.client.update_segments(
+            [make_segment([Word(0.0, 0.1, " world"), Word(0.2, 0.4, " that"), Word(0.5, 0.7, " is")])], 0.8
+        )
+        self.assertEqual(len(self.client.transcript), 2)
+        self.assertEqual(self.client.transcript[1]["text"], " that is")
+        self.assertAlmostEqual(self.client.timestamp_offset, 0.9 + 0.7)
+
+
+if __name__ == "__main__":
+    unittest.main()
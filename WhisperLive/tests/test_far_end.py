@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+from scipy import signal
+
+from whisper_live.preprocessing.audio_processor import PreprocessingDesign
+from whisper_live.preprocessing.jitter_buffer import FarEndJitterBuffer
+from whisper_live.protocol import decode_far_end, encode_far_end
+
+
+class TestFarEndProtocol(unittest.TestCase):
+    def test_round_trip(self):
+        samples = np.linspace(-1, 1, 100, dtype=np.float32)
+        position, decoded = decode_far_end(encode_far_end(123456, samples))
+        self.assertEqual(position, 123456)
+        np.testing.assert_array_equal(decoded, samples)
+
+    def test_microphone_audio_is_not_a_far_end_frame(self):
+        audio = np.random.default_rng(0).uniform(-1, 1, 4096).astype(np.float32)
+        self.assertIsNone(decode_far_end(audio.tobytes()))
+        self.assertIsNone(decode_far_end(b"END_OF_AUDIO"))
+
+
+class TestFarEndJitterBuffer(unittest.TestCase):
+    def test_aligns_out_of_order_frames(self):
+        buffer = FarEndJitterBuffer(capacity=1000)
+        stream = np.arange(1, 601, dtype=np.float32)
+        buffer.write(300, stream[300:600])
+        buffer.write(0, stream[:200])
+        # nothing received for [200, 300)
+        np.testing.assert_array_equal(buffer.read(0, 250), np.concatenate([stream[:200], np.zeros(50)]))
+        np.testing.assert_array_equal(buffer.read(250, 250), np.concatenate([np.zeros(50), stream[300:500]]))
+        self.assertIsNone(buffer.read(600, 100))
+
+    def test_drops_late_and_far_ahead_audio(self):
+        buffer = FarEndJitterBuffer(capacity=100)
+        self.assertIsNone(buffer.read(0, 50))
+        buffer.write(40, np.ones(20, dtype=np.float32))
+        buffer.write(120, np.ones(60, dtype=np.float32))
+        stats = buffer.get_stats()
+        self.assertEqual(stats["late_samples"], 10)
+        self.assertEqual(stats["overflow_samples"], 30)
+        far = buffer.read(50, 100)
+        self.assertEqual(far[:10].sum(), 10)
+        self.assertEqual(far[10:70].sum(), 0)
+        self.assertEqual(far[70:].sum(), 30)
+
+
+class TestAudioProcessorFarEnd(unittest.TestCase):
+    def test_far_end_frames_cancel_echo(self):
+        rng = np.random.default_rng(0)
+        far = (signal.lfilter([1.0], [1.0, -0.9], rng.standard_normal(16000 * 6)) * 0.02).astype(np.float32)
+        path = np.zeros(800)
+        path[40:] = rng.standard_normal(760) * np.exp(-np.arange(760) / 150.0) * 0.2
+        mic = signal.lfilter(path, [1.0], far).astype(np.float32)
+
+        design = PreprocessingDesign.create(enable_aec=True)
+        energies = []
+        for send_far_end in (False, True):
+            processor = design.create_processor()
+            processor.aec_processor.ns_enabled = processor.aec_processor.agc_enabled = False
+            out = []
+            for i in range(0, len(mic), 4096):
+                if send_far_end:
+                    processor.add_far_end(i, far[i:i + 4096])
+                out.append(processor.process_audio_chunk(mic[i:i + 4096]))
+            energies.append(np.sum(np.concatenate(out)[len(mic) // 2:] ** 2))
+        self.assertLess(energies[1], energies[0] / 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+from scipy import signal
+
+from whisper_live.preprocessing.aec_processor import WebRTCAECProcessor
+from whisper_live.preprocessing.fdaf import PartitionedBlockFDAF
+
+
+def echo_scene(seconds=8, rate=16000, seed=0):
+    rng = np.random.default_rng(seed)
+    far = (signal.lfilter([1.0], [1.0, -0.9], rng.standard_normal(seconds * rate)) * 0.05).astype(np.float32)
+    path = np.zeros(1500, dtype=np.float32)
+    path[80:] = rng.standard_normal(1420) * np.exp(-np.arange(1420) / 250.0) * 0.2
+    mic = (signal.lfilter(path, [1.0], far) + 1e-3 * rng.standard_normal(len(far))).astype(np.float32)
+    return mic, far
+
+
+class TestPartitionedBlockFDAF(unittest.TestCase):
+    def test_converges_on_echo_path(self):
+        mic, far = echo_scene()
+        canceller = PartitionedBlockFDAF()
+        out = np.concatenate([
+            canceller.process(mic[i:i + 4096], far[i:i + 4096]) for i in range(0, len(mic), 4096)
+        ])
+        tail = slice(len(mic) // 2, None)
+        erle = 10 * np.log10(np.sum(mic[tail] ** 2) / np.sum(out[tail] ** 2))
+        self.assertGreater(erle, 25.0)
+        self.assertGreater(canceller.erle_db, 20.0)
+
+    def test_output_does_not_depend_on_packet_size(self):
+        mic, far = echo_scene(seconds=2)
+        aligned = PartitionedBlockFDAF()
+        expected = np.concatenate([aligned.process(mic[i:i + 256], far[i:i + 256]) for i in range(0, len(mic), 256)])
+        ragged = PartitionedBlockFDAF()
+        bounds = [0, 1000, 1333, 5429, 5430, len(mic)]
+        out = np.concatenate([ragged.process(mic[a:b], far[a:b]) for a, b in zip(bounds, bounds[1:])])
+        np.testing.assert_allclose(out, expected, atol=1e-5)
+
+    def test_skips_without_far_end(self):
+        canceller = PartitionedBlockFDAF()
+        mic = np.ones(4096, dtype=np.float32)
+        self.assertIs(canceller.process(mic), mic)
+        self.assertEqual(canceller.blocks_processed, 0)
+
+        mic, far = echo_scene(seconds=1)
+        canceller.process(mic[:4096], far[:4096])
+        self.assertTrue(canceller.active)
+        # the echo tail still has to be cancelled, then processing stops
+        canceller.process(mic[4096:8192])
+        self.assertFalse(canceller.active)
+        chunk = mic[8192:12288]
+        self.assertIs(canceller.process(chunk), chunk)
+
+
+class TestWebRTCAECProcessor(unittest.TestCase):
+    def test_far_end_reference_is_consumed_with_microphone(self):
+        processor = WebRTCAECProcessor()
+        processor.set_speaker_data(np.ones(1000, dtype=np.float32))
+        far = processor._take_far_end(4096)
+        self.assertEqual(len(far), 4096)
+        self.assertEqual(far[999], 1.0)
+        self.assertEqual(far[1000], 0.0)
+        self.assertIsNone(processor._take_far_end(4096))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from whisper_live.ring_buffer import AudioRingBuffer
+from whisper_live.transcriber.feature_cache import StreamingFeatureExtractor, align_speech_chunks
+
+
+class TestStreamingFeatureExtractor(unittest.TestCase):
+    def setUp(self):
+        self.feature_extractor = FeatureExtractor(feature_size=80)
+        self.buffer = AudioRingBuffer(capacity=16000 * 10)
+        self.cache = StreamingFeatureExtractor(self.feature_extractor, self.buffer)
+        self.stream = (np.random.default_rng(0).standard_normal(16000 * 30) * 0.1).astype(np.float32)
+
+    def stream_packets(self, num_packets, packet_size=4096):
+        for i in range(num_packets):
+            self.buffer.append(self.stream[i * packet_size:(i + 1) * packet_size])
+            yield i
+
+    def test_window_features_match_feature_extractor(self):
+        for i in self.stream_packets(60):
+            if i % 5 or len(self.buffer) < 16000:
+                continue
+            start = self.buffer.start + 160 * (i % 7)
+            audio = self.buffer.view(start)
+            np.testing.assert_allclose(self.cache.features(start, audio), self.feature_extractor(audio), atol=1e-5)
+
+    def test_frames_are_reused_across_passes(self):
+        list(self.stream_packets(20))
+        start = self.buffer.start
+        self.cache.features(start, self.buffer.view(start))
+        cached_until = self.cache.next
+
+        list(self.stream_packets(1))
+        self.cache.features(start, self.buffer.view(start))
+        # only the frames covered by the new packet were computed
+        self.assertLessEqual(self.cache.next - cached_until, 4096 // 160 + 1)
+
+    def test_vad_chunks_match_feature_extractor(self):
+        list(self.stream_packets(40))
+        start = self.buffer.start
+        audio = self.buffer.view(start)
+        chunks = [{"start": 1234, "end": 20001}, {"start": 20100, "end": 60000}, {"start": 70017, "end": len(audio)}]
+        chunks = align_speech_chunks(chunks, 160, len(audio))
+        for chunk in chunks:
+            self.assertEqual(chunk["start"] % 160, 0)
+        vad_audio = np.concatenate([audio[c["start"]:c["end"]] for c in chunks])
+        np.testing.assert_allclose(
+            self.cache.features(start, vad_audio, chunks), self.feature_extractor(vad_audio), atol=1e-5
+        )
+
+    def test_unaligned_window_falls_back(self):
+        list(self.stream_packets(10))
+        start = self.buffer.start + 7
+        audio = self.buffer.view(start)
+        np.testing.assert_allclose(self.cache.features(start, audio), self.feature_extractor(audio), atol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import unittest
+
+import numpy as np
+
+from tests.helpers import FakeSession, Segment
+from whisper_live.flow_control import IngestBudget
+from whisper_live.metrics import METRICS
+
+
+class RecordingOutbox(object):
+    def __init__(self):
+        self.messages = []
+
+    def put_message(self, message):
+        self.messages.append(json.loads(message)["message"])
+
+
+class OneSecondSession(FakeSession):
+    """Transcribes one second per pass, committing it once the same output came twice."""
+
+    def __init__(self, **kwargs):
+        super().__init__(same_output_threshold=1, **kwargs)
+
+    def segments_for(self, duration):
+        return [Segment(0.0, 1.0, " word", 0.0), Segment(1.0, duration, " more", 0.0)]
+
+    def messages(self):
+        return [m["message"] for m in self.sent_messages() if "message" in m]
+
+
+class TestIngestBudget(unittest.TestCase):
+    def setUp(self):
+        self.outbox = RecordingOutbox()
+        self.budget = IngestBudget(self.outbox, "uid", max_pending=10.0)
+
+    def test_pause_and_resume_with_hysteresis(self):
+        self.budget.update(9.9)
+        self.budget.update(10.0)
+        self.budget.update(12.0)
+        self.assertEqual(self.outbox.messages, ["PAUSE"])
+        self.budget.update(6.0)
+        self.assertEqual(self.outbox.messages, ["PAUSE"])
+        self.budget.update(5.0)
+        self.assertEqual(self.outbox.messages, ["PAUSE", "RESUME"])
+        self.assertEqual(self.budget.stats["pauses"], 1)
+
+    def test_idle_session_resumes_the_client(self):
+        self.budget.update(11.0)
+        self.budget.update(11.0, idle=True)
+        self.assertEqual(self.outbox.messages, ["PAUSE", "RESUME"])
+        # an idle session does not pause the client
+        self.budget.update(11.0, idle=True)
+        self.assertEqual(self.outbox.messages, ["PAUSE", "RESUME"])
+
+    def test_zero_budget_sends_nothing(self):
+        budget = IngestBudget(self.outbox, "uid")
+        budget.update(100.0)
+        self.assertFalse(budget.enabled)
+        self.assertEqual(self.outbox.messages, [])
+
+
+class TestSessionFlowControl(unittest.TestCase):
+    def test_client_is_paused_and_resumed_by_transcription(self):
+        session = OneSecondSession(ingest_budget=4.0)
+        for _ in range(5):
+            session.add_frames(np.zeros(session.RATE, dtype=np.float32))
+        self.assertTrue(session.ingest_budget.paused)
+        while session.process_step() and session.ingest_budget.paused:
+            pass
+        self.assertFalse(session.ingest_budget.paused)
+        self.assertLessEqual(session.pending_seconds(), 2.0)
+        self.assertEqual(session.messages(), ["PAUSE", "RESUME"])
+
+    def test_buffered_audio_gauge_follows_transcription(self):
+        session = OneSecondSession()
+        for _ in range(3):
+            session.add_frames(np.zeros(session.RATE, dtype=np.float32))
+        self.assertEqual(METRICS.buffered_seconds.series[(session.client_uid,)], 3.0)
+        session.process_step()
+        self.assertEqual(METRICS.buffered_seconds.series[(session.client_uid,)], session.pending_seconds())
+        self.assertLess(session.pending_seconds(), 3.0)
+
+    def test_untranscribed_audio_trimmed_from_the_buffer_is_counted(self):
+        session = OneSecondSession()
+        before = METRICS.dropped_seconds.series.get((), 0.0)
+        for _ in range(47):
+            session.add_frames(np.zeros(session.RATE, dtype=np.float32))
+        self.assertAlmostEqual(session.dropped_seconds, 30.0)
+        self.assertAlmostEqual(METRICS.dropped_seconds.series.get((), 0.0) - before, 30.0)
+        self.assertEqual(session.messages(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
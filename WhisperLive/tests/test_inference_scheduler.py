@@ -0,0 +1,78 @@
+import threading
+import unittest
+
+import numpy as np
+
+from whisper_live.backend.inference_scheduler import InferenceScheduler
+
+
+class FakeBatchTranscriber:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def transcribe_batch(self, audios, languages=None, **options):
+        self.release.wait(timeout=5)
+        self.calls.append((len(audios), list(languages), options))
+        return [([f"{languages[i]}:{len(audio)}"], None) for i, audio in enumerate(audios)]
+
+
+class TestInferenceScheduler(unittest.TestCase):
+    def setUp(self):
+        self.transcriber = FakeBatchTranscriber()
+        self.scheduler = InferenceScheduler(self.transcriber, max_batch_size=4, max_wait_ms=200)
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def submit_concurrently(self, requests):
+        results = [None] * len(requests)
+
+        def worker(i, audio, options):
+            results[i] = self.scheduler.submit(audio, **options)
+
+        threads = [
+            threading.Thread(target=worker, args=(i, audio, options))
+            for i, (audio, options) in enumerate(requests)
+        ]
+        for t in threads:
+            t.start()
+        self.transcriber.release.set()
+        for t in threads:
+            t.join(timeout=5)
+        return results
+
+    def test_requests_are_batched_and_routed(self):
+        requests = [
+            (np.zeros(16000 * (i + 1), dtype=np.float32), {"language": lang, "task": "transcribe"})
+            for i, lang in enumerate(["en", "de", "en"])
+        ]
+        results = self.submit_concurrently(requests)
+
+        self.assertEqual(sum(call[0] for call in self.transcriber.calls), 3)
+        self.assertLess(len(self.transcriber.calls), 3)
+        self.assertEqual(results[0][0], ["en:16000"])
+        self.assertEqual(results[1][0], ["de:32000"])
+        self.assertEqual(results[2][0], ["en:48000"])
+
+    def test_different_options_are_not_mixed(self):
+        requests = [
+            (np.zeros(16000, dtype=np.float32), {"language": "en", "task": "transcribe"}),
+            (np.zeros(16000, dtype=np.float32), {"language": "en", "task": "translate"}),
+        ]
+        self.submit_concurrently(requests)
+
+        tasks = sorted(call[2]["task"] for call in self.transcriber.calls)
+        self.assertEqual(tasks, ["transcribe", "translate"])
+
+    def test_errors_are_raised_in_the_session(self):
+        def fail(audios, languages=None, **options):
+            raise ValueError("boom")
+
+        self.transcriber.transcribe_batch = fail
+        with self.assertRaises(ValueError):
+            self.scheduler.submit(np.zeros(16000, dtype=np.float32), language="en")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+
+import numpy as np
+
+from tests.helpers import FakeSession
+from whisper_live.preprocessing.ingest_gate import IngestGate
+from whisper_live.timeline import TimelineMap
+
+
+class EnergyModel(object):
+    """Stands in for the streaming Silero model: a window is speech when it is loud."""
+
+    def __call__(self, audio):
+        windows = audio.reshape(-1, 512)
+        return (np.sqrt(np.mean(windows ** 2, axis=1)) > 0.05).astype(np.float32)
+
+
+def speech_and_silence(pattern, seed=0):
+    """Concatenated (seconds, is_speech) parts, rounded to 512-sample windows, with a mask of the speech samples."""
+    rng = np.random.default_rng(seed)
+    parts, mask = [], []
+    for seconds, speech in pattern:
+        n = int(seconds * 16000) // 512 * 512
+        parts.append((0.3 if speech else 0.001) * rng.standard_normal(n))
+        mask.append(np.full(n, speech))
+    return np.concatenate(parts).astype(np.float32), np.concatenate(mask)
+
+
+PATTERN = [(2, False), (1, True), (3, False), (0.5, True), (2, False)]
+
+
+def bursts(mask):
+    """(onset, offset) of each speech burst."""
+    edges = np.flatnonzero(np.diff(np.r_[0, mask.astype(int), 0]))
+    return edges.reshape(-1, 2)
+
+
+def run_gate(gate, audio, packet_size):
+    kept = np.zeros(len(audio), dtype=bool)
+    runs = []
+    for i in range(0, len(audio), packet_size):
+        for position, samples in gate.process(audio[i:i + packet_size]):
+            np.testing.assert_array_equal(samples, audio[position:position + len(samples)])
+            assert not kept[position:position + len(samples)].any()
+            kept[position:position + len(samples)] = True
+            runs.append((position, samples))
+    return kept, runs
+
+
+class TestIngestGate(unittest.TestCase):
+    def setUp(self):
+        self.gate = IngestGate(hangover_ms=500, preroll_ms=300, model=EnergyModel())
+        self.audio, self.speech = speech_and_silence(PATTERN)
+
+    def test_keeps_speech_with_preroll_and_hangover(self):
+        kept, _ = run_gate(self.gate, self.audio, 1000)
+        self.assertTrue(kept[self.speech].all())
+        for onset, offset in bursts(self.speech):
+            # 300 ms before, and the silent windows within the 500 ms hangover after
+            self.assertTrue(kept[onset - 4800:offset + 15 * 512].all())
+            self.assertFalse(kept[onset - 4800 - 512:onset - 4800].any())
+            self.assertFalse(kept[offset + 15 * 512:offset + 16 * 512].any())
+        stats = self.gate.get_stats()
+        self.assertAlmostEqual(stats["audio_seconds"], len(self.audio) / 16000)
+        self.assertAlmostEqual(stats["kept_seconds"], kept.sum() / 16000)
+        self.assertLess(stats["kept_seconds"], 4.0)
+
+    def test_open_gate_lets_partial_windows_through(self):
+        silence, speech = np.zeros(5120, np.float32), 0.3 * np.ones(1000, np.float32)
+        self.gate.process(silence)
+        runs = self.gate.process(speech)
+        # the pre-roll and the whole packet, without waiting for the next window
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(runs[0][0], len(silence) - 4800)
+        self.assertEqual(len(runs[0][1]), 4800 + len(speech))
+
+    def test_packet_size_does_not_change_what_is_kept(self):
+        kept_small, _ = run_gate(self.gate, self.audio, 320)
+        self.gate.reset()
+        kept_large, _ = run_gate(self.gate, self.audio, 4096)
+        np.testing.assert_array_equal(kept_small, kept_large)
+
+
+class TestTimelineMap(unittest.TestCase):
+    def test_identity_without_breaks(self):
+        timeline = TimelineMap()
+        self.assertEqual(timeline.to_stream(12345), 12345)
+        self.assertEqual(timeline.to_stream(12345.5, end=True), 12345.5)
+
+    def test_maps_runs_and_their_boundaries(self):
+        timeline = TimelineMap()
+        timeline.add(0, 1000)
+        timeline.add(500, 5000)
+        self.assertEqual(timeline.to_stream(0), 1000)
+        self.assertEqual(timeline.to_stream(499), 1499)
+        self.assertEqual(timeline.to_stream(500), 5000)
+        # a span ending at a break ends in the run before it
+        self.assertEqual(timeline.to_stream(500, end=True), 1500)
+        self.assertEqual(timeline.to_stream(501, end=True), 5001)
+
+    def test_continuous_runs_add_no_break(self):
+        timeline = TimelineMap()
+        timeline.add(100, 100)
+        timeline.add(300, 400)
+        timeline.add(500, 600)
+        self.assertEqual(timeline.sessions, [0, 300])
+
+    def test_gated_session_reports_stream_time(self):
+        session = FakeSession()
+        gate = IngestGate(hangover_ms=500, preroll_ms=300, model=EnergyModel())
+        audio, speech = speech_and_silence(PATTERN)
+        for i in range(0, len(audio), 1000):
+            for position, samples in gate.process(audio[i:i + 1000]):
+                session.mark_stream_position(position)
+                session.add_frames(samples)
+        self.assertLess(session.frames_buffer.end, len(audio))
+
+        (onset1, offset1), (onset2, offset2) = bursts(speech)
+        # each burst starts 300 ms into its run, the second run follows the first one in the session
+        first_run = 4800 + offset1 - onset1 + 15 * 512
+        segment = session.format_segment(0.3, 0.3 + (offset1 - onset1) / 16000, "one")
+        self.assertEqual(segment["start"], "{:.3f}".format(onset1 / 16000))
+        self.assertEqual(segment["end"], "{:.3f}".format(offset1 / 16000))
+        start = (first_run + 4800) / 16000
+        segment = session.format_segment(start, start + (offset2 - onset2) / 16000, "two")
+        self.assertEqual(segment["start"], "{:.3f}".format(onset2 / 16000))
+        self.assertEqual(segment["end"], "{:.3f}".format(offset2 / 16000))
+        # a segment ending where a run ends stays in that run
+        segment = session.format_segment(0.3, first_run / 16000, "one")
+        self.assertEqual(segment["end"], "{:.3f}".format((offset1 + 15 * 512) / 16000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import urllib.request
+
+from whisper_live.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsRegistry()
+
+    def test_stage_histograms_render_cumulative_buckets(self):
+        self.metrics.observe_stage("transcribe", 0.2, session="a")
+        self.metrics.observe_stage("transcribe", 3.0, session="b")
+        text = self.metrics.render()
+        self.assertIn('whisperlive_stage_seconds_bucket{stage="transcribe",le="0.25"} 1', text)
+        self.assertIn('whisperlive_stage_seconds_bucket{stage="transcribe",le="+Inf"} 2', text)
+        self.assertIn('whisperlive_stage_seconds_count{stage="transcribe"} 2', text)
+        self.assertIn('whisperlive_session_stage_seconds_count{session="a",stage="transcribe"} 1', text)
+
+    def test_session_series_removed(self):
+        self.metrics.observe_stage("send", 0.001, session="a")
+        self.metrics.buffered_seconds.set(1.5, session="a")
+        self.metrics.remove_session("a")
+        text = self.metrics.render()
+        self.assertNotIn('session="a"', text)
+        self.assertIn('whisperlive_stage_seconds_count{stage="send"} 1', text)
+
+    def test_gauge_function_and_http_endpoint(self):
+        self.metrics.active_sessions.function = lambda: 3
+        self.metrics.passes.inc(outcome="skipped")
+        server = self.metrics.serve("127.0.0.1", 0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                text = response.read().decode()
+        finally:
+            server.shutdown()
+        self.assertIn("whisperlive_active_sessions 3", text)
+        self.assertIn('whisperlive_passes_total{outcome="skipped"} 1', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import threading
+import unittest
+
+from whisper_live.backend.model_registry import ModelRegistry
+
+
+class FakeScheduler(object):
+    def __init__(self):
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ModelRegistry(memory_budget=100)
+        self.loads = []
+
+    def loader(self, name):
+        def load():
+            self.loads.append(name)
+            return object()
+        return load
+
+    def test_sessions_share_one_instance(self):
+        first = self.registry.acquire(("m", "tiny"), self.loader("tiny"), size=lambda _: 40)
+        second = self.registry.acquire(("m", "tiny"), self.loader("tiny"), size=lambda _: 40)
+        self.assertIs(first.model, second.model)
+        self.assertEqual(first.refcount, 2)
+        self.assertEqual(self.loads, ["tiny"])
+
+    def test_concurrent_acquire_loads_once(self):
+        threads = [
+            threading.Thread(target=self.registry.acquire, args=(("m", "small"), self.loader("small")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.loads, ["small"])
+        self.assertEqual(self.registry.entries[("m", "small")].refcount, 8)
+
+    def test_passes_limited_to_concurrency(self):
+        entry = self.registry.acquire(("m", "base"), self.loader("base"), concurrency=2)
+        with entry.locked(), entry.locked():
+            self.assertFalse(entry.lock.acquire(blocking=False))
+        self.assertTrue(entry.lock.acquire(blocking=False))
+        entry.lock.release()
+
+        # the first session's setting holds for the loaded model
+        self.assertIs(self.registry.acquire(("m", "base"), self.loader("base"), concurrency=4), entry)
+        self.assertEqual(entry.concurrency, 2)
+
+    def test_idle_models_evicted_lru_under_budget(self):
+        for name in ("tiny", "base", "small"):
+            self.registry.acquire(("m", name), self.loader(name), size=lambda _: 40)
+        self.registry.release(("m", "base"))
+        self.registry.release(("m", "tiny"))
+        # 120 > 100, but base is the only model that went idle before tiny
+        self.assertNotIn(("m", "base"), self.registry.entries)
+        self.assertIn(("m", "tiny"), self.registry.entries)
+        self.assertEqual(self.registry.memory_usage(), 80)
+
+        # a model in use is never evicted, even over budget
+        self.registry.acquire(("m", "large"), self.loader("large"), size=lambda _: 90)
+        self.assertNotIn(("m", "tiny"), self.registry.entries)
+        self.assertIn(("m", "small"), self.registry.entries)
+
+        # an idle model is reused without reloading
+        self.registry.set_memory_budget(None)
+        self.registry.release(("m", "small"))
+        self.registry.acquire(("m", "small"), self.loader("small"))
+        self.assertEqual(self.loads.count("small"), 1)
+
+    def test_attachments_stopped_on_eviction(self):
+        self.registry.acquire(("m", "tiny"), self.loader("tiny"), size=lambda _: 40)
+        scheduler = self.registry.attach(("m", "tiny"), "scheduler", lambda entry: FakeScheduler())
+        self.assertIs(self.registry.attach(("m", "tiny"), "scheduler", lambda entry: FakeScheduler()), scheduler)
+        self.registry.release(("m", "tiny"))
+        self.registry.set_memory_budget(0)
+        self.assertTrue(scheduler.stopped)
+
+    def test_failed_load_is_not_cached(self):
+        def fail():
+            raise RuntimeError("no weights")
+        with self.assertRaises(RuntimeError):
+            self.registry.acquire(("m", "broken"), fail)
+        self.assertNotIn(("m", "broken"), self.registry.entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+import numpy as np
+
+from whisper_live.preprocessing.noise_suppressor import SpectralNoiseSuppressor
+
+
+def noisy_tone(seconds=4, rate=16000, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * rate) / rate
+    # syllable-like bursts changing pitch: a sound lasting as long as the minimum search window counts as noise
+    pitch = np.array([220.0, 330.0, 440.0, 550.0, 660.0])[(t // 0.5).astype(int) % 5]
+    bursts = (t % 0.5) < 0.3
+    tone = (0.3 * np.sin(2 * np.pi * pitch * t) * bursts).astype(np.float32)
+    noise = (0.02 * rng.standard_normal(len(t))).astype(np.float32)
+    return tone, noise
+
+
+class TestSpectralNoiseSuppressor(unittest.TestCase):
+    def test_passes_signal_through_with_constant_delay(self):
+        suppressor = SpectralNoiseSuppressor(gain_floor=1.0)
+        audio = np.random.default_rng(1).standard_normal(8000).astype(np.float32) * 0.1
+        out = suppressor.process(audio)
+        delay = suppressor.frame_size
+        np.testing.assert_allclose(out[:delay], 0.0, atol=1e-6)
+        np.testing.assert_allclose(out[delay:], audio[:-delay], atol=1e-5)
+
+    def test_flush_returns_the_delayed_samples(self):
+        suppressor = SpectralNoiseSuppressor(gain_floor=1.0)
+        audio = np.random.default_rng(2).standard_normal(8100).astype(np.float32) * 0.1
+        out = np.concatenate([suppressor.process(audio), suppressor.flush()])
+        delay = suppressor.frame_size
+        np.testing.assert_allclose(out[delay:], audio, atol=1e-5)
+
+        # the next stream starts over with the same delay
+        out = suppressor.process(audio)
+        np.testing.assert_allclose(out[:delay], 0.0, atol=1e-6)
+        np.testing.assert_allclose(out[delay:], audio[:-delay], atol=1e-5)
+
+    def test_flush_of_a_short_stream_is_finite(self):
+        suppressor = SpectralNoiseSuppressor()
+        self.assertEqual(len(suppressor.flush()), 0)
+        audio = np.random.default_rng(3).standard_normal(100).astype(np.float32) * 0.1
+        out = np.concatenate([suppressor.process(audio), suppressor.flush()])
+        self.assertTrue(np.isfinite(out).all())
+        self.assertEqual(len(out), 100 + suppressor.frame_size)
+        # nothing new since the last flush
+        self.assertEqual(len(suppressor.flush()), 0)
+
+    def test_flush_keeps_the_noise_estimate(self):
+        _, noise = noisy_tone(seconds=2)
+        suppressor = SpectralNoiseSuppressor()
+        suppressor.process(noise)
+        estimate = suppressor.noise.copy()
+        suppressor.flush()
+        np.testing.assert_array_equal(suppressor.noise, estimate)
+
+    def test_attenuates_noise_and_keeps_tone(self):
+        tone, noise = noisy_tone()
+        suppressor = SpectralNoiseSuppressor()
+        out = np.concatenate([suppressor.process(c) for c in np.array_split(tone + noise, 16)])
+        delay = suppressor.frame_size
+        # steady state, once the noise estimate has settled
+        clean = tone[len(tone) // 2 - delay:-delay]
+        residual = out[len(tone) // 2:] - clean
+        noise_before = np.mean(noise[len(tone) // 2:] ** 2)
+        self.assertGreater(10 * np.log10(noise_before / np.mean(residual ** 2)), 6.0)
+        self.assertGreater(np.sqrt(np.mean(out[len(tone) // 2:] ** 2)), 0.9 * np.sqrt(np.mean(clean ** 2)))
+
+    def test_noise_estimate_persists_across_packets(self):
+        _, noise = noisy_tone(seconds=3)
+        suppressor = SpectralNoiseSuppressor()
+        for i in range(0, len(noise), 4096):
+            suppressor.process(noise[i:i + 4096])
+        out = suppressor.process(noise[:4096])
+        # a packet of noise alone is brought down to the gain floor, not gated against itself
+        self.assertLess(np.mean(out ** 2), 0.1 * np.mean(noise[:4096] ** 2))
+
+    def test_output_does_not_depend_on_packet_size(self):
+        tone, noise = noisy_tone(seconds=1)
+        audio = tone + noise
+        expected = SpectralNoiseSuppressor().process(audio)
+        ragged = SpectralNoiseSuppressor()
+        bounds = [0, 1, 255, 256, 1000, 4097, 9000, len(audio)]
+        out = np.concatenate([ragged.process(audio[a:b]) for a, b in zip(bounds, bounds[1:])])
+        np.testing.assert_allclose(out, expected, atol=1e-6)
+
+    def test_in_place(self):
+        tone, noise = noisy_tone(seconds=1)
+        audio = tone + noise
+        expected = SpectralNoiseSuppressor().process(audio)
+        buffer = audio.copy()
+        result = SpectralNoiseSuppressor().process(buffer, out=buffer)
+        self.assertIs(result, buffer)
+        np.testing.assert_allclose(buffer, expected, atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
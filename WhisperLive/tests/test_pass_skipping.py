@@ -0,0 +1,84 @@
+import unittest
+from collections import namedtuple
+from unittest import mock
+
+import numpy as np
+
+from tests.helpers import FakeSession
+
+Word = namedtuple("Word", ["start", "end", "word"])
+WordSegment = namedtuple("WordSegment", ["start", "end", "text", "no_speech_prob", "words"])
+
+
+class WordSession(FakeSession):
+    """Decodes the window as " Hello wor", with word timestamps."""
+
+    def segments_for(self, duration):
+        words = [Word(0.0, 0.4, " Hello"), Word(0.5, 0.8, " wor")]
+        return [WordSegment(0.0, 0.8, " Hello wor", 0.0, words)]
+
+
+class TestPassSkipping(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSession(same_output_threshold=3)
+        self.session.add_frames(np.zeros(self.session.RATE, dtype=np.float32))
+
+    def test_no_pass_without_new_audio(self):
+        self.session.text_out = ""
+        self.assertFalse(self.session.process_step())
+        self.assertFalse(self.session.process_step())
+        self.assertEqual(self.session.calls, 1)
+        self.assertEqual(self.session.pass_stats["skipped"], 1)
+
+    def test_pending_commit_is_replayed_without_inference(self):
+        self.session.REPLAY_INTERVAL = 0.0
+        while self.session.process_step() and self.session.transcript == []:
+            pass
+        self.assertEqual(self.session.calls, 1)
+        self.assertEqual(len(self.session.transcript), 1)
+        self.assertEqual(self.session.transcript[0]["text"], " hello")
+        self.assertEqual(self.session.pass_stats["replayed"], 4)
+
+    def test_replays_are_paced_without_blocking(self):
+        self.assertTrue(self.session.process_step())
+        with mock.patch("whisper_live.backend.base.time.time", return_value=self.session.last_pass_time + 0.04):
+            self.assertFalse(self.session.process_step())
+        self.assertAlmostEqual(self.session.wake_delay, 0.06, places=3)
+        self.assertEqual(self.session.pass_stats["replayed"], 0)
+        with mock.patch("whisper_live.backend.base.time.time", return_value=self.session.last_pass_time + 0.1):
+            self.assertTrue(self.session.process_step())
+        self.assertEqual(self.session.pass_stats["replayed"], 1)
+        self.assertEqual(self.session.calls, 1)
+
+    def test_local_agreement_waits_for_new_audio(self):
+        session = WordSession(commit_policy="local_agreement")
+        session.REPLAY_INTERVAL = 0.0
+        session.add_frames(np.zeros(session.RATE, dtype=np.float32))
+        self.assertFalse(session.process_step())
+        self.assertFalse(session.process_step())
+        # the unconfirmed tail does not agree with itself
+        self.assertEqual(session.transcript, [])
+        self.assertEqual(session.pass_stats["replayed"], 0)
+        self.assertEqual(session.pass_stats["skipped"], 1)
+        self.assertEqual(session.calls, 1)
+
+    def test_cadence_widens_with_pass_latency(self):
+        self.session.text_out = ""
+        self.session.process_step()
+        self.session.pass_latency = 0.0
+        self.session.update_audio_step(1.0)
+        self.assertEqual(self.session.audio_step, 1.0)
+        self.session.add_frames(np.zeros(self.session.RATE // 2, dtype=np.float32))
+        self.assertFalse(self.session.process_step())
+        self.assertEqual(self.session.calls, 1)
+
+        self.session.add_frames(np.zeros(self.session.RATE // 2, dtype=np.float32))
+        self.session.process_step()
+        self.assertEqual(self.session.calls, 2)
+
+        self.session.update_audio_step(10.0)
+        self.assertEqual(self.session.audio_step, self.session.MAX_AUDIO_STEP)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import queue
+import threading
+import time
+import unittest
+from multiprocessing import shared_memory
+
+from tests.helpers import RecordingWebSocket
+from whisper_live.backend.process_pool import BUFFER_SAMPLES, InferenceProcessPool, SESSION_FAILED, WorkerSessions
+
+
+class TestInferenceProcessPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = InferenceProcessPool(1, threads_per_process=1, workers_per_process=1)
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def test_dead_worker_disconnects_its_sessions(self):
+        websocket = RecordingWebSocket()
+        session = self.pool.open_session(websocket, client_uid="client")
+        self.pool.processes[0].kill()
+
+        self.assertTrue(websocket.closed.wait(10))
+        messages = [json.loads(message) for message in websocket.sent]
+        self.assertEqual(messages[0]["status"], "ERROR")
+        self.assertEqual(messages[1]["message"], "DISCONNECT")
+        self.assertNotIn(session.uid, self.pool.sessions)
+        self.assertEqual(self.pool.load, [0])
+        with self.assertRaises(RuntimeError):
+            self.pool.open_session(RecordingWebSocket(), client_uid="other")
+        session.cleanup()
+
+        # nothing left to wait for
+        start = time.time()
+        self.pool.preload(["tiny"], timeout=5)
+        self.assertLess(time.time() - start, 1.0)
+
+    def test_session_failing_to_open_is_removed(self):
+        websocket = RecordingWebSocket()
+        session = self.pool.open_session(websocket, client_uid="client")
+        self.pool.results.put((session.uid, json.dumps({"uid": "client", "status": "ERROR", "message": "no model"})))
+        self.pool.results.put((session.uid, SESSION_FAILED))
+
+        deadline = time.time() + 5
+        while session.uid in self.pool.sessions and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertNotIn(session.uid, self.pool.sessions)
+        self.assertEqual(self.pool.load, [0])
+        session.cleanup()
+        self.assertEqual(json.loads(websocket.sent[0])["status"], "ERROR")
+
+
+class LoadedSession(object):
+    def __init__(self):
+        self.written = []
+        self.positions = []
+        self.timeline = self
+        self.cleaned_up = False
+
+    def add_written_frames(self, num_samples):
+        self.written.append(num_samples)
+
+    def add(self, session_position, stream_position):
+        self.positions.append((session_position, stream_position))
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+
+class TestWorkerSessions(unittest.TestCase):
+    def setUp(self):
+        self.loaded = threading.Event()
+        self.created = []
+        self.results = queue.Queue()
+        self.sessions = WorkerSessions(self.create, self.results)
+        self.shm = shared_memory.SharedMemory(create=True, size=2 * BUFFER_SAMPLES * 4)
+
+    def tearDown(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def create(self, websocket, frames_buffer, options):
+        # a model load or download
+        self.loaded.wait(5)
+        if options.get("fail"):
+            raise RuntimeError("no model")
+        session = LoadedSession()
+        self.created.append(session)
+        return session
+
+    def test_loading_session_does_not_hold_up_the_others(self):
+        self.loaded.set()
+        self.sessions.open("ready", {}, self.shm.name).join(5)
+        self.loaded.clear()
+        loader = self.sessions.open("loading", {}, self.shm.name)
+
+        self.sessions.forward(("frames", "ready", 512))
+        self.sessions.forward(("frames", "loading", 256))
+        self.sessions.forward(("timeline", "loading", 256, 1000))
+        self.assertEqual(self.created[0].written, [512])
+        self.assertTrue(loader.is_alive())
+
+        # what arrived while it was loading is applied in order once it is ready
+        self.loaded.set()
+        loader.join(5)
+        self.sessions.forward(("frames", "loading", 128))
+        self.assertEqual(self.created[1].written, [256, 128])
+        self.assertEqual(self.created[1].positions, [(256, 1000)])
+
+    def test_session_closed_while_loading_is_dropped(self):
+        loader = self.sessions.open("uid", {}, self.shm.name)
+        self.sessions.close("uid")
+        self.loaded.set()
+        loader.join(5)
+        self.assertTrue(self.created[0].cleaned_up)
+        self.assertNotIn("uid", self.sessions.sessions)
+
+    def test_failed_session_reports_an_error(self):
+        self.loaded.set()
+        self.sessions.open("uid", {"fail": True}, self.shm.name).join(5)
+        self.assertEqual(json.loads(self.results.get_nowait()[1])["status"], "ERROR")
+        self.assertEqual(self.results.get_nowait(), ("uid", SESSION_FAILED))
+        self.assertEqual(self.sessions.loading, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import json
+import unittest
+
+from tests.helpers import RecordingWebSocket
+from whisper_live.protocol import (
+    MSGPACK_AVAILABLE, ResultDecoder, ResultEncoder, negotiate_result_format,
+)
+from whisper_live.send_queue import SendQueue
+
+
+def segment(start, end, text, completed):
+    return {"start": "{:.3f}".format(start), "end": "{:.3f}".format(end), "text": text, "completed": completed}
+
+
+class TestResultEncoder(unittest.TestCase):
+    def test_json_results_are_unchanged(self):
+        encoder = ResultEncoder("uid")
+        committed, partial = [segment(0, 1.5, " hello", True)], segment(1.5, 2, " wor", False)
+        self.assertEqual(
+            json.loads(encoder.encode(committed, partial)),
+            {"uid": "uid", "segments": committed + [partial]},
+        )
+
+    def test_unknown_format_falls_back_to_json(self):
+        self.assertEqual(negotiate_result_format(None), "json")
+        self.assertEqual(negotiate_result_format("cbor"), "json")
+        with self.assertRaises(ValueError):
+            ResultEncoder("uid", "cbor")
+
+
+@unittest.skipUnless(MSGPACK_AVAILABLE, "msgpack is not installed")
+class TestMessagePackResults(unittest.TestCase):
+    def setUp(self):
+        self.encoder = ResultEncoder("uid", "msgpack")
+        self.decoder = ResultDecoder()
+
+    def round_trip(self, committed, partial=None):
+        return self.decoder.decode(self.encoder.encode(committed, partial))
+
+    def test_partials_are_sent_as_deltas(self):
+        message = self.round_trip([], segment(0, 0.8, " the qu", False))
+        self.assertEqual(message["uid"], "uid")
+        self.assertEqual(message["segments"], [
+            {"id": 0, "start": 0.0, "end": 0.8, "text": " the qu", "completed": False},
+        ])
+
+        frame = self.encoder.encode([], segment(0, 1.2, " the quick", False))
+        json_frame = ResultEncoder("uid").encode([], segment(0, 1.2, " the quick", False))
+        self.assertLess(len(frame), len(json_frame) / 2)
+        message = self.decoder.decode(frame)
+        self.assertEqual(message["segments"][0]["text"], " the quick")
+
+        # a rewrite keeps only the common prefix
+        message = self.round_trip([], segment(0, 1.3, " the quack ünïcode 🎤", False))
+        self.assertEqual(message["segments"][0]["text"], " the quack ünïcode 🎤")
+        message = self.round_trip([], segment(0, 1.4, " the quack ünïcode 🎤!", False))
+        self.assertEqual(message["segments"][0]["text"], " the quack ünïcode 🎤!")
+
+    def test_committed_segments_get_ids_and_numeric_times(self):
+        self.round_trip([], segment(0, 1, " hello", False))
+        message = self.round_trip(
+            [segment(0, 1.25, " hello", True), segment(1.25, 2.5, " world", True)],
+            segment(2.5, 3, " again", False),
+        )
+        self.assertEqual(message["segments"], [
+            {"id": 0, "start": 0.0, "end": 1.25, "text": " hello", "completed": True},
+            {"id": 1, "start": 1.25, "end": 2.5, "text": " world", "completed": True},
+            {"id": 2, "start": 2.5, "end": 3.0, "text": " again", "completed": False},
+        ])
+        message = self.round_trip([segment(2.5, 3.5, " again!", True)])
+        self.assertEqual([s["id"] for s in message["segments"]], [2])
+
+    def test_partial_without_times(self):
+        message = self.round_trip([], {"text": " tensorrt partial"})
+        self.assertEqual(message["segments"][0]["start"], None)
+        self.assertEqual(message["segments"][0]["text"], " tensorrt partial")
+
+    def test_send_queue_sends_binary_frames(self):
+        websocket = RecordingWebSocket()
+        queue = SendQueue(websocket, "uid", "msgpack")
+        queue.put_segments([segment(0, 1, " one", False)])
+        queue.put_message("text")
+        queue.close()
+        frames = [message for message in websocket.sent if isinstance(message, bytes)]
+        self.assertEqual(len(frames), 1)
+        self.assertIn("text", websocket.sent)
+        self.assertEqual(self.decoder.decode(frames[0])["segments"][0]["text"], " one")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from whisper_live.backend.base import ServeClientBase
+from whisper_live.ring_buffer import AudioRingBuffer
+
+
+class TestAudioRingBuffer(unittest.TestCase):
+    def test_append_and_view_across_wraparound(self):
+        buffer = AudioRingBuffer(capacity=10)
+        stream = np.arange(37, dtype=np.float32)
+        for i in range(0, len(stream), 3):
+            buffer.append(stream[i:i + 3])
+
+        self.assertEqual(buffer.end, 37)
+        self.assertEqual(buffer.start, 27)
+        np.testing.assert_array_equal(buffer.view(), stream[27:])
+        np.testing.assert_array_equal(buffer.view(30, 35), stream[30:35])
+
+    def test_view_is_zero_copy_and_read_only(self):
+        buffer = AudioRingBuffer(capacity=8)
+        buffer.append(np.arange(12, dtype=np.float32))
+        window = buffer.view()
+        self.assertTrue(np.shares_memory(window, buffer.data))
+        self.assertFalse(window.flags.writeable)
+        with self.assertRaises(ValueError):
+            window[0] = 1.0
+
+    def test_discard_and_clamped_views(self):
+        buffer = AudioRingBuffer(capacity=16)
+        buffer.append(np.arange(10, dtype=np.float32))
+        buffer.discard_before(4)
+        self.assertEqual(len(buffer), 6)
+        np.testing.assert_array_equal(buffer.view(0), np.arange(4, 10))
+        self.assertEqual(buffer.view(12).shape[0], 0)
+
+    def test_oversized_append_keeps_newest_samples(self):
+        buffer = AudioRingBuffer(capacity=5)
+        buffer.append(np.arange(3, dtype=np.float32))
+        buffer.append(np.arange(3, 15, dtype=np.float32))
+        self.assertEqual((buffer.start, buffer.end), (10, 15))
+        np.testing.assert_array_equal(buffer.view(), np.arange(10, 15))
+
+    def test_reserve_and_commit_in_place(self):
+        buffer = AudioRingBuffer(capacity=10)
+        stream = np.arange(37, dtype=np.float32)
+        for i in range(0, len(stream), 4):
+            packet = stream[i:i + 4]
+            slot = buffer.reserve(packet.shape[0])
+            self.assertTrue(np.shares_memory(slot, buffer.data))
+            np.multiply(packet, 2, out=slot)
+            buffer.commit(packet.shape[0])
+            end = i + packet.shape[0]
+            np.testing.assert_array_equal(buffer.view(), 2 * stream[max(0, end - 10):end])
+        with self.assertRaises(ValueError):
+            buffer.reserve(11)
+
+    def test_reader_follows_writer_through_shared_memory(self):
+        shm = shared_memory.SharedMemory(create=True, size=2 * 10 * 4)
+        try:
+            writer = AudioRingBuffer(capacity=10, buffer=shm.buf)
+            reader_shm = shared_memory.SharedMemory(name=shm.name)
+            reader = AudioRingBuffer(capacity=10, buffer=reader_shm.buf)
+            stream = np.arange(25, dtype=np.float32)
+            for i in range(0, len(stream), 4):
+                packet = stream[i:i + 4]
+                writer.append(packet)
+                reader.advance(packet.shape[0])
+            self.assertEqual((reader.start, reader.end), (15, 25))
+            np.testing.assert_array_equal(reader.view(), stream[15:])
+            del writer, reader
+            reader_shm.close()
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+class TestSessionAudioBuffer(unittest.TestCase):
+    def setUp(self):
+        self.client = ServeClientBase("uid", websocket=None)
+        self.client.notify_new_audio = lambda: None
+
+    def test_retention_keeps_offset_semantics(self):
+        rate = self.client.RATE
+        stream = np.random.default_rng(0).standard_normal(47 * rate).astype(np.float32)
+        for i in range(0, len(stream), 4096):
+            self.client.add_frames(stream[i:i + 4096])
+
+        self.assertEqual(self.client.frames_offset, 30.0)
+        self.assertEqual(self.client.timestamp_offset, 30.0)
+        np.testing.assert_array_equal(self.client.frames_np, stream[30 * rate:])
+
+        chunk, duration = self.client.get_audio_chunk_for_processing()
+        self.assertAlmostEqual(duration, 17.0)
+        np.testing.assert_array_equal(chunk, stream[30 * rate:])
+
+        self.client.timestamp_offset = 40.0
+        chunk, duration = self.client.get_audio_chunk_for_processing()
+        self.assertAlmostEqual(duration, 7.0)
+        np.testing.assert_array_equal(chunk, stream[40 * rate:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import json
+import threading
+import time
+import unittest
+
+from whisper_live.send_queue import SenderPool, SendQueue
+
+
+class BlockingWebSocket(object):
+    """Records what is sent, and blocks while `released` is not set, like a client that stopped reading."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+        self.released = threading.Event()
+        self.released.set()
+        self.sending = threading.Event()
+
+    def send(self, message):
+        self.sending.set()
+        self.released.wait()
+        self.sent.append(message)
+
+    def close(self):
+        self.closed = True
+
+
+def segment(text, completed):
+    return {"start": "0.000", "end": "1.000", "text": text, "completed": completed}
+
+
+class TestSendQueue(unittest.TestCase):
+    def setUp(self):
+        self.websocket = BlockingWebSocket()
+        self.queue = SendQueue(self.websocket, "uid")
+
+    def tearDown(self):
+        self.websocket.released.set()
+        self.queue.close()
+
+    def sent_segments(self):
+        return [[s["text"] for s in json.loads(m)["segments"]] for m in self.websocket.sent]
+
+    def test_slow_client_does_not_block_and_partials_coalesce(self):
+        self.websocket.released.clear()
+        self.queue.put_segments([segment("a", False)])
+        self.assertTrue(self.websocket.sending.wait(1.0))
+
+        start = time.perf_counter()
+        self.queue.put_segments([segment("ab", False)])
+        self.queue.put_segments([segment("abc", True), segment("d", False)])
+        self.queue.put_segments([segment("de", False)])
+        self.queue.put_segments([segment("def", False)])
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+        self.websocket.released.set()
+        self.queue.close()
+        # the committed segment is kept, only the newest partial follows it
+        self.assertEqual(self.sent_segments(), [["a"], ["abc", "def"]])
+        self.assertEqual(self.queue.stats["coalesced"], 3)
+
+    def test_repeated_partial_is_suppressed(self):
+        self.websocket.released.clear()
+        self.queue.put_segments([segment("a", False)])
+        self.assertTrue(self.websocket.sending.wait(1.0))
+        self.queue.put_segments([segment("a", False)])
+        self.queue.put_segments([segment("a", True), segment("b", False)])
+        self.websocket.released.set()
+        self.queue.close()
+        self.assertEqual(self.sent_segments(), [["a"], ["a", "b"]])
+        self.assertEqual(self.queue.stats["suppressed"], 1)
+
+    def test_committed_segment_replaces_stale_partial(self):
+        self.websocket.released.clear()
+        self.queue.put_message("first")
+        self.assertTrue(self.websocket.sending.wait(1.0))
+        self.queue.put_segments([segment("a", False)])
+        self.queue.put_segments([segment("ab", True)])
+        self.websocket.released.set()
+        self.queue.close()
+        self.assertEqual(self.websocket.sent[0], "first")
+        self.assertEqual([[s["text"] for s in json.loads(m)["segments"]] for m in self.websocket.sent[1:]], [["ab"]])
+
+    def test_messages_keep_their_order(self):
+        self.websocket.released.clear()
+        self.queue.put_message("ready")
+        self.assertTrue(self.websocket.sending.wait(1.0))
+        self.queue.put_segments([segment("a", True)])
+        self.queue.put_message("disconnect")
+        self.queue.put_close()
+        self.websocket.released.set()
+        self.queue.close()
+        self.assertEqual(self.websocket.sent[0], "ready")
+        self.assertEqual(json.loads(self.websocket.sent[1])["segments"][0]["text"], "a")
+        self.assertEqual(self.websocket.sent[2], "disconnect")
+        self.assertTrue(self.websocket.closed)
+
+
+
+class TestSenderPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = SenderPool(num_threads=2)
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def test_sessions_share_a_bounded_number_of_threads(self):
+        websockets = [BlockingWebSocket() for _ in range(10)]
+        queues = [SendQueue(websocket, f"uid{i}", sender_pool=self.pool) for i, websocket in enumerate(websockets)]
+        for q in queues:
+            q.put_message("ready")
+            q.put_segments([segment("a", True)])
+        for q in queues:
+            q.close()
+        self.assertEqual(len(self.pool.threads), 2)
+        for websocket in websockets:
+            self.assertEqual(websocket.sent[0], "ready")
+            self.assertEqual(json.loads(websocket.sent[1])["segments"][0]["text"], "a")
+
+    def test_slow_client_only_holds_its_sender(self):
+        slow, fast = BlockingWebSocket(), BlockingWebSocket()
+        slow.released.clear()
+        slow_queue = SendQueue(slow, "slow", sender_pool=self.pool)
+        fast_queue = SendQueue(fast, "fast", sender_pool=self.pool)
+        slow_queue.put_message("stuck")
+        self.assertTrue(slow.sending.wait(1.0))
+        fast_queue.put_message("ready")
+        fast_queue.close()
+        self.assertEqual(fast.sent, ["ready"])
+        slow.released.set()
+        slow_queue.close()
+        self.assertEqual(slow.sent, ["stuck"])
+
+if __name__ == "__main__":
+    unittest.main()
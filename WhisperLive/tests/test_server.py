@@ -39,6 +39,25 @@ class TestGetWaitTime(unittest.TestCase):
         self.assertAlmostEqual(self.server.client_manager.get_wait_time(), expected_wait_time, places=2)
 
 
+class TestHealthCheck(unittest.TestCase):
+    def setUp(self):
+        self.server = TranscriptionServer()
+        self.connection = mock.Mock()
+
+    def test_health_reports_loading_until_ready(self):
+        self.server.process_request(self.connection, mock.Mock(path="/health"))
+        self.assertEqual(self.connection.respond.call_args[0][0], 503)
+
+        self.server.ready = True
+        self.server.process_request(self.connection, mock.Mock(path="/health"))
+        self.assertEqual(self.connection.respond.call_args[0][0], 200)
+
+    def test_websocket_requests_pass_through(self):
+        self.server.ready = True
+        self.assertIsNone(self.server.process_request(self.connection, mock.Mock(path="/")))
+        self.connection.respond.assert_not_called()
+
+
 class TestServerConnection(unittest.TestCase):
     def setUp(self):
         self.server = TranscriptionServer()
@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+from faster_whisper.vad import VadOptions, get_speech_timestamps, get_vad_model
+
+from whisper_live.ring_buffer import AudioRingBuffer
+from whisper_live.transcriber.speech_map import StreamingSileroVAD, StreamingSpeechMap
+
+
+def bursts(seconds, seed=0):
+    """Noise bursts of varying length and level, 512-sample aligned."""
+    rng = np.random.default_rng(seed)
+    audio = (0.005 * rng.standard_normal(seconds * 16000)).astype(np.float32)
+    t = np.arange(len(audio)) / 16000
+    envelope = (np.sin(2 * np.pi * 0.7 * t) > 0.3) * (0.2 + 0.1 * np.sin(2 * np.pi * 3 * t))
+    audio += (envelope * rng.standard_normal(len(audio))).astype(np.float32)
+    return audio[:len(audio) // 512 * 512]
+
+
+class TestStreamingSileroVAD(unittest.TestCase):
+    def test_incremental_calls_match_one_pass(self):
+        audio = bursts(4)
+        expected = get_vad_model()(audio).reshape(-1)
+        model = StreamingSileroVAD()
+        bounds = [0, 512, 2048, 2560, 16384, len(audio)]
+        probs = np.concatenate([model(audio[a:b]) for a, b in zip(bounds, bounds[1:])])
+        np.testing.assert_allclose(probs, expected, atol=1e-5)
+
+
+class TestStreamingSpeechMap(unittest.TestCase):
+    def setUp(self):
+        self.buffer = AudioRingBuffer(capacity=16000 * 10)
+        self.map = StreamingSpeechMap(self.buffer)
+
+    def test_chunks_match_get_speech_timestamps(self):
+        audio = bursts(6)
+        for i in range(0, len(audio), 4096):
+            self.buffer.append(audio[i:i + 4096])
+            self.map.update()
+        probs = get_vad_model()(audio).reshape(-1)
+        options = VadOptions(threshold=float(np.median(probs)), min_silence_duration_ms=100, speech_pad_ms=30)
+        expected = get_speech_timestamps(audio, options)
+        self.assertGreater(len(expected), 1)
+        self.assertEqual(self.map.speech_chunks(0, len(audio), options), expected)
+
+    def test_windows_are_classified_once(self):
+        audio = bursts(6)
+        options = VadOptions()
+        for i in range(0, len(audio), 4096):
+            self.buffer.append(audio[i:i + 4096])
+            self.map.speech_chunks(self.buffer.start, self.buffer.end, options)
+        self.assertEqual(self.map.windows_classified, self.buffer.end // 512)
+
+    def test_chunks_are_relative_to_the_window(self):
+        audio = bursts(6)
+        self.buffer.append(audio)
+        threshold = float(np.median(get_vad_model()(audio)))
+        options = VadOptions(threshold=threshold, min_silence_duration_ms=100, speech_pad_ms=0)
+        whole = self.map.speech_chunks(0, len(audio), options)
+        shifted = self.map.speech_chunks(4096, len(audio), options)
+        later = [c for c in whole if c["start"] >= 4096]
+        self.assertGreater(len(later), 1)
+        self.assertEqual(shifted[-len(later):], [{"start": c["start"] - 4096, "end": c["end"] - 4096} for c in later])
+
+    def test_catches_up_after_the_buffer_wrapped(self):
+        audio = bursts(25)
+        self.buffer.append(audio)
+        self.map.update()
+        self.assertEqual(self.map.first, -(-self.buffer.start // 512))
+        self.assertEqual(self.map.next, self.buffer.end // 512)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from whisper_live.uplink import UplinkDecoder, UplinkEncoder, pack_opus_packets, unpack_opus_packets
+
+
+def tone(seconds, sample_rate, frequency=440.0, amplitude=0.3):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def stream(encoder, decoder, audio, packet=4096):
+    """Send `audio` in packets like the client does, returns the decoded audio and the bytes sent."""
+    out, sent = [], 0
+    for i in range(0, len(audio), packet):
+        message = encoder.encode(audio[i:i + packet])
+        sent += len(message)
+        out.append(decoder.decode(message))
+    message = encoder.flush()
+    sent += len(message)
+    out.append(decoder.decode(message))
+    return np.concatenate(out), sent
+
+
+class TestUplink(unittest.TestCase):
+    def test_int16_round_trip(self):
+        audio = tone(1, 16000)
+        decoded, sent = stream(UplinkEncoder("int16"), UplinkDecoder("int16"), audio)
+        self.assertEqual(sent, 2 * len(audio))
+        self.assertEqual(decoded.dtype, np.float32)
+        np.testing.assert_allclose(decoded, audio, atol=1e-4)
+
+    def test_float32_is_unchanged(self):
+        audio = tone(0.5, 16000)
+        decoded, _ = stream(UplinkEncoder(), UplinkDecoder(), audio)
+        np.testing.assert_array_equal(decoded, audio)
+
+    def test_opus_round_trip(self):
+        audio = tone(2, 16000)
+        decoded, sent = stream(UplinkEncoder("opus"), UplinkDecoder("opus"), audio)
+        self.assertLess(sent, 4 * len(audio) / 10)
+        # the decoder's pre-skip shifts the audio by a few milliseconds
+        self.assertAlmostEqual(len(decoded) / 16000, 2, delta=0.05)
+        rms = np.sqrt(np.mean(decoded[1600:-1600] ** 2))
+        self.assertAlmostEqual(rms, 0.3 / np.sqrt(2), delta=0.03)
+        spectrum = np.abs(np.fft.rfft(decoded[1600:17600]))
+        self.assertAlmostEqual(np.argmax(spectrum), 440, delta=2)
+
+    def test_resamples_to_the_session_rate(self):
+        audio = tone(1, 48000)
+        decoded, _ = stream(UplinkEncoder("int16", 48000), UplinkDecoder("int16", 48000), audio, packet=4800)
+        self.assertAlmostEqual(len(decoded), 16000, delta=160)
+        spectrum = np.abs(np.fft.rfft(decoded[:8000]))
+        self.assertAlmostEqual(np.argmax(spectrum) * 16000 / 8000, 440, delta=2)
+
+    def test_rejects_unsupported_uplinks(self):
+        with self.assertRaises(ValueError):
+            UplinkDecoder("mp3")
+        with self.assertRaises(ValueError):
+            UplinkDecoder("opus", 44100)
+        with self.assertRaises(ValueError):
+            UplinkEncoder("int16", 0)
+
+    def test_opus_packet_framing(self):
+        packets = [b"\x01\x02", b"", b"x" * 300]
+        message = pack_opus_packets(packets)
+        self.assertEqual(unpack_opus_packets(message), packets)
+        with self.assertRaises(ValueError):
+            unpack_opus_packets(message[:-1])
+        with self.assertRaises(ValueError):
+            UplinkDecoder("opus").decode(message[:-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,3 +24,11 @@ class TestVoiceActivityDetection(unittest.TestCase):
         audio_tensor = load_audio("assets/jfk.flac")
         is_speech_present = self.vad(audio_tensor)
         self.assertTrue(is_speech_present, "VAD failed to identify speech segment.")
+
+    def test_vad_reuses_buffers(self):
+        model = self.vad.model
+        window = np.zeros(512, dtype=np.float64)
+        first = model(window, self.sample_rate)
+        second = model(window, self.sample_rate)
+        self.assertIs(first, second)
+        self.assertEqual(first.dtype, np.float32)
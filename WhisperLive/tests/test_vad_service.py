@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from whisper_live.vad_service import VADService
+
+
+class FakeSileroSession:
+    """Recurrent stand-in for the Silero model: the output depends on the state, the context and the window."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def run(self, output_names, inputs):
+        x, state = inputs["input"], inputs["state"]
+        self.batch_sizes.append(len(x))
+        state = state.copy()
+        state[0, :, 0] = 0.5 * state[0, :, 0] + x[:, 64:].mean(axis=1)
+        state[1, :, 0] = x[:, :64].mean(axis=1)
+        out = (state[0, :, :1] + state[1, :, :1]).astype(np.float32)
+        return out, state
+
+
+def reference_probs(audio):
+    """The same stream evaluated one window at a time, batch of one."""
+    session = FakeSileroSession()
+    state = np.zeros((2, 1, 128), dtype=np.float32)
+    context = np.zeros(64, dtype=np.float32)
+    probs = []
+    for i in range(0, len(audio) - 511, 512):
+        x = np.concatenate([context, audio[i:i + 512]])[None]
+        out, state = session.run(None, {"input": x, "state": state, "sr": np.array(16000)})
+        context = x[0, -64:]
+        probs.append(out[0, 0])
+    return np.array(probs, dtype=np.float32)
+
+
+class TestVADService(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSileroSession()
+        self.service = VADService(self.session, max_wait_ms=200)
+
+    def tearDown(self):
+        self.service.stop()
+
+    def test_sessions_share_inferences(self):
+        rng = np.random.default_rng(0)
+        audios = [rng.standard_normal(4096).astype(np.float32) for _ in range(3)]
+        streams = [self.service.open() for _ in audios]
+        results = [None] * len(audios)
+
+        def worker(i):
+            results[i] = streams[i].submit(audios[i])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(audios))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+
+        # 8 windows per session, stepped together: 8 inferences of 3 rows instead of 24
+        self.assertEqual(self.session.batch_sizes, [3] * 8)
+        for audio, probs in zip(audios, results):
+            np.testing.assert_allclose(probs, reference_probs(audio), atol=1e-6)
+
+    def test_state_carries_across_chunks(self):
+        audio = np.random.default_rng(1).standard_normal(5000).astype(np.float32)
+        stream = self.service.open()
+        bounds = [0, 100, 1500, 1524, 5000]
+        probs = np.concatenate([stream.submit(audio[a:b]) for a, b in zip(bounds, bounds[1:])])
+        np.testing.assert_allclose(probs, reference_probs(audio), atol=1e-6)
+        # the 392 samples past the last full window wait for the next chunk
+        self.assertEqual(stream.filled, 5000 % 512)
+
+    def test_single_stream_does_not_wait(self):
+        stream = self.service.open()
+        start = time.monotonic()
+        stream.submit(np.zeros(512, dtype=np.float32))
+        # far below the 200ms max_wait
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_tick_runs_once_every_open_stream_is_pending(self):
+        streams = [self.service.open() for _ in range(2)]
+        closed = self.service.open()
+        closed.close()
+        threads = [threading.Thread(target=s.submit, args=(np.zeros(512, dtype=np.float32),)) for s in streams]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(self.session.batch_sizes, [2])
+
+    def test_short_chunk_does_not_wait(self):
+        stream = self.service.open()
+        self.assertEqual(len(stream.submit(np.zeros(100, dtype=np.float32))), 0)
+        self.assertEqual(self.session.batch_sizes, [])
+
+    def test_errors_are_raised_in_the_session(self):
+        def fail(output_names, inputs):
+            raise ValueError("boom")
+
+        self.session.run = fail
+        with self.assertRaises(ValueError):
+            self.service.open().submit(np.zeros(512, dtype=np.float32))
+
+
+if __name__ == "__main__":
+    unittest.main()
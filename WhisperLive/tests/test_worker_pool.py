@@ -0,0 +1,88 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.worker_pool import TranscriptionWorkerPool
+
+
+class CountingSession(ServeClientBase):
+    def __init__(self, worker_pool):
+        super().__init__("uid", websocket=None, worker_pool=worker_pool)
+        self.passes = 0
+        self.active = 0
+        self.max_active = 0
+        self.counter_lock = threading.Lock()
+
+    def process_step(self):
+        with self.counter_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self.counter_lock:
+            self.active -= 1
+            self.passes += 1
+        return False
+
+
+class TestTranscriptionWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = TranscriptionWorkerPool(num_workers=2)
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def wait_for(self, predicate, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return predicate()
+
+    def test_idle_session_is_never_run(self):
+        session = CountingSession(self.pool)
+        session.start_transcription()
+        time.sleep(0.1)
+        self.assertEqual(session.passes, 0)
+        self.assertIsNone(session.trans_thread)
+
+    def test_small_chunks_do_not_wake_the_session(self):
+        session = CountingSession(self.pool)
+        session.add_frames(np.zeros(int(0.1 * session.RATE), dtype=np.float32))
+        time.sleep(0.1)
+        self.assertEqual(session.passes, 0)
+
+    def test_new_audio_schedules_a_pass(self):
+        session = CountingSession(self.pool)
+        session.add_frames(np.zeros(session.RATE, dtype=np.float32))
+        self.assertTrue(self.wait_for(lambda: session.passes == 1))
+
+    def test_session_never_runs_concurrently(self):
+        session = CountingSession(self.pool)
+        for _ in range(10):
+            session.add_frames(np.zeros(session.RATE, dtype=np.float32))
+        time.sleep(0.3)
+        self.assertEqual(session.max_active, 1)
+        # schedules arriving while a pass runs collapse into a single extra pass
+        self.assertLessEqual(session.passes, 3)
+
+    def test_delayed_schedule_runs_later(self):
+        session = CountingSession(self.pool)
+        self.pool.schedule_after(session, 0.2)
+        time.sleep(0.1)
+        self.assertEqual(session.passes, 0)
+        self.assertTrue(self.wait_for(lambda: session.passes == 1))
+
+    def test_exited_session_is_dropped(self):
+        session = CountingSession(self.pool)
+        session.cleanup()
+        self.pool.schedule(session)
+        time.sleep(0.1)
+        self.assertEqual(session.passes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,13 +3,21 @@ import logging
 import threading
 import time
 import queue
-import numpy as np
+import string
+
+from whisper_live.backend.model_registry import MODEL_REGISTRY
+from whisper_live.flow_control import IngestBudget
+from whisper_live.metrics import METRICS
+from whisper_live.ring_buffer import AudioRingBuffer
+from whisper_live.send_queue import SendQueue
+from whisper_live.timeline import TimelineMap
 
 
 class ServeClientBase(object):
     RATE = 16000
     SERVER_READY = "SERVER_READY"
     DISCONNECT = "DISCONNECT"
+    COMMIT_POLICIES = ("same_output", "local_agreement")
 
     client_uid: str
     """A unique identifier for the client."""
@@ -23,6 +31,18 @@ class ServeClientBase(object):
     """Whether to clip audio with no valid segments."""
     same_output_threshold: int
     """Number of repeated outputs before considering it as a valid segment."""
+    commit_policy: str
+    """How segments are committed: "same_output" (repeated partials) or "local_agreement" (agreed word prefix)."""
+    MIN_CHUNK_DURATION = 0.5
+    """Minimum amount of unprocessed audio (in seconds) before a transcription pass is run."""
+    BUFFER_CAPACITY = 60
+    """Capacity (in seconds) of the session audio buffer, kept above the 45s retention so in-flight windows stay valid."""
+    MAX_AUDIO_STEP = 2.0
+    """Upper bound (in seconds) of the adaptive amount of new audio required between two passes."""
+    CATCH_UP_TARGET = 2.0
+    """Audio (in seconds) a catch-up pass leaves pending for the streaming passes, the latency they resume at."""
+    REPLAY_INTERVAL = 0.1
+    """Minimum time (in seconds) between two replays of an unchanged window, so repeated outputs leave room for new speech."""
 
     def __init__(
         self,
@@ -33,18 +53,39 @@ class ServeClientBase(object):
         clip_audio=False,
         same_output_threshold=10,
         translation_queue=None,
+        worker_pool=None,
+        commit_policy="same_output",
+        min_audio_step=0.0,
+        frames_buffer=None,
+        result_format="json",
+        ingest_budget=0.0,
+        catch_up_threshold=0.0,
     ):
         self.client_uid = client_uid
         self.websocket = websocket
+        # sends of the transcription thread go through it
+        self.outbox = SendQueue(websocket, client_uid, result_format)
+        self.ingest_budget = IngestBudget(self.outbox, client_uid, ingest_budget)
         self.send_last_n_segments = send_last_n_segments
         self.no_speech_thresh = no_speech_thresh
         self.clip_audio = clip_audio
         self.same_output_threshold = same_output_threshold
+        if commit_policy not in self.COMMIT_POLICIES:
+            logging.warning(f"Unknown commit policy '{commit_policy}', using 'same_output'")
+            commit_policy = "same_output"
+        self.commit_policy = commit_policy
 
         self.frames = b""
         self.timestamp_offset = 0.0
-        self.frames_np = None
+        # a buffer can be handed in when another process writes the session audio into shared memory
+        if frames_buffer is None:
+            frames_buffer = AudioRingBuffer(int(self.BUFFER_CAPACITY * self.RATE))
+        self.frames_buffer = frames_buffer
         self.frames_offset = 0.0
+        self.dropped_seconds = 0.0  # untranscribed audio discarded from the full buffer
+        self.timeline = TimelineMap()  # session buffer position -> client stream position
+        self.window_alignment = 1
+        self.window_start = 0
         self.text = []
         self.current_out = ""
         self.prev_out = ""
@@ -53,10 +94,74 @@ class ServeClientBase(object):
         self.transcript = []
         self.last_sent_segment_count = 0  # Track how many segments we've already sent
         self.end_time_for_same_output = None
+        self.hypothesis = []  # uncommitted (start, end, word) of the previous pass, local_agreement only
+        self.committed_words = []
         self.translation_queue = translation_queue
+        self.translation_client = None
+        self.worker_pool = worker_pool
+        self.model_key = None  # key of the shared model in the model registry, set by the backend
+        self.model_entry = None
+
+        # pass bookkeeping: a pass only runs once enough new audio arrived since the previous one
+        self.min_audio_step = min_audio_step
+        self.catch_up_threshold = catch_up_threshold
+        self.audio_step = min_audio_step
+        self.pass_latency = 0.0
+        self.last_pass_window = None  # (window_start, window_end) of the previous pass, absolute samples
+        self.last_transcribed_end = 0
+        self.last_result = None
+        self.last_pass_time = 0.0  # wall time the previous pass (or replay) ended
+        self.last_frames_time = None  # wall time the newest audio arrived
+        self.pass_stats = {"transcribed": 0, "replayed": 0, "skipped": 0, "caught_up": 0}
 
         # threading
         self.lock = threading.Lock()
+        self.data_ready = threading.Event()
+        self.wake_delay = None  # set by wake_after, for the session's own thread
+        self.trans_thread = None
+
+    @property
+    def frames_np(self):
+        """
+        Read-only view of the retained session audio, starting at `frames_offset`, or None before any audio arrived.
+        """
+        if self.frames_buffer.end == 0:
+            return None
+        return self.frames_buffer.view()
+
+    def start_transcription(self):
+        """
+        Start processing audio for this session.
+
+        With a shared worker pool nothing needs to be started: the session is scheduled on the pool
+        whenever `add_frames` brings in enough new audio. Without one, a dedicated thread runs
+        `speech_to_text`, sleeping until new audio arrives.
+        """
+        if self.worker_pool is not None:
+            return
+        self.trans_thread = threading.Thread(target=self.speech_to_text)
+        self.trans_thread.start()
+
+    def notify_new_audio(self):
+        """
+        Wake up whatever runs transcription passes for this session.
+        """
+        if self.worker_pool is not None:
+            self.worker_pool.schedule(self)
+        else:
+            self.data_ready.set()
+
+    def wake_after(self, delay):
+        """
+        Wake up whatever runs transcription passes for this session in `delay` seconds, or earlier if new audio arrives.
+
+        Args:
+            delay (float): Seconds to wait.
+        """
+        if self.worker_pool is not None:
+            self.worker_pool.schedule_after(self, delay)
+        else:
+            self.wake_delay = delay
 
     def speech_to_text(self):
         """
@@ -78,35 +183,233 @@ class ServeClientBase(object):
                 logging.info("Exiting speech to text thread")
                 break
 
-            if self.frames_np is None:
-                continue
+            self.data_ready.clear()
+            if not self.process_step():
+                # sleep until add_frames brings in new audio (or cleanup wakes us up), or a replay is due
+                self.data_ready.wait(self.wake_delay)
+                self.wake_delay = None
 
-            if self.clip_audio:
-                self.clip_audio_if_no_valid_segment()
+    def process_step(self):
+        """
+        Run a single transcription pass over the unprocessed audio, then pause or resume the client
+        for the audio still pending.
 
-            input_bytes, duration = self.get_audio_chunk_for_processing()
-            # Reduced from 1.0s to 0.5s for faster response time
-            if duration < 0.5:
-                time.sleep(0.05)     # Reduced sleep time for faster processing
-                continue
-            try:
-                input_sample = input_bytes.copy()
-                result = self.transcribe_audio(input_sample)
+        This is the unit of work executed either by the session's own thread or by a worker of the
+        shared `TranscriptionWorkerPool`.
 
-                # Don't block on language detection - process audio even if language not yet detected
-                if result is None:
-                    self.timestamp_offset += duration
-                    time.sleep(0.1)    # Reduced sleep time when no voice activity detected
-                    continue
-                # If language is None but we have a result, language will be auto-detected from the result
-                if self.language is None and result:
-                    # Language will be set in transcribe_audio via set_language()
-                    pass
-                self.handle_transcription_output(result, duration)
+        Returns:
+            bool: True if the session should run another pass even when no new audio arrives, i.e.
+                  an incomplete segment is still waiting to be finalized.
+        """
+        run_again = self.transcription_pass()
+        pending = self.pending_seconds()
+        if not self.exit:
+            # the series of a session that ended is removed
+            METRICS.buffered_seconds.set(pending, session=self.client_uid)
+        if self.ingest_budget.enabled:
+            self.ingest_budget.update(pending, idle=not run_again)
+        return run_again
+
+    def pending_seconds(self):
+        """Audio received but not transcribed yet, in seconds."""
+        with self.lock:
+            return self.pending_samples() / self.RATE
+
+    def pending_samples(self):
+        return len(self.frames_buffer) - int((self.timestamp_offset - self.frames_offset) * self.RATE)
 
+    def transcription_pass(self):
+        """
+        Run a single transcription pass over the unprocessed audio.
+
+        Returns:
+            bool: True if the session should run another pass even when no new audio arrives.
+        """
+        if self.frames_buffer.end == 0:
+            return False
+
+        if self.catch_up_threshold > 0 and self.pending_seconds() > self.catch_up_threshold:
+            run_again = self.catch_up()
+            if run_again is not None:
+                return run_again
+
+        if self.clip_audio:
+            self.clip_audio_if_no_valid_segment()
+
+        input_bytes, duration = self.get_audio_chunk_for_processing()
+        # Reduced from 1.0s to 0.5s for faster response time
+        if duration < self.MIN_CHUNK_DURATION:
+            return False
+
+        window = (self.window_start, self.window_start + input_bytes.shape[0])
+        arrival = self.last_frames_time
+        # only repeated outputs commit without new audio, a local agreement needs a new hypothesis
+        commit_pending = (self.commit_policy == "same_output" and self.current_out != ''
+                          and self.last_result is not None)
+        if window == self.last_pass_window:
+            if not commit_pending:
+                self.count_pass("skipped")
+                return False
+            # the model would return the same output for the same window, replay it so
+            # the pending commit decision can move on without running inference again
+            wait = self.last_pass_time + self.REPLAY_INTERVAL - time.time()
+            if wait > 0:
+                self.wake_after(wait)
+                return False
+            self.last_pass_time = time.time()
+            self.count_pass("replayed")
+            offset = self.timestamp_offset
+            try:
+                self.handle_transcription_output(self.last_result, duration)
             except Exception as e:
-                logging.error(f"[ERROR]: Failed to transcribe audio chunk: {e}")
-                time.sleep(0.01)
+                logging.error(f"[ERROR]: Failed to handle transcription output: {e}")
+                return False
+            # after a commit the rest of the window still needs a real pass
+            return self.current_out != '' or self.timestamp_offset != offset
+        if not commit_pending and not self.has_new_audio(window):
+            self.count_pass("skipped")
+            return False
+
+        try:
+            pass_start = time.time()
+            result = self.transcribe_audio(input_bytes)
+            elapsed = time.time() - pass_start
+            self.update_audio_step(elapsed)
+            self.count_pass("transcribed")
+            METRICS.observe_stage("transcribe", elapsed, self.client_uid)
+            METRICS.real_time_factor.observe(elapsed / duration)
+
+            # Don't block on language detection - process audio even if language not yet detected
+            if result is None:
+                self.timestamp_offset += duration
+                self.last_result = None
+                return False
+            result = list(result)
+            self.last_pass_window = window
+            self.last_transcribed_end = window[1]
+            self.last_result = result
+            self.handle_transcription_output(result, duration)
+            self.last_pass_time = time.time()
+            if arrival is not None:
+                METRICS.audio_to_text_seconds.observe(time.time() - arrival)
+        except Exception as e:
+            logging.error(f"[ERROR]: Failed to transcribe audio chunk: {e}")
+            return False
+        return self.commit_policy == "same_output" and self.current_out != ''
+
+    def catch_up(self):
+        """
+        Transcribe the backlog of a session that fell behind in one batched call.
+
+        Everything pending but the last `CATCH_UP_TARGET` seconds is handed to `transcribe_backlog`,
+        its segments are committed at once and the streaming passes resume where the backlog's speech
+        stops (or at the utterance still going on there).
+
+        Returns:
+            bool or None: True once the backlog is committed, None if the backend cannot catch up, in which
+                case the regular pass runs.
+        """
+        with self.lock:
+            offset = self.timestamp_offset
+            start = self.frames_buffer.start + max(0, int(round((offset - self.frames_offset) * self.RATE)))
+            end = self.frames_buffer.end - int(self.CATCH_UP_TARGET * self.RATE)
+        if end - start < self.MIN_CHUNK_DURATION * self.RATE:
+            return None
+
+        pass_start = time.time()
+        try:
+            backlog = self.transcribe_backlog(start, end)
+        except Exception as e:
+            logging.error(f"[ERROR]: Failed to transcribe the backlog of client {self.client_uid}: {e}")
+            return None
+        if backlog is None or backlog[1] <= 0:
+            return None
+        segments, consumed = backlog
+        elapsed = time.time() - pass_start
+        self.count_pass("caught_up")
+        METRICS.observe_stage("catch_up", elapsed, self.client_uid)
+        METRICS.caught_up_seconds.inc(consumed / self.RATE)
+
+        for s in segments:
+            if self.get_segment_no_speech_prob(s) > self.no_speech_thresh or not s.text.strip():
+                continue
+            seg_start = offset + self.get_segment_start(s)
+            seg_end = offset + min(consumed / self.RATE, self.get_segment_end(s))
+            if seg_start >= seg_end:
+                continue
+            self.text.append(s.text)
+            completed_segment = self.format_segment(seg_start, seg_end, s.text, completed=True)
+            self.transcript.append(completed_segment)
+            self.queue_for_translation(completed_segment)
+            if self.commit_policy == "local_agreement":
+                self.committed_words.append((seg_start, seg_end, s.text))
+        del self.committed_words[:-50]
+
+        with self.lock:
+            self.timestamp_offset = max(self.timestamp_offset, offset + consumed / self.RATE)
+        # the streaming passes start over on the audio after the backlog
+        self.current_out = ''
+        self.prev_out = ''
+        self.same_output_count = 0
+        self.end_time_for_same_output = None
+        self.hypothesis = []
+        self.last_pass_window = None
+        self.last_result = None
+
+        new_segments = self.prepare_segments()
+        if new_segments:
+            self.send_transcription_to_client(new_segments)
+        logging.info(
+            f"⏩ Client {self.client_uid} caught up on {consumed / self.RATE:.1f}s of backlog in {elapsed:.2f}s "
+            f"({len(new_segments)} segments)"
+        )
+        return True
+
+    def transcribe_backlog(self, start, end):
+        """
+        Transcribe a span of session audio in one batched call, for `catch_up`.
+
+        Args:
+            start (int): Absolute index of the first sample of the backlog.
+            end (int): Absolute index one past its last sample.
+
+        Returns:
+            tuple or None: The segments, with times relative to `start`, and the number of samples from
+                `start` they account for. None if the backend has no batched transcription.
+        """
+        return None
+
+    def count_pass(self, outcome):
+        self.pass_stats[outcome] += 1
+        METRICS.passes.inc(outcome=outcome)
+
+    def has_new_audio(self, window):
+        """
+        Whether a window is worth a transcription pass without a pending commit decision.
+
+        Args:
+            window (tuple): Absolute (start, end) sample indices of the window.
+
+        Returns:
+            bool: True if the window moved since the previous pass or at least `audio_step`
+                  seconds of audio arrived after it.
+        """
+        if self.last_pass_window is None or window[0] != self.last_pass_window[0]:
+            return True
+        return window[1] - self.last_transcribed_end >= self.audio_step * self.RATE
+
+    def update_audio_step(self, latency):
+        """
+        Adapt the amount of new audio required between two passes to the pass latency.
+
+        Under load passes take longer, so the cadence widens up to `MAX_AUDIO_STEP` and a session
+        never asks for more than about one pass per pass duration of new audio.
+
+        Args:
+            latency (float): Wall time (in seconds) of the pass that just ran.
+        """
+        self.pass_latency = latency if self.pass_latency == 0.0 else 0.8 * self.pass_latency + 0.2 * latency
+        self.audio_step = min(self.MAX_AUDIO_STEP, max(self.min_audio_step, self.pass_latency))
 
     def transcribe_audio(self):
         raise NotImplementedError
@@ -123,11 +426,16 @@ class ServeClientBase(object):
             end (float): The end time of the transcription segment in seconds.
             text (str): The transcribed text corresponding to the segment.
 
+        Times are in session audio time; they are reported in the time of the client stream, which
+        differs when an ingest gate dropped silence before it reached the session buffer.
+
         Returns:
             dict: A dictionary representing the formatted transcription segment, including
                 'start' and 'end' times as strings with three decimal places and the 'text'
                 of the transcription.
         """
+        start += self.timeline.offset(start * self.RATE) / self.RATE
+        end += self.timeline.offset(end * self.RATE, end=True) / self.RATE
         return {
             'start': "{:.3f}".format(start),
             'end': "{:.3f}".format(end),
@@ -144,27 +452,87 @@ class ServeClientBase(object):
         to prevent excessive memory usage.
 
         If the buffer size exceeds a threshold (45 seconds of audio data), it discards the oldest 30 seconds
-        of audio data to maintain a reasonable buffer size. If the buffer is empty, it initializes it with the provided
-        audio frame. The audio stream buffer is used for real-time processing of audio data for transcription.
+        of audio data to maintain a reasonable buffer size. The audio is stored in a preallocated ring buffer,
+        so appending costs the same no matter how long the session has been running and discarding never copies.
+        Discarded audio that was not transcribed yet is counted as dropped; clients that honour the session's
+        `IngestBudget` are paused before that happens.
 
         Args:
             frame_np (numpy.ndarray): The audio frame data as a NumPy array.
 
         """
-        self.lock.acquire()
-        if self.frames_np is not None and self.frames_np.shape[0] > 45*self.RATE:
-            self.frames_offset += 30.0
-            self.frames_np = self.frames_np[int(30*self.RATE):]
-            # check timestamp offset(should be >= self.frame_offset)
-            # this basically means that there is no speech as timestamp offset hasnt updated
-            # and is less than frame_offset
-            if self.timestamp_offset < self.frames_offset:
-                self.timestamp_offset = self.frames_offset
-        if self.frames_np is None:
-            self.frames_np = frame_np.copy()
-        else:
-            self.frames_np = np.concatenate((self.frames_np, frame_np), axis=0)
-        self.lock.release()
+        self.extend_frames(self.frames_buffer.append, frame_np)
+
+    def mark_stream_position(self, stream_position):
+        """
+        Record where in the client stream the next samples added to the session come from.
+
+        The ingest gate calls this before each run of audio it lets through, so segment times can be
+        reported in stream time although the silence between runs never reached the session buffer.
+
+        Args:
+            stream_position (int): Stream position, in samples, of the next sample added.
+        """
+        with self.lock:
+            self.timeline.add(self.frames_buffer.end, stream_position)
+
+    def reserve_frames(self, num_samples):
+        """
+        Writable slot for the next audio samples of the session, for the ingest path to decode and
+        preprocess a packet directly into the session buffer. Pass the slot's samples on with `commit_frames`.
+
+        Args:
+            num_samples (int): Number of samples in the packet.
+
+        Returns:
+            numpy.ndarray: The slot.
+        """
+        return self.frames_buffer.reserve(num_samples)
+
+    def commit_frames(self, num_samples):
+        """
+        Same as `add_frames` for samples written into the slot returned by `reserve_frames`.
+
+        Args:
+            num_samples (int): Number of samples written.
+        """
+        self.extend_frames(self.frames_buffer.commit, num_samples)
+
+    def add_written_frames(self, num_samples):
+        """
+        Same as `add_frames` for samples another process already wrote into the shared `frames_buffer`.
+
+        Args:
+            num_samples (int): Number of samples written.
+        """
+        self.extend_frames(self.frames_buffer.advance, num_samples)
+
+    def extend_frames(self, extend, frames):
+        with self.lock:
+            dropped = 0.0
+            if len(self.frames_buffer) > 45*self.RATE:
+                self.frames_offset += 30.0
+                self.frames_buffer.discard_before(self.frames_buffer.start + int(30*self.RATE))
+                # check timestamp offset(should be >= self.frame_offset)
+                # this basically means that there is no speech as timestamp offset hasnt updated
+                # and is less than frame_offset
+                if self.timestamp_offset < self.frames_offset:
+                    dropped = self.frames_offset - self.timestamp_offset
+                    self.timestamp_offset = self.frames_offset
+            extend(frames)
+            self.last_frames_time = time.time()
+            pending = self.pending_samples()
+            new_audio = self.frames_buffer.end - self.last_transcribed_end
+
+        METRICS.buffered_seconds.set(pending / self.RATE, session=self.client_uid)
+        if dropped > 0:
+            self.dropped_seconds += dropped
+            METRICS.dropped_seconds.inc(dropped)
+            logging.warning(f"⚠️ Client {self.client_uid} is ahead of transcription, dropped {dropped:.1f}s of audio")
+        self.ingest_budget.update(pending / self.RATE)
+
+        if pending >= self.MIN_CHUNK_DURATION * self.RATE and new_audio >= self.audio_step * self.RATE:
+            self.notify_new_audio()
 
     def clip_audio_if_no_valid_segment(self):
         """
@@ -173,8 +541,10 @@ class ServeClientBase(object):
         no valid segment for the last 30 seconds from whisper
         """
         with self.lock:
-            if self.frames_np[int((self.timestamp_offset - self.frames_offset)*self.RATE):].shape[0] > 25 * self.RATE:
-                duration = self.frames_np.shape[0] / self.RATE
+            retained = len(self.frames_buffer)
+            unprocessed = retained - max(0, int((self.timestamp_offset - self.frames_offset)*self.RATE))
+            if unprocessed > 25 * self.RATE:
+                duration = retained / self.RATE
                 self.timestamp_offset = self.frames_offset + duration - 5
 
     def get_audio_chunk_for_processing(self):
@@ -184,16 +554,25 @@ class ServeClientBase(object):
         Calculates which part of the audio data should be processed next, based on
         the difference between the current timestamp offset and the frame's offset, scaled by
         the audio sample rate (RATE). It then returns this chunk of audio data along with its
-        duration in seconds.
+        duration in seconds. The absolute position of the chunk in the session buffer is kept in
+        `window_start`; when `window_alignment` is set, the chunk (and `timestamp_offset`) is moved
+        back to the previous multiple of it.
 
         Returns:
             tuple: A tuple containing:
-                - input_bytes (np.ndarray): The next chunk of audio data to be processed.
+                - input_bytes (np.ndarray): The next chunk of audio data to be processed, as a read-only view
+                  into the session buffer.
                 - duration (float): The duration of the audio chunk in seconds.
         """
         with self.lock:
             samples_take = max(0, (self.timestamp_offset - self.frames_offset) * self.RATE)
-            input_bytes = self.frames_np[int(samples_take):].copy()
+            if self.window_alignment > 1:
+                # start the window on the feature hop grid so cached feature frames can be reused
+                samples_take = int(round(samples_take))
+                samples_take -= samples_take % self.window_alignment
+                self.timestamp_offset = self.frames_offset + samples_take / self.RATE
+            self.window_start = self.frames_buffer.start + int(samples_take)
+            input_bytes = self.frames_buffer.view(self.window_start)
         duration = input_bytes.shape[0] / self.RATE
         return input_bytes, duration
 
@@ -246,31 +625,16 @@ class ServeClientBase(object):
 
     def send_transcription_to_client(self, segments):
         """
-        Sends the specified transcription segments to the client over the websocket connection.
+        Queues the specified transcription segments for the client.
 
-        This method formats the transcription segments into a JSON object and attempts to send
-        this object to the client. If an error occurs during the send operation, it logs the error.
+        The segments are serialized and sent by the session's `SendQueue`, so the transcription thread
+        never waits for the client. A partial segment superseded by a newer one before it went out is
+        not sent, and a partial identical to the previous one is not sent again.
 
-        Returns:
-            segments (list): A list of transcription segments to be sent to the client.
+        Args:
+            segments (list): Newly committed segments, optionally followed by the partial segment.
         """
-        try:
-            # DEBUG: Log transcription before sending
-            if segments and len(segments) > 0:
-                transcript_text = ' '.join([seg.get('text', '') for seg in segments]).strip()
-                logging.info(f"📤 Sending transcription to client {self.client_uid}: {len(segments)} segments, text: '{transcript_text[:100]}...'")
-            else:
-                logging.warning(f"⚠️ Attempting to send empty segments to client {self.client_uid}")
-            
-            self.websocket.send(
-                json.dumps({
-                    "uid": self.client_uid,
-                    "segments": segments,
-                })
-            )
-            logging.debug(f"✅ Successfully sent {len(segments)} segments to client {self.client_uid}")
-        except Exception as e:
-            logging.error(f"[ERROR]: Sending data to client {self.client_uid}: {e}")
+        self.outbox.put_segments(segments)
 
     def disconnect(self):
         """
@@ -280,7 +644,7 @@ class ServeClientBase(object):
         that the transcription service is disconnecting gracefully.
 
         """
-        self.websocket.send(json.dumps({
+        self.outbox.put_message(json.dumps({
             "uid": self.client_uid,
             "message": self.DISCONNECT
         }))
@@ -295,8 +659,41 @@ class ServeClientBase(object):
 
         """
         logging.info("Cleaning up.")
+        logging.info(
+            f"📊 Passes for client {self.client_uid}: {self.pass_stats['transcribed']} transcribed, "
+            f"{self.pass_stats['replayed']} replayed, {self.pass_stats['skipped']} skipped, "
+            f"{self.pass_stats['caught_up']} caught up"
+        )
+        if self.ingest_budget.stats["pauses"] or self.dropped_seconds:
+            logging.info(
+                f"🚦 Client {self.client_uid} paused {self.ingest_budget.stats['pauses']} times "
+                f"({self.ingest_budget.stats['paused_seconds']:.1f}s), {self.dropped_seconds:.1f}s of audio dropped"
+            )
         self.exit = True
+        self.data_ready.set()
+        self.outbox.close()
+        if self.model_key is not None:
+            MODEL_REGISTRY.release(self.model_key)
+            self.model_key = None
+        METRICS.remove_session(self.client_uid)
     
+    def queue_for_translation(self, segment):
+        """
+        Hand a completed segment to the translation client, if translation is enabled.
+
+        Args:
+            segment (dict): The completed segment to translate.
+        """
+        if not self.translation_queue:
+            return
+        try:
+            self.translation_queue.put(segment.copy(), timeout=0.1)
+        except queue.Full:
+            logging.warning("Translation queue is full, skipping segment")
+            return
+        if self.worker_pool is not None and self.translation_client is not None:
+            self.worker_pool.schedule(self.translation_client)
+
     def get_segment_no_speech_prob(self, segment):
         return getattr(segment, "no_speech_prob", 0)
 
@@ -318,6 +715,9 @@ class ServeClientBase(object):
         Returns:
             dict or None: The last processed segment (if any).
         """
+        if self.commit_policy == "local_agreement":
+            return self.update_segments_local_agreement(segments, duration)
+
         offset = None
         self.current_out = ''
         last_segment = None
@@ -350,11 +750,7 @@ class ServeClientBase(object):
                 self.transcript.append(completed_segment)
                 logging.info(f"✅ Added completed segment to transcript: '{text_}'")
 
-                if self.translation_queue:
-                    try:
-                        self.translation_queue.put(completed_segment.copy(), timeout=0.1)
-                    except queue.Full:
-                        logging.warning("Translation queue is full, skipping segment")
+                self.queue_for_translation(completed_segment)
                 offset = min(duration, self.get_segment_end(s))
         else:
             if len(segments) <= 1:
@@ -386,7 +782,6 @@ class ServeClientBase(object):
             # audio thats not yet transcribed so, capturing the time when it was repeated for the first time
             if self.end_time_for_same_output is None:
                 self.end_time_for_same_output = self.get_segment_end(segments[-1])
-            time.sleep(0.1)  # wait briefly for any new voice activity
         else:
             self.same_output_count = 0
             self.end_time_for_same_output = None
@@ -404,12 +799,7 @@ class ServeClientBase(object):
                         completed=True
                     )
                     self.transcript.append(completed_segment)
-
-                    if self.translation_queue:
-                        try:
-                            self.translation_queue.put(completed_segment.copy(), timeout=0.1)
-                        except queue.Full:
-                            logging.warning("Translation queue is full, skipping segment")
+                self.queue_for_translation(completed_segment)
 
             self.current_out = ''
             offset = min(duration, self.end_time_for_same_output)
@@ -424,3 +814,82 @@ class ServeClientBase(object):
                 self.timestamp_offset += offset
 
         return last_segment
+
+    @staticmethod
+    def normalize_word(word):
+        return word.strip().strip(string.punctuation).lower()
+
+    def get_committed_text(self, max_chars=200):
+        """
+        Tail of the text committed by the local agreement policy, used as the decoding prompt.
+
+        Args:
+            max_chars (int, optional): Maximum number of characters returned. Defaults to 200.
+
+        Returns:
+            str: The most recently committed text.
+        """
+        text = "".join(word for _, _, word in self.committed_words).strip()
+        return text[-max_chars:]
+
+    def update_segments_local_agreement(self, segments, duration):
+        """
+        Commits the word prefix two consecutive passes agree on (LocalAgreement-2).
+
+        The words of this pass are compared with the uncommitted words of the previous pass. The
+        longest common prefix is committed as a completed segment and `timestamp_offset` moves to the
+        end of its last word, so the next pass only decodes the unsettled tail. The remaining words
+        become the hypothesis the next pass is compared with.
+
+        Args:
+            segments (list): Segments with word timestamps returned by the transcriber.
+            duration (float): Duration of the current audio chunk.
+
+        Returns:
+            dict or None: The uncommitted tail as an incomplete segment (if any).
+        """
+        with self.lock:
+            offset = self.timestamp_offset
+
+        words = []
+        for s in segments:
+            if self.get_segment_no_speech_prob(s) > self.no_speech_thresh:
+                continue
+            for w in getattr(s, "words", None) or []:
+                start = offset + min(duration, w.start)
+                end = offset + min(duration, w.end)
+                words.append((start, end, w.word))
+
+        # drop words overlapping what is already committed
+        if self.committed_words:
+            last_committed_end = self.committed_words[-1][1]
+            words = [w for w in words if w[0] > last_committed_end - 0.1]
+            for n in range(min(5, len(words), len(self.committed_words)), 0, -1):
+                tail = [self.normalize_word(w[2]) for w in self.committed_words[-n:]]
+                if tail == [self.normalize_word(w[2]) for w in words[:n]]:
+                    words = words[n:]
+                    break
+
+        agreed = 0
+        while (agreed < min(len(words), len(self.hypothesis))
+               and self.normalize_word(words[agreed][2]) == self.normalize_word(self.hypothesis[agreed][2])):
+            agreed += 1
+
+        if agreed:
+            committed = words[:agreed]
+            text = "".join(w[2] for w in committed)
+            self.committed_words.extend(committed)
+            del self.committed_words[:-50]
+            self.text.append(text)
+            completed_segment = self.format_segment(committed[0][0], committed[-1][1], text, completed=True)
+            self.transcript.append(completed_segment)
+            self.queue_for_translation(completed_segment)
+            logging.info(f"✅ Committed agreed prefix: '{text}'")
+            with self.lock:
+                self.timestamp_offset = max(self.timestamp_offset, committed[-1][1])
+
+        self.hypothesis = words[agreed:]
+        self.current_out = "".join(w[2] for w in self.hypothesis)
+        if not self.hypothesis:
+            return None
+        return self.format_segment(self.hypothesis[0][0], self.hypothesis[-1][1], self.current_out, completed=False)
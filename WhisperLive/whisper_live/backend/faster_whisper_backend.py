@@ -1,20 +1,30 @@
 import os
 import json
 import logging
-import threading
 import time
 import torch
 import ctranslate2
 from huggingface_hub import snapshot_download
 from websockets.exceptions import ConnectionClosed
 
-from whisper_live.transcriber.transcriber_faster_whisper import WhisperModel
+from faster_whisper.vad import get_speech_timestamps
+from whisper_live.transcriber.transcriber_faster_whisper import BatchedInferencePipeline, WhisperModel
 from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.inference_scheduler import InferenceScheduler
+from whisper_live.backend.model_registry import MODEL_REGISTRY, directory_size
+from whisper_live.transcriber.feature_cache import StreamingFeatureExtractor
+from whisper_live.transcriber.speech_map import StreamingSpeechMap, backlog_clips
+from whisper_live.metrics import METRICS
+from whisper_live.utils import warmup_audio
 
 
 class ServeClientFasterWhisper(ServeClientBase):
-    SINGLE_MODEL = None
-    SINGLE_MODEL_LOCK = threading.Lock()
+    MODEL_SIZES = [
+        "tiny", "tiny.en", "base", "base.en", "small", "small.en",
+        "medium", "medium.en", "large-v2", "large-v3", "distil-small.en",
+        "distil-medium.en", "distil-large-v2", "distil-large-v3",
+        "large-v3-turbo", "turbo"
+    ]
 
     def __init__(
         self,
@@ -34,6 +44,17 @@ class ServeClientFasterWhisper(ServeClientBase):
         same_output_threshold=7,
         cache_path="~/.cache/whisper-live/",
         translation_queue=None,
+        batch_inference=False,
+        max_batch_size=8,
+        max_batch_wait_ms=10.0,
+        worker_pool=None,
+        commit_policy="same_output",
+        min_audio_step=0.0,
+        frames_buffer=None,
+        result_format="json",
+        ingest_budget=0.0,
+        catch_up_threshold=0.0,
+        model_concurrency=1,
     ):
         """
         Initialize a ServeClient instance.
@@ -49,11 +70,30 @@ class ServeClientFasterWhisper(ServeClientBase):
             client_uid (str, optional): A unique identifier for the client. Defaults to None.
             model (str, optional): The whisper model size. Defaults to 'small.en'
             initial_prompt (str, optional): Prompt for whisper inference. Defaults to None.
-            single_model (bool, optional): Whether to instantiate a new model for each client connection. Defaults to False.
+            single_model (bool, optional): Whether the server serves a single custom model to every client. Models are
+                shared through the model registry either way. Defaults to False.
             send_last_n_segments (int, optional): Number of most recent segments to send to the client. Defaults to 10.
             no_speech_thresh (float, optional): Segments with no speech probability above this threshold will be discarded. Defaults to 0.45.
             clip_audio (bool, optional): Whether to clip audio with no valid segments. Defaults to False.
             same_output_threshold (int, optional): Number of repeated outputs before considering it as a valid segment. Defaults to 10.
+            batch_inference (bool, optional): Whether to batch passes from all sessions sharing the single model. Defaults to False.
+            max_batch_size (int, optional): Maximum number of sessions decoded in one batch. Defaults to 8.
+            max_batch_wait_ms (float, optional): Maximum time a pass waits for other sessions to join its batch. Defaults to 10.
+            worker_pool (TranscriptionWorkerPool, optional): Shared pool running the transcription passes. Defaults to None,
+                which runs them on a dedicated thread for this session.
+            commit_policy (str, optional): "same_output" commits a partial once it repeats `same_output_threshold` times,
+                "local_agreement" commits the word prefix two consecutive passes agree on. Defaults to "same_output".
+            min_audio_step (float, optional): Minimum amount of new audio (in seconds) between two passes, widened
+                automatically when passes get slow. Defaults to 0.0.
+            frames_buffer (AudioRingBuffer, optional): Session audio buffer, when another process writes the audio into
+                shared memory. Defaults to None, which allocates one.
+            result_format (str, optional): Encoding of the transcription results, "json" or "msgpack". Defaults to "json".
+            ingest_budget (float, optional): Audio (in seconds) the client may send ahead of transcription before it is
+                asked to pause, 0 for no flow control. Defaults to 0.
+            catch_up_threshold (float, optional): Pending audio (in seconds) above which the session transcribes its
+                backlog in one batched call instead of streaming passes, 0 never catches up. Defaults to 0.
+            model_concurrency (int, optional): Passes of all the sessions sharing the model that may run at once,
+                the model gets as many CTranslate2 workers when this session loads it. Defaults to 1.
 
         """
         super().__init__(
@@ -63,15 +103,17 @@ class ServeClientFasterWhisper(ServeClientBase):
             no_speech_thresh,
             clip_audio,
             same_output_threshold,
-            translation_queue
+            translation_queue,
+            worker_pool,
+            commit_policy,
+            min_audio_step,
+            frames_buffer,
+            result_format,
+            ingest_budget,
+            catch_up_threshold,
         )
         self.cache_path = cache_path
-        self.model_sizes = [
-            "tiny", "tiny.en", "base", "base.en", "small", "small.en",
-            "medium", "medium.en", "large-v2", "large-v3", "distil-small.en",
-            "distil-medium.en", "distil-large-v2", "distil-large-v3",
-            "large-v3-turbo", "turbo"
-        ]
+        self.model_concurrency = model_concurrency
 
         self.model_size_or_path = model
         # Auto-detect language: if language is None or empty, let the model detect it
@@ -90,12 +132,7 @@ class ServeClientFasterWhisper(ServeClientBase):
         # Note: 'onset' is no longer supported in newer faster-whisper versions
         self.vad_parameters = vad_parameters or {}  # Use empty dict to let faster-whisper use defaults
 
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        if device == "cuda":
-            major, _ = torch.cuda.get_device_capability(device)
-            self.compute_type = "float16" if major >= 7 else "float32"
-        else:
-            self.compute_type = "int8"
+        device, self.compute_type = self.get_device()
 
         if self.model_size_or_path is None:
             logging.error("Model not specified - cannot initialize faster_whisper backend")
@@ -127,19 +164,9 @@ class ServeClientFasterWhisper(ServeClientBase):
             logging.warning(f"⚠️  Failed to send LOADING status: {e}")
     
         try:
-            if single_model:
-                if ServeClientFasterWhisper.SINGLE_MODEL is None:
-                    logging.info(f"🔄 Loading model '{self.model_size_or_path}' (first time, may take a while)...")
-                    self.create_model(device)
-                    ServeClientFasterWhisper.SINGLE_MODEL = self.transcriber
-                    logging.info("✅ Model loaded and cached")
-                else:
-                    self.transcriber = ServeClientFasterWhisper.SINGLE_MODEL
-                    logging.info("✅ Using cached model")
-            else:
-                logging.info(f"🔄 Loading model '{self.model_size_or_path}'...")
-                self.create_model(device)
-                logging.info("✅ Model loaded")
+            # models are shared by every session asking for the same one, with single_model the
+            # server already points all sessions at its custom model
+            self.create_model(device)
         except Exception as e:
             import traceback
             logging.error(f"Failed to load model: {e}")
@@ -158,9 +185,33 @@ class ServeClientFasterWhisper(ServeClientBase):
 
         self.use_vad = use_vad
 
-        # threading
-        self.trans_thread = threading.Thread(target=self.speech_to_text)
-        self.trans_thread.start()
+        self.scheduler = None
+        if batch_inference:
+            self.scheduler = MODEL_REGISTRY.attach(
+                self.model_key,
+                "scheduler",
+                lambda entry: InferenceScheduler(
+                    entry.model,
+                    max_batch_size=max_batch_size,
+                    max_wait_ms=max_batch_wait_ms,
+                    lock=entry.lock,
+                ),
+            )
+
+        # log-mel frames are computed once per hop of session audio and reused by every pass
+        self.feature_cache = StreamingFeatureExtractor(self.transcriber.feature_extractor, self.frames_buffer)
+        self.window_alignment = self.feature_cache.hop_length
+
+        # speech probabilities are computed once per window of session audio and reused by every pass
+        self.speech_map = None
+        self.vad_options = WhisperModel._get_vad_options(self.vad_parameters)
+        if self.use_vad:
+            try:
+                self.speech_map = StreamingSpeechMap(self.frames_buffer, sampling_rate=self.RATE)
+            except Exception as e:
+                logging.warning(f"⚠️ Streaming VAD unavailable, every pass runs the VAD over its window: {e}")
+
+        self.start_transcription()
         
         # Send SERVER_READY message
         try:
@@ -169,7 +220,9 @@ class ServeClientFasterWhisper(ServeClientBase):
                     {
                         "uid": self.client_uid,
                         "message": self.SERVER_READY,
-                        "backend": "faster_whisper"
+                        "backend": "faster_whisper",
+                        "result_format": self.outbox.encoder.result_format,
+                        "flow_control": self.ingest_budget.enabled,
                     }
                 )
             )
@@ -182,27 +235,118 @@ class ServeClientFasterWhisper(ServeClientBase):
             logging.warning(f"⚠️  Failed to send SERVER_READY to client {self.client_uid}: {e}")
             # Don't return - let the connection continue, client might retry
 
+    @staticmethod
+    def get_device():
+        """
+        Device and CTranslate2 compute type the models run with.
+
+        Returns:
+            tuple: ("cuda", "float16" or "float32") if a GPU is available, ("cpu", "int8") otherwise.
+        """
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        if device == "cuda":
+            major, _ = torch.cuda.get_device_capability(device)
+            return device, "float16" if major >= 7 else "float32"
+        return device, "int8"
+
+    @classmethod
+    def acquire_model(cls, model_ref, device, compute_type, cache_path, concurrency=1):
+        """
+        Get the shared model from the model registry, loading it if no session uses it yet.
+
+        Args:
+            concurrency (int, optional): Passes that may run on the model at once. Defaults to 1.
+
+        Returns:
+            tuple: The registry key and the `ModelEntry` holding the model.
+        """
+        key = ("faster_whisper", model_ref, device, compute_type)
+        entry = MODEL_REGISTRY.acquire(
+            key,
+            lambda: cls.load_model(model_ref, device, compute_type, cache_path, num_workers=concurrency),
+            size=lambda model: directory_size(model.model_path),
+            concurrency=concurrency,
+        )
+        return key, entry
+
     def create_model(self, device):
         """
-        Instantiates a new model, sets it as the transcriber. If model is a huggingface model_id
-        then it is automatically converted to ctranslate2(faster_whisper) format.
+        Sets the shared model for this session's model, device and precision as the transcriber,
+        loading it through the model registry if no other session uses it yet.
+
+        Args:
+            device (str): "cuda" or "cpu".
         """
-        import sys
-        print(f"🔧 create_model() called with device='{device}'", file=sys.stderr, flush=True)
-        print(f"   model_size_or_path: {self.model_size_or_path}", file=sys.stderr, flush=True)
-        print(f"   compute_type: {self.compute_type}", file=sys.stderr, flush=True)
-        logging.info(f"🔧 create_model() called with device='{device}'")
-        logging.info(f"   model_size_or_path: {self.model_size_or_path}")
-        logging.info(f"   compute_type: {self.compute_type}")
-        
-        model_ref = self.model_size_or_path
+        self.model_key, self.model_entry = self.acquire_model(
+            self.model_size_or_path, device, self.compute_type, self.cache_path, self.model_concurrency
+        )
+        self.transcriber = self.model_entry.model
+
+    @classmethod
+    def preload(cls, model_ref, cache_path="~/.cache/whisper-live/", warmup_steps=3, concurrency=1):
+        """
+        Load a model into the model registry and warm it up before any client connects.
 
-        if model_ref in self.model_sizes:
+        The model is released right away, it stays loaded as an idle model until a session picks it up.
+
+        Args:
+            model_ref (str): Model size, huggingface model_id or path to a ctranslate2 model.
+            cache_path (str, optional): Where downloaded and converted models are cached.
+            warmup_steps (int, optional): Number of warmup passes. Defaults to 3.
+            concurrency (int, optional): Passes that may run on the model at once. Defaults to 1.
+        """
+        device, compute_type = cls.get_device()
+        key, entry = cls.acquire_model(model_ref, device, compute_type, cache_path, concurrency)
+        try:
+            cls.warmup(entry, warmup_steps)
+        finally:
+            MODEL_REGISTRY.release(key)
+
+    @staticmethod
+    def warmup(entry, warmup_steps=3):
+        """
+        Run a few passes on the warmup clip, the first ones after loading are much slower.
+
+        The first pass goes through the VAD so its model gets loaded as well, the others decode the whole clip.
+
+        Args:
+            entry (ModelEntry): Registry entry of the model.
+            warmup_steps (int): Number of passes.
+        """
+        logging.info(f"🔥 Warming up model {entry.key}...")
+        audio = warmup_audio()
+        with entry.locked():
+            for step in range(warmup_steps):
+                segments, _ = entry.model.transcribe(audio, vad_filter=step == 0)
+                list(segments)
+
+    @classmethod
+    def load_model(cls, model_ref, device, compute_type, cache_path, num_workers=1):
+        """
+        Instantiates a new model. If model is a huggingface model_id then it is automatically
+        converted to ctranslate2(faster_whisper) format.
+
+        Args:
+            model_ref (str): Model size, huggingface model_id or path to a ctranslate2 model.
+            device (str): "cuda" or "cpu".
+            compute_type (str): CTranslate2 compute type.
+            cache_path (str): Where downloaded and converted models are cached.
+            num_workers (int, optional): CTranslate2 workers, i.e. transcriptions that can run in parallel
+                on the model. Defaults to 1.
+
+        Returns:
+            WhisperModel: The loaded model.
+        """
+        logging.debug(f"🔧 load_model() called with device='{device}'")
+        logging.debug(f"   model_size_or_path: {model_ref}")
+        logging.debug(f"   compute_type: {compute_type}")
+
+        if model_ref in cls.MODEL_SIZES:
             # Model is a standard size - use the download_root to find/download it
             model_to_load = model_ref
-            print(f"✅ Standard model size detected: {model_ref}", file=sys.stderr, flush=True)
+            logging.debug(f"✅ Standard model size detected: {model_ref}")
             # Set download_root so WhisperModel knows where to cache
-            download_root = os.path.expanduser(os.path.join(self.cache_path, "whisper-ct2-models/"))
+            download_root = os.path.expanduser(os.path.join(cache_path, "whisper-ct2-models/"))
             os.makedirs(download_root, exist_ok=True)
         else:
             logging.info(f"Model not in model_sizes")
@@ -219,7 +363,7 @@ class ServeClientFasterWhisper(ServeClientBase):
                     model_to_load = local_snapshot
                 else:
                     logging.info(f"Model needs conversion to CT2 format")
-                    cache_root = os.path.expanduser(os.path.join(self.cache_path, "whisper-ct2-models/"))
+                    cache_root = os.path.expanduser(os.path.join(cache_path, "whisper-ct2-models/"))
                     os.makedirs(cache_root, exist_ok=True)
                     safe_name = model_ref.replace("/", "--")
                     ct2_dir = os.path.join(cache_root, safe_name)
@@ -234,7 +378,7 @@ class ServeClientFasterWhisper(ServeClientBase):
                             )
                             ct2_converter.convert(
                                 output_dir=ct2_dir,
-                                quantization=self.compute_type,
+                                quantization=compute_type,
                                 force=False,  # skip if already up-to-date
                             )
                             logging.info(f"✅ Conversion complete: {ct2_dir}")
@@ -245,33 +389,32 @@ class ServeClientFasterWhisper(ServeClientBase):
                         logging.info(f"✅ CT2 model already exists at: {ct2_dir}")
                     model_to_load = ct2_dir
 
-        import sys
-        print(f"📦 Final model_to_load: {model_to_load}", file=sys.stderr, flush=True)
-        print(f"🔄 About to instantiate WhisperModel...", file=sys.stderr, flush=True)
         logging.info(f"📦 Final model_to_load: {model_to_load}")
-        logging.info(f"🔄 Instantiating WhisperModel with device='{device}', compute_type='{self.compute_type}'...")
+        logging.info(f"🔄 Instantiating WhisperModel with device='{device}', compute_type='{compute_type}'...")
         
         # For standard model sizes, specify download_root
-        if model_ref in self.model_sizes:
-            print(f"🌐 Using download_root for standard model", file=sys.stderr, flush=True)
-            self.transcriber = WhisperModel(
+        if model_ref in cls.MODEL_SIZES:
+            logging.debug("🌐 Using download_root for standard model")
+            model = WhisperModel(
                 model_to_load,
                 device=device,
-                compute_type=self.compute_type,
-                download_root=os.path.expanduser(os.path.join(self.cache_path, "whisper-ct2-models/")),
+                compute_type=compute_type,
+                download_root=os.path.expanduser(os.path.join(cache_path, "whisper-ct2-models/")),
                 local_files_only=False,
+                num_workers=num_workers,
             )
         else:
             # For custom paths or HF models, don't specify download_root
-            self.transcriber = WhisperModel(
+            model = WhisperModel(
                 model_to_load,
                 device=device,
-                compute_type=self.compute_type,
+                compute_type=compute_type,
                 local_files_only=False,
+                num_workers=num_workers,
             )
         
-        print(f"✅ WhisperModel created successfully!", file=sys.stderr, flush=True)
         logging.info(f"✅ WhisperModel created successfully!")
+        return model
 
     def set_language(self, info):
         """
@@ -286,9 +429,28 @@ class ServeClientFasterWhisper(ServeClientBase):
         if info.language_probability > 0.5:
             self.language = info.language
             logging.info(f"Detected language {self.language} with probability {info.language_probability}")
-            self.websocket.send(json.dumps(
+            self.outbox.put_message(json.dumps(
                 {"uid": self.client_uid, "language": self.language, "language_prob": info.language_probability}))
 
+    def get_initial_prompt(self):
+        """
+        Decoding prompt for the next pass.
+
+        With the local agreement policy the committed text is appended to the client's initial prompt,
+        since the window no longer contains the audio it was decoded from.
+
+        Returns:
+            str or None: The prompt passed to the transcriber.
+        """
+        if self.commit_policy != "local_agreement":
+            return self.initial_prompt
+        committed = self.get_committed_text()
+        if not committed:
+            return self.initial_prompt
+        if self.initial_prompt:
+            return f"{self.initial_prompt} {committed}"
+        return committed
+
     def transcribe_audio(self, input_sample):
         """
         Transcribes the provided audio sample using the configured transcriber instance.
@@ -305,30 +467,94 @@ class ServeClientFasterWhisper(ServeClientBase):
             depends on the implementation of the `transcriber.transcribe` method but typically
             includes the transcribed text.
         """
-        if ServeClientFasterWhisper.SINGLE_MODEL:
-            ServeClientFasterWhisper.SINGLE_MODEL_LOCK.acquire()
-        
         # Log language setting for debugging
         if self.language is None:
             logging.debug(f"🌍 Auto-detecting language for client {self.client_uid} (language=None)")
         else:
             logging.debug(f"🌍 Using specified language '{self.language}' for client {self.client_uid}")
-        
-        result, info = self.transcriber.transcribe(
-            input_sample,
-            initial_prompt=self.initial_prompt,
-            language=self.language,  # None = auto-detect, otherwise use specified language
-            task=self.task,
-            vad_filter=self.use_vad,
-            vad_parameters=self.vad_parameters if self.use_vad else None)
-        if ServeClientFasterWhisper.SINGLE_MODEL:
-            ServeClientFasterWhisper.SINGLE_MODEL_LOCK.release()
+
+        features_provider = self.feature_cache.provider(self.window_start)
+        speech_chunks = None
+        if self.speech_map is not None:
+            with METRICS.time_stage("vad", self.client_uid):
+                speech_chunks = self.speech_map.speech_chunks(
+                    self.window_start, self.window_start + input_sample.shape[0], self.vad_options
+                )
+        local_agreement = self.commit_policy == "local_agreement"
+        initial_prompt = self.get_initial_prompt()
+        if self.scheduler is not None:
+            # the scheduler batches this pass with other sessions sharing the model
+            result, info = self.scheduler.submit(
+                input_sample,
+                features_provider=features_provider,
+                speech_chunks=speech_chunks,
+                initial_prompt=initial_prompt,
+                language=self.language,
+                task=self.task,
+                vad_filter=self.use_vad,
+                vad_parameters=self.vad_parameters if self.use_vad else None,
+                word_timestamps=local_agreement)
+        else:
+            # the model is shared with the other sessions using it
+            with self.model_entry.locked():
+                result, info = self.transcriber.transcribe(
+                    input_sample,
+                    initial_prompt=initial_prompt,
+                    language=self.language,  # None = auto-detect, otherwise use specified language
+                    task=self.task,
+                    vad_filter=self.use_vad,
+                    vad_parameters=self.vad_parameters if self.use_vad else None,
+                    word_timestamps=local_agreement,
+                    features_provider=features_provider,
+                    speech_chunks=speech_chunks)
+                # segments are decoded lazily, decode them while holding the model
+                result = list(result)
 
         # Auto-detect language if not set (first transcription)
         if self.language is None and info is not None:
             self.set_language(info)
         return result
 
+    def transcribe_backlog(self, start, end):
+        """
+        Transcribes the backlog of a session that fell behind with the `BatchedInferencePipeline`: the speech
+        of the backlog is cut into clips at its pauses and all clips are decoded in batches.
+
+        Args:
+            start (int): Absolute index of the first sample of the backlog.
+            end (int): Absolute index one past its last sample.
+
+        Returns:
+            tuple: The segments, with times relative to `start`, and the number of samples from `start` they
+                account for.
+        """
+        audio = self.frames_buffer.view(start, end)
+        if self.speech_map is not None:
+            speech_chunks = self.speech_map.speech_chunks(start, end, self.vad_options)
+        elif self.use_vad:
+            speech_chunks = get_speech_timestamps(audio, self.vad_options)
+        else:
+            speech_chunks = [{"start": 0, "end": audio.shape[0]}]
+        max_samples = self.transcriber.feature_extractor.chunk_length * self.RATE
+        clips, consumed = backlog_clips(speech_chunks, audio.shape[0], max_samples)
+        if not clips:
+            return [], consumed
+
+        pipeline = BatchedInferencePipeline(self.transcriber)
+        with self.model_entry.locked():
+            result, info = pipeline.transcribe(
+                audio,
+                language=self.language,
+                task=self.task,
+                initial_prompt=self.get_initial_prompt(),
+                vad_filter=False,
+                clip_timestamps=clips,
+            )
+            result = list(result)
+        if self.language is None and info is not None:
+            self.set_language(info)
+        return result, consumed
+
     def handle_transcription_output(self, result, duration):
         """
         Handle the transcription output, updating the transcript and sending data to the client.
@@ -349,14 +575,14 @@ class ServeClientFasterWhisper(ServeClientBase):
         segments = []
         if len(result_list):
             self.t_start = None
-            last_segment = self.update_segments(result_list, duration)
+            with METRICS.time_stage("update_segments", self.client_uid):
+                last_segment = self.update_segments(result_list, duration)
             segments = self.prepare_segments(last_segment)
-            logging.info(f"📋 Prepared {len(segments)} segments to send to client")
+            logging.debug(f"📋 Prepared {len(segments)} segments to send to client")
         else:
-            logging.info(f"ℹ️ No segments to process (empty result)")
+            logging.debug("ℹ️ No segments to process (empty result)")
 
         if len(segments):
-            logging.info(f"📤 Sending {len(segments)} segments to client {self.client_uid}")
             self.send_transcription_to_client(segments)
         else:
-            logging.info(f"⏭️ No segments to send (empty segments list)")
+            logging.debug("⏭️ No segments to send (empty segments list)")
@@ -0,0 +1,179 @@
+import logging
+import queue
+import threading
+import time
+
+from whisper_live.metrics import METRICS
+
+
+class InferenceRequest(object):
+    """A transcription pass submitted by one session, completed by the scheduler thread."""
+
+    def __init__(self, audio, options, features_provider=None, speech_chunks=None):
+        self.audio = audio
+        self.options = options
+        self.features_provider = features_provider
+        self.speech_chunks = speech_chunks
+        self.result = None
+        self.info = None
+        self.error = None
+        self.done = threading.Event()
+
+    PER_REQUEST_OPTIONS = ("language", "initial_prompt")
+
+    def batch_key(self):
+        """
+        Requests can only share a batch when everything but the audio, the language and the prompt
+        is identical. Prompted and unprompted requests are kept apart, since prompts in one batch are
+        truncated to the same number of tokens.
+        """
+        key = tuple(
+            (key, repr(value)) for key, value in sorted(self.options.items())
+            if key not in self.PER_REQUEST_OPTIONS
+        )
+        return key + (("has_prompt", bool(self.options.get("initial_prompt"))),)
+
+
+class InferenceScheduler(object):
+    """
+    Central micro-batching scheduler for a faster_whisper model shared by several sessions.
+
+    Sessions call `submit` from their transcription thread and block until their pass is done.
+    A single scheduler thread collects pending passes, waiting at most `max_wait_ms` after the
+    first one arrived or until `max_batch_size` passes are queued, and runs them through
+    `WhisperModel.transcribe_batch` so CTranslate2 encodes and decodes them together.
+    """
+
+    def __init__(self, transcriber, max_batch_size=8, max_wait_ms=10.0, lock=None):
+        """
+        Initialize the scheduler and start its worker thread.
+
+        Args:
+            transcriber (WhisperModel): The shared model instance.
+            max_batch_size (int, optional): Maximum number of passes run in one batch. Defaults to 8.
+            max_wait_ms (float, optional): Maximum time to wait for more passes once one is pending. Defaults to 10.
+            lock (threading.Lock, optional): Lock or semaphore guarding the model, a slot is held while a batch runs.
+                Defaults to a new lock.
+        """
+        self.transcriber = transcriber
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.lock = lock if lock is not None else threading.Lock()
+        self.queue = queue.Queue()
+        self.exit = False
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        logging.info(
+            f"🧮 Inference scheduler started (max_batch_size={self.max_batch_size}, max_wait_ms={max_wait_ms})"
+        )
+
+    def submit(self, audio, features_provider=None, speech_chunks=None, **options):
+        """
+        Queue one transcription pass and wait for its result.
+
+        Args:
+            audio (np.ndarray): The audio window to transcribe.
+            features_provider (callable, optional): Computes the features of this window, see `WhisperModel.transcribe`.
+            speech_chunks (list, optional): Precomputed speech chunks of this window, see `WhisperModel.transcribe`.
+            **options: Keyword arguments accepted by `WhisperModel.transcribe_batch`, plus `language`.
+
+        Returns:
+            tuple: The (segments, info) pair for this pass, as returned by `WhisperModel.transcribe`.
+        """
+        if self.exit:
+            raise RuntimeError("Inference scheduler is stopped")
+        request = InferenceRequest(audio, options, features_provider, speech_chunks)
+        self.queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result, request.info
+
+    def collect_batch(self):
+        """
+        Blocks for the first pending request, then gathers more until the batch is full or the wait expires.
+
+        Returns:
+            list: The collected requests, empty when the scheduler is stopping.
+        """
+        first = self.queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                request = self.queue.get_nowait()
+            except queue.Empty:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            if request is None:
+                self.exit = True
+                break
+            batch.append(request)
+        return batch
+
+    def run(self):
+        """Scheduler loop, runs until `stop` is called."""
+        while not self.exit:
+            batch = self.collect_batch()
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.batch_key(), []).append(request)
+            for requests in groups.values():
+                self.run_group(requests)
+
+        # fail anything still queued so no session waits forever
+        while True:
+            try:
+                request = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request.error = RuntimeError("Inference scheduler is stopped")
+                request.done.set()
+
+    def run_group(self, requests):
+        """
+        Runs requests with identical decoding options as one batch and hands each session its own result.
+
+        Args:
+            requests (list): Requests sharing the same batch key.
+        """
+        options = {
+            k: v for k, v in requests[0].options.items() if k not in InferenceRequest.PER_REQUEST_OPTIONS
+        }
+        try:
+            wait_start = time.perf_counter()
+            with self.lock:
+                METRICS.model_lock_wait_seconds.observe(time.perf_counter() - wait_start)
+                results = self.transcriber.transcribe_batch(
+                    [request.audio for request in requests],
+                    languages=[request.options.get("language") for request in requests],
+                    initial_prompts=[request.options.get("initial_prompt") for request in requests],
+                    features_providers=[request.features_provider for request in requests],
+                    speech_chunk_lists=[request.speech_chunks for request in requests],
+                    **options,
+                )
+            for request, (result, info) in zip(requests, results):
+                request.result = result
+                request.info = info
+            logging.debug(f"🧮 Ran batched inference for {len(requests)} sessions")
+        except Exception as e:
+            logging.error(f"[ERROR]: Batched inference failed for {len(requests)} sessions: {e}")
+            for request in requests:
+                request.error = e
+        finally:
+            for request in requests:
+                request.done.set()
+
+    def stop(self):
+        """Stop the scheduler thread, failing any request that is still pending."""
+        self.exit = True
+        self.queue.put(None)
@@ -0,0 +1,223 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from whisper_live.metrics import METRICS
+
+
+def directory_size(path):
+    """
+    Size in bytes of the files under a model directory, used as an estimate of its memory footprint.
+
+    Args:
+        path (str): Model directory or file.
+
+    Returns:
+        int: Total size of the files, 0 if the path does not exist.
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ModelEntry(object):
+    """A model loaded by the registry, with the sessions currently using it."""
+
+    def __init__(self, key, concurrency=1):
+        self.key = key
+        self.model = None
+        self.size = 0
+        self.refcount = 0
+        self.last_used = time.time()
+        self.concurrency = concurrency
+        self.lock = threading.BoundedSemaphore(concurrency)
+        """Limits inference on the shared instance to `concurrency` passes at once."""
+        self.load_lock = threading.Lock()
+        self.attachments = {}
+        """Per-model helpers created through `attach`, e.g. an inference scheduler."""
+
+    @contextmanager
+    def locked(self):
+        """
+        Hold one of the inference slots of the model, recording how long it took to get it.
+
+        Yields:
+            The model.
+        """
+        start = time.perf_counter()
+        with self.lock:
+            METRICS.model_lock_wait_seconds.observe(time.perf_counter() - start)
+            yield self.model
+
+
+class ModelRegistry(object):
+    """
+    Process-wide cache of loaded models shared by all sessions.
+
+    Models are keyed by a tuple describing everything that changes the loaded weights (backend, model
+    id or path, device, precision). Sessions `acquire` a model for as long as they are connected and
+    `release` it when they go away. Models nobody holds stay loaded so the next session asking for them
+    starts instantly, until the total estimated size exceeds the memory budget; then idle models are
+    unloaded, least recently used first. Models in use are never evicted, so the budget can be exceeded
+    while they are all busy.
+    """
+
+    def __init__(self, memory_budget=None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            memory_budget (int, optional): Budget, in bytes, for the estimated size of all loaded models.
+                Defaults to None, which never evicts idle models.
+        """
+        self.memory_budget = memory_budget
+        self.entries = OrderedDict()  # least recently released first
+        self.lock = threading.Lock()
+
+    def set_memory_budget(self, memory_budget):
+        """
+        Change the memory budget and evict idle models that no longer fit.
+
+        Args:
+            memory_budget (int): Budget in bytes, or None for no limit.
+        """
+        with self.lock:
+            self.memory_budget = memory_budget
+            evicted = self.evict()
+        self.unload(evicted)
+
+    def acquire(self, key, loader, size=None, concurrency=1):
+        """
+        Get a shared model instance, loading it on first use.
+
+        Concurrent sessions asking for the same key wait for a single load instead of each loading
+        its own copy. Passes of all the sessions sharing the instance run at most `concurrency` at a
+        time, the others wait in `ModelEntry.locked`.
+
+        Args:
+            key (tuple): Identifies the model.
+            loader (callable): Called without arguments to load the model.
+            size (callable, optional): Called with the loaded model, returns its estimated size in bytes.
+            concurrency (int, optional): Passes that may run on the model at once, set by the first
+                session loading it. The loader should give the model as many workers. Defaults to 1.
+
+        Returns:
+            ModelEntry: The entry holding the model, its inference lock and size.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = ModelEntry(key, concurrency)
+            entry.refcount += 1
+            entry.last_used = time.time()
+
+        try:
+            with entry.load_lock:
+                if entry.model is None:
+                    logging.info(f"🔄 Loading model {key}...")
+                    model = loader()
+                    entry.size = size(model) if size is not None else 0
+                    entry.model = model
+                    logging.info(f"✅ Model {key} loaded ({entry.size / 2**20:.0f} MB)")
+                else:
+                    logging.info(f"✅ Using loaded model {key}")
+        except Exception:
+            self.release(key)
+            raise
+
+        with self.lock:
+            evicted = self.evict()
+        self.unload(evicted)
+        return entry
+
+    def release(self, key):
+        """
+        Drop a session's reference to a model. The model stays loaded until it is evicted.
+
+        Args:
+            key (tuple): Key the model was acquired with.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.refcount == 0:
+                return
+            entry.refcount -= 1
+            entry.last_used = time.time()
+            if entry.refcount == 0:
+                if entry.model is None:
+                    # the load failed, nothing to keep
+                    del self.entries[key]
+                else:
+                    self.entries.move_to_end(key)
+            evicted = self.evict()
+        self.unload(evicted)
+
+    def attach(self, key, name, factory):
+        """
+        Get a helper bound to a loaded model, creating it on first use.
+
+        Helpers live as long as the model; when it is evicted, helpers with a `stop` method are stopped.
+
+        Args:
+            key (tuple): Key of an acquired model.
+            name (str): Name of the helper.
+            factory (callable): Called with the model entry to create the helper.
+
+        Returns:
+            object: The helper.
+        """
+        with self.lock:
+            entry = self.entries[key]
+            if name not in entry.attachments:
+                entry.attachments[name] = factory(entry)
+            return entry.attachments[name]
+
+    def memory_usage(self):
+        """Estimated size, in bytes, of all loaded models."""
+        with self.lock:
+            return sum(entry.size for entry in self.entries.values())
+
+    def evict(self):
+        """
+        Remove idle models, least recently used first, until the loaded models fit in the budget.
+        Must be called with `lock` held.
+
+        Returns:
+            list: The evicted entries, to be passed to `unload` once the lock is released.
+        """
+        if self.memory_budget is None:
+            return []
+        usage = sum(entry.size for entry in self.entries.values())
+        evicted = []
+        for key, entry in list(self.entries.items()):
+            if usage <= self.memory_budget:
+                break
+            if entry.refcount > 0 or entry.model is None:
+                continue
+            del self.entries[key]
+            usage -= entry.size
+            evicted.append(entry)
+        return evicted
+
+    def unload(self, entries):
+        for entry in entries:
+            for attachment in entry.attachments.values():
+                if hasattr(attachment, "stop"):
+                    attachment.stop()
+            logging.info(f"🗑️ Evicted idle model {entry.key} ({entry.size / 2**20:.0f} MB)")
+            entry.attachments.clear()
+            entry.model = None
+
+
+MODEL_REGISTRY = ModelRegistry()
+"""The registry shared by all sessions of the server."""
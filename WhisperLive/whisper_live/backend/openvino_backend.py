@@ -1,16 +1,16 @@
 import json
 import logging
-import threading
 import time
 
 from openvino import Core
 from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.model_registry import MODEL_REGISTRY, directory_size
+from whisper_live.metrics import METRICS
 from whisper_live.transcriber.transcriber_openvino import WhisperOpenVINO
+from whisper_live.utils import warmup_audio
 
 
 class ServeClientOpenVINO(ServeClientBase):
-    SINGLE_MODEL = None
-    SINGLE_MODEL_LOCK = threading.Lock()
 
     def __init__(
         self,
@@ -28,6 +28,10 @@ class ServeClientOpenVINO(ServeClientBase):
         no_speech_thresh=0.45,
         clip_audio=False,
         same_output_threshold=10,
+        worker_pool=None,
+        min_audio_step=0.0,
+        result_format="json",
+        ingest_budget=0.0,
     ):
         """
         Initialize a ServeClient instance.
@@ -43,11 +47,18 @@ class ServeClientOpenVINO(ServeClientBase):
             client_uid (str, optional): A unique identifier for the client. Defaults to None.
             model (str, optional): Huggingface model_id for a valid OpenVINO model.
             initial_prompt (str, optional): Prompt for whisper inference. Defaults to None.
-            single_model (bool, optional): Whether to instantiate a new model for each client connection. Defaults to False.
+            single_model (bool, optional): Unused, models are always shared through the model registry. Defaults to False.
             send_last_n_segments (int, optional): Number of most recent segments to send to the client. Defaults to 10.
             no_speech_thresh (float, optional): Segments with no speech probability above this threshold will be discarded. Defaults to 0.45.
             clip_audio (bool, optional): Whether to clip audio with no valid segments. Defaults to False.
             same_output_threshold (int, optional): Number of repeated outputs before considering it as a valid segment. Defaults to 10.
+            worker_pool (TranscriptionWorkerPool, optional): Shared pool running the transcription passes. Defaults to None,
+                which runs them on a dedicated thread for this session.
+            min_audio_step (float, optional): Minimum amount of new audio (in seconds) between two passes, widened
+                automatically when passes get slow. Defaults to 0.0.
+            result_format (str, optional): Encoding of the transcription results, "json" or "msgpack". Defaults to "json".
+            ingest_budget (float, optional): Audio (in seconds) the client may send ahead of transcription before it is
+                asked to pause, 0 for no flow control. Defaults to 0.
         """
         super().__init__(
             client_uid,
@@ -56,6 +67,10 @@ class ServeClientOpenVINO(ServeClientBase):
             no_speech_thresh,
             clip_audio,
             same_output_threshold,
+            worker_pool=worker_pool,
+            min_audio_step=min_audio_step,
+            result_format=result_format,
+            ingest_budget=ingest_budget,
         )
         self.language = "en" if language is None else language
         if not self.language.startswith("<|"):
@@ -65,47 +80,76 @@ class ServeClientOpenVINO(ServeClientBase):
 
         self.clip_audio = True
 
-        core = Core()
-        available_devices = core.available_devices
-        if 'GPU' in available_devices:
-            selected_device = 'GPU'
-        else:
-            gpu_devices = [d for d in available_devices if d.startswith('GPU')]
-            selected_device = gpu_devices[0] if gpu_devices else 'CPU'
-        self.device = selected_device
-
-
-        if single_model:
-            if ServeClientOpenVINO.SINGLE_MODEL is None:
-                self.create_model(model)
-                ServeClientOpenVINO.SINGLE_MODEL = self.transcriber
-            else:
-                self.transcriber = ServeClientOpenVINO.SINGLE_MODEL
-        else:
-            self.create_model(model)
-
-        # threading
-        self.trans_thread = threading.Thread(target=self.speech_to_text)
-        self.trans_thread.start()
+        self.device = self.get_device()
+
+        self.create_model(model)
+
+        self.start_transcription()
 
         self.websocket.send(json.dumps({
             "uid": self.client_uid,
             "message": self.SERVER_READY,
-            "backend": "openvino"
+            "backend": "openvino",
+            "result_format": self.outbox.encoder.result_format,
+            "flow_control": self.ingest_budget.enabled,
         }))
         logging.info(f"Using OpenVINO device: {self.device}")
         logging.info(f"Running OpenVINO backend with language: {self.language} and task: {self.task}")
 
-    def create_model(self, model_id):
+    @staticmethod
+    def get_device():
+        """
+        OpenVINO device the models run on, the first GPU if there is one.
         """
-        Instantiates a new model, sets it as the transcriber.
+        available_devices = Core().available_devices
+        if 'GPU' in available_devices:
+            return 'GPU'
+        gpu_devices = [d for d in available_devices if d.startswith('GPU')]
+        return gpu_devices[0] if gpu_devices else 'CPU'
+
+    @staticmethod
+    def acquire_model(model_id, device):
+        """
+        Get the shared pipeline from the model registry, loading it if no session uses it yet.
+
+        Returns:
+            tuple: The registry key and the `ModelEntry` holding the pipeline.
         """
-        self.transcriber = WhisperOpenVINO(
-            model_id,
-            device=self.device,
-            language=self.language,
-            task=self.task
+        key = ("openvino", model_id, device)
+        entry = MODEL_REGISTRY.acquire(
+            key,
+            lambda: WhisperOpenVINO(model_id, device=device),
+            size=lambda model: directory_size(model.model_path),
         )
+        return key, entry
+
+    def create_model(self, model_id):
+        """
+        Sets the shared pipeline for the model and device as the transcriber, loading it through the
+        model registry if no other session uses it yet. Language and task are passed on every call,
+        so sessions with different settings share the same weights.
+        """
+        self.model_key, self.model_entry = self.acquire_model(model_id, self.device)
+        self.transcriber = self.model_entry.model
+
+    @classmethod
+    def preload(cls, model_id, warmup_steps=3):
+        """
+        Load a pipeline into the model registry and warm it up before any client connects.
+
+        Args:
+            model_id (str): Huggingface model_id of an OpenVINO model.
+            warmup_steps (int, optional): Number of warmup passes. Defaults to 3.
+        """
+        key, entry = cls.acquire_model(model_id, cls.get_device())
+        try:
+            logging.info(f"🔥 Warming up model {key}...")
+            audio = warmup_audio()
+            with entry.locked():
+                for _ in range(warmup_steps):
+                    entry.model.transcribe(audio)
+        finally:
+            MODEL_REGISTRY.release(key)
 
     def transcribe_audio(self, input_sample):
         """
@@ -123,11 +167,8 @@ class ServeClientOpenVINO(ServeClientBase):
             depends on the implementation of the `transcriber.transcribe` method but typically
             includes the transcribed text.
         """
-        if ServeClientOpenVINO.SINGLE_MODEL:
-            ServeClientOpenVINO.SINGLE_MODEL_LOCK.acquire()
-        result = self.transcriber.transcribe(input_sample)
-        if ServeClientOpenVINO.SINGLE_MODEL:
-            ServeClientOpenVINO.SINGLE_MODEL_LOCK.release()
+        with self.model_entry.locked():
+            result = self.transcriber.transcribe(input_sample, language=self.language, task=self.task)
         return result
 
     def handle_transcription_output(self, result, duration):
@@ -141,7 +182,8 @@ class ServeClientOpenVINO(ServeClientBase):
         segments = []
         if len(result):
             self.t_start = None
-            last_segment = self.update_segments(result, duration)
+            with METRICS.time_stage("update_segments", self.client_uid):
+                last_segment = self.update_segments(result, duration)
             segments = self.prepare_segments(last_segment)
 
         if len(segments):
@@ -0,0 +1,467 @@
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from whisper_live.backend.base import ServeClientBase
+from whisper_live.metrics import METRICS
+from whisper_live.ring_buffer import AudioRingBuffer
+from whisper_live.send_queue import SendQueue
+
+BUFFER_SAMPLES = int(ServeClientBase.BUFFER_CAPACITY * ServeClientBase.RATE)
+
+# Sent by a worker after the ERROR of a session it could not start
+SESSION_FAILED = "session-failed"
+
+
+class IPCWebSocket(object):
+    """
+    Stands in for the client websocket inside a worker process. Messages are sent back to the server
+    process, which forwards them to the real websocket.
+    """
+
+    def __init__(self, uid, results):
+        self.uid = uid
+        self.results = results
+
+    def send(self, message):
+        self.results.put((self.uid, message))
+
+    def close(self):
+        self.results.put((self.uid, None))
+
+
+def attach_buffer(shm_name):
+    """
+    Attach to the shared-memory audio buffer of a session created by the server process.
+
+    Returns:
+        tuple: The `SharedMemory` block and the `AudioRingBuffer` reading from it.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    return shm, AudioRingBuffer(BUFFER_SAMPLES, buffer=shm.buf)
+
+
+def close_buffer(shm):
+    try:
+        shm.close()
+    except BufferError:
+        # a pass still holds a view of the audio, the mapping goes away with it
+        pass
+
+
+class WorkerSessions(object):
+    """
+    The sessions of an inference worker process.
+
+    Creating a session can load or download its model, which takes seconds to minutes, so sessions are
+    created on a loader thread of their own while the worker's command loop keeps handing audio to the
+    other sessions. The audio and timeline commands of a session still loading are kept and applied, in
+    order, once it is ready.
+    """
+
+    def __init__(self, factory, results):
+        """
+        Args:
+            factory (callable): Creates a session from its `IPCWebSocket`, audio buffer and options.
+            results (multiprocessing.Queue): Messages for the clients, as (uid, message) tuples.
+        """
+        self.factory = factory
+        self.results = results
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.loading = {}
+        """Commands received for each session still being created."""
+
+    def open(self, uid, options, shm_name):
+        """
+        Start creating a session on a loader thread.
+
+        Args:
+            uid (str): Session id.
+            options (dict): Keyword arguments of the session.
+            shm_name (str): Name of the session's shared audio buffer.
+
+        Returns:
+            threading.Thread: The loader thread, None if the client already left.
+        """
+        try:
+            shm, frames_buffer = attach_buffer(shm_name)
+        except FileNotFoundError:
+            # the client left before the session got here
+            return None
+        with self.lock:
+            self.loading[uid] = []
+        loader = threading.Thread(
+            target=self.load, args=(uid, options, shm, frames_buffer), name=f"session-loader-{uid}", daemon=True
+        )
+        loader.start()
+        return loader
+
+    def load(self, uid, options, shm, frames_buffer):
+        try:
+            session = self.factory(IPCWebSocket(uid, self.results), frames_buffer, options)
+        except Exception as e:
+            logging.error(f"❌ Failed to start session {uid} in worker {os.getpid()}: {e}")
+            with self.lock:
+                self.loading.pop(uid, None)
+            self.results.put((uid, json.dumps({"uid": uid, "status": "ERROR", "message": str(e)})))
+            self.results.put((uid, SESSION_FAILED))
+            del frames_buffer
+            close_buffer(shm)
+            return
+        with self.lock:
+            commands = self.loading.pop(uid, None)
+            if commands is not None:
+                self.sessions[uid] = (session, shm)
+                for command in commands:
+                    self.apply(session, command)
+        if commands is None:
+            # closed while it was being created
+            session.cleanup()
+            close_buffer(shm)
+
+    def forward(self, command):
+        """
+        Hand a "frames" or "timeline" command over to its session.
+
+        Args:
+            command (tuple): The command, its second item is the session id.
+        """
+        uid = command[1]
+        with self.lock:
+            if uid in self.loading:
+                self.loading[uid].append(command)
+                return
+            session = self.sessions.get(uid)
+            if session is not None:
+                self.apply(session[0], command)
+
+    @staticmethod
+    def apply(session, command):
+        if command[0] == "frames":
+            session.add_written_frames(command[2])
+        else:
+            session.timeline.add(command[2], command[3])
+
+    def close(self, uid):
+        """
+        Stop a session, or drop it once created if it is still loading.
+
+        Args:
+            uid (str): Session id.
+        """
+        with self.lock:
+            self.loading.pop(uid, None)
+            session = self.sessions.pop(uid, None)
+        if session is not None:
+            session[0].cleanup()
+            close_buffer(session[1])
+
+
+def worker_main(commands, results, num_threads, num_workers, cache_path, metrics_address=None):
+    """
+    Entry point of an inference worker process.
+
+    The worker owns its own model registry, so its own model instances, and runs the transcription passes
+    of the sessions assigned to it on a small `TranscriptionWorkerPool`.
+
+    Args:
+        commands (multiprocessing.Queue): Commands from the server process.
+        results (multiprocessing.Queue): Messages for the clients, as (uid, message) tuples.
+        num_threads (int): CPU threads the models of this worker may use.
+        num_workers (int): Threads running transcription passes.
+        cache_path (str): Where downloaded and converted models are cached.
+        metrics_address (tuple, optional): (host, port) to serve the metrics of this worker on.
+    """
+    # CTranslate2 and onnxruntime size their thread pools from OMP_NUM_THREADS when they are loaded
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+    from whisper_live.backend.faster_whisper_backend import ServeClientFasterWhisper
+    from whisper_live.backend.worker_pool import TranscriptionWorkerPool
+
+    if metrics_address is not None:
+        METRICS.serve(*metrics_address)
+    pool = TranscriptionWorkerPool(num_workers)
+    sessions = WorkerSessions(
+        lambda websocket, frames_buffer, options: ServeClientFasterWhisper(
+            websocket, worker_pool=pool, frames_buffer=frames_buffer, cache_path=cache_path, **options
+        ),
+        results,
+    )
+    while True:
+        command = commands.get()
+        kind = command[0]
+        if kind == "stop":
+            break
+        if kind in ("frames", "timeline"):
+            sessions.forward(command)
+        elif kind == "open":
+            _, uid, options, shm_name = command
+            sessions.open(uid, options, shm_name)
+        elif kind == "close":
+            _, uid = command
+            sessions.close(uid)
+        elif kind == "preload":
+            _, models, concurrency = command
+            for model in models:
+                try:
+                    ServeClientFasterWhisper.preload(model, cache_path=cache_path, concurrency=concurrency)
+                except Exception as e:
+                    logging.error(f"❌ Failed to preload {model} in worker {os.getpid()}: {e}")
+            results.put((None, os.getpid()))
+    pool.stop()
+
+
+class RemoteSession(object):
+    """
+    Server-side handle of a session running in an inference worker process.
+
+    The audio is written into a ring buffer in shared memory, and only the number of new samples goes
+    through the command queue, so handing audio over costs one copy no matter the packet size.
+    """
+
+    def __init__(self, pool, index, websocket, client_uid):
+        self.pool = pool
+        self.index = index
+        self.worker = pool.workers[index]
+        self.websocket = websocket
+        self.client_uid = client_uid
+        self.uid = f"{client_uid}-{uuid.uuid4().hex[:8]}"
+        self.translation_client = None
+        self.outbox = SendQueue(websocket, client_uid)
+        self.shm = shared_memory.SharedMemory(create=True, size=2 * BUFFER_SAMPLES * np.dtype(np.float32).itemsize)
+        self.frames_buffer = AudioRingBuffer(BUFFER_SAMPLES, buffer=self.shm.buf)
+
+    def add_frames(self, frame_np):
+        """
+        Hand new audio over to the worker running the session.
+
+        Args:
+            frame_np (numpy.ndarray): float32 audio samples.
+        """
+        self.frames_buffer.append(frame_np)
+        self.worker.put(("frames", self.uid, frame_np.shape[0]))
+
+    def reserve_frames(self, num_samples):
+        """Writable slot for the next samples, directly in the shared audio buffer."""
+        return self.frames_buffer.reserve(num_samples)
+
+    def commit_frames(self, num_samples):
+        """
+        Hand the samples written into the slot returned by `reserve_frames` over to the worker.
+
+        Args:
+            num_samples (int): Number of samples written.
+        """
+        self.frames_buffer.commit(num_samples)
+        self.worker.put(("frames", self.uid, num_samples))
+
+    def mark_stream_position(self, stream_position):
+        """
+        Tell the worker where in the client stream the next samples come from, see `ServeClientBase.mark_stream_position`.
+
+        Args:
+            stream_position (int): Stream position of the next sample handed over.
+        """
+        self.worker.put(("timeline", self.uid, self.frames_buffer.end, stream_position))
+
+    def disconnect(self):
+        self.outbox.put_message(json.dumps({
+            "uid": self.client_uid,
+            "message": ServeClientBase.DISCONNECT
+        }))
+
+    def cleanup(self):
+        """Stop the session in its worker and free the shared audio buffer."""
+        self.worker.put(("close", self.uid))
+        self.pool.remove_session(self)
+        self.outbox.close()
+        METRICS.remove_session(self.client_uid)
+        self.frames_buffer = None
+        close_buffer(self.shm)
+        self.shm.unlink()
+
+
+class InferenceProcessPool(object):
+    """
+    Shards sessions across worker processes, each with its own interpreter, models and CPU thread budget,
+    so the Python side of transcription (segment handling, VAD glue, JSON) does not contend on the GIL
+    of the server process.
+
+    New sessions go to the worker with the fewest sessions. The server process keeps the websockets,
+    writes the session audio into shared memory and forwards what the workers send back. When a worker
+    dies its sessions are failed and it gets no new ones.
+    """
+
+    def __init__(self, num_processes, threads_per_process=None, workers_per_process=2,
+                 cache_path="~/.cache/whisper-live/", metrics_address=None):
+        """
+        Start the worker processes.
+
+        Args:
+            num_processes (int): Number of worker processes.
+            threads_per_process (int, optional): CPU threads for the models of each worker. Defaults to
+                the CPU count divided by the number of workers.
+            workers_per_process (int, optional): Threads running transcription passes in each worker.
+            cache_path (str, optional): Where downloaded and converted models are cached.
+            metrics_address (tuple, optional): (host, port) of the metrics endpoint of the first worker,
+                the others use the following ports. Defaults to None, no endpoint.
+        """
+        context = multiprocessing.get_context("spawn")
+        self.num_processes = max(1, int(num_processes))
+        threads = threads_per_process or max(1, (os.cpu_count() or 1) // self.num_processes)
+        self.results = context.Queue()
+        self.workers = []
+        self.processes = []
+        for i in range(self.num_processes):
+            commands = context.Queue()
+            worker_metrics = None if metrics_address is None else (metrics_address[0], metrics_address[1] + i)
+            process = context.Process(
+                target=worker_main,
+                args=(commands, self.results, threads, workers_per_process, cache_path, worker_metrics),
+                name=f"inference-worker-{i}",
+                daemon=True,
+            )
+            process.start()
+            self.workers.append(commands)
+            self.processes.append(process)
+
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.load = [0] * self.num_processes
+        self.alive = [True] * self.num_processes
+        self.stopping = False
+        self.preloaded = queue.Queue()
+        self.forwarder = threading.Thread(target=self.forward_results, daemon=True)
+        self.forwarder.start()
+        self.watcher = threading.Thread(target=self.watch_workers, daemon=True)
+        self.watcher.start()
+        logging.info(f"🧩 Inference process pool started with {self.num_processes} workers, {threads} threads each")
+
+    def open_session(self, websocket, **options):
+        """
+        Start a faster_whisper session on the least loaded worker.
+
+        Args:
+            websocket: The client websocket.
+            **options: Keyword arguments of `ServeClientFasterWhisper`, they must be picklable.
+
+        Returns:
+            RemoteSession: Handle of the session for the server process.
+
+        Raises:
+            RuntimeError: If no worker process is running.
+        """
+        with self.lock:
+            alive = [i for i in range(self.num_processes) if self.alive[i]]
+            if not alive:
+                raise RuntimeError("No inference worker process is running")
+            index = min(alive, key=lambda i: self.load[i])
+            self.load[index] += 1
+            session = RemoteSession(self, index, websocket, options.get("client_uid"))
+            self.sessions[session.uid] = session
+        session.worker.put(("open", session.uid, options, session.shm.name))
+        logging.info(f"🧩 Session {session.client_uid} assigned to inference worker {index}")
+        return session
+
+    def remove_session(self, session):
+        with self.lock:
+            if self.sessions.pop(session.uid, None) is not None:
+                self.load[session.index] -= 1
+
+    def preload(self, models, timeout=600, concurrency=1):
+        """
+        Load and warm up models in every worker, returns once all of them are done or died.
+
+        Args:
+            models (list): Models to preload.
+            timeout (float, optional): Maximum time to wait for the workers, in seconds. Defaults to 600.
+            concurrency (int, optional): Passes that may run at once on each model. Defaults to 1.
+        """
+        processes = {}
+        for index, commands in enumerate(self.workers):
+            if self.alive[index]:
+                commands.put(("preload", models, concurrency))
+                processes[self.processes[index].pid] = self.processes[index]
+        deadline = time.time() + timeout
+        while processes:
+            try:
+                processes.pop(self.preloaded.get(timeout=1.0), None)
+            except queue.Empty:
+                pass
+            processes = {pid: process for pid, process in processes.items() if process.is_alive()}
+            if processes and time.time() > deadline:
+                logging.error(f"❌ {len(processes)} inference workers did not preload the models in {timeout}s")
+                return
+
+    def forward_results(self):
+        """Forward what the workers send to the client websockets, through each session's `SendQueue`."""
+        while True:
+            item = self.results.get()
+            if item is None:
+                break
+            uid, message = item
+            if uid is None:
+                self.preloaded.put(message)
+                continue
+            with self.lock:
+                session = self.sessions.get(uid)
+            if session is None:
+                continue
+            # queued per client, a slow client does not hold up the others
+            if message == SESSION_FAILED:
+                self.remove_session(session)
+            elif message is None:
+                session.outbox.put_close()
+            else:
+                session.outbox.put_message(message)
+
+    def watch_workers(self):
+        """Wait for worker processes to exit, and fail the sessions of the ones that died."""
+        sentinels = {process.sentinel: index for index, process in enumerate(self.processes)}
+        while sentinels:
+            for sentinel in wait(list(sentinels)):
+                self.worker_died(sentinels.pop(sentinel))
+
+    def worker_died(self, index):
+        """
+        Stop assigning sessions to a worker process that exited, and disconnect the clients it was serving.
+
+        Args:
+            index (int): Index of the worker.
+        """
+        with self.lock:
+            self.alive[index] = False
+            sessions = [session for session in self.sessions.values() if session.index == index]
+            for session in sessions:
+                del self.sessions[session.uid]
+            self.load[index] = 0
+        if self.stopping:
+            return
+        exitcode = self.processes[index].exitcode
+        logging.error(f"❌ Inference worker {index} died (exit code {exitcode}), disconnecting {len(sessions)} sessions")
+        for session in sessions:
+            session.outbox.put_message(json.dumps({
+                "uid": session.client_uid,
+                "status": "ERROR",
+                "message": "The inference worker running the session stopped."
+            }))
+            session.disconnect()
+            session.outbox.put_close()
+
+    def stop(self):
+        """Stop the worker processes."""
+        self.stopping = True
+        for commands in self.workers:
+            commands.put(("stop",))
+        for process in self.processes:
+            process.join(timeout=5)
+        self.results.put(None)
@@ -116,28 +116,7 @@ class ServeClientTranslation(ServeClientBase):
                     logging.info(f"Received exit signal for translation client {self.client_uid}")
                     break
                     
-                # Only translate completed segments
-                if not segment.get("completed", False):
-                    self.translation_queue.task_done()
-                    continue
-                    
-                # Translate the segment
-                original_text = segment.get("text", "")
-                translated_text = self.translate_text(original_text)
-                
-                # Create translated segment
-                translated_segment = {
-                    "start": segment["start"],
-                    "end": segment["end"],
-                    "text": translated_text,
-                    "completed": segment.get("completed", False),
-                    "target_language": self.target_language
-                }
-                
-                self.translated_segments.append(translated_segment)
-                segments_to_send = self.prepare_translated_segments()
-                self.send_translation_to_client(segments_to_send)
-                
+                self.translate_segment(segment)
                 self.translation_queue.task_done()
                 
             except queue.Empty:
@@ -148,6 +127,34 @@ class ServeClientTranslation(ServeClientBase):
         
         logging.info(f"Translation processing ended for client {self.client_uid}")
     
+    def translate_segment(self, segment):
+        """
+        Translate a completed segment and send the recent translations to the client.
+
+        Args:
+            segment (dict): Segment taken from the translation queue. Incomplete segments are ignored.
+        """
+        # Only translate completed segments
+        if not segment.get("completed", False):
+            return
+
+        # Translate the segment
+        original_text = segment.get("text", "")
+        translated_text = self.translate_text(original_text)
+
+        # Create translated segment
+        translated_segment = {
+            "start": segment["start"],
+            "end": segment["end"],
+            "text": translated_text,
+            "completed": segment.get("completed", False),
+            "target_language": self.target_language
+        }
+
+        self.translated_segments.append(translated_segment)
+        segments_to_send = self.prepare_translated_segments()
+        self.send_translation_to_client(segments_to_send)
+
     def prepare_translated_segments(self):
         """
         Prepare the last n translated segments to send to client.
@@ -182,6 +189,35 @@ class ServeClientTranslation(ServeClientBase):
         This method will be called when the translation thread starts.
         """
         self.process_translation_queue()
+
+    def process_step(self):
+        """
+        Translate every segment currently waiting in the queue without blocking.
+
+        Used when translation runs on the shared worker pool instead of its own thread; the
+        transcription session schedules this client whenever it queues a completed segment.
+
+        Returns:
+            bool: Always False, the client is scheduled again when new segments are queued.
+        """
+        while not self.exit:
+            try:
+                segment = self.translation_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if segment is None:
+                logging.info(f"Received exit signal for translation client {self.client_uid}")
+                self.exit = True
+                break
+
+            try:
+                self.translate_segment(segment)
+            except Exception as e:
+                logging.error(f"Error processing translation queue: {e}")
+            finally:
+                self.translation_queue.task_done()
+        return False
     
     def set_target_language(self, language: str):
         """
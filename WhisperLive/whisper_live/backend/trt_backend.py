@@ -1,15 +1,14 @@
 import json
 import logging
-import threading
-import time
 
 from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.model_registry import MODEL_REGISTRY, directory_size
 from whisper_live.transcriber.transcriber_tensorrt import WhisperTRTLLM
+from whisper_live.utils import warmup_audio
 
 
 class ServeClientTensorRT(ServeClientBase):
-    SINGLE_MODEL = None
-    SINGLE_MODEL_LOCK = threading.Lock()
+    MIN_CHUNK_DURATION = 0.4
 
     def __init__(
         self,
@@ -26,6 +25,9 @@ class ServeClientTensorRT(ServeClientBase):
         no_speech_thresh=0.45,
         clip_audio=False,
         same_output_threshold=10,
+        worker_pool=None,
+        result_format="json",
+        ingest_budget=0.0,
     ):
         """
         Initialize a ServeClient instance.
@@ -40,13 +42,18 @@ class ServeClientTensorRT(ServeClientBase):
             multilingual (bool, optional): Whether the client supports multilingual transcription. Defaults to False.
             language (str, optional): The language for transcription. Defaults to None.
             client_uid (str, optional): A unique identifier for the client. Defaults to None.
-            single_model (bool, optional): Whether to instantiate a new model for each client connection. Defaults to False.
+            single_model (bool, optional): Unused, engines are always shared through the model registry. Defaults to False.
             use_py_session (bool, optional): Use python session or cpp session. Defaults to Cpp Session.
             max_new_tokens (int, optional): Max number of tokens to generate.
             send_last_n_segments (int, optional): Number of most recent segments to send to the client. Defaults to 10.
             no_speech_thresh (float, optional): Segments with no speech probability above this threshold will be discarded. Defaults to 0.45.
             clip_audio (bool, optional): Whether to clip audio with no valid segments. Defaults to False.
             same_output_threshold (int, optional): Number of repeated outputs before considering it as a valid segment. Defaults to 10.
+            worker_pool (TranscriptionWorkerPool, optional): Shared pool running the transcription passes. Defaults to None,
+                which runs them on a dedicated thread for this session.
+            result_format (str, optional): Encoding of the transcription results, "json" or "msgpack". Defaults to "json".
+            ingest_budget (float, optional): Audio (in seconds) the client may send ahead of transcription before it is
+                asked to pause, 0 for no flow control. Defaults to 0.
         """
         super().__init__(
             client_uid,
@@ -55,6 +62,9 @@ class ServeClientTensorRT(ServeClientBase):
             no_speech_thresh,
             clip_audio,
             same_output_threshold,
+            worker_pool=worker_pool,
+            result_format=result_format,
+            ingest_budget=ingest_budget,
         )
 
         self.language = language if multilingual else "en"
@@ -62,53 +72,90 @@ class ServeClientTensorRT(ServeClientBase):
         self.eos = False
         self.max_new_tokens = max_new_tokens
 
-        if single_model:
-            if ServeClientTensorRT.SINGLE_MODEL is None:
-                self.create_model(model, multilingual, use_py_session=use_py_session)
-                ServeClientTensorRT.SINGLE_MODEL = self.transcriber
-            else:
-                self.transcriber = ServeClientTensorRT.SINGLE_MODEL
-        else:
-            self.create_model(model, multilingual, use_py_session=use_py_session)
+        self.create_model(model, multilingual, use_py_session=use_py_session)
 
-        # threading
-        self.trans_thread = threading.Thread(target=self.speech_to_text)
-        self.trans_thread.start()
+        self.start_transcription()
 
         self.websocket.send(json.dumps({
             "uid": self.client_uid,
             "message": self.SERVER_READY,
-            "backend": "tensorrt"
+            "backend": "tensorrt",
+            "result_format": self.outbox.encoder.result_format,
+            "flow_control": self.ingest_budget.enabled,
         }))
 
     def create_model(self, model, multilingual, warmup=True, use_py_session=False):
         """
-        Instantiates a new model, sets it as the transcriber and does warmup if desired.
+        Sets the shared engine as the transcriber, loading it through the model registry (and doing
+        warmup if desired) if no other session uses it yet.
         """
-        self.transcriber = WhisperTRTLLM(
+        self.model_key, self.model_entry = self.acquire_model(
+            model, multilingual, use_py_session, self.max_new_tokens, warmup=warmup
+        )
+        self.transcriber = self.model_entry.model
+
+    @classmethod
+    def acquire_model(cls, model, multilingual, use_py_session=False, max_new_tokens=225, warmup=True):
+        """
+        Get the shared engine from the model registry, loading it (and doing warmup if desired) if no
+        session uses it yet. The decoding prompt is passed on every call, so sessions with different
+        languages share the engine.
+
+        Returns:
+            tuple: The registry key and the `ModelEntry` holding the engine.
+        """
+        key = ("tensorrt", model, multilingual, use_py_session, max_new_tokens)
+        entry = MODEL_REGISTRY.acquire(
+            key,
+            lambda: cls.load_model(model, multilingual, use_py_session, max_new_tokens, warmup),
+            size=lambda _: directory_size(model),
+        )
+        return key, entry
+
+    @classmethod
+    def load_model(cls, model, multilingual, use_py_session=False, max_new_tokens=225, warmup=True):
+        """
+        Instantiates a new model and does warmup if desired.
+
+        Returns:
+            WhisperTRTLLM: The loaded model.
+        """
+        transcriber = WhisperTRTLLM(
             model,
             assets_dir="assets",
             device="cuda",
             is_multilingual=multilingual,
-            language=self.language,
-            task=self.task,
+            language="en",
+            task="transcribe",
             use_py_session=use_py_session,
-            max_output_len=self.max_new_tokens,
+            max_output_len=max_new_tokens,
         )
         if warmup:
-            self.warmup()
+            cls.warmup(transcriber)
+        return transcriber
+
+    @classmethod
+    def preload(cls, model, multilingual, use_py_session=False):
+        """
+        Load and warm up an engine before any client connects. It stays loaded as an idle model until
+        a session picks it up.
+        """
+        key, _ = cls.acquire_model(model, multilingual, use_py_session)
+        MODEL_REGISTRY.release(key)
 
-    def warmup(self, warmup_steps=10):
+    @staticmethod
+    def warmup(transcriber, warmup_steps=10):
         """
         Warmup TensorRT since first few inferences are slow.
 
         Args:
+            transcriber (WhisperTRTLLM): The engine to warm up.
             warmup_steps (int): Number of steps to warm up the model for.
         """
         logging.info("[INFO:] Warming up TensorRT engine..")
-        mel, _ = self.transcriber.log_mel_spectrogram("assets/jfk.flac")
+        mel, _ = transcriber.log_mel_spectrogram(warmup_audio())
         for i in range(warmup_steps):
-            self.transcriber.transcribe(mel)
+            transcriber.transcribe(mel)
 
     def set_eos(self, eos):
         """
@@ -142,16 +189,13 @@ class ServeClientTensorRT(ServeClientBase):
         Args:
             input_bytes (np.array): The audio chunk to transcribe.
         """
-        if ServeClientTensorRT.SINGLE_MODEL:
-            ServeClientTensorRT.SINGLE_MODEL_LOCK.acquire()
-        logging.info(f"[WhisperTensorRT:] Processing audio with duration: {input_bytes.shape[0] / self.RATE}")
-        mel, duration = self.transcriber.log_mel_spectrogram(input_bytes)
-        last_segment = self.transcriber.transcribe(
-            mel,
-            text_prefix=f"<|startoftranscript|><|{self.language}|><|{self.task}|><|notimestamps|>",
-        )
-        if ServeClientTensorRT.SINGLE_MODEL:
-            ServeClientTensorRT.SINGLE_MODEL_LOCK.release()
+        with self.model_entry.locked():
+            logging.info(f"[WhisperTensorRT:] Processing audio with duration: {input_bytes.shape[0] / self.RATE}")
+            mel, duration = self.transcriber.log_mel_spectrogram(input_bytes)
+            last_segment = self.transcriber.transcribe(
+                mel,
+                text_prefix=f"<|startoftranscript|><|{self.language}|><|{self.task}|><|notimestamps|>",
+            )
         if last_segment:
             self.handle_transcription_output(last_segment, duration)
 
@@ -171,40 +215,31 @@ class ServeClientTensorRT(ServeClientBase):
         with self.lock:
             self.timestamp_offset += duration
 
-    def speech_to_text(self):
+    def transcription_pass(self):
         """
-        Process an audio stream in an infinite loop, continuously transcribing the speech.
-
-        This method continuously receives audio frames, performs real-time transcription, and sends
-        transcribed segments to the client via a WebSocket connection.
+        Run a single transcription pass over the unprocessed audio.
 
-        If the client's language is not detected, it waits for 30 seconds of audio input to make a language prediction.
-        It utilizes the Whisper ASR model to transcribe the audio, continuously processing and streaming results. Segments
-        are sent to the client in real-time, and a history of segments is maintained to provide context.
-
-        Raises:
-            Exception: If there is an issue with audio processing or WebSocket communication.
+        Unlike the other backends, the TensorRT backend always clips audio with no valid segment and
+        advances the timestamp offset by the whole chunk after every pass.
 
+        Returns:
+            bool: Always False, every pass consumes the pending audio.
         """
-        while True:
-            if self.exit:
-                logging.info("Exiting speech to text thread")
-                break
-
-            if self.frames_np is None:
-                time.sleep(0.02)    # wait for any audio to arrive
-                continue
+        if self.frames_buffer.end == 0:
+            return False
 
-            self.clip_audio_if_no_valid_segment()
+        self.clip_audio_if_no_valid_segment()
 
-            input_bytes, duration = self.get_audio_chunk_for_processing()
-            if duration < 0.4:
-                continue
+        input_bytes, duration = self.get_audio_chunk_for_processing()
+        if duration < self.MIN_CHUNK_DURATION:
+            return False
 
-            try:
-                input_sample = input_bytes.copy()
-                logging.info(f"[WhisperTensorRT:] Processing audio with duration: {duration}")
-                self.transcribe_audio(input_sample)
+        try:
+            # torch needs a writable array, the chunk is a read-only view into the session buffer
+            input_sample = input_bytes.copy()
+            logging.info(f"[WhisperTensorRT:] Processing audio with duration: {duration}")
+            self.transcribe_audio(input_sample)
 
-            except Exception as e:
-                logging.error(f"[ERROR]: {e}")
+        except Exception as e:
+            logging.error(f"[ERROR]: {e}")
+        return False
@@ -0,0 +1,132 @@
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+
+
+class TranscriptionWorkerPool(object):
+    """
+    Fixed-size pool of threads running transcription passes for all sessions.
+
+    Sessions are schedulable units: anything exposing `process_step()` (and an `exit` flag) can be
+    handed to `schedule`. A unit is queued at most once, and never runs on two workers at the same
+    time; scheduling a unit while it is running makes it run once more right after. Idle sessions
+    cost nothing, and the number of threads stays bounded no matter how many sessions are connected.
+    A unit that needs to run again later, but not right away, is handed to `schedule_after`.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    RERUN = "rerun"
+
+    def __init__(self, num_workers=4):
+        """
+        Initialize the pool and start its worker threads.
+
+        Args:
+            num_workers (int, optional): Number of worker threads. Defaults to 4.
+        """
+        self.num_workers = max(1, int(num_workers))
+        self.ready = queue.Queue()
+        self.lock = threading.Lock()
+        self.states = {}
+        # delayed schedules, (due time, sequence, unit) in a heap run by a timer thread started on first use
+        self.timers = []
+        self.timer_sequence = itertools.count()
+        self.timers_changed = threading.Condition(self.lock)
+        self.timer_thread = None
+        self.stopped = False
+
+        self.workers = []
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self.worker_loop, name=f"transcription-worker-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        logging.info(f"🧵 Transcription worker pool started with {self.num_workers} workers")
+
+    def schedule(self, unit):
+        """
+        Request a `process_step` run for the given unit.
+
+        Args:
+            unit: A session (or any object with `process_step()`) that has new work.
+        """
+        with self.lock:
+            self.enqueue(unit)
+
+    def enqueue(self, unit):
+        state = self.states.get(unit)
+        if state is None:
+            self.states[unit] = self.QUEUED
+            self.ready.put(unit)
+        elif state == self.RUNNING:
+            self.states[unit] = self.RERUN
+
+    def schedule_after(self, unit, delay):
+        """
+        Request a `process_step` run for the given unit in `delay` seconds, without holding a worker meanwhile.
+
+        Args:
+            unit: A session (or any object with `process_step()`).
+            delay (float): Seconds to wait before scheduling it.
+        """
+        with self.lock:
+            heapq.heappush(self.timers, (time.monotonic() + delay, next(self.timer_sequence), unit))
+            if self.timer_thread is None:
+                self.timer_thread = threading.Thread(target=self.timer_loop, name="transcription-timer", daemon=True)
+                self.timer_thread.start()
+            self.timers_changed.notify()
+
+    def timer_loop(self):
+        """Timer thread loop, schedules the units whose delay is over until `stop` is called."""
+        with self.lock:
+            while not self.stopped:
+                if not self.timers:
+                    self.timers_changed.wait()
+                    continue
+                wait = self.timers[0][0] - time.monotonic()
+                if wait > 0:
+                    self.timers_changed.wait(wait)
+                    continue
+                unit = heapq.heappop(self.timers)[2]
+                if not getattr(unit, "exit", False):
+                    self.enqueue(unit)
+
+    def worker_loop(self):
+        """Worker thread loop, runs until `stop` is called."""
+        while True:
+            unit = self.ready.get()
+            if unit is None:
+                break
+
+            with self.lock:
+                if getattr(unit, "exit", False):
+                    self.states.pop(unit, None)
+                    continue
+                self.states[unit] = self.RUNNING
+
+            run_again = False
+            try:
+                run_again = unit.process_step()
+            except Exception as e:
+                logging.error(f"[ERROR]: Worker failed to process {getattr(unit, 'client_uid', unit)}: {e}")
+
+            with self.lock:
+                if getattr(unit, "exit", False):
+                    self.states.pop(unit, None)
+                elif run_again or self.states.get(unit) == self.RERUN:
+                    # go to the back of the queue so other sessions get their turn
+                    self.states[unit] = self.QUEUED
+                    self.ready.put(unit)
+                else:
+                    self.states.pop(unit, None)
+
+    def stop(self):
+        """Stop all worker threads once they finish their current pass."""
+        with self.lock:
+            self.stopped = True
+            self.timers_changed.notify()
+        for _ in self.workers:
+            self.ready.put(None)
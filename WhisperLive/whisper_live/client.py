@@ -12,6 +12,8 @@ import uuid
 import time
 import av
 import whisper_live.utils as utils
+from whisper_live.protocol import MSGPACK_AVAILABLE, ResultDecoder, encode_far_end
+from whisper_live.uplink import UplinkEncoder
 
 
 class Client:
@@ -20,6 +22,8 @@ class Client:
     """
     INSTANCES = {}
     END_OF_AUDIO = "END_OF_AUDIO"
+    MAX_PAUSE = 30
+    """Longest time (in seconds) to hold audio back after the server asked to pause without resuming."""
 
     def __init__(
         self,
@@ -41,6 +45,10 @@ class Client:
         target_language="fr",
         translation_callback=None,
         translation_srt_file_path="output_translated.srt",
+        commit_policy="same_output",
+        result_format="json",
+        audio_encoding="float32",
+        flow_control=False,
     ):
         """
         Initializes a Client instance for audio recording and streaming to a server.
@@ -67,6 +75,14 @@ class Client:
             target_language (str, optional): Target language for translation. Defaults to 'fr'.
             translation_callback (callable, optional): A callback function to handle translation results. Default is None.
             translation_srt_file_path (str, optional): The file path to save the translated output SRT file. Default is "output_translated.srt".
+            commit_policy (str, optional): How the server commits segments, "same_output" or "local_agreement". Default is "same_output".
+            result_format (str, optional): "msgpack" asks for compact binary results with partial-text deltas, "json" for
+                JSON text results. Default is "json".
+            audio_encoding (str, optional): Encoding of the audio sent to the server, "float32", "int16" (half the
+                bandwidth) or "opus" (about a seventeenth). Default is "float32".
+            flow_control (bool, optional): Whether the audio source can slow down when the server asks to pause,
+                e.g. a file or a stream read on demand. Leave it off for live sources such as the microphone, their
+                audio is sent as it comes and the server counts what it has to drop. Default is False.
         """
         self.recording = False
         self.task = "transcribe"
@@ -87,6 +103,12 @@ class Client:
         self.no_speech_thresh = no_speech_thresh
         self.clip_audio = clip_audio
         self.same_output_threshold = same_output_threshold
+        self.commit_policy = commit_policy
+        if result_format == "msgpack" and not MSGPACK_AVAILABLE:
+            print("[WARN]: msgpack is not installed, asking for JSON results.")
+            result_format = "json"
+        self.result_format = result_format
+        self.result_decoder = ResultDecoder()
         self.transcription_callback = transcription_callback
 
         # Translation-specific attributes
@@ -99,6 +121,13 @@ class Client:
             self.task = "translate"
 
         self.audio_bytes = None
+        self.samples_sent = 0
+        # cleared while the server asks to pause sending audio, only waited on with flow control
+        self.flow_control = flow_control
+        self.send_allowed = threading.Event()
+        self.send_allowed.set()
+        self.audio_encoding = audio_encoding
+        self.uplink_encoder = UplinkEncoder(audio_encoding, sample_rate=16000) if audio_encoding != "float32" else None
 
         if host is not None and port is not None:
             socket_protocol = 'wss' if self.use_wss else "ws"
@@ -197,10 +226,13 @@ class Client:
 
         Args:
             ws (websocket.WebSocketApp): The WebSocket client instance.
-            message (str): The received message from the server.
+            message (str or bytes): The received message from the server, binary for MessagePack results.
 
         """
-        message = json.loads(message)
+        if isinstance(message, bytes):
+            message = self.result_decoder.decode(message)
+        else:
+            message = json.loads(message)
 
         if self.uid != message.get("uid"):
             print("[ERROR]: invalid client uid")
@@ -213,6 +245,15 @@ class Client:
         if "message" in message.keys() and message["message"] == "DISCONNECT":
             print("[INFO]: Server disconnected due to overtime.")
             self.recording = False
+            self.send_allowed.set()
+
+        if "message" in message.keys() and message["message"] in ("PAUSE", "RESUME"):
+            # the server is ahead of transcription by its ingest budget, or caught up again
+            if message["message"] == "PAUSE":
+                self.send_allowed.clear()
+            else:
+                self.send_allowed.set()
+            return
 
         if "message" in message.keys() and message["message"] == "SERVER_READY":
             self.last_response_received = time.time()
@@ -244,6 +285,7 @@ class Client:
         print(f"[INFO]: Websocket connection closed: {close_status_code}: {close_msg}")
         self.recording = False
         self.waiting = False
+        self.send_allowed.set()
 
     def on_open(self, ws):
         """
@@ -269,6 +311,11 @@ class Client:
                     "no_speech_thresh": self.no_speech_thresh,
                     "clip_audio": self.clip_audio,
                     "same_output_threshold": self.same_output_threshold,
+                    "commit_policy": self.commit_policy,
+                    "result_format": self.result_format,
+                    "audio_encoding": self.audio_encoding,
+                    "sample_rate": 16000,
+                    "flow_control": self.flow_control,
                     "enable_translation": self.enable_translation,
                     "target_language": self.target_language,
                 }
@@ -277,14 +324,66 @@ class Client:
 
     def send_packet_to_server(self, message):
         """
-        Send an audio packet to the server using WebSocket.
+        Send an audio packet to the server using WebSocket, in the negotiated audio encoding.
+
+        With flow control, audio packets wait while the server asks to pause until it resumes (at most `MAX_PAUSE`
+        seconds), so audio sent faster than real time is never trimmed from the server's buffer untranscribed.
+
+        Args:
+            message (bytes): The audio data packet in bytes (float32 samples at 16kHz) to be sent to the server.
+
+        """
+        try:
+            if message == Client.END_OF_AUDIO.encode('utf-8'):
+                # the Opus encoder still holds the end of the audio
+                if self.uplink_encoder is not None:
+                    tail = self.uplink_encoder.flush()
+                    if tail:
+                        self.client_socket.send(tail, websocket.ABNF.OPCODE_BINARY)
+                self.client_socket.send(message, websocket.ABNF.OPCODE_BINARY)
+                return
+            if self.flow_control:
+                self.wait_until_resumed()
+            num_samples = len(message) // 4
+            if self.uplink_encoder is not None:
+                message = self.uplink_encoder.encode(np.frombuffer(message, dtype=np.float32))
+            if message:
+                self.client_socket.send(message, websocket.ABNF.OPCODE_BINARY)
+            self.samples_sent += num_samples
+        except Exception as e:
+            print(e)
+
+    def wait_until_resumed(self):
+        """
+        Block while the server asks to pause sending audio, at most `MAX_PAUSE` seconds.
+        """
+        if self.send_allowed.is_set():
+            return
+        if not self.send_allowed.wait(self.MAX_PAUSE):
+            print(f"[WARN]: Server did not resume within {self.MAX_PAUSE}s, sending audio again.")
+            self.send_allowed.set()
+
+    def send_far_end(self, audio, position=None):
+        """
+        Send far-end reference audio, i.e. audio played to the user (TTS, avatar speech) that the microphone
+        may pick up, so the server's echo canceller can remove it from the microphone audio.
 
         Args:
-            message (bytes): The audio data packet in bytes to be sent to the server.
+            audio (np.ndarray): Mono float32 audio at 16kHz, as played.
+            position (int, optional): Position, in the microphone samples sent so far, of the microphone
+                sample captured when playback of `audio` started. Defaults to the number of samples sent,
+                i.e. playback starting now.
 
+        Far-end audio is only sent with the "float32" audio encoding, the server cannot tell it from
+        int16 or Opus microphone audio.
         """
+        if self.uplink_encoder is not None:
+            print(f"[WARN]: Far-end audio is not supported with the {self.audio_encoding} audio encoding.")
+            return
+        if position is None:
+            position = self.samples_sent
         try:
-            self.client_socket.send(message, websocket.ABNF.OPCODE_BINARY)
+            self.client_socket.send(encode_far_end(position, audio), websocket.ABNF.OPCODE_BINARY)
         except Exception as e:
             print(e)
 
@@ -366,6 +465,10 @@ class TranscriptionTeeClient:
         self.output_recording_filename = output_recording_filename
         self.mute_audio_playback = mute_audio_playback
         self.frames = b""
+        if len(self.clients) > 1 and any(client.flow_control for client in self.clients):
+            # the clients are fed one after the other, one paused server would stall all of them
+            print("[WARN]: Flow control is not supported with several clients, audio is sent as it comes.")
+            self.stop_flow_control()
         self.p = pyaudio.PyAudio()
         try:
             self.stream = self.p.open(
@@ -411,8 +514,16 @@ class TranscriptionTeeClient:
         elif rtsp_url is not None:
             self.process_rtsp_stream(rtsp_url)
         else:
+            if any(client.flow_control for client in self.clients):
+                print("[WARN]: The microphone cannot wait for the server, audio is sent as it comes.")
+                self.stop_flow_control()
             self.record()
 
+    def stop_flow_control(self):
+        """Stop holding audio back when a server asks to pause, for sources that cannot slow down."""
+        for client in self.clients:
+            client.flow_control = False
+
     def close_all_clients(self):
         """Closes all client websockets."""
         for client in self.clients:
@@ -756,6 +867,11 @@ class TranscriptionClient(TranscriptionTeeClient):
         target_language (str, optional): Target language for translation. Defaults to 'fr'.
         translation_callback (callable, optional): A callback function to handle translation results. Default is None.
         translation_srt_file_path (str, optional): The file path to save the translated output SRT file. Default is "output_translated.srt".
+        commit_policy (str, optional): How the server commits segments, "same_output" or "local_agreement". Default is "same_output".
+        result_format (str, optional): "msgpack" for compact binary results, "json" for JSON text results. Default is "json".
+        audio_encoding (str, optional): Encoding of the audio sent to the server, "float32", "int16" or "opus". Default is "float32".
+        flow_control (bool, optional): Whether the server may pause the audio when it falls behind, for file and stream
+            sources. Microphone audio is always sent as it comes. Default is False.
 
     Attributes:
         client (Client): An instance of the underlying Client class responsible for handling the WebSocket connection.
@@ -790,6 +906,10 @@ class TranscriptionClient(TranscriptionTeeClient):
         target_language="fr",
         translation_callback=None,
         translation_srt_file_path="./output_translated.srt",
+        commit_policy="same_output",
+        result_format="json",
+        audio_encoding="float32",
+        flow_control=False,
     ):
         self.client = Client(
             host,
@@ -810,6 +930,10 @@ class TranscriptionClient(TranscriptionTeeClient):
             target_language=target_language,
             translation_callback=translation_callback,
             translation_srt_file_path=translation_srt_file_path,
+            commit_policy=commit_policy,
+            result_format=result_format,
+            audio_encoding=audio_encoding,
+            flow_control=flow_control,
         )
 
         if save_output_recording and not output_recording_filename.endswith(".wav"):
@@ -0,0 +1,74 @@
+import json
+import logging
+import threading
+import time
+
+from whisper_live.metrics import METRICS
+
+
+class IngestBudget(object):
+    """
+    Flow control of the audio a client sends ahead of transcription.
+
+    The budget is the amount of audio (in seconds) a session holds received but not transcribed yet.
+    When the pending audio reaches it the client is sent PAUSE, and RESUME once transcription brought
+    it down to half of it, or as soon as the session has nothing left to do with the audio it holds
+    (e.g. the last words wait for more audio to be committed), so a paused client is never stuck.
+    Clients that did not ask for flow control get no messages; a session whose budget is 0 only
+    tracks the pending audio.
+    """
+    PAUSE = "PAUSE"
+    RESUME = "RESUME"
+
+    def __init__(self, outbox, client_uid, max_pending=0.0, resume_pending=None):
+        """
+        Args:
+            outbox (SendQueue): Where the PAUSE and RESUME messages are queued.
+            client_uid (str): Session id, sent in every message.
+            max_pending (float, optional): Budget in seconds of pending audio, 0 disables flow control. Defaults to 0.
+            resume_pending (float, optional): Pending audio (in seconds) at which a paused client resumes.
+                Defaults to half the budget.
+        """
+        self.outbox = outbox
+        self.client_uid = client_uid
+        self.max_pending = max_pending
+        self.resume_pending = max_pending / 2 if resume_pending is None else resume_pending
+        self.lock = threading.Lock()
+        self.paused = False
+        self.paused_at = None
+        self.stats = {"pauses": 0, "paused_seconds": 0.0}
+
+    @property
+    def enabled(self):
+        return self.max_pending > 0
+
+    def update(self, pending, idle=False):
+        """
+        Pause or resume the client for the current amount of pending audio.
+
+        Args:
+            pending (float): Audio received but not transcribed yet, in seconds.
+            idle (bool, optional): Whether the session waits for new audio before it can run another pass.
+                Defaults to False.
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            if not self.paused and pending >= self.max_pending and not idle:
+                self.paused = True
+                self.paused_at = time.time()
+                self.stats["pauses"] += 1
+                METRICS.flow_pauses.inc()
+                self.send(self.PAUSE, pending)
+            elif self.paused and (pending <= self.resume_pending or idle):
+                self.paused = False
+                self.stats["paused_seconds"] += time.time() - self.paused_at
+                self.send(self.RESUME, pending)
+
+    def send(self, message, pending):
+        logging.debug(f"🚦 {message} client {self.client_uid} with {pending:.1f}s of audio pending")
+        self.outbox.put_message(json.dumps({
+            "uid": self.client_uid,
+            "message": message,
+            "pending": round(pending, 3),
+        }))
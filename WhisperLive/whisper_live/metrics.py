@@ -0,0 +1,234 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Histogram buckets (in seconds) for stage timings and latencies."""
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+"""Histogram buckets for real-time factors (processing time / audio duration)."""
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Metric(object):
+    """Base class of the metrics: a name, a help text and one series per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def remove(self, **labels):
+        """Drop every series matching the given labels, e.g. all series of a session that went away."""
+        positions = [(self.labelnames.index(name), str(value)) for name, value in labels.items()]
+        with self.lock:
+            for key in list(self.series):
+                if all(str(key[i]) == value for i, value in positions):
+                    del self.series[key]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            for key, value in self.series.items():
+                lines.extend(self.render_series(key, value))
+        return lines
+
+    def render_series(self, key, value):
+        return [f"{self.name}{format_labels(self.labelnames, key)} {value}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        """
+        Args:
+            function (callable, optional): Called at scrape time to get the value of an unlabelled gauge.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.series[key] = value
+
+    def render(self):
+        if self.function is not None:
+            try:
+                self.set(self.function())
+            except Exception as e:
+                logging.debug(f"Failed to collect {self.name}: {e}")
+        return super().render()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                # per-bucket counts (not cumulative), then sum and count
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render_series(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += bucket_count
+            labels = format_labels(self.labelnames + ("le",), key + (bound,))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {total}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry(object):
+    """
+    In-process metrics of the server, rendered in the Prometheus text exposition format.
+
+    Stage timings are recorded twice: in an aggregate histogram per stage and in a per-session one,
+    whose series are dropped when the session ends so the number of series stays bounded.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.stage_seconds = self.register(Histogram(
+            "whisperlive_stage_seconds", "Time spent in each processing stage.", ("stage",)))
+        self.session_stage_seconds = self.register(Histogram(
+            "whisperlive_session_stage_seconds", "Time spent in each processing stage, per session.",
+            ("session", "stage")))
+        self.real_time_factor = self.register(Histogram(
+            "whisperlive_real_time_factor", "Transcription time divided by the duration of the transcribed audio.",
+            buckets=RTF_BUCKETS))
+        self.audio_to_text_seconds = self.register(Histogram(
+            "whisperlive_audio_to_text_latency_seconds",
+            "Time from the arrival of the newest audio of a window to its transcription being sent."))
+        self.model_lock_wait_seconds = self.register(Histogram(
+            "whisperlive_model_lock_wait_seconds", "Time spent waiting for a shared model."))
+        self.passes = self.register(Counter(
+            "whisperlive_passes_total",
+            "Transcription passes by outcome: transcribed, replayed, skipped or caught_up.",
+            ("outcome",)))
+        self.gated_seconds = self.register(Counter(
+            "whisperlive_gated_audio_seconds_total", "Audio dropped as silence by the ingest gate."))
+        self.dropped_seconds = self.register(Counter(
+            "whisperlive_dropped_audio_seconds_total",
+            "Audio discarded from a full session buffer before it was transcribed."))
+        self.caught_up_seconds = self.register(Counter(
+            "whisperlive_caught_up_audio_seconds_total", "Backlog audio transcribed by batched catch-up passes."))
+        self.flow_pauses = self.register(Counter(
+            "whisperlive_flow_pauses_total", "PAUSE messages sent to clients over their ingest budget."))
+        self.active_sessions = self.register(Gauge(
+            "whisperlive_active_sessions", "Number of connected sessions."))
+        self.buffered_seconds = self.register(Gauge(
+            "whisperlive_buffered_seconds", "Audio received but not transcribed yet, per session.", ("session",)))
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def observe_stage(self, stage, seconds, session=None):
+        """
+        Record the duration of a processing stage.
+
+        Args:
+            stage (str): Name of the stage.
+            seconds (float): Time spent in it.
+            session (str, optional): Session the work was done for.
+        """
+        self.stage_seconds.observe(seconds, stage=stage)
+        if session is not None:
+            self.session_stage_seconds.observe(seconds, session=session, stage=stage)
+
+    @contextmanager
+    def time_stage(self, stage, session=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start, session)
+
+    def remove_session(self, session):
+        """Drop the per-session series of a session that ended."""
+        self.session_stage_seconds.remove(session=session)
+        self.buffered_seconds.remove(session=session)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def serve(self, host, port):
+        """
+        Serve the metrics on `http://host:port/metrics` from a daemon thread.
+
+        Returns:
+            ThreadingHTTPServer: The running server.
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(HTTPStatus.NOT_FOUND)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(HTTPStatus.OK)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        logging.info(f"📈 Metrics available on http://{host}:{port}/metrics")
+        return server
+
+
+METRICS = MetricsRegistry()
+"""The metrics of this process."""
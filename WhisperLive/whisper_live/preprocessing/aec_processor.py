@@ -5,10 +5,15 @@ Uses aiortc WebRTC functionality or fallback AEC for echo cancellation
 
 import numpy as np
 import logging
+from dataclasses import dataclass
 from typing import Optional
 from scipy import signal
 import threading
 
+from whisper_live.ring_buffer import AudioRingBuffer
+from .fdaf import PartitionedBlockFDAF
+from .noise_suppressor import SpectralNoiseSuppressor
+
 # Try to import aiortc WebRTC - if not available, use enhanced DSP fallback
 WEBRTC_AVAILABLE = False
 try:
@@ -22,7 +27,50 @@ except ImportError as e:
     logging.warning(f"⚠️ aiortc WebRTC not available: {e} - using enhanced DSP AEC")
 
 
-def create_aec_processor(sample_rate: int = 16000, channels: int = 1) -> 'AECProcessor':
+@dataclass(frozen=True)
+class AECDesign:
+    """
+    Filter coefficients shared by the AEC processors of all sessions.
+
+    Designing the filters is done once per server; every session only allocates its own filter states.
+    Processors must treat the coefficient arrays as constants (they are not flagged read-only because
+    scipy's filters only accept writable arrays).
+    """
+    sample_rate: int
+    hp_sos: Optional[np.ndarray] = None
+    """High-pass filter of the WebRTC-style processor, as second-order sections."""
+    lp_b: Optional[np.ndarray] = None
+    lp_a: Optional[np.ndarray] = None
+    fallback_hp_b: Optional[np.ndarray] = None
+    fallback_hp_a: Optional[np.ndarray] = None
+
+    @classmethod
+    def create(cls, sample_rate: int = 16000) -> 'AECDesign':
+        """
+        Design the filters of the AEC processors for a sample rate.
+
+        Args:
+            sample_rate: Audio sample rate
+
+        Returns:
+            AECDesign with the coefficients of every processor that could be designed
+        """
+        nyquist = sample_rate / 2
+        coefficients = {}
+        try:
+            coefficients["hp_sos"] = signal.butter(4, 120 / nyquist, 'highpass', output='sos')
+            coefficients["lp_b"], coefficients["lp_a"] = signal.butter(2, 1000 / nyquist, 'lowpass')
+        except Exception as e:
+            logging.warning(f"⚠️ WebRTC-style AEC filter design failed: {e}")
+        try:
+            coefficients["fallback_hp_b"], coefficients["fallback_hp_a"] = signal.butter(4, 100 / nyquist, btype='high')
+        except Exception as e:
+            logging.warning(f"⚠️ Fallback AEC filter design failed: {e}")
+        return cls(sample_rate=sample_rate, **coefficients)
+
+
+def create_aec_processor(sample_rate: int = 16000, channels: int = 1,
+                         design: Optional[AECDesign] = None) -> 'AECProcessor':
     """
     Factory function to create AEC processor with proper error handling.
     Prioritizes WebRTC-style processing when available.
@@ -30,19 +78,22 @@ def create_aec_processor(sample_rate: int = 16000, channels: int = 1) -> 'AECPro
     Args:
         sample_rate: Audio sample rate
         channels: Number of audio channels
+        design: Shared filter coefficients, designed for this processor alone if not given
 
     Returns:
         AECProcessor instance (WebRTC-style preferred, fallback otherwise)
     """
+    if design is None:
+        design = AECDesign.create(sample_rate)
     try:
         # Try WebRTC-style processor first (enhanced DSP with WebRTC algorithms)
-        processor = WebRTCAECProcessor(sample_rate=sample_rate, num_channels=channels)
-        logging.info("🎯 Using WebRTC-style AEC processor (enhanced DSP)")
+        processor = WebRTCAECProcessor(sample_rate=sample_rate, num_channels=channels, design=design)
+        logging.debug("🎯 Using WebRTC-style AEC processor (enhanced DSP)")
         return processor
     except Exception as e:
         logging.warning(f"⚠️ WebRTC-style AEC failed: {e} - using fallback")
         try:
-            processor = FallbackAECProcessor(sample_rate=sample_rate)
+            processor = FallbackAECProcessor(sample_rate=sample_rate, design=design)
             logging.info("🔄 Using fallback AEC processor")
             return processor
         except Exception as e2:
@@ -53,8 +104,11 @@ def create_aec_processor(sample_rate: int = 16000, channels: int = 1) -> 'AECPro
 class WebRTCAECProcessor:
     """Enhanced AEC processor inspired by WebRTC algorithms"""
 
-    def __init__(self, sample_rate: int = 16000, num_channels: int = 1):
+    def __init__(self, sample_rate: int = 16000, num_channels: int = 1, design: Optional[AECDesign] = None):
         self.sample_rate = sample_rate
+        self.design = design if design is not None else AECDesign.create(sample_rate)
+        if self.design.hp_sos is None:
+            raise ValueError("WebRTC-style AEC filters are not available")
         self.num_channels = num_channels
         self.enabled = True
 
@@ -64,27 +118,33 @@ class WebRTCAECProcessor:
         self.agc_enabled = True  # Automatic gain control
         self.hp_filter_enabled = True  # High-pass filter
 
-        # AEC-specific parameters (simulating WebRTC AEC behavior)
-        self.aec_filter_length = 1024  # Adaptive filter length
-        self.aec_step_size = 0.005     # Adaptation step size
-        self.aec_leak_factor = 0.99    # Forgetting factor
+        # AEC-specific parameters: partitioned-block frequency-domain adaptive filter
+        self.aec_block_size = 256      # Samples per block and per filter partition
+        self.aec_partitions = 16       # Echo tail of 16 * 256 samples (256 ms at 16 kHz)
+        self.aec_step_size = 0.5       # Normalized adaptation step size
+
+        # Noise suppression parameters: STFT frames with 50% overlap
+        self.ns_frame_size = 512       # 32 ms at 16 kHz
 
         # Initialize filters and buffers (ensure float32)
         self._init_filters()
-        self.adaptive_filter = np.zeros(self.aec_filter_length, dtype=np.float32)
-        self.speaker_history = np.zeros(self.aec_filter_length, dtype=np.float32)
+        self.echo_canceller = PartitionedBlockFDAF(
+            block_size=self.aec_block_size, partitions=self.aec_partitions, step_size=self.aec_step_size
+        )
+        self.aec_filter_length = self.echo_canceller.filter_length
+        self.noise_suppressor = SpectralNoiseSuppressor(frame_size=self.ns_frame_size)
+        # Far-end (speaker) samples not consumed yet, aligned with the microphone samples to come
+        self.far_end = AudioRingBuffer(sample_rate * 2)
 
-        logging.info("✅ WebRTC-style AEC processor initialized")
+        logging.debug("✅ WebRTC-style AEC processor initialized")
 
     def _init_filters(self):
-        """Initialize WebRTC-style filters"""
+        """Initialize the filter states of this processor, the coefficients come from the shared design"""
         # High-pass filter (WebRTC uses ~80-150Hz cutoff)
-        nyquist = self.sample_rate / 2
-        cutoff = 120  # Hz
-        self.hp_sos = signal.butter(4, cutoff / nyquist, 'highpass', output='sos')
+        self.hp_sos = self.design.hp_sos
 
         # Low-pass filter for noise estimation
-        self.lp_b, self.lp_a = signal.butter(2, 1000 / nyquist, 'lowpass')
+        self.lp_b, self.lp_a = self.design.lp_b, self.design.lp_a
 
         # Filter states - correct shape for sosfilt
         # sosfilt expects zi with shape (n_sections, 2)
@@ -99,15 +159,15 @@ class WebRTCAECProcessor:
             return audio_data.astype(np.float32) if audio_data.dtype != np.float32 else audio_data
 
         try:
-            # Ensure input is float32
-            processed = audio_data.astype(np.float32) if audio_data.dtype != np.float32 else audio_data.copy()
+            # Ensure input is float32, every stage below returns a new array so the input is left untouched
+            processed = np.asarray(audio_data, dtype=np.float32)
 
             # Step 1: High-pass filter (removes low-frequency noise)
             if self.hp_filter_enabled:
                 processed, self.hp_zi = signal.sosfilt(self.hp_sos, processed, zi=self.hp_zi)
                 # scipy.signal operations may return float64, convert back to float32
-                processed = processed.astype(np.float32)
-                self.hp_zi = self.hp_zi.astype(np.float32)
+                processed = processed.astype(np.float32, copy=False)
+                self.hp_zi = self.hp_zi.astype(np.float32, copy=False)
 
             # Step 2: AEC processing (adaptive filtering)
             if self.aec_enabled:
@@ -122,7 +182,7 @@ class WebRTCAECProcessor:
                 processed = self._apply_agc(processed)
 
             # Final dtype check - ensure float32
-            return processed.astype(np.float32)
+            return processed.astype(np.float32, copy=False)
 
         except Exception as e:
             logging.error(f"❌ WebRTC AEC processing error: {e}")
@@ -130,74 +190,48 @@ class WebRTCAECProcessor:
             return audio_data.astype(np.float32) if audio_data.dtype != np.float32 else audio_data
 
     def _apply_adaptive_aec(self, audio: np.ndarray, speaker_data: Optional[np.ndarray]) -> np.ndarray:
-        """Apply adaptive echo cancellation using LMS algorithm"""
-        # Ensure float32
-        audio = audio.astype(np.float32) if audio.dtype != np.float32 else audio
-        
-        if speaker_data is None:
-            # Without speaker reference, apply basic echo suppression
-            # Estimate echo based on recent audio history
-            echo_estimate = np.convolve(audio, self.adaptive_filter[:len(audio)], mode='same').astype(np.float32)
-            # Subtract estimated echo
-            return (audio - 0.3 * echo_estimate).astype(np.float32)
+        """
+        Cancel the echo of the far-end reference with the frequency-domain adaptive filter.
+
+        Without any far-end reference pending, and once the last one is out of the echo tail, there is no
+        echo to cancel and the audio is returned as is.
+        """
+        if speaker_data is not None:
+            self.set_speaker_data(speaker_data)
+        return self.echo_canceller.process(audio, self._take_far_end(len(audio)))
+
+    def _take_far_end(self, num_samples: int) -> Optional[np.ndarray]:
+        """The far-end samples played with the next `num_samples` microphone samples, None if there are none."""
+        available = len(self.far_end)
+        if available == 0:
+            return None
+        start = self.far_end.start
+        if available >= num_samples:
+            far = self.far_end.view(start, start + num_samples)
         else:
-            # Ensure speaker_data is float32
-            speaker_data = speaker_data.astype(np.float32) if speaker_data.dtype != np.float32 else speaker_data
-            
-            # With speaker reference, update adaptive filter
-            if len(speaker_data) >= self.aec_filter_length:
-                # Update speaker history
-                self.speaker_history = speaker_data[-self.aec_filter_length:].astype(np.float32)
-
-                # Compute echo estimate
-                echo_estimate = np.convolve(self.speaker_history, self.adaptive_filter, mode='valid').astype(np.float32)
-
-                # Compute error (near-end signal)
-                error = (audio[:len(echo_estimate)] - echo_estimate).astype(np.float32)
-
-                # Update adaptive filter (LMS algorithm)
-                filter_update = (self.aec_step_size * np.convolve(error, self.speaker_history, mode='valid')).astype(np.float32)
-                self.adaptive_filter = (self.adaptive_filter.astype(np.float32) + filter_update).astype(np.float32)
-
-                # Apply forgetting factor
-                self.adaptive_filter = (self.adaptive_filter * self.aec_leak_factor).astype(np.float32)
-
-                # Return echo-cancelled signal
-                result = audio.copy().astype(np.float32)
-                result[:len(error)] = error
-                return result.astype(np.float32)
-            else:
-                # Basic suppression without full AEC
-                return (audio * 0.8).astype(np.float32)
+            # the reference stopped in the middle of the chunk, the rest is silence
+            far = np.zeros(num_samples, dtype=np.float32)
+            far[:available] = self.far_end.view()
+        self.far_end.discard_before(start + num_samples)
+        return far
 
     def _apply_noise_suppression(self, audio: np.ndarray) -> np.ndarray:
-        """Apply WebRTC-style noise suppression"""
-        # Ensure float32
-        audio = audio.astype(np.float32) if audio.dtype != np.float32 else audio
-        
-        # Estimate noise floor using voice activity detection
-        # WebRTC uses spectral subtraction with VAD
-
-        # Compute short-time energy
-        frame_length = 256
-        hop_length = 128
-
-        # Simple noise gate based on RMS
-        rms = np.sqrt(np.convolve(audio**2, np.ones(frame_length, dtype=np.float32)/frame_length, mode='same')).astype(np.float32)
-
-        # Estimate noise floor
-        noise_floor = np.float32(np.percentile(rms, 15))  # 15th percentile
-
-        # Apply noise gate (handle divide by zero)
-        if noise_floor > 0:
-            gate_ratio = np.clip(rms / (noise_floor * np.float32(1.5)), np.float32(0), np.float32(1)).astype(np.float32)
-        else:
-            # If noise floor is zero, use a small default value to avoid division by zero
-            gate_ratio = np.clip(rms / np.float32(0.001), np.float32(0), np.float32(1)).astype(np.float32)
-        gate_ratio = np.convolve(gate_ratio, np.ones(frame_length, dtype=np.float32)/frame_length, mode='same').astype(np.float32)
-        gate_ratio = np.clip(gate_ratio, np.float32(0.1), np.float32(1.0)).astype(np.float32)  # Minimum gate of 0.1
-
-        return (audio * gate_ratio).astype(np.float32)
+        """
+        Apply streaming spectral noise suppression.
+
+        The noise spectrum is estimated across packets, so a packet of pure speech is not gated against
+        itself. The output lags the input by `ns_frame_size` samples.
+        """
+        return self.noise_suppressor.process(audio)
+
+    def flush(self) -> np.ndarray:
+        """End of the stream: the audio the noise suppressor still holds back, through the stages after it"""
+        if not self.enabled or not self.ns_enabled:
+            return np.zeros(0, dtype=np.float32)
+        tail = self.noise_suppressor.flush()
+        if self.agc_enabled:
+            tail = self._apply_agc(tail)
+        return tail.astype(np.float32, copy=False)
 
     def _apply_agc(self, audio: np.ndarray) -> np.ndarray:
         """Apply WebRTC-style automatic gain control"""
@@ -217,29 +251,27 @@ class WebRTCAECProcessor:
             gain = np.float32(target_rms / current_rms)
 
             # Limit gain range (WebRTC AGC has limits)
-            gain = np.clip(gain, np.float32(0.1), np.float32(10.0)).astype(np.float32)
+            gain = np.clip(gain, np.float32(0.1), np.float32(10.0)).astype(np.float32, copy=False)
 
             # Apply compression for very loud signals
             if gain < np.float32(0.5):
                 # Compress instead of amplify
                 gain = np.float32(0.5 + 0.5 * (gain / 0.5))
 
-            return (audio * gain).astype(np.float32)
+            return (audio * gain).astype(np.float32, copy=False)
 
-        return audio.astype(np.float32)
+        return audio.astype(np.float32, copy=False)
 
     def set_speaker_data(self, speaker_data: np.ndarray):
-        """Update speaker reference for AEC"""
+        """Queue speaker reference for AEC, consumed along with the next microphone samples"""
         if speaker_data is not None and len(speaker_data) > 0:
-            # Update speaker history for adaptive filtering
-            speaker_data = speaker_data.astype(np.float32)
-            self.speaker_history = np.roll(self.speaker_history, -len(speaker_data))
-            self.speaker_history[-len(speaker_data):] = speaker_data[:len(self.speaker_history)]
+            self.far_end.append(np.asarray(speaker_data, dtype=np.float32))
 
     def reset(self):
         """Reset AEC processor state"""
-        self.adaptive_filter = np.zeros(self.aec_filter_length)
-        self.speaker_history = np.zeros(self.aec_filter_length)
+        self.echo_canceller.reset()
+        self.noise_suppressor.reset()
+        self.far_end.clear()
         self._init_filters()
         logging.info("🔄 WebRTC AEC processor reset")
 
@@ -255,15 +287,18 @@ class WebRTCAECProcessor:
             "ns_enabled": self.ns_enabled,
             "agc_enabled": self.agc_enabled,
             "hp_filter_enabled": self.hp_filter_enabled,
-            "adaptive_filter_length": self.aec_filter_length
+            "adaptive_filter_length": self.aec_filter_length,
+            "aec_active": self.echo_canceller.active,
+            "erle_db": self.echo_canceller.erle_db
         }
 
 
 class FallbackAECProcessor:
     """Fallback AEC using digital signal processing techniques"""
 
-    def __init__(self, sample_rate: int = 16000):
+    def __init__(self, sample_rate: int = 16000, design: Optional[AECDesign] = None):
         self.sample_rate = sample_rate
+        self.design = design if design is not None else AECDesign.create(sample_rate)
         self.enabled = True
         self.buffer_size = sample_rate * 2  # 2 second buffer
         self.audio_buffer = np.array([], dtype=np.float32)
@@ -277,17 +312,13 @@ class FallbackAECProcessor:
         # High-pass filter to remove low-frequency noise
         self.hp_filter = self._design_high_pass_filter()
 
-        logging.info("✅ Fallback AEC processor initialized (DSP-based)")
+        logging.debug("✅ Fallback AEC processor initialized (DSP-based)")
 
     def _design_high_pass_filter(self):
-        """Design a high-pass filter to remove low-frequency noise"""
-        nyquist = self.sample_rate / 2
-        cutoff = 100  # 100 Hz cutoff
-        normalized_cutoff = cutoff / nyquist
-
-        # Design Butterworth high-pass filter
-        from scipy.signal import butter
-        b, a = butter(4, normalized_cutoff, btype='high')
+        """High-pass filter to remove low-frequency noise (100 Hz Butterworth from the shared design)"""
+        b, a = self.design.fallback_hp_b, self.design.fallback_hp_a
+        if b is None:
+            raise ValueError("Fallback AEC high-pass filter is not available")
         return {'b': b, 'a': a, 'zi': np.zeros(max(len(a), len(b)) - 1)}
 
     def process_audio(self, audio_data: np.ndarray, speaker_data: Optional[np.ndarray] = None) -> np.ndarray:
@@ -350,6 +381,10 @@ class FallbackAECProcessor:
         # But we could implement correlation-based echo detection here
         pass
 
+    def flush(self) -> np.ndarray:
+        """Nothing is held back"""
+        return np.zeros(0, dtype=np.float32)
+
     def reset(self):
         """Reset processor state"""
         self.audio_buffer = np.array([], dtype=np.float32)
@@ -382,6 +417,9 @@ class DummyAECProcessor:
     def set_speaker_data(self, speaker_data: np.ndarray):
         pass
 
+    def flush(self) -> np.ndarray:
+        return np.zeros(0, dtype=np.float32)
+
     def reset(self):
         pass
 
@@ -5,46 +5,125 @@ Handles AEC, normalization, and audio format conversion
 
 import numpy as np
 import logging
-from typing import Optional, Tuple
-from .aec_processor import create_aec_processor
+import time
+from dataclasses import dataclass
+from scipy import signal
+from typing import Iterable, Optional, Tuple
+from whisper_live.ring_buffer import AudioRingBuffer
+from .aec_processor import AECDesign, create_aec_processor
+from .jitter_buffer import FarEndJitterBuffer
+
+
+@dataclass(frozen=True)
+class PreprocessingDesign:
+    """
+    Immutable description of the preprocessing pipeline, shared by all sessions of a server.
+
+    It holds the configuration and the filter coefficients; the mutable state (filter states, adaptive
+    filter, audio buffer) lives in the `AudioProcessor` each session creates from it, so sessions never
+    see each other's state and can be processed in parallel.
+    """
+    sample_rate: int = 16000
+    enable_aec: bool = True
+    aec: Optional[AECDesign] = None
+
+    @classmethod
+    def create(cls, sample_rate: int = 16000, enable_aec: bool = True) -> 'PreprocessingDesign':
+        """
+        Design the preprocessing pipeline.
+
+        Args:
+            sample_rate: Target sample rate for processing
+            enable_aec: Whether to enable acoustic echo cancellation
+
+        Returns:
+            PreprocessingDesign to create the per-session processors from
+        """
+        aec = AECDesign.create(sample_rate) if enable_aec else None
+        return cls(sample_rate=sample_rate, enable_aec=enable_aec, aec=aec)
+
+    def create_processor(self) -> 'AudioProcessor':
+        """Create the preprocessing pipeline of a new session."""
+        return AudioProcessor(design=self)
+
 
 class AudioProcessor:
     """
     Complete audio preprocessing pipeline including AEC, normalization, and format conversion.
+
+    An instance holds the state of one audio stream, create one per session from a shared
+    `PreprocessingDesign`.
     """
 
-    def __init__(self, sample_rate: int = 16000, enable_aec: bool = True):
+    # One-pole smoothing filter of the enhancement stage: y[n] = 0.98 * y[n-1] + 0.02 * x[n]
+    # (reduced from 0.95/0.05 to preserve speech)
+    ENHANCE_B = np.array([0.02], dtype=np.float32)
+    ENHANCE_A = np.array([1.0, -0.98], dtype=np.float32)
+    # Gentle dynamic range compression: above the threshold, the excess is divided by the ratio
+    COMPRESSION_THRESHOLD = np.float32(0.8)
+    COMPRESSION_RATIO = np.float32(2.0)
+
+    def __init__(self, sample_rate: int = 16000, enable_aec: bool = True,
+                 design: Optional[PreprocessingDesign] = None):
         """
         Initialize audio processor.
 
         Args:
             sample_rate: Target sample rate for processing
             enable_aec: Whether to enable acoustic echo cancellation
+            design: Shared pipeline design, overrides sample_rate and enable_aec when given
         """
-        self.sample_rate = sample_rate
-        self.enable_aec = enable_aec
+        if design is None:
+            design = PreprocessingDesign.create(sample_rate=sample_rate, enable_aec=enable_aec)
+        self.design = design
+        self.sample_rate = design.sample_rate
+        self.enable_aec = design.enable_aec
 
         # Initialize AEC processor using factory function
-        self.aec_processor = create_aec_processor(sample_rate=sample_rate) if enable_aec else None
+        self.aec_processor = create_aec_processor(
+            sample_rate=self.sample_rate, design=design.aec
+        ) if self.enable_aec else None
 
         # Audio processing state
-        self.audio_buffer = np.array([], dtype=np.float32)
-        self.buffer_size = sample_rate * 2  # 2 second buffer
+        self.buffer_size = self.sample_rate * 2  # 2 second buffer
+        self.audio_buffer = AudioRingBuffer(self.buffer_size)
+
+        # Far-end reference sent by the client, aligned with the microphone stream by sample position
+        self.far_end = FarEndJitterBuffer(self.sample_rate * 4)
+        self.mic_position = 0
+
+        # Enhancement state: the filter state carried across chunks and scratch space for the compressor
+        self.enhance_zi = np.zeros(1, dtype=np.float32)
+        self.enhance_scratch = np.empty(0, dtype=np.float32)
+        self.enhance_mask = np.empty(0, dtype=bool)
+
+        # Session statistics
+        self.chunks_processed = 0
+        self.samples_processed = 0
+        self.aec_errors = 0
+        self.processing_time = 0.0
 
-        logging.info(f"🎵 Audio processor initialized (AEC: {enable_aec})")
+        logging.debug(f"🎵 Audio processor initialized (AEC: {self.enable_aec})")
 
     def process_audio_chunk(self, audio_chunk: np.ndarray,
-                          speaker_chunk: Optional[np.ndarray] = None) -> np.ndarray:
+                          speaker_chunk: Optional[np.ndarray] = None,
+                          out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Process a chunk of audio data through the complete pipeline.
 
+        The chunk is converted once into the output array, then every stage works in place over it.
+
         Args:
             audio_chunk: Raw audio chunk from microphone
-            speaker_chunk: Corresponding speaker output (for AEC reference)
+            speaker_chunk: Corresponding speaker output (for AEC reference). Defaults to the far-end audio
+                added with `add_far_end` for the chunk's span of the microphone stream.
+            out: float32 array of the chunk's length to write the processed audio to, e.g. a slot of the
+                session's audio buffer. Defaults to a new array.
 
         Returns:
-            Processed audio chunk ready for transcription
+            Processed audio chunk ready for transcription (`out` when given), empty if processing failed
         """
+        start = time.perf_counter()
         try:
             # Check for empty arrays (prevent AEC errors)
             if audio_chunk is None or len(audio_chunk) == 0:
@@ -53,41 +132,49 @@ class AudioProcessor:
 
             # Ensure audio_chunk is a numpy array
             if not isinstance(audio_chunk, np.ndarray):
-                audio_chunk = np.array(audio_chunk, dtype=np.float32)
+                audio_chunk = np.asarray(audio_chunk, dtype=np.float32)
 
-            # Step 1: Format conversion and normalization
-            processed_chunk = self._normalize_audio(audio_chunk)
+            position = self.mic_position
+            self.mic_position += len(audio_chunk)
+            if speaker_chunk is None:
+                speaker_chunk = self.far_end.read(position, len(audio_chunk))
 
-            # Check again after normalization (in case normalization failed)
-            if len(processed_chunk) == 0:
-                logging.debug("⚠️ Processed chunk is empty, returning empty array")
-                return np.array([], dtype=np.float32)
+            # Step 1: Format conversion and normalization, the only write of the raw audio
+            processed_chunk = self._normalize_audio(audio_chunk, out=out)
 
             # Step 2: AEC processing (if enabled)
             if self.enable_aec and self.aec_processor and self.aec_processor.is_enabled():
                 # Provide speaker reference if available
                 if speaker_chunk is not None and len(speaker_chunk) > 0:
-                    speaker_normalized = self._normalize_audio(speaker_chunk)
-                    if len(speaker_normalized) > 0:
-                        self.aec_processor.set_speaker_data(speaker_normalized)
-
-                # Apply AEC (only if we have valid audio)
-                if len(processed_chunk) > 0:
-                    try:
-                        processed_chunk = self.aec_processor.process_audio(processed_chunk)
-                    except Exception as aec_error:
-                        logging.warning(f"⚠️ AEC processing error (non-critical): {aec_error}")
-                        # Continue without AEC if it fails
-                        pass
-
-            # Step 3: Additional audio enhancements
-            if len(processed_chunk) > 0:
-                processed_chunk = self._enhance_audio(processed_chunk)
+                    self.aec_processor.set_speaker_data(self._normalize_audio(speaker_chunk))
 
-            # Step 4: Buffer management for continuous processing
-            if len(processed_chunk) > 0:
-                processed_chunk = self._manage_buffer(processed_chunk)
+                try:
+                    echo_cancelled = self.aec_processor.process_audio(processed_chunk)
+                    if echo_cancelled is not processed_chunk:
+                        processed_chunk[:] = echo_cancelled
+                except Exception as aec_error:
+                    self.aec_errors += 1
+                    logging.warning(f"⚠️ AEC processing error (non-critical): {aec_error}")
+                    # Continue without AEC if it fails
 
+            # Step 3: Additional audio enhancements
+            self._enhance_audio(processed_chunk)
+
+            # Step 4: Keep the recent processed audio for analysis
+            self._manage_buffer(processed_chunk)
+
+            # Level metering is only worth its passes over the audio when it gets logged
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                magnitude, _ = self._scratch(len(processed_chunk))
+                np.abs(processed_chunk, out=magnitude)
+                logging.debug(
+                    f"🔊 Audio level: {magnitude.mean():.4f} (mean abs), max: {magnitude.max():.4f}, "
+                    f"{len(processed_chunk)} samples"
+                )
+
+            self.chunks_processed += 1
+            self.samples_processed += len(processed_chunk)
+            self.processing_time += time.perf_counter() - start
             return processed_chunk
 
         except Exception as e:
@@ -95,77 +182,96 @@ class AudioProcessor:
             # Return empty array instead of crashing
             return np.array([], dtype=np.float32)
 
-    def _normalize_audio(self, audio: np.ndarray) -> np.ndarray:
+    def flush(self) -> np.ndarray:
         """
-        Normalize audio to float32 format and ensure proper levels.
+        End of the stream: the processed audio the pipeline still holds back (the noise suppressor's last
+        frame), to be transcribed after the last chunk.
+
+        Returns:
+            The held-back audio, empty if there is none
         """
-        # Convert to float32 if needed
-        if audio.dtype != np.float32:
-            if audio.dtype == np.int16:
-                audio = (audio.astype(np.float32) / 32767.0).astype(np.float32)
-            elif audio.dtype == np.int32:
-                audio = (audio.astype(np.float32) / 2147483647.0).astype(np.float32)
-            elif audio.dtype == np.float64:
-                # Explicitly convert float64 (double) to float32
-                audio = audio.astype(np.float32)
-            else:
-                audio = audio.astype(np.float32)
+        if not (self.enable_aec and self.aec_processor and self.aec_processor.is_enabled()):
+            return np.array([], dtype=np.float32)
+        try:
+            tail = np.array(self.aec_processor.flush(), dtype=np.float32)
+        except Exception as e:
+            self.aec_errors += 1
+            logging.warning(f"⚠️ AEC flush error (non-critical): {e}")
+            return np.array([], dtype=np.float32)
+        if len(tail) > 0:
+            self._enhance_audio(tail)
+            self._manage_buffer(tail)
+        return tail
 
-        # Ensure values are in valid range [-1, 1] and maintain float32
-        audio = np.clip(audio, -1.0, 1.0).astype(np.float32)
+    def add_far_end(self, position: int, speaker_chunk: np.ndarray):
+        """
+        Add far-end reference audio (what the client played: TTS, avatar speech) for the echo canceller.
 
-        return audio
+        Args:
+            position: Position, in the microphone sample stream, of the microphone sample captured when the
+                first sample of the chunk was played
+            speaker_chunk: Mono far-end audio at the processing sample rate
+        """
+        if len(speaker_chunk) > 0:
+            self.far_end.write(position, self._normalize_audio(speaker_chunk))
 
-    def _enhance_audio(self, audio: np.ndarray) -> np.ndarray:
+    def _normalize_audio(self, audio: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        Apply additional audio enhancements.
-        """
-        # Ensure float32 dtype before processing
-        if audio.dtype != np.float32:
-            audio = audio.astype(np.float32)
-        
-        # Apply very gentle high-pass filter to remove low-frequency noise
-        # Reduced filter strength to preserve speech (was 0.95/0.05, now 0.98/0.02)
-        # This preserves more of the original audio signal for better transcription
-        if len(audio) > 1:
-            filtered = np.zeros_like(audio, dtype=np.float32)
-            filtered[0] = (audio[0] * 0.02).astype(np.float32)
-            for i in range(1, len(audio)):
-                filtered[i] = (0.98 * filtered[i-1] + 0.02 * audio[i]).astype(np.float32)
-            audio = filtered.astype(np.float32)
-
-        # Apply gentle dynamic range compression (reduced threshold to preserve more audio)
-        # Lower threshold = less compression = more audio preserved
-        threshold = np.float32(0.8)  # Increased from 0.6 to 0.8 (less aggressive)
-        ratio = np.float32(2.0)  # Reduced from 4.0 to 2.0 (gentler compression)
-
-        over_threshold = np.abs(audio) > threshold
-        if np.any(over_threshold):
-            sign = np.sign(audio[over_threshold]).astype(np.float32)
-            magnitude = np.abs(audio[over_threshold]).astype(np.float32)
-            compressed = (threshold + (magnitude - threshold) / ratio).astype(np.float32)
-            audio = np.where(over_threshold, sign * compressed, audio).astype(np.float32)
-
-        # Final dtype check - ensure float32
-        return audio.astype(np.float32)
+        Convert audio to float32 in [-1, 1], writing it into `out` (a new array if not given).
+        """
+        if out is None:
+            out = np.empty(audio.shape, dtype=np.float32)
+        if audio.dtype == np.int16:
+            np.multiply(audio, np.float32(1 / 32767.0), out=out)
+        elif audio.dtype == np.int32:
+            np.multiply(audio, 1 / 2147483647.0, out=out)
+        else:
+            np.copyto(out, audio, casting="unsafe")
 
-    def _manage_buffer(self, audio_chunk: np.ndarray) -> np.ndarray:
+        # Ensure values are in valid range [-1, 1]
+        return np.clip(out, -1.0, 1.0, out=out)
+
+    def _scratch(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Scratch float32 and bool arrays of `n` samples, reused across chunks."""
+        if len(self.enhance_scratch) < n:
+            self.enhance_scratch = np.empty(n, dtype=np.float32)
+            self.enhance_mask = np.empty(n, dtype=bool)
+        return self.enhance_scratch[:n], self.enhance_mask[:n]
+
+    def _enhance_audio(self, audio: np.ndarray) -> np.ndarray:
         """
-        Manage audio buffer for continuous processing.
+        Apply additional audio enhancements in place on a float32 chunk.
+
+        The smoothing filter runs vectorized and carries its state from one chunk to the next, so the
+        output has no discontinuity at chunk boundaries. The compressor uses scratch buffers kept across calls.
         """
-        # Add new chunk to buffer
-        self.audio_buffer = np.concatenate([self.audio_buffer, audio_chunk])
+        # float32 coefficients and state keep the filter in float32
+        audio[:], self.enhance_zi = signal.lfilter(self.ENHANCE_B, self.ENHANCE_A, audio, zi=self.enhance_zi)
+
+        magnitude, over_threshold = self._scratch(len(audio))
+        np.abs(audio, out=magnitude)
+        np.greater(magnitude, self.COMPRESSION_THRESHOLD, out=over_threshold)
+        if over_threshold.any():
+            # sign(x) * (threshold + (|x| - threshold) / ratio), only for the few samples above the threshold
+            compressed = magnitude[over_threshold]
+            compressed -= self.COMPRESSION_THRESHOLD
+            compressed /= self.COMPRESSION_RATIO
+            compressed += self.COMPRESSION_THRESHOLD
+            audio[over_threshold] = np.copysign(compressed, audio[over_threshold])
 
-        # Keep buffer size manageable
-        if len(self.audio_buffer) > self.buffer_size:
-            # Keep the most recent audio
-            self.audio_buffer = self.audio_buffer[-self.buffer_size:]
+        return audio
 
+    def _manage_buffer(self, audio_chunk: np.ndarray) -> np.ndarray:
+        """
+        Keep the most recent processed audio, in a ring buffer so nothing is reallocated per chunk.
+        """
+        self.audio_buffer.append(audio_chunk)
         return audio_chunk  # Return the processed chunk, not the entire buffer
 
     def reset(self):
         """Reset audio processor state."""
-        self.audio_buffer = np.array([], dtype=np.float32)
+        self.audio_buffer.clear()
+        self.enhance_zi = np.zeros(1, dtype=np.float32)
         if self.aec_processor:
             self.aec_processor.reset()
         logging.info("🔄 Audio processor reset")
@@ -176,7 +282,12 @@ class AudioProcessor:
             "sample_rate": self.sample_rate,
             "aec_enabled": self.enable_aec,
             "buffer_size": len(self.audio_buffer),
-            "buffer_duration_seconds": len(self.audio_buffer) / self.sample_rate if self.sample_rate > 0 else 0
+            "buffer_duration_seconds": len(self.audio_buffer) / self.sample_rate if self.sample_rate > 0 else 0,
+            "chunks_processed": self.chunks_processed,
+            "audio_seconds": self.samples_processed / self.sample_rate if self.sample_rate > 0 else 0,
+            "aec_errors": self.aec_errors,
+            "processing_seconds": self.processing_time,
+            "far_end": self.far_end.get_stats(),
         }
 
         if self.aec_processor:
@@ -203,7 +314,27 @@ class AudioProcessor:
             Recent audio buffer
         """
         samples_needed = int(duration_seconds * self.sample_rate)
-        if len(self.audio_buffer) >= samples_needed:
-            return self.audio_buffer[-samples_needed:]
-        else:
-            return self.audio_buffer.copy()
+        return self.audio_buffer.view(self.audio_buffer.end - samples_needed).copy()
+
+
+def aggregate_stats(processors: Iterable[AudioProcessor]) -> dict:
+    """
+    Combine the statistics of the per-session processors into server-wide ones.
+
+    Args:
+        processors: The processors of the sessions
+
+    Returns:
+        Number of sessions, chunks and seconds of audio processed, AEC errors, total processing time and
+        the processing time per second of audio.
+    """
+    stats = {"sessions": 0, "chunks_processed": 0, "audio_seconds": 0.0, "aec_errors": 0, "processing_seconds": 0.0}
+    for processor in processors:
+        session = processor.get_stats()
+        stats["sessions"] += 1
+        for key in ("chunks_processed", "audio_seconds", "aec_errors", "processing_seconds"):
+            stats[key] += session[key]
+    stats["real_time_factor"] = (
+        stats["processing_seconds"] / stats["audio_seconds"] if stats["audio_seconds"] > 0 else 0.0
+    )
+    return stats
@@ -0,0 +1,183 @@
+"""
+Partitioned-block frequency-domain adaptive filter (PBFDAF) for acoustic echo cancellation
+"""
+
+import numpy as np
+from scipy import fft
+from typing import Optional
+
+
+class PartitionedBlockFDAF:
+    """
+    Echo canceller estimating the echo path from the far-end (speaker) signal to the microphone.
+
+    The echo path is modelled by a filter of `block_size * partitions` taps, split in `partitions` blocks
+    that are applied and adapted in the frequency domain with overlap-save (constrained, normalized
+    PBFDAF). Per block of `block_size` samples this costs a few FFTs of `2 * block_size` points instead of
+    a time-domain convolution with the whole filter, so long echo tails stay cheap.
+
+    The far-end spectra, the filter and the power estimates are kept across calls, so packets of any
+    length can be fed. A block that is not complete yet is filtered with what is known of it (the echo of a
+    sample only depends on past far-end samples), and only adapted on once complete, so the output is
+    sample-aligned with the input and adds no latency.
+
+    When the far-end has been silent for longer than the filter (or was never supplied), there is no echo
+    left to cancel: `process` returns the microphone signal untouched without any FFT.
+    """
+
+    def __init__(self, block_size: int = 256, partitions: int = 16, step_size: float = 0.5,
+                 smoothing: float = 0.9, regularization: float = 1e-2):
+        """
+        Args:
+            block_size: Samples per block, also the length of each filter partition
+            partitions: Number of partitions, the filter covers `block_size * partitions` samples of echo tail
+            step_size: Normalized adaptation step, between 0 and 2 (smaller is slower but more robust)
+            smoothing: Forgetting factor of the per-bin far-end power estimate
+            regularization: Added to the power estimate so quiet bins do not blow up the step
+        """
+        self.block_size = int(block_size)
+        self.partitions = int(partitions)
+        self.step_size = np.float32(step_size)
+        self.smoothing = np.float32(smoothing)
+        self.regularization = np.float32(regularization)
+        self.reset()
+
+    @property
+    def filter_length(self) -> int:
+        return self.block_size * self.partitions
+
+    def reset(self):
+        """Forget the echo path and the far-end history."""
+        bins = self.block_size + 1
+        self.weights = np.zeros((self.partitions, bins), dtype=np.complex64)
+        self.power = np.zeros(bins, dtype=np.float32)
+        self._clear_history()
+        # ERLE estimate: smoothed microphone and residual energies while the far-end is active
+        self.mic_energy = 0.0
+        self.error_energy = 0.0
+        self.blocks_processed = 0
+        self.blocks_skipped = 0
+
+    def _clear_history(self):
+        n, bins = self.block_size, self.block_size + 1
+        self.spectra = np.zeros((self.partitions, bins), dtype=np.complex64)
+        """Far-end spectra, row 0 for the current block, row p for the block p blocks ago."""
+        self.window = np.zeros(2 * n, dtype=np.float32)
+        """Previous far-end block followed by the current one, the overlap-save input."""
+        self.mic_block = np.zeros(n, dtype=np.float32)
+        self.filled = 0
+        self.history_echo = None
+        self.silent_blocks = self.partitions
+
+    @property
+    def active(self) -> bool:
+        """Whether far-end audio is still within the echo tail, i.e. there may be echo to cancel."""
+        return self.silent_blocks < self.partitions or self.filled > 0
+
+    @property
+    def erle_db(self) -> float:
+        """Echo return loss enhancement (microphone energy over residual energy) in dB, while the far-end is active."""
+        if self.error_energy <= 0.0 or self.mic_energy <= 0.0:
+            return 0.0
+        return float(10.0 * np.log10(self.mic_energy / self.error_energy))
+
+    def process(self, mic: np.ndarray, far: Optional[np.ndarray] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Remove the echo of the far-end signal from a microphone chunk.
+
+        Args:
+            mic: float32 microphone samples
+            far: float32 far-end samples played at the same time, same length as `mic`. None for silence.
+            out: Where to write the echo-cancelled samples, may be `mic` itself. Defaults to a new array.
+
+        Returns:
+            The echo-cancelled chunk, `mic` itself when there is nothing to cancel and `out` is not given
+        """
+        if far is None and not self.active:
+            self.blocks_skipped += len(mic) // self.block_size
+            if out is None or out is mic:
+                return mic
+            out[:] = mic
+            return out
+
+        if out is None:
+            out = np.empty(len(mic), dtype=np.float32)
+        n = self.block_size
+        i = 0
+        while i < len(mic):
+            start = self.filled
+            take = min(n - start, len(mic) - i)
+            end = start + take
+            self.mic_block[start:end] = mic[i:i + take]
+            current = self.window[n:]
+            if far is None:
+                current[start:end] = 0.0
+            else:
+                current[start:end] = far[i:i + take]
+            # samples of the block that have not arrived yet are zero, they do not affect the echo of earlier ones
+            current[end:] = 0.0
+
+            error = self._filter_block()
+            out[i:i + take] = error[start:end]
+            i += take
+
+            if end == n:
+                self._adapt(error)
+                self._next_block()
+            else:
+                self.filled = end
+        return out
+
+    def _filter_block(self) -> np.ndarray:
+        """Echo estimate of the current block, returns the residual of the whole block."""
+        n = self.block_size
+        self.spectra[0] = fft.rfft(self.window)
+        if self.history_echo is None:
+            # contribution of the past blocks, fixed while the current block fills up
+            self.history_echo = np.einsum("pk,pk->k", self.spectra[1:], self.weights[1:])
+        echo = fft.irfft(self.spectra[0] * self.weights[0] + self.history_echo, n=2 * n)[n:]
+        return self.mic_block - echo
+
+    def _adapt(self, error: np.ndarray):
+        n = self.block_size
+        far = self.window[n:]
+        far_energy = float(np.dot(far, far))
+        if far_energy > 0.0:
+            self.silent_blocks = 0
+        else:
+            self.silent_blocks += 1
+
+        if self.silent_blocks < self.partitions:
+            # ERLE over the blocks where an echo can be present
+            self.mic_energy = 0.99 * self.mic_energy + float(np.dot(self.mic_block, self.mic_block))
+            self.error_energy = 0.99 * self.error_energy + float(np.dot(error, error))
+
+        if far_energy > 0.0:
+            block_power = self.spectra[0].real ** 2 + self.spectra[0].imag ** 2
+            if not self.power.any():
+                self.power[:] = block_power
+            else:
+                self.power *= self.smoothing
+                self.power += (1 - self.smoothing) * block_power
+            padded = np.zeros(2 * n, dtype=np.float32)
+            padded[n:] = error
+            # the step is shared by all partitions, each bin is normalized by the far-end power in it
+            gradient = fft.rfft(padded) * (
+                self.step_size / (self.partitions * self.power + self.regularization)
+            )
+            self.weights += np.conj(self.spectra) * gradient
+            # gradient constraint: keep every partition a causal filter of `block_size` taps
+            taps = fft.irfft(self.weights, n=2 * n, axis=1)
+            taps[:, n:] = 0.0
+            self.weights = fft.rfft(taps, axis=1).astype(np.complex64, copy=False)
+        self.blocks_processed += 1
+
+    def _next_block(self):
+        n = self.block_size
+        self.spectra[1:] = self.spectra[:-1]
+        self.window[:n] = self.window[n:]
+        self.filled = 0
+        self.history_echo = None
+        if not self.active:
+            # nothing of the far-end left in the filter's reach, the next far-end starts from silence
+            self._clear_history()
@@ -0,0 +1,138 @@
+"""
+Ingest-time silence gate keeping non-speech out of the session buffer
+"""
+
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+
+from whisper_live.ring_buffer import AudioRingBuffer
+
+
+class IngestGate:
+    """
+    Streaming voice activity gate applied to the audio of a session before it is buffered.
+
+    Every complete 512-sample window of the stream is classified by a streaming Silero VAD, all windows
+    of a packet in one model call. The gate opens on the first speech window and lets audio through
+    until `hangover_ms` of consecutive non-speech has passed; while it is closed audio is dropped. When
+    it opens, the last `preroll_ms` of dropped audio is let through first so word onsets quieter than
+    the VAD threshold are kept. Long silences shrink to hangover plus pre-roll.
+
+    The gate returns the kept audio as runs tagged with their position in the original stream, for the
+    session to map its buffer back to stream time. While the gate is open and not about to close, the
+    trailing partial window of a packet is let through at once, so speech gets no added latency.
+    """
+
+    WINDOW_SIZE = 512
+
+    def __init__(self, sample_rate: int = 16000, threshold: float = 0.5, hangover_ms: float = 500,
+                 preroll_ms: float = 300, model: Optional[Callable[[np.ndarray], np.ndarray]] = None):
+        """
+        Args:
+            sample_rate: Sample rate of the audio, the Silero model runs at 16000
+            threshold: Speech probability at which a window counts as speech
+            hangover_ms: Non-speech still let through after the last speech window
+            preroll_ms: Dropped audio let through ahead of the window that opens the gate
+            model: Speech probability of each window of a whole number of 512-sample windows,
+                carrying its state across calls. Defaults to `StreamingSileroVAD`
+        """
+        if model is None:
+            from whisper_live.transcriber.speech_map import StreamingSileroVAD
+            model = StreamingSileroVAD()
+        self.model = model
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.hangover = int(hangover_ms * sample_rate / 1000)
+        self.preroll = int(preroll_ms * sample_rate / 1000)
+        self.reset()
+
+    def reset(self):
+        """Forget the stream."""
+        if hasattr(self.model, "reset_states"):
+            self.model.reset_states()
+        self.history = AudioRingBuffer(max(self.preroll, 1))
+        """The latest classified samples, addressed by stream position, for the pre-roll."""
+        self.pending = np.zeros(0, dtype=np.float32)
+        """Samples after the last complete window, classified with the next packet."""
+        self.position = 0
+        """Stream position of the first pending sample."""
+        self.emitted = 0
+        """Stream position one past the last sample let through."""
+        self.open = False
+        self.silence = 0
+        self.samples_in = 0
+        self.samples_out = 0
+
+    def process(self, audio: np.ndarray) -> List[Tuple[int, np.ndarray]]:
+        """
+        Gate one packet.
+
+        Args:
+            audio: float32 samples following the previous packet
+
+        Returns:
+            The audio let through, as (stream position, samples) runs in stream order. The samples are
+            copies, the caller may reuse `audio`.
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        self.samples_in += len(audio)
+        buf = np.concatenate((self.pending, audio)) if len(self.pending) else audio
+        start, end = self.position, self.position + len(buf)
+        w = self.WINDOW_SIZE
+        num_windows = len(buf) // w
+
+        spans = []
+        if num_windows:
+            probs = self.model(buf[:num_windows * w])
+            for k, prob in enumerate(probs):
+                window_start = start + k * w
+                if prob >= self.threshold:
+                    self.silence = 0
+                    if not self.open:
+                        self.open = True
+                        spans.append((max(window_start - self.preroll, self.history.start, self.emitted), window_start))
+                else:
+                    self.silence += w
+                    if self.open and self.silence > self.hangover:
+                        self.open = False
+                if self.open:
+                    spans.append((window_start, window_start + w))
+        if self.open and self.silence + w <= self.hangover:
+            # the next window is kept whatever it turns out to be, its first samples can go through now
+            spans.append((start + num_windows * w, end))
+
+        runs = []
+        for span_start, span_end in spans:
+            span_start = max(span_start, self.emitted)
+            if span_end <= span_start:
+                continue
+            if runs and runs[-1][1] == span_start:
+                runs[-1][1] = span_end
+            else:
+                runs.append([span_start, span_end])
+            self.emitted = span_end
+
+        out = [(a, self._samples(buf, start, a, b)) for a, b in runs]
+        self.samples_out += sum(len(samples) for _, samples in out)
+
+        classified = num_windows * w
+        self.history.append(buf[:classified])
+        self.pending = buf[classified:].copy()
+        self.position = start + classified
+        return out
+
+    def _samples(self, buf, start, a, b):
+        """Copy of the stream samples in [a, b), from the history or the current packet."""
+        parts = []
+        if a < start:
+            parts.append(self.history.view(a, min(b, start)))
+        if b > start:
+            parts.append(buf[max(a, start) - start:b - start])
+        return np.concatenate(parts) if len(parts) > 1 else parts[0].copy()
+
+    def get_stats(self):
+        return {
+            "audio_seconds": self.samples_in / self.sample_rate,
+            "kept_seconds": self.samples_out / self.sample_rate,
+            "dropped_seconds": (self.samples_in - self.samples_out) / self.sample_rate,
+        }
@@ -0,0 +1,104 @@
+"""
+Jitter buffer aligning far-end reference audio with the microphone stream
+"""
+
+import numpy as np
+from typing import Optional
+
+
+class FarEndJitterBuffer:
+    """
+    Holds far-end (speaker) audio until the microphone samples captured while it played come in.
+
+    Far-end frames are placed by their timestamp, an absolute position in the microphone sample stream,
+    so they can arrive early, late relative to each other, or with gaps. Reading the span of a microphone
+    chunk returns the far-end audio played during it, with silence where nothing was received. Audio for
+    microphone samples already processed is too late to be of use and is dropped, as is audio more than
+    `capacity` samples ahead of the microphone.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: How far ahead of the microphone, in samples, far-end audio is kept
+        """
+        self.capacity = int(capacity)
+        self.data = np.zeros(self.capacity, dtype=np.float32)
+        self.read_position = 0
+        """Absolute position of the next microphone sample, nothing before it is kept."""
+        self.end = 0
+        """One past the newest far-end sample received."""
+        self.samples_received = 0
+        self.late_samples = 0
+        self.overflow_samples = 0
+
+    def write(self, position: int, samples: np.ndarray):
+        """
+        Add far-end audio.
+
+        Args:
+            position: Position, in the microphone stream, of the first sample
+            samples: float32 far-end audio
+        """
+        position = int(position)
+        self.samples_received += len(samples)
+        if position < self.read_position:
+            late = min(self.read_position - position, len(samples))
+            self.late_samples += late
+            samples = samples[late:]
+            position = self.read_position
+        limit = self.read_position + self.capacity
+        if position + len(samples) > limit:
+            keep = max(0, limit - position)
+            self.overflow_samples += len(samples) - keep
+            samples = samples[:keep]
+        if len(samples) == 0:
+            return
+
+        pos = position % self.capacity
+        first = min(len(samples), self.capacity - pos)
+        self.data[pos:pos + first] = samples[:first]
+        self.data[:len(samples) - first] = samples[first:]
+        self.end = max(self.end, position + len(samples))
+
+    def read(self, position: int, num_samples: int) -> Optional[np.ndarray]:
+        """
+        Take the far-end audio played during a microphone chunk, and drop everything before its end.
+
+        Args:
+            position: Position of the chunk's first sample in the microphone stream
+            num_samples: Length of the chunk
+
+        Returns:
+            float32 far-end audio of `num_samples` samples, None if none was received for the chunk
+        """
+        start = max(int(position), self.read_position)
+        stop = int(position) + num_samples
+        available = min(self.end, stop) - start
+        result = None
+        if available > 0:
+            result = np.zeros(num_samples, dtype=np.float32)
+            offset = start - int(position)
+            pos = start % self.capacity
+            first = min(available, self.capacity - pos)
+            result[offset:offset + first] = self.data[pos:pos + first]
+            result[offset + first:offset + available] = self.data[:available - first]
+        self._discard(stop)
+        return result
+
+    def _discard(self, position: int):
+        """Forget the far-end audio before `position`, its slots are zeroed for the audio to come."""
+        count = min(position - self.read_position, self.capacity)
+        if count > 0:
+            pos = self.read_position % self.capacity
+            first = min(count, self.capacity - pos)
+            self.data[pos:pos + first] = 0.0
+            self.data[:count - first] = 0.0
+        self.read_position = max(self.read_position, position)
+
+    def get_stats(self) -> dict:
+        return {
+            "samples_received": self.samples_received,
+            "late_samples": self.late_samples,
+            "overflow_samples": self.overflow_samples,
+        }
@@ -0,0 +1,180 @@
+"""
+Streaming STFT noise suppressor with a minimum-statistics noise estimate
+"""
+
+import numpy as np
+from scipy import fft
+from typing import Optional
+
+
+class SpectralNoiseSuppressor:
+    """
+    Overlap-add spectral noise suppression for a continuous audio stream.
+
+    The stream is analysed in frames of `frame_size` samples every `frame_size / 2` samples with a
+    square-root Hann window (which reconstructs the input exactly when the gain is 1). Per frequency bin,
+    the noise power is tracked with minimum statistics: the minimum of the smoothed power over the last
+    ~1.5 seconds, kept in sub-windows so it follows rising noise. Speech rarely occupies a bin that long,
+    so the minimum follows the noise floor even while someone talks, and it persists across packets.
+    The gain is a Wiener gain on a decision-directed a-priori SNR, floored so speech is never removed
+    completely.
+
+    Frames, spectra and statistics live in buffers allocated once. The output is the input delayed by
+    `frame_size` samples (32 ms at 16 kHz with the defaults), whatever the packet sizes; `flush` returns
+    the delayed samples at the end of the stream.
+    """
+
+    def __init__(self, frame_size: int = 512, smoothing: float = 0.85, subwindows: int = 8,
+                 subwindow_frames: int = 12, bias: float = 1.5, dd_smoothing: float = 0.98,
+                 gain_floor: float = 0.1):
+        """
+        Args:
+            frame_size: Analysis frame in samples, the hop is half of it
+            smoothing: Recursive smoothing of the power spectrum used for the minimum search
+            subwindows: Number of sub-windows of the minimum search
+            subwindow_frames: Frames per sub-window, the search spans `subwindows * subwindow_frames` frames
+            bias: Compensates the minimum being below the mean noise power
+            dd_smoothing: Weight of the previous frame in the decision-directed SNR estimate
+            gain_floor: Lowest gain applied to a bin
+        """
+        self.frame_size = int(frame_size)
+        self.hop = self.frame_size // 2
+        self.smoothing = np.float32(smoothing)
+        self.subwindows = int(subwindows)
+        self.subwindow_frames = int(subwindow_frames)
+        self.bias = np.float32(bias)
+        self.dd_smoothing = np.float32(dd_smoothing)
+        self.gain_floor = np.float32(gain_floor)
+        # periodic sqrt-Hann: analysis * synthesis window overlap-adds to 1 at 50% overlap
+        self.window = np.sqrt(0.5 - 0.5 * np.cos(2 * np.pi * np.arange(self.frame_size) / self.frame_size)).astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        """Forget the stream and the noise estimate."""
+        n, bins = self.frame_size, self.frame_size // 2 + 1
+        self.frame = np.zeros(n, dtype=np.float32)
+        """The last `frame_size` input samples, the newest hop at the end."""
+        self.windowed = np.zeros(n, dtype=np.float32)
+        self.filled = 0
+        self.ready = np.zeros(self.hop, dtype=np.float32)
+        """Finished output samples, emitted while the next hop of input comes in."""
+        self.overlap = np.zeros(self.hop, dtype=np.float32)
+        self.flushing = False
+        self.stream_samples = 0
+        """Samples received since the stream started, nothing is held back before the first one."""
+
+        self.power = np.zeros(bins, dtype=np.float32)
+        self.smoothed = np.zeros(bins, dtype=np.float32)
+        self.current_min = np.full(bins, np.inf, dtype=np.float32)
+        self.subwindow_mins = np.full((self.subwindows, bins), np.inf, dtype=np.float32)
+        self.window_min = np.full(bins, np.inf, dtype=np.float32)
+        """Minimum over the completed sub-windows, only changes when a sub-window completes."""
+        # floored like every later estimate, the gain of a frame flushed before any estimate stays finite
+        self.noise = np.full(bins, 1e-10, dtype=np.float32)
+        self.gain = np.ones(bins, dtype=np.float32)
+        self.prior = np.zeros(bins, dtype=np.float32)
+        self.posterior = np.zeros(bins, dtype=np.float32)
+        self.clean_power = np.zeros(bins, dtype=np.float32)
+        self.frames = 0
+
+    def process(self, audio: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Denoise a chunk of the stream.
+
+        Args:
+            audio: float32 samples
+            out: Where to write the output, may be `audio` itself. Defaults to a new array.
+
+        Returns:
+            The denoised stream, delayed by `frame_size` samples, same length as `audio`
+        """
+        if out is None:
+            out = np.empty(len(audio), dtype=np.float32)
+        self.stream_samples += len(audio)
+        hop = self.hop
+        i = 0
+        while i < len(audio):
+            take = min(hop - self.filled, len(audio) - i)
+            start = hop + self.filled
+            # read the input before writing the output, `out` may be `audio`
+            self.frame[start:start + take] = audio[i:i + take]
+            out[i:i + take] = self.ready[self.filled:self.filled + take]
+            self.filled += take
+            i += take
+            if self.filled == hop:
+                self._process_frame()
+                self.frame[:hop] = self.frame[hop:]
+                self.filled = 0
+        return out
+
+    def flush(self) -> np.ndarray:
+        """
+        End the stream, returning the samples still held back.
+
+        The last frames are completed with silence, which does not enter the noise estimate. The estimate
+        is kept, and the next samples start a new stream with the same delay.
+
+        Returns:
+            The denoised last `frame_size` samples of the stream, empty if the stream has no samples
+        """
+        if self.stream_samples == 0:
+            return np.zeros(0, dtype=np.float32)
+        self.flushing = True
+        try:
+            tail = self.process(np.zeros(self.frame_size, dtype=np.float32))
+        finally:
+            self.flushing = False
+        self.frame.fill(0.0)
+        self.filled = 0
+        self.ready.fill(0.0)
+        self.overlap.fill(0.0)
+        self.stream_samples = 0
+        return tail
+
+    def _process_frame(self):
+        np.multiply(self.frame, self.window, out=self.windowed)
+        spectrum = fft.rfft(self.windowed)
+        np.multiply(spectrum.real, spectrum.real, out=self.power)
+        self.power += spectrum.imag * spectrum.imag
+
+        if not self.flushing:
+            self._update_noise()
+        self._update_gain()
+
+        spectrum *= self.gain
+        frame = fft.irfft(spectrum, n=self.frame_size)
+        frame *= self.window
+        np.add(self.overlap, frame[:self.hop], out=self.ready)
+        self.overlap[:] = frame[self.hop:]
+
+    def _update_noise(self):
+        """Minimum statistics: the noise power is the minimum of the smoothed power over the search window."""
+        if self.frames == 0:
+            self.smoothed[:] = self.power
+        else:
+            self.smoothed *= self.smoothing
+            self.smoothed += (1 - self.smoothing) * self.power
+        np.minimum(self.current_min, self.smoothed, out=self.current_min)
+
+        self.frames += 1
+        if self.frames % self.subwindow_frames == 0:
+            # the oldest sub-window leaves the search window
+            slot = (self.frames // self.subwindow_frames) % self.subwindows
+            self.subwindow_mins[slot] = self.current_min
+            self.current_min.fill(np.inf)
+            np.minimum.reduce(self.subwindow_mins, axis=0, out=self.window_min)
+        np.minimum(self.window_min, self.current_min, out=self.noise)
+        self.noise *= self.bias
+        self.noise += np.float32(1e-10)
+
+    def _update_gain(self):
+        """Wiener gain on the decision-directed a-priori SNR."""
+        np.divide(self.power, self.noise, out=self.posterior)
+        # a-priori SNR: the previous frame's clean estimate, blended with the current excess over the noise
+        np.divide(self.clean_power, self.noise, out=self.prior)
+        self.prior *= self.dd_smoothing
+        self.prior += (1 - self.dd_smoothing) * np.maximum(self.posterior - 1, 0)
+        np.divide(self.prior, self.prior + 1, out=self.gain)
+        np.maximum(self.gain, self.gain_floor, out=self.gain)
+        np.multiply(self.gain, self.gain, out=self.clean_power)
+        self.clean_power *= self.power
@@ -0,0 +1,194 @@
+"""
+Binary frames of the WhisperLive websocket protocol, besides the raw float32 microphone audio.
+"""
+import json
+import logging
+import struct
+
+import numpy as np
+
+MSGPACK_AVAILABLE = False
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+
+FAR_END_MAGIC = b"FARE"
+"""
+Tag of a far-end reference frame. As a float32 it would be a sample of magnitude ~850, far outside
+the [-1, 1] range of audio, so untagged microphone frames can never be mistaken for one. That only
+holds for float32 audio: far-end frames are accepted from float32 uplinks at the server's sample rate
+only, and int16 or Opus audio starting with the tag is audio.
+"""
+FAR_END_HEADER = struct.Struct("<4sQ")
+"""Magic, then the position (uint64, in microphone samples) at which the frame started playing."""
+
+
+def encode_far_end(position, samples):
+    """
+    Build a far-end reference frame: audio played to the user (TTS, avatar) that the microphone may pick
+    up as echo, for the server-side echo canceller.
+
+    Args:
+        position (int): Index, in the microphone sample stream sent so far, of the microphone sample
+            captured when the first sample of `samples` was played.
+        samples (np.ndarray): Mono float32 audio at the microphone's sample rate.
+
+    Returns:
+        bytes: The frame.
+    """
+    return FAR_END_HEADER.pack(FAR_END_MAGIC, int(position)) + np.asarray(samples, dtype=np.float32).tobytes()
+
+
+def decode_far_end(frame):
+    """
+    Parse a far-end reference frame.
+
+    Args:
+        frame (bytes): A binary websocket message.
+
+    Returns:
+        tuple: (position, samples) if the message is a far-end reference frame, None otherwise.
+    """
+    if len(frame) < FAR_END_HEADER.size or frame[:4] != FAR_END_MAGIC:
+        return None
+    _, position = FAR_END_HEADER.unpack_from(frame)
+    payload = len(frame) - FAR_END_HEADER.size
+    samples = np.frombuffer(frame, dtype=np.float32, count=payload // 4, offset=FAR_END_HEADER.size)
+    return position, samples
+
+
+RESULT_FORMATS = ("json", "msgpack")
+"""
+Encodings of transcription results a client can ask for with the "result_format" option.
+
+"json" text frames carry {"uid", "segments"} with every segment in full and times as strings.
+
+"msgpack" binary frames carry a MessagePack map {"u": uid, "c": committed, "p": partial}:
+  - "c": the segments committed since the previous frame, each [id, start_ms, end_ms, text];
+  - "p" (only when the partial changed): [id, start_ms, end_ms, keep, append], the in-progress
+    segment whose text is the first `keep` characters (code points) of the previous partial's
+    text followed by `append`.
+Segment ids count the committed segments of the session, the partial carries the id it will be
+committed under. Times are integer milliseconds, None when the backend has none.
+Other messages (status, language, translations) stay JSON text frames.
+"""
+
+
+def negotiate_result_format(requested):
+    """
+    The result format a session will use, given what its client asked for.
+
+    Args:
+        requested (str): The client's "result_format" option, None for the default.
+
+    Returns:
+        str: "msgpack" when asked for and available, "json" otherwise.
+    """
+    if requested in (None, "json"):
+        return "json"
+    if requested == "msgpack" and MSGPACK_AVAILABLE:
+        return "msgpack"
+    logging.warning(f"⚠️ Result format '{requested}' is not available, sending JSON results")
+    return "json"
+
+
+def _milliseconds(value):
+    return None if value is None else int(round(float(value) * 1000))
+
+
+def _common_prefix(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class ResultEncoder(object):
+    """
+    Serializes the transcription results of one session, in the session's result format.
+
+    The msgpack format sends the partial segment as a delta against the previous one, so the encoder
+    keeps the last partial text it encoded; every frame it returns must be delivered, in order.
+    """
+
+    def __init__(self, client_uid, result_format="json"):
+        """
+        Args:
+            client_uid (str): Session id, sent in every frame.
+            result_format (str, optional): One of `RESULT_FORMATS`. Defaults to "json".
+        """
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(f"Unknown result format '{result_format}'")
+        self.client_uid = client_uid
+        self.result_format = result_format
+        self.next_id = 0
+        self.partial_text = ""
+
+    def encode(self, committed, partial=None):
+        """
+        Build the frame of an update.
+
+        Args:
+            committed (list): Segments committed since the previous update, as built by `format_segment`.
+            partial (dict, optional): The newest partial segment, None if it did not change.
+
+        Returns:
+            str or bytes: A JSON text frame or a MessagePack binary frame.
+        """
+        if self.result_format == "json":
+            segments = committed + [partial] if partial is not None else committed
+            return json.dumps({"uid": self.client_uid, "segments": segments})
+
+        update = {"u": self.client_uid, "c": []}
+        for segment in committed:
+            update["c"].append([
+                self.next_id, _milliseconds(segment.get("start")), _milliseconds(segment.get("end")), segment["text"],
+            ])
+            self.next_id += 1
+        if partial is not None:
+            text = partial["text"]
+            keep = _common_prefix(self.partial_text, text)
+            update["p"] = [
+                self.next_id, _milliseconds(partial.get("start")), _milliseconds(partial.get("end")), keep, text[keep:],
+            ]
+            self.partial_text = text
+        return msgpack.packb(update, use_bin_type=True)
+
+
+class ResultDecoder(object):
+    """Client side of `ResultEncoder`: turns MessagePack result frames back into JSON-style messages."""
+
+    def __init__(self):
+        self.partial_text = ""
+
+    def decode(self, frame):
+        """
+        Args:
+            frame (bytes): A MessagePack result frame.
+
+        Returns:
+            dict: {"uid", "segments"} like a JSON result message, with numeric times in seconds and
+                the segment "id". The partial segment, if the frame has one, comes last.
+        """
+        update = msgpack.unpackb(frame, raw=False)
+        segments = []
+        for segment_id, start, end, text in update.get("c", []):
+            segments.append(self._segment(segment_id, start, end, text, True))
+        if "p" in update:
+            segment_id, start, end, keep, append = update["p"]
+            self.partial_text = self.partial_text[:keep] + append
+            segments.append(self._segment(segment_id, start, end, self.partial_text, False))
+        return {"uid": update["u"], "segments": segments}
+
+    @staticmethod
+    def _segment(segment_id, start, end, text, completed):
+        return {
+            "id": segment_id,
+            "start": None if start is None else start / 1000,
+            "end": None if end is None else end / 1000,
+            "text": text,
+            "completed": completed,
+        }
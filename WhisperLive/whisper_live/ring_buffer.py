@@ -0,0 +1,148 @@
+import numpy as np
+
+
+class AudioRingBuffer(object):
+    """
+    Fixed-capacity audio buffer addressed by absolute sample index.
+
+    Samples are stored twice in a backing array of `2 * capacity` samples (a "mirrored" ring), so any
+    window of up to `capacity` retained samples is a single contiguous slice. Appending costs
+    O(packet) regardless of how long the stream has been running, and reading a window never copies.
+
+    A view returned by `view` stays valid until `capacity` samples past its start have been written.
+    Callers keep the retained span well below the capacity so views handed to inference survive the
+    audio that arrives while it runs.
+    """
+
+    def __init__(self, capacity, dtype=np.float32, buffer=None):
+        """
+        Initialize an empty buffer.
+
+        Args:
+            capacity (int): Maximum number of samples retained.
+            dtype (np.dtype, optional): Sample type. Defaults to np.float32.
+            buffer (optional): Memory to store the samples in, e.g. a `SharedMemory.buf` so another
+                process can write them. Must hold `2 * capacity` samples. Defaults to a new array.
+        """
+        self.capacity = int(capacity)
+        if self.capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        if buffer is None:
+            self.data = np.zeros(2 * self.capacity, dtype=dtype)
+        else:
+            self.data = np.ndarray((2 * self.capacity,), dtype=dtype, buffer=buffer)
+        self.start = 0
+        """Absolute index of the oldest retained sample."""
+        self.end = 0
+        """Absolute index one past the newest sample."""
+
+    def __len__(self):
+        return self.end - self.start
+
+    def append(self, samples):
+        """
+        Append samples at the end of the stream, dropping the oldest ones if the buffer is full.
+
+        Args:
+            samples (np.ndarray): 1-D array of samples.
+        """
+        n = samples.shape[0]
+        if n == 0:
+            return
+        if n > self.capacity:
+            # only the newest `capacity` samples can be kept anyway
+            self.start = self.end = self.end + n - self.capacity
+            samples = samples[n - self.capacity:]
+            n = self.capacity
+
+        pos = self.end % self.capacity
+        first = min(n, self.capacity - pos)
+        # primary copy, wrapping around at `capacity`
+        self.data[pos:pos + first] = samples[:first]
+        self.data[:n - first] = samples[first:]
+        # mirror copy, shifted by `capacity`
+        self.data[self.capacity + pos:self.capacity + pos + first] = samples[:first]
+        self.data[self.capacity:self.capacity + n - first] = samples[first:]
+
+        self.end += n
+        if self.end - self.start > self.capacity:
+            self.start = self.end - self.capacity
+
+    def reserve(self, n):
+        """
+        Writable, contiguous slot for the next `n` samples of the stream, so a producer can write (and
+        process) them in place instead of building an array to `append`. The samples become part of the
+        stream once `commit` is called; until then the buffer is unchanged.
+
+        Args:
+            n (int): Number of samples, at most `capacity`.
+
+        Returns:
+            np.ndarray: The slot, valid until the next `append` or `commit`.
+        """
+        n = int(n)
+        if n > self.capacity:
+            raise ValueError(f"Cannot reserve {n} samples in a ring buffer of {self.capacity}")
+        pos = self.end % self.capacity
+        # thanks to the mirror half, the slot never has to wrap around
+        return self.data[pos:pos + n]
+
+    def commit(self, n):
+        """
+        Append the `n` samples written into the slot returned by `reserve`.
+
+        Args:
+            n (int): Number of samples written, at most the reserved number.
+        """
+        n = int(n)
+        if n == 0:
+            return
+        pos = self.end % self.capacity
+        first = min(n, self.capacity - pos)
+        # the slot covers the primary copy up to `capacity`, then the mirror of the wrapped part
+        self.data[self.capacity + pos:self.capacity + pos + first] = self.data[pos:pos + first]
+        self.data[:n - first] = self.data[self.capacity:self.capacity + n - first]
+        self.advance(n)
+
+    def advance(self, n):
+        """
+        Account for samples written at the end of the stream by another buffer sharing the same
+        memory, e.g. the writer side of a buffer shared between processes.
+
+        Args:
+            n (int): Number of samples appended by the writer.
+        """
+        self.end += int(n)
+        if self.end - self.start > self.capacity:
+            self.start = self.end - self.capacity
+
+    def discard_before(self, index):
+        """
+        Stop retaining samples older than the given absolute index. This never copies.
+
+        Args:
+            index (int): Absolute index of the first sample to keep.
+        """
+        self.start = min(max(self.start, int(index)), self.end)
+
+    def view(self, start=None, end=None):
+        """
+        Zero-copy, read-only view of the retained samples in `[start, end)`.
+
+        Args:
+            start (int, optional): Absolute index of the first sample. Defaults to the oldest retained sample.
+            end (int, optional): Absolute index one past the last sample. Defaults to the newest sample.
+
+        Returns:
+            np.ndarray: The requested window, clamped to the retained range.
+        """
+        start = self.start if start is None else min(max(int(start), self.start), self.end)
+        end = self.end if end is None else min(max(int(end), start), self.end)
+        pos = start % self.capacity
+        window = self.data[pos:pos + end - start]
+        window.flags.writeable = False
+        return window
+
+    def clear(self):
+        """Drop all samples, keeping the absolute index of the stream."""
+        self.start = self.end
@@ -0,0 +1,207 @@
+import logging
+import queue
+import threading
+
+from whisper_live.metrics import METRICS
+from whisper_live.protocol import ResultEncoder
+
+
+class SenderPool(object):
+    """
+    Fixed-size pool of threads sending the queued messages of every session.
+
+    A `SendQueue` with something to send is handed to the pool once, a sender thread sends one batch
+    of it and hands it back if more was queued meanwhile, so clients take turns and the number of
+    threads stays bounded no matter how many sessions are connected. A slow client only holds up the
+    sender thread writing to it.
+    """
+
+    def __init__(self, num_threads=8):
+        """
+        Args:
+            num_threads (int, optional): Number of sender threads, started on first use. Defaults to 8.
+        """
+        self.num_threads = max(1, int(num_threads))
+        self.ready = queue.Queue()
+        self.lock = threading.Lock()
+        self.threads = []
+
+    def submit(self, send_queue):
+        """
+        Send the next batch of a queue on a sender thread.
+
+        Args:
+            send_queue (SendQueue): A queue with something to send, submitted at most once at a time.
+        """
+        with self.lock:
+            if not self.threads:
+                for i in range(self.num_threads):
+                    thread = threading.Thread(target=self.run, name=f"sender-{i}", daemon=True)
+                    thread.start()
+                    self.threads.append(thread)
+        self.ready.put(send_queue)
+
+    def run(self):
+        """Sender thread loop, runs until `stop` is called."""
+        while True:
+            send_queue = self.ready.get()
+            if send_queue is None:
+                break
+            send_queue.send_batch()
+
+    def stop(self):
+        """Stop the sender threads once they finish their current batch."""
+        with self.lock:
+            threads, self.threads = self.threads, []
+        for _ in threads:
+            self.ready.put(None)
+
+
+SENDER_POOL = SenderPool()
+
+
+class SendQueue(object):
+    """
+    Outbound messages of one session, sent to its websocket by the threads of a shared `SenderPool`.
+
+    Transcription threads only enqueue, so a slow client never holds up inference. Committed segments
+    and other messages are sent in the order they were queued and never dropped. The in-progress
+    (partial) segment is coalesced: only the newest one queued is sent, appended to the message
+    carrying the segments committed since the last send (or after the other messages taken with it),
+    and a partial equal to the previous one is not sent again. Results are serialized on the sender thread, in the session's result format.
+    """
+
+    def __init__(self, websocket, client_uid, result_format="json", sender_pool=None):
+        """
+        Args:
+            websocket: The client's websocket, or anything with a `send(str)` method.
+            client_uid (str): Session id, sent in every transcription message.
+            result_format (str, optional): Encoding of the results, see `protocol.RESULT_FORMATS`. Defaults to "json".
+            sender_pool (SenderPool, optional): Threads sending the messages. Defaults to the shared `SENDER_POOL`.
+        """
+        self.websocket = websocket
+        self.client_uid = client_uid
+        self.encoder = ResultEncoder(client_uid, result_format)
+        self.condition = threading.Condition()
+        self.items = []
+        """Pending ("message", str), ("segments", list) and ("close", None) items, in order."""
+        self.partial = None
+        self.partial_pending = False
+        self.last_partial = None
+        self.closed = False
+        self.sender_pool = sender_pool if sender_pool is not None else SENDER_POOL
+        self.scheduled = False
+        """Whether the queue is waiting for or being sent by a sender thread."""
+        self.sender = None
+        self.stats = {"sent": 0, "coalesced": 0, "suppressed": 0}
+
+    def put_segments(self, segments):
+        """
+        Queue a transcription update.
+
+        Args:
+            segments (list): Newly committed segments, optionally followed by the partial segment,
+                a segment whose "completed" flag is not set.
+        """
+        partial = None
+        if segments and not segments[-1].get("completed", False):
+            partial = segments[-1]
+            segments = segments[:-1]
+        with self.condition:
+            if not segments and partial == self.last_partial:
+                self.stats["suppressed"] += 1
+                return
+            if segments:
+                self.items.append(("segments", list(segments)))
+            if self.partial_pending and self.partial is not None:
+                self.stats["coalesced"] += 1
+            self.partial = partial
+            self.partial_pending = True
+            self.last_partial = partial
+            self.notify()
+
+    def put_message(self, message):
+        """
+        Queue a message as it is, after everything queued before it.
+
+        Args:
+            message (str or bytes): The serialized message.
+        """
+        with self.condition:
+            self.items.append(("message", message))
+            self.notify()
+
+    def put_close(self):
+        """Queue closing the websocket, after everything queued before."""
+        with self.condition:
+            self.items.append(("close", None))
+            self.notify()
+
+    def notify(self):
+        # called with the condition held
+        if not self.scheduled and not self.closed:
+            self.scheduled = True
+            self.sender_pool.submit(self)
+
+    def pending(self):
+        return bool(self.items) or self.partial_pending
+
+    def take(self):
+        """
+        Takes everything queued as the messages to send.
+
+        Returns:
+            list: Serialized messages (str or bytes), None to close the websocket. Empty when nothing is queued.
+        """
+        with self.condition:
+            items, self.items = self.items, []
+            partial, self.partial = self.partial, None
+            self.partial_pending = False
+
+        # consecutive updates merge into one, the partial goes with the last of them
+        batches = []
+        for kind, payload in items:
+            if kind == "segments" and batches and batches[-1][0] == "segments":
+                batches[-1][1].extend(payload)
+            else:
+                batches.append((kind, list(payload) if kind == "segments" else payload))
+        if partial is not None and not (batches and batches[-1][0] == "segments"):
+            batches.append(("segments", []))
+        return [
+            self.encoder.encode(payload, partial if i == len(batches) - 1 else None) if kind == "segments" else payload
+            for i, (kind, payload) in enumerate(batches)
+        ]
+
+    def send_batch(self):
+        """Send what is queued, on a thread of the sender pool, then hand the queue back if more came in."""
+        self.sender = threading.current_thread()
+        for message in self.take():
+            try:
+                if message is None:
+                    self.websocket.close()
+                    continue
+                with METRICS.time_stage("send", self.client_uid):
+                    self.websocket.send(message)
+                self.stats["sent"] += 1
+            except Exception as e:
+                logging.error(f"[ERROR]: Sending data to client {self.client_uid}: {e}")
+        with self.condition:
+            self.sender = None
+            if self.pending() and not self.closed:
+                # back of the line, the other clients get their turn
+                self.sender_pool.submit(self)
+            else:
+                self.scheduled = False
+                self.condition.notify_all()
+
+    def close(self, timeout=1.0):
+        """
+        Send what is still queued, waiting at most `timeout` seconds; nothing queued afterwards is sent.
+
+        Args:
+            timeout (float, optional): Maximum time to wait for the pending messages. Defaults to 1.
+        """
+        with self.condition:
+            if self.sender is not threading.current_thread():
+                self.condition.wait_for(lambda: not self.scheduled, timeout)
+            self.closed = True
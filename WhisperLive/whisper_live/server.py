@@ -6,14 +6,24 @@ import json
 import functools
 import logging
 from enum import Enum
+from http import HTTPStatus
 from typing import List, Optional
 
 import numpy as np
 from websockets.sync.server import serve
 from websockets.exceptions import ConnectionClosed, InvalidUpgrade, InvalidMessage
-from whisper_live.vad import VoiceActivityDetector
+from whisper_live.vad import VoiceActivityDetection, VoiceActivityDetector
+from whisper_live.vad_service import VADService
 from whisper_live.backend.base import ServeClientBase
-from whisper_live.preprocessing.audio_processor import AudioProcessor
+from whisper_live.backend.model_registry import MODEL_REGISTRY
+from whisper_live.backend.process_pool import InferenceProcessPool
+from whisper_live.metrics import METRICS
+from whisper_live.backend.worker_pool import TranscriptionWorkerPool
+from whisper_live.preprocessing.aec_processor import create_aec_processor
+from whisper_live.protocol import decode_far_end, negotiate_result_format
+from whisper_live.preprocessing.audio_processor import PreprocessingDesign, aggregate_stats
+from whisper_live.preprocessing.ingest_gate import IngestGate
+from whisper_live.uplink import UplinkDecoder
 
 # Configure logging - suppress noisy WebSocket handshake errors
 # Use INFO level for production, DEBUG for troubleshooting
@@ -53,19 +63,49 @@ class ClientManager:
         """
         self.clients = {}
         self.start_times = {}
+        self.audio_processors = {}
+        self.ingest_gates = {}
         self.max_clients = max_clients
         self.max_connection_time = max_connection_time
 
-    def add_client(self, websocket, client):
+    def add_client(self, websocket, client, audio_processor=None, ingest_gate=None):
         """
         Adds a client and their connection start time to the tracking dictionaries.
 
         Args:
             websocket: The websocket associated with the client to add.
             client: The client object to be added and tracked.
+            audio_processor (AudioProcessor, optional): The preprocessing pipeline of the client's audio.
+            ingest_gate (IngestGate, optional): The silence gate of the client's audio.
         """
         self.clients[websocket] = client
         self.start_times[websocket] = time.time()
+        if audio_processor is not None:
+            self.audio_processors[websocket] = audio_processor
+        if ingest_gate is not None:
+            self.ingest_gates[websocket] = ingest_gate
+
+    def get_audio_processor(self, websocket):
+        """
+        Retrieves the preprocessing pipeline of the client associated with the given websocket.
+
+        Returns:
+            The AudioProcessor of the client, None if it has none.
+        """
+        return self.audio_processors.get(websocket)
+
+    def get_ingest_gate(self, websocket):
+        """
+        Retrieves the silence gate of the client associated with the given websocket.
+
+        Returns:
+            The IngestGate of the client, None if its audio is not gated.
+        """
+        return self.ingest_gates.get(websocket)
+
+    def preprocessing_stats(self):
+        """Preprocessing statistics aggregated over the connected clients."""
+        return aggregate_stats(list(self.audio_processors.values()))
 
     def get_client(self, websocket):
         """
@@ -93,6 +133,20 @@ class ClientManager:
         if client:
             client.cleanup()
         self.start_times.pop(websocket, None)
+        audio_processor = self.audio_processors.pop(websocket, None)
+        if audio_processor is not None:
+            stats = audio_processor.get_stats()
+            logging.info(
+                f"🎛️ Preprocessed {stats['audio_seconds']:.1f}s of audio in {stats['chunks_processed']} chunks "
+                f"({stats['processing_seconds']:.2f}s, {stats['aec_errors']} AEC errors)"
+            )
+        ingest_gate = self.ingest_gates.pop(websocket, None)
+        if ingest_gate is not None:
+            stats = ingest_gate.get_stats()
+            logging.info(
+                f"🔕 Ingest gate kept {stats['kept_seconds']:.1f}s of {stats['audio_seconds']:.1f}s of audio "
+                f"({stats['dropped_seconds']:.1f}s of silence dropped)"
+            )
 
     def get_wait_time(self):
         """
@@ -180,12 +234,26 @@ class TranscriptionServer:
         self.no_voice_activity_chunks = 0
         self.use_vad = True
         self.single_model = False
-
-        # Initialize audio processor with AEC for hybrid echo cancellation
-        # Check environment variable to enable/disable AEC
+        self.batch_inference = False
+        self.max_batch_size = 8
+        self.max_batch_wait_ms = 10.0
+        self.worker_pool = None
+        self.process_pool = None
+        self.vad_service = None
+        self.vad_detectors = {}
+        self.uplink_decoders = {}
+        self.ingest_gate = False
+        self.ingest_budget = 0.0
+        self.catch_up_threshold = 0.0
+        self.min_audio_step = 0.0
+        self.model_concurrency = 1
+        self.ready = False
+
+        # Design the audio preprocessing with AEC for hybrid echo cancellation, every session gets its
+        # own pipeline built from it. Check environment variable to enable/disable AEC
         aec_enabled = os.environ.get('WHISPER_LIVE_AEC_ENABLED', 'true').lower() == 'true'
-        self.audio_processor = AudioProcessor(sample_rate=self.RATE, enable_aec=aec_enabled)
-        if aec_enabled and self.audio_processor.aec_processor and self.audio_processor.aec_processor.is_enabled():
+        self.preprocessing = PreprocessingDesign.create(sample_rate=self.RATE, enable_aec=aec_enabled)
+        if aec_enabled and self.preprocessing.aec.hp_sos is not None:
             logging.info("🎯 Hybrid AEC enabled - complementing browser AEC with server-side processing")
         elif not aec_enabled:
             logging.info("🔇 Server AEC disabled via WHISPER_LIVE_AEC_ENABLED=false - using browser AEC only")
@@ -203,6 +271,9 @@ class TranscriptionServer:
             True if client was successfully initialized, False otherwise
         """
         client: Optional[ServeClientBase] = None
+        result_format = negotiate_result_format(options.get("result_format"))
+        # only clients that honour PAUSE and RESUME are sent them
+        ingest_budget = self.ingest_budget if options.get("flow_control", False) else 0.0
 
         # Check if client wants translation
         enable_translation = options.get("enable_translation", False)
@@ -224,12 +295,13 @@ class TranscriptionServer:
                 send_last_n_segments=options.get("send_last_n_segments", 10)
             )
             
-            # Start translation thread
-            translation_thread = threading.Thread(
-                target=translation_client.speech_to_text,
-                daemon=True
-            )
-            translation_thread.start()
+            # Start translation thread, with a worker pool the transcription session schedules it instead
+            if self.worker_pool is None:
+                translation_thread = threading.Thread(
+                    target=translation_client.speech_to_text,
+                    daemon=True
+                )
+                translation_thread.start()
             
             logging.info(f"Translation enabled for client {options['uid']} with target language: {target_language}")
 
@@ -249,6 +321,9 @@ class TranscriptionServer:
                     no_speech_thresh=options.get("no_speech_thresh", 0.45),
                     clip_audio=options.get("clip_audio", False),
                     same_output_threshold=options.get("same_output_threshold", 10),
+                    worker_pool=self.worker_pool,
+                    result_format=result_format,
+                    ingest_budget=ingest_budget,
                 )
                 logging.info("Running TensorRT backend.")
             except Exception as e:
@@ -276,6 +351,10 @@ class TranscriptionServer:
                     no_speech_thresh=options.get("no_speech_thresh", 0.45),
                     clip_audio=options.get("clip_audio", False),
                     same_output_threshold=options.get("same_output_threshold", 10),
+                    worker_pool=self.worker_pool,
+                    min_audio_step=self.min_audio_step,
+                    result_format=result_format,
+                    ingest_budget=ingest_budget,
                 )
                 logging.info("Running OpenVINO backend.")
             except Exception as e:
@@ -291,7 +370,6 @@ class TranscriptionServer:
 
         try:
             if self.backend.is_faster_whisper():
-                from whisper_live.backend.faster_whisper_backend import ServeClientFasterWhisper
                 # model is of the form namespace/repo_name and not a filesystem path
                 if faster_whisper_custom_model_path is not None:
                     logging.info(f"Using custom model {faster_whisper_custom_model_path}")
@@ -305,8 +383,7 @@ class TranscriptionServer:
                 if "language" not in options or options["language"] is None or options["language"] == "":
                     options["language"] = None
                     logging.info("Language auto-detection enabled (language=None)")
-                client = ServeClientFasterWhisper(
-                    websocket,
+                session_options = dict(
                     language=options.get("language"),  # Use .get() to handle None gracefully
                     task=options.get("task", "transcribe"),
                     client_uid=options["uid"],
@@ -319,9 +396,32 @@ class TranscriptionServer:
                     no_speech_thresh=options.get("no_speech_thresh", 0.45),
                     clip_audio=options.get("clip_audio", False),
                     same_output_threshold=options.get("same_output_threshold", 10),
-                    cache_path=self.cache_path,
-                    translation_queue=translation_queue
+                    batch_inference=self.batch_inference,
+                    max_batch_size=self.max_batch_size,
+                    max_batch_wait_ms=self.max_batch_wait_ms,
+                    commit_policy=options.get("commit_policy", "same_output"),
+                    min_audio_step=self.min_audio_step,
+                    result_format=result_format,
+                    ingest_budget=ingest_budget,
+                    catch_up_threshold=self.catch_up_threshold,
+                    model_concurrency=self.model_concurrency,
                 )
+                if self.process_pool is not None:
+                    # the session runs in an inference worker process
+                    if translation_client is not None:
+                        logging.warning("⚠️ Translation is not available with inference worker processes")
+                        translation_client.cleanup()
+                        translation_client = None
+                    client = self.process_pool.open_session(websocket, **session_options)
+                else:
+                    from whisper_live.backend.faster_whisper_backend import ServeClientFasterWhisper
+                    client = ServeClientFasterWhisper(
+                        websocket,
+                        cache_path=self.cache_path,
+                        translation_queue=translation_queue,
+                        worker_pool=self.worker_pool,
+                        **session_options,
+                    )
 
                 logging.info("Running faster_whisper backend.")
         except ConnectionClosed:
@@ -364,18 +464,21 @@ class TranscriptionServer:
             client.translation_client = translation_client
             client.translation_thread = translation_thread
 
-        self.client_manager.add_client(websocket, client)
+        ingest_gate = IngestGate(sample_rate=self.RATE) if self.ingest_gate else None
+        self.client_manager.add_client(websocket, client, self.preprocessing.create_processor(), ingest_gate)
         return True
 
     def get_audio_from_websocket(self, websocket):
         """
-        Receives audio buffer from websocket and creates a numpy array out of it.
+        Receives audio buffer from websocket and creates a numpy array out of it. Far-end reference frames
+        are handed to the client's audio processor.
 
         Args:
             websocket: The websocket to receive audio from.
 
         Returns:
-            A numpy array containing the audio, False for END_OF_AUDIO, or None for non-audio data.
+            A numpy array containing the audio, False for END_OF_AUDIO, or None for non-audio data
+            (including far-end reference frames).
         """
         frame_data = websocket.recv()
         
@@ -390,7 +493,28 @@ class TranscriptionServer:
         # Handle binary END_OF_AUDIO
         if frame_data == b"END_OF_AUDIO":
             return False
-            
+
+        # Far-end reference for the echo canceller, interleaved with the microphone audio. Its tag can only
+        # be told apart from float32 samples, and its position only matches the session's at the server's rate
+        uplink_decoder = self.uplink_decoders.get(websocket)
+        if uplink_decoder is None or uplink_decoder.encoding == "float32":
+            far_end = decode_far_end(frame_data)
+            if far_end is not None:
+                audio_processor = self.client_manager.get_audio_processor(websocket)
+                if uplink_decoder is not None:
+                    logging.debug(f"⚠️ Ignoring far-end frame of a {uplink_decoder.sample_rate} Hz uplink")
+                elif audio_processor is not None:
+                    audio_processor.add_far_end(*far_end)
+                return None
+
+        # Compressed or resampled uplink, negotiated in the options
+        if uplink_decoder is not None:
+            try:
+                return uplink_decoder.decode(frame_data)
+            except ValueError as e:
+                logging.error(f"❌ Failed to decode {uplink_decoder.encoding} audio: {e}")
+                return None
+
         # Convert binary audio data to numpy array
         try:
             return np.frombuffer(frame_data, dtype=np.float32)
@@ -412,6 +536,23 @@ class TranscriptionServer:
                 websocket.close()
                 return False  # Indicates that the connection should not continue
 
+            # Audio sent as float32 at the server's rate needs no decoding
+            audio_encoding = options.get("audio_encoding", "float32")
+            sample_rate = options.get("sample_rate", self.RATE)
+            if audio_encoding != "float32" or sample_rate != self.RATE:
+                try:
+                    self.uplink_decoders[websocket] = UplinkDecoder(audio_encoding, sample_rate, target_rate=self.RATE)
+                except ValueError as e:
+                    logging.error(f"❌ Unsupported audio uplink: {e}")
+                    websocket.send(json.dumps({
+                        "uid": options.get("uid", "unknown"),
+                        "status": "ERROR",
+                        "message": str(e)
+                    }))
+                    websocket.close()
+                    return False
+                logging.info(f"🎙️ Audio uplink: {audio_encoding} at {sample_rate} Hz")
+
             # Send immediate acknowledgment that we received the config
             try:
                 websocket.send(json.dumps({
@@ -427,7 +568,12 @@ class TranscriptionServer:
                 logging.warning(f"⚠️ Failed to send acknowledgment: {e}")
 
             if self.backend.is_tensorrt():
-                self.vad_detector = VoiceActivityDetector(frame_rate=self.RATE)
+                # one model for all connections, their windows are evaluated together
+                if self.vad_service is None:
+                    self.vad_service = VADService(
+                        VoiceActivityDetection.shared_session(VoiceActivityDetection.download()), sample_rate=self.RATE
+                    )
+                self.vad_detectors[websocket] = VoiceActivityDetector(frame_rate=self.RATE, service=self.vad_service)
             
             # Initialize client - return False if initialization fails
             if not self.initialize_client(websocket, options, faster_whisper_custom_model_path,
@@ -466,6 +612,7 @@ class TranscriptionServer:
             return False
         
         if frame_np is False:
+            self.flush_audio_processor(websocket, client)
             if self.backend.is_tensorrt() and client:
                 client.set_eos(True)
             return False
@@ -479,28 +626,22 @@ class TranscriptionServer:
             logging.debug("⚠️ Received empty audio frame, skipping processing")
             return True  # Continue processing, just skip this frame
 
-        # Ensure float32 dtype before processing (prevent float64 issues)
-        if frame_np.dtype != np.float32:
-            frame_np = frame_np.astype(np.float32)
-        
-        # Apply audio processing pipeline (hybrid AEC: browser + server)
-        frame_np = self.audio_processor.process_audio_chunk(frame_np)
-        
-        # Ensure float32 after processing (VAD and transcription require float32)
-        if frame_np.dtype != np.float32:
-            frame_np = frame_np.astype(np.float32)
-        
+        # Decode and preprocess the packet straight into the session's audio buffer (hybrid AEC: browser +
+        # server), every stage works in place over that slot
+        num_samples = len(frame_np)
+        slot = client.reserve_frames(num_samples)
+        audio_processor = self.client_manager.get_audio_processor(websocket)
+        with METRICS.time_stage("preprocess", client.client_uid):
+            if audio_processor is not None:
+                frame_np = audio_processor.process_audio_chunk(frame_np, out=slot)
+            else:
+                np.copyto(slot, frame_np, casting="unsafe")
+                frame_np = slot
+
         # Check if processing resulted in empty array
         if len(frame_np) == 0:
             logging.debug("⚠️ Processed audio chunk is empty, skipping transcription")
             return True  # Continue processing, just skip this frame
-        
-        logging.debug(f"🎵 Audio processed chunk: {len(frame_np)} samples, dtype: {frame_np.dtype}")
-        
-        # DEBUG: Log audio processing for troubleshooting
-        if len(frame_np) > 0:
-            audio_level = np.abs(frame_np).mean()
-            logging.debug(f"🔊 Audio level: {audio_level:.4f} (mean abs), max: {np.abs(frame_np).max():.4f}")
 
         if self.backend.is_tensorrt():
             voice_active = self.voice_activity(websocket, frame_np)
@@ -511,10 +652,55 @@ class TranscriptionServer:
             if self.use_vad and not voice_active:
                 return True
 
-        if client:
-            client.add_frames(frame_np)
+        ingest_gate = self.client_manager.get_ingest_gate(websocket)
+        if ingest_gate is not None:
+            self.add_gated_frames(client, ingest_gate, frame_np)
+            return True
+
+        with METRICS.time_stage("add_frames", client.client_uid):
+            client.commit_frames(num_samples)
         return True
 
+    def add_gated_frames(self, client, ingest_gate, frame_np):
+        """
+        Hand the runs of audio the ingest gate lets through over to the session, each tagged with its stream position.
+
+        Args:
+            client: The client's session.
+            ingest_gate (IngestGate): The client's ingest gate.
+            frame_np (numpy.ndarray): Preprocessed float32 audio.
+        """
+        with METRICS.time_stage("ingest_gate", client.client_uid):
+            runs = ingest_gate.process(frame_np)
+        kept = 0
+        with METRICS.time_stage("add_frames", client.client_uid):
+            for stream_position, samples in runs:
+                client.mark_stream_position(stream_position)
+                client.add_frames(samples)
+                kept += len(samples)
+        METRICS.gated_seconds.inc(max(0, len(frame_np) - kept) / self.RATE)
+
+    def flush_audio_processor(self, websocket, client):
+        """
+        At the end of the stream, hand the audio still held back by the client's preprocessing (the
+        last frame of the noise suppressor) over to the session.
+
+        Args:
+            websocket: The client websocket.
+            client: The client's session.
+        """
+        audio_processor = self.client_manager.get_audio_processor(websocket)
+        if audio_processor is None:
+            return
+        tail = audio_processor.flush()
+        if len(tail) == 0:
+            return
+        ingest_gate = self.client_manager.get_ingest_gate(websocket)
+        if ingest_gate is not None:
+            self.add_gated_frames(client, ingest_gate, tail)
+        else:
+            client.add_frames(tail)
+
     def recv_audio(self,
                    websocket,   
                    backend: BackendType = BackendType.FASTER_WHISPER,
@@ -595,16 +781,80 @@ class TranscriptionServer:
             single_model=False,
             max_clients=4,
             max_connection_time=600,
-            cache_path="~/.cache/whisper-live/"):
+            cache_path="~/.cache/whisper-live/",
+            batch_inference=False,
+            max_batch_size=8,
+            max_batch_wait_ms=10.0,
+            num_workers=4,
+            min_audio_step=0.0,
+            model_memory_budget=None,
+            model_concurrency=None,
+            preload=None,
+            num_processes=0,
+            threads_per_process=None,
+            metrics_port=None,
+            ingest_gate=False,
+            ingest_budget=10.0,
+            catch_up_threshold=0.0):
         """
         Run the transcription server.
 
         Args:
             host (str): The host address to bind the server.
             port (int): The port number to bind the server.
+            batch_inference (bool): Batch passes of all sessions sharing the single faster_whisper model.
+            max_batch_size (int): Maximum number of sessions decoded in one batch.
+            max_batch_wait_ms (float): Maximum time a pass waits for other sessions to join its batch.
+            num_workers (int): Size of the shared transcription worker pool, 0 runs a thread per session.
+            min_audio_step (float): Minimum amount of new audio (in seconds) a session needs between two passes.
+            model_memory_budget (float): Memory budget (in MB) for loaded models, idle models are evicted
+                least recently used first once it is exceeded. None keeps them loaded.
+            model_concurrency (int): Passes that may run at once on each shared faster_whisper model (its CTranslate2
+                workers), the passes of other sessions sharing the model wait for a free slot. None allows
+                one per transcription worker thread.
+            preload (list): Models to load and warm up before the socket opens. An empty list preloads the
+                model the backend serves by default. None loads models on first use.
+            num_processes (int): Run faster_whisper sessions in this many inference worker processes, each
+                with `num_workers` transcription threads. 0 runs them in the server process.
+            threads_per_process (int): CPU threads for the models of each worker process. Defaults to the
+                CPU count divided by `num_processes`.
+            metrics_port (int): Serve Prometheus metrics on this port, worker processes use the following
+                ports. None disables the endpoint.
+            ingest_gate (bool): Drop silence from every session's audio before it is buffered, see `IngestGate`.
+                Segment times stay in the time of the client's stream.
+            ingest_budget (float): Audio (in seconds) a session may hold untranscribed before clients that asked
+                for flow control are sent PAUSE, see `IngestBudget`. 0 disables flow control. Above 15s the
+                buffer can be trimmed (dropping untranscribed audio) before the budget is reached.
+            catch_up_threshold (float): Pending audio (in seconds) above which a faster_whisper session transcribes
+                its backlog in one batched call, then resumes streaming. 0 disables catch-up.
         """
         self.cache_path = cache_path
+        self.batch_inference = batch_inference
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait_ms = max_batch_wait_ms
+        self.min_audio_step = min_audio_step
+        self.ingest_gate = ingest_gate
+        self.ingest_budget = ingest_budget
+        self.catch_up_threshold = catch_up_threshold
+        self.model_concurrency = model_concurrency or max(1, num_workers)
+        if model_memory_budget is not None:
+            MODEL_REGISTRY.set_memory_budget(int(model_memory_budget * 2**20))
+        if num_processes > 0 and backend == BackendType.FASTER_WHISPER.value:
+            self.process_pool = InferenceProcessPool(
+                num_processes,
+                threads_per_process=threads_per_process,
+                workers_per_process=max(1, num_workers),
+                cache_path=cache_path,
+                metrics_address=(host, metrics_port + 1) if metrics_port else None,
+            )
+        elif num_processes > 0:
+            logging.warning(f"⚠️ Inference worker processes are only supported with faster_whisper, not {backend}")
+        if num_workers > 0 and self.process_pool is None:
+            self.worker_pool = TranscriptionWorkerPool(num_workers)
         self.client_manager = ClientManager(max_clients, max_connection_time)
+        METRICS.active_sessions.function = lambda: len(self.client_manager.clients)
+        if metrics_port:
+            METRICS.serve(host, metrics_port)
         if faster_whisper_custom_model_path is not None and not os.path.exists(faster_whisper_custom_model_path):
             raise ValueError(f"Custom faster_whisper model '{faster_whisper_custom_model_path}' is not a valid path.")
         if whisper_tensorrt_path is not None and not os.path.exists(whisper_tensorrt_path):
@@ -613,15 +863,14 @@ class TranscriptionServer:
             if faster_whisper_custom_model_path or whisper_tensorrt_path:
                 logging.info("Custom model option was provided. Switching to single model mode.")
                 self.single_model = True
-                # TODO: load model initially
             else:
                 logging.info("Single model mode currently only works with custom models.")
         if not BackendType.is_valid(backend):
             raise ValueError(f"{backend} is not a valid backend type. Choose backend from {BackendType.valid_types()}")
 
         # Log AEC status
-        if self.audio_processor and self.audio_processor.aec_processor:
-            aec_stats = self.audio_processor.aec_processor.get_stats()
+        if self.preprocessing.enable_aec:
+            aec_stats = create_aec_processor(sample_rate=self.RATE, design=self.preprocessing.aec).get_stats()
             logging.info("🎯 Hybrid AEC Status:")
             if aec_stats.get('enabled'):
                 logging.info(f"   • AEC Type: {aec_stats.get('type', 'Unknown')}")
@@ -636,7 +885,14 @@ class TranscriptionServer:
             logging.warning("⚠️ AEC not available - audio processing without echo cancellation")
             logging.warning("💡 Install webrtc-audio-processing for full AEC support")
 
+        if preload is not None:
+            self.preload_models(
+                BackendType(backend), preload, faster_whisper_custom_model_path,
+                whisper_tensorrt_path, trt_multilingual, trt_py_session,
+            )
+
         logging.info(f"🚀 Starting WhisperLive server on {host}:{port} with {backend} backend")
+        self.ready = True
 
         with serve(
             functools.partial(
@@ -648,10 +904,64 @@ class TranscriptionServer:
                 trt_py_session=trt_py_session,
             ),
             host,
-            port
+            port,
+            process_request=self.process_request,
         ) as server:
             server.serve_forever()
 
+    def preload_models(self, backend, models, faster_whisper_custom_model_path=None,
+                       whisper_tensorrt_path=None, trt_multilingual=False, trt_py_session=False):
+        """
+        Load models into the model registry and warm them up, so the first clients do not wait for
+        downloads, conversion, loading or cold first passes.
+
+        Args:
+            backend (BackendType): The backend the server runs.
+            models (list): Models to preload, the backend's default model if empty.
+            faster_whisper_custom_model_path (str): Custom faster_whisper model, the default when set.
+            whisper_tensorrt_path (str): TensorRT engine, the only model of the tensorrt backend.
+            trt_multilingual (bool): Whether the TensorRT engine is multilingual.
+            trt_py_session (bool): Whether the TensorRT engine runs with the python session.
+        """
+        start = time.time()
+        if backend.is_tensorrt():
+            from whisper_live.backend.trt_backend import ServeClientTensorRT
+            logging.info(f"🔄 Preloading TensorRT engine {whisper_tensorrt_path}")
+            ServeClientTensorRT.preload(whisper_tensorrt_path, trt_multilingual, trt_py_session)
+        elif backend.is_openvino():
+            from whisper_live.backend.openvino_backend import ServeClientOpenVINO
+            for model in models or ["OpenVINO/whisper-tiny-fp16-ov"]:
+                logging.info(f"🔄 Preloading OpenVINO model {model}")
+                ServeClientOpenVINO.preload(model)
+        else:
+            if not models:
+                models = [faster_whisper_custom_model_path or "base"]
+            if self.process_pool is not None:
+                logging.info(f"🔄 Preloading faster_whisper models {models} in every inference worker")
+                self.process_pool.preload(models, concurrency=self.model_concurrency)
+                logging.info(f"✅ Models preloaded and warmed up in {time.time() - start:.1f}s")
+                return
+            from whisper_live.backend.faster_whisper_backend import ServeClientFasterWhisper
+            for model in models:
+                logging.info(f"🔄 Preloading faster_whisper model {model}")
+                ServeClientFasterWhisper.preload(
+                    model, cache_path=self.cache_path, concurrency=self.model_concurrency
+                )
+        logging.info(f"✅ Models preloaded and warmed up in {time.time() - start:.1f}s")
+
+    def process_request(self, connection, request):
+        """
+        Answer plain HTTP health checks on `/health` before the websocket handshake.
+
+        Returns 200 once models are preloaded and warmed up, so a load balancer never routes
+        clients to a cold node. Any other path continues with the websocket handshake.
+        """
+        if request.path != "/health":
+            return None
+        if self.ready:
+            return connection.respond(HTTPStatus.OK, "OK\n")
+        return connection.respond(HTTPStatus.SERVICE_UNAVAILABLE, "LOADING\n")
+
     def voice_activity(self, websocket, frame_np):
         """
         Evaluates the voice activity in a given audio frame and manages the state of voice activity detection.
@@ -676,7 +986,7 @@ class TranscriptionServer:
         if frame_np.dtype != np.float32:
             frame_np = frame_np.astype(np.float32)
         
-        if not self.vad_detector(frame_np):
+        if not self.vad_detectors[websocket](frame_np):
             self.no_voice_activity_chunks += 1
             if self.no_voice_activity_chunks > 3:
                 client = self.client_manager.get_client(websocket)
@@ -702,4 +1012,19 @@ class TranscriptionServer:
             if hasattr(client, 'translation_thread') and client.translation_thread:
                 client.translation_thread.join(timeout=2.0)
             self.client_manager.remove_client(websocket)
+            self.log_preprocessing_status()
+        vad_detector = self.vad_detectors.pop(websocket, None)
+        if vad_detector is not None:
+            vad_detector.close()
+        self.uplink_decoders.pop(websocket, None)
+
+    def log_preprocessing_status(self):
+        """Log the preprocessing statistics of the connected clients."""
+        stats = self.client_manager.preprocessing_stats()
+        if stats["sessions"] == 0:
+            return
+        logging.info(
+            f"🎛️ Preprocessing status: {stats['sessions']} sessions, {stats['audio_seconds']:.1f}s of audio, "
+            f"RTF {stats['real_time_factor']:.4f}, {stats['aec_errors']} AEC errors"
+        )
 
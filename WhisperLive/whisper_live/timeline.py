@@ -0,0 +1,65 @@
+import bisect
+import threading
+
+
+class TimelineMap(object):
+    """
+    Maps positions in a session's audio buffer to positions in the original client stream.
+
+    When an ingest gate drops silence, the session audio is a concatenation of runs of the stream. Each
+    run is recorded as a break: the session position where it starts and the stream position of its first
+    sample. Within a run both advance together, so a session position maps to the stream by adding the
+    offset of its run. Without breaks the map is the identity.
+    """
+
+    MAX_BREAKS = 4096
+    """Breaks kept; older ones are dropped, they are far behind the audio still retained by the session."""
+
+    def __init__(self):
+        self.sessions = [0]
+        self.offsets = [0]
+        self.lock = threading.Lock()
+
+    def add(self, session_position, stream_position):
+        """
+        Record that the session samples from `session_position` on continue the stream at `stream_position`.
+
+        Args:
+            session_position (int): Session buffer position of the first sample of the run.
+            stream_position (int): Stream position of that sample.
+        """
+        offset = int(stream_position) - int(session_position)
+        with self.lock:
+            if offset == self.offsets[-1]:
+                return
+            if session_position == self.sessions[-1]:
+                # the previous run is empty
+                self.offsets[-1] = offset
+            else:
+                self.sessions.append(int(session_position))
+                self.offsets.append(offset)
+            if len(self.sessions) > self.MAX_BREAKS:
+                del self.sessions[:self.MAX_BREAKS // 2]
+                del self.offsets[:self.MAX_BREAKS // 2]
+
+    def offset(self, session_position, end=False):
+        """
+        Stream position minus session position for a position in the session audio.
+
+        Args:
+            session_position (float): Position in samples, fractional positions are allowed.
+            end (bool, optional): The position ends a span: at a break it belongs to the run before. Defaults to False.
+
+        Returns:
+            int: Offset, in samples, to add to the position.
+        """
+        with self.lock:
+            if end:
+                i = bisect.bisect_left(self.sessions, session_position) - 1
+            else:
+                i = bisect.bisect_right(self.sessions, session_position) - 1
+            return self.offsets[max(i, 0)]
+
+    def to_stream(self, session_position, end=False):
+        """Stream position of a session position, see `offset`."""
+        return session_position + self.offset(session_position, end)
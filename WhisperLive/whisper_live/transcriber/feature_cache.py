@@ -0,0 +1,196 @@
+import functools
+import logging
+
+import numpy as np
+
+
+def align_speech_chunks(speech_chunks, hop_length, num_samples):
+    """
+    Snap VAD speech chunks outwards to the feature hop grid.
+
+    Keeping every chunk boundary on the hop grid lets the frames inside each chunk be taken from the
+    streaming feature cache after the chunks are concatenated. Chunks grow by less than one hop on
+    each side and never overlap.
+
+    Args:
+        speech_chunks (list): Chunks with "start" and "end" sample indices, as returned by `get_speech_timestamps`.
+        hop_length (int): Hop length of the feature extractor, in samples.
+        num_samples (int): Length of the audio the chunks refer to.
+
+    Returns:
+        list: The aligned chunks.
+    """
+    aligned = []
+    for chunk in speech_chunks:
+        start = chunk["start"] - chunk["start"] % hop_length
+        end = min(num_samples, -(-chunk["end"] // hop_length) * hop_length)
+        if aligned and start < aligned[-1]["end"]:
+            start = aligned[-1]["end"]
+        if end > start:
+            aligned.append({"start": start, "end": end})
+    return aligned
+
+
+class StreamingFeatureExtractor(object):
+    """
+    Incremental log-mel features for one streaming session.
+
+    Log-mel frames are computed once for every hop of the session audio, on the absolute hop grid of
+    the session's `AudioRingBuffer`, and kept in a frame ring of the same duration. A transcription
+    window then only computes the frames that depend on its own boundaries (reflect padding at the
+    start, zero padding at the end, junctions between VAD chunks) and copies the rest from the cache.
+    The result matches `FeatureExtractor.__call__` on the same window.
+    """
+
+    def __init__(self, feature_extractor, audio_buffer):
+        """
+        Initialize the cache for a session.
+
+        Args:
+            feature_extractor (FeatureExtractor): The model's feature extractor, used for its parameters
+                and as a fallback for windows that are not on the hop grid.
+            audio_buffer (AudioRingBuffer): The session audio buffer the cache follows.
+        """
+        self.feature_extractor = feature_extractor
+        self.audio_buffer = audio_buffer
+        self.hop_length = feature_extractor.hop_length
+        self.n_fft = feature_extractor.n_fft
+        self.half_window = self.n_fft // 2
+        self.mel_filters = feature_extractor.mel_filters
+        self.window = np.hanning(self.n_fft + 1)[:-1].astype("float32")
+
+        self.capacity = audio_buffer.capacity // self.hop_length
+        self.frames = np.zeros((self.mel_filters.shape[0], 2 * self.capacity), dtype=np.float32)
+        self.first = 0
+        """Absolute index of the oldest cached frame."""
+        self.next = 0
+        """Absolute index one past the newest cached frame."""
+
+    def log_mel(self, frames):
+        """
+        Raw log10 mel energies of windowed STFT frames, before the dynamic range clamp.
+
+        Args:
+            frames (np.ndarray): Array of shape (num_frames, n_fft).
+
+        Returns:
+            np.ndarray: Array of shape (n_mels, num_frames).
+        """
+        stft = np.fft.rfft(frames * self.window, n=self.n_fft, axis=-1).astype("complex64")
+        magnitudes = np.abs(stft.T) ** 2
+        mel_spec = self.mel_filters @ magnitudes
+        return np.log10(np.clip(mel_spec, a_min=1e-10, a_max=None))
+
+    def strided_frames(self, samples, num_frames):
+        return np.lib.stride_tricks.as_strided(
+            samples,
+            (num_frames, self.n_fft),
+            (self.hop_length * samples.strides[0], samples.strides[0]),
+            writeable=False,
+        )
+
+    def update(self):
+        """
+        Compute the frames for audio appended since the last call.
+
+        A frame is cached once the whole STFT window around its center has arrived, so it never
+        changes afterwards.
+        """
+        buffer = self.audio_buffer
+        hop, half = self.hop_length, self.half_window
+        first_available = -(-(buffer.start + half) // hop)
+        last = (buffer.end - half) // hop
+        if self.next < first_available:
+            # the cache fell behind the retained audio
+            self.first = self.next = first_available
+        if last < self.next:
+            return
+
+        # compute at most `capacity` frames, older ones would be overwritten right away
+        begin = max(self.next, last + 1 - self.capacity)
+        samples = np.ascontiguousarray(buffer.view(begin * hop - half, last * hop + half), dtype=np.float32)
+        raw = self.log_mel(self.strided_frames(samples, last + 1 - begin))
+        self.store(begin, raw)
+
+        if begin > self.next:
+            self.first = begin
+        self.next = last + 1
+        self.first = max(self.first, self.next - self.capacity)
+
+    def store(self, begin, raw):
+        n = raw.shape[1]
+        pos = begin % self.capacity
+        first = min(n, self.capacity - pos)
+        for offset in (0, self.capacity):
+            self.frames[:, offset + pos:offset + pos + first] = raw[:, :first]
+            self.frames[:, offset:offset + n - first] = raw[:, first:]
+
+    def cached(self, begin, end):
+        """Zero-copy view of the cached raw frames `[begin, end)`."""
+        pos = begin % self.capacity
+        return self.frames[:, pos:pos + end - begin]
+
+    def features(self, start, audio, speech_chunks=None):
+        """
+        Log-mel features of a window of the session audio.
+
+        Args:
+            start (int): Absolute index, in the session audio buffer, of the first sample of the window.
+            audio (np.ndarray): The audio given to the model, i.e. the window itself or the concatenation
+                of its VAD speech chunks.
+            speech_chunks (list, optional): The speech chunks, relative to the window, `audio` was built from.
+
+        Returns:
+            np.ndarray: The same features `FeatureExtractor.__call__(audio)` returns.
+        """
+        hop, half = self.hop_length, self.half_window
+        if start % hop:
+            return self.feature_extractor(audio)
+
+        try:
+            self.update()
+        except Exception as e:
+            logging.warning(f"⚠️ Feature cache update failed, computing features from scratch: {e}")
+            return self.feature_extractor(audio)
+
+        num_samples = audio.shape[0]
+        num_frames = (num_samples + hop) // hop
+        spans = [(0, num_samples)] if speech_chunks is None else [(c["start"], c["end"]) for c in speech_chunks]
+
+        log_spec = np.empty((self.mel_filters.shape[0], num_frames), dtype=np.float32)
+        missing = np.ones(num_frames, dtype=bool)
+        offset = 0
+        for span_start, span_end in spans:
+            length = span_end - span_start
+            if (start + span_start - offset) % hop == 0:
+                # frames whose STFT window lies entirely inside this span
+                base = (start + span_start - offset) // hop
+                lo = max(-(-(offset + half) // hop), self.first - base)
+                hi = min((offset + length - half) // hop, num_frames - 1, self.next - 1 - base)
+                if hi >= lo:
+                    log_spec[:, lo:hi + 1] = self.cached(base + lo, base + hi + 1)
+                    missing[lo:hi + 1] = False
+            offset += length
+
+        indices = np.flatnonzero(missing)
+        if indices.size:
+            padded = np.pad(audio.astype(np.float32), (0, hop))
+            padded = np.pad(padded, (half, half), mode="reflect")
+            frames = self.strided_frames(padded, num_frames)[indices]
+            log_spec[:, indices] = self.log_mel(frames)
+
+        log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+        log_spec = (log_spec + 4.0) / 4.0
+        return log_spec
+
+    def provider(self, start):
+        """
+        Features provider for `WhisperModel.transcribe` for a window starting at the given absolute sample.
+
+        Args:
+            start (int): Absolute index of the first sample of the window.
+
+        Returns:
+            callable: Takes the model input audio and its speech chunks, returns its log-mel features.
+        """
+        return functools.partial(self.features, start)
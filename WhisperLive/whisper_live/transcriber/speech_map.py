@@ -0,0 +1,269 @@
+import numpy as np
+
+
+class StreamingSileroVAD(object):
+    """
+    The Silero VAD model of faster_whisper, fed incrementally.
+
+    The model takes a sequence of 512-sample windows, each preceded by the last 64 samples of the
+    previous one, and carries its recurrent state (h, c) through the sequence. Keeping h, c and the
+    context between calls makes several calls on consecutive audio return exactly the probabilities of
+    one call on the whole audio, so only new windows are ever evaluated.
+    """
+
+    WINDOW_SIZE = 512
+    CONTEXT_SIZE = 64
+
+    def __init__(self, session=None):
+        """
+        Args:
+            session (onnxruntime.InferenceSession, optional): The faster_whisper Silero VAD session.
+                Defaults to the one `faster_whisper.vad.get_vad_model` shares across the process.
+        """
+        if session is None:
+            from faster_whisper.vad import get_vad_model
+            session = get_vad_model().session
+        self.session = session
+        self.reset_states()
+
+    def reset_states(self):
+        self.h = np.zeros((1, 1, 128), dtype=np.float32)
+        self.c = np.zeros((1, 1, 128), dtype=np.float32)
+        self.context = np.zeros(self.CONTEXT_SIZE, dtype=np.float32)
+
+    def __call__(self, audio):
+        """
+        Speech probabilities of the windows following the previous call.
+
+        Args:
+            audio (np.ndarray): float32 samples, a whole number of windows.
+
+        Returns:
+            np.ndarray: One probability per window.
+        """
+        w, ctx = self.WINDOW_SIZE, self.CONTEXT_SIZE
+        windows = audio.reshape(-1, w)
+        batched = np.empty((len(windows), ctx + w), dtype=np.float32)
+        batched[:, ctx:] = windows
+        batched[0, :ctx] = self.context
+        batched[1:, :ctx] = windows[:-1, -ctx:]
+        out, self.h, self.c = self.session.run(None, {"input": batched, "h": self.h, "c": self.c})
+        self.context[:] = windows[-1, -ctx:]
+        return out.reshape(-1)
+
+
+class StreamingSpeechMap(object):
+    """
+    Incremental speech map of one streaming session.
+
+    Silero speech probabilities are computed once for every 512-sample window of the session audio, on
+    the absolute window grid of the session's `AudioRingBuffer`, by a streaming model whose state carries
+    from one window to the next. A transcription pass then turns the cached probabilities of its own
+    window into speech chunks with the same rules as `faster_whisper.vad.get_speech_timestamps`, instead
+    of classifying the whole buffer again.
+    """
+
+    WINDOW_SIZE = StreamingSileroVAD.WINDOW_SIZE
+
+    def __init__(self, audio_buffer, model=None, sampling_rate=16000):
+        """
+        Initialize the map for a session.
+
+        Args:
+            audio_buffer (AudioRingBuffer): The session audio buffer the map follows.
+            model (StreamingSileroVAD, optional): Streaming model of this session. Defaults to a new one.
+            sampling_rate (int, optional): Sample rate of the session audio. Defaults to 16000.
+        """
+        self.audio_buffer = audio_buffer
+        self.model = model if model is not None else StreamingSileroVAD()
+        self.sampling_rate = sampling_rate
+        self.capacity = audio_buffer.capacity // self.WINDOW_SIZE + 1
+        self.probs = np.zeros(self.capacity, dtype=np.float32)
+        self.first = 0
+        """Absolute index of the oldest cached window."""
+        self.next = 0
+        """Absolute index one past the newest cached window."""
+        self.windows_classified = 0
+
+    def update(self):
+        """Classify the windows completed since the last call, in one model call."""
+        buffer, w = self.audio_buffer, self.WINDOW_SIZE
+        first_available = -(-buffer.start // w)
+        last = buffer.end // w
+        if self.next < first_available:
+            # the map fell behind the retained audio, the model restarts from the oldest window kept
+            self.model.reset_states()
+            self.first = self.next = first_available
+        if last <= self.next:
+            return
+
+        probs = self.model(buffer.view(self.next * w, last * w))
+        for k, prob in enumerate(probs, self.next):
+            self.probs[k % self.capacity] = prob
+        self.windows_classified += last - self.next
+        self.next = last
+        self.first = max(self.first, self.next - self.capacity)
+
+    def speech_chunks(self, start, end, vad_options):
+        """
+        Speech chunks of a transcription window, relative to its first sample.
+
+        Windows straddling the start of the transcription window count from its first sample, and a
+        trailing partial window that is not classified yet is treated like the end of the audio.
+
+        Args:
+            start (int): Absolute index of the first sample of the window.
+            end (int): Absolute index one past its last sample.
+            vad_options (VadOptions): The VAD parameters of the pass.
+
+        Returns:
+            list: Chunks with "start" and "end" sample indices, like `get_speech_timestamps` on the window.
+        """
+        self.update()
+        w = self.WINDOW_SIZE
+        first = max(self.first, start // w)
+        last = min(self.next, -(-end // w))
+        positions = [max(0, k * w - start) for k in range(first, last)]
+        probs = [self.probs[k % self.capacity] for k in range(first, last)]
+        return speech_timestamps(probs, positions, end - start, vad_options, self.sampling_rate)
+
+    def get_stats(self):
+        return {"windows_classified": self.windows_classified}
+
+
+def speech_timestamps(speech_probs, positions, num_samples, vad_options, sampling_rate=16000):
+    """
+    Speech chunks from per-window speech probabilities, the decision rules of `get_speech_timestamps`.
+
+    Args:
+        speech_probs (list): Speech probability of each window.
+        positions (list): Sample index of each window's start within the audio.
+        num_samples (int): Length of the audio.
+        vad_options (VadOptions): Threshold, durations and padding.
+        sampling_rate (int, optional): Defaults to 16000.
+
+    Returns:
+        list: Chunks with "start" and "end" sample indices.
+    """
+    threshold = vad_options.threshold
+    neg_threshold = getattr(vad_options, "neg_threshold", None)
+    if neg_threshold is None:
+        neg_threshold = max(threshold - 0.15, 0.01)
+    window_size = StreamingSpeechMap.WINDOW_SIZE
+    min_speech_samples = sampling_rate * vad_options.min_speech_duration_ms / 1000
+    speech_pad_samples = sampling_rate * vad_options.speech_pad_ms / 1000
+    max_speech_samples = sampling_rate * vad_options.max_speech_duration_s - window_size - 2 * speech_pad_samples
+    min_silence_samples = sampling_rate * vad_options.min_silence_duration_ms / 1000
+    min_silence_samples_at_max_speech = sampling_rate * 98 / 1000
+
+    triggered = False
+    speeches = []
+    current_speech = {}
+    temp_end = 0
+    prev_end = next_start = 0
+
+    for speech_prob, position in zip(speech_probs, positions):
+        if (speech_prob >= threshold) and temp_end:
+            temp_end = 0
+            if next_start < prev_end:
+                next_start = position
+
+        if (speech_prob >= threshold) and not triggered:
+            triggered = True
+            current_speech["start"] = position
+            continue
+
+        if triggered and position - current_speech["start"] > max_speech_samples:
+            if prev_end:
+                current_speech["end"] = prev_end
+                speeches.append(current_speech)
+                current_speech = {}
+                # previously reached silence (< neg_thres) and is still not speech (< thres)
+                if next_start < prev_end:
+                    triggered = False
+                else:
+                    current_speech["start"] = next_start
+                prev_end = next_start = temp_end = 0
+            else:
+                current_speech["end"] = position
+                speeches.append(current_speech)
+                current_speech = {}
+                prev_end = next_start = temp_end = 0
+                triggered = False
+                continue
+
+        if (speech_prob < neg_threshold) and triggered:
+            if not temp_end:
+                temp_end = position
+            # condition to avoid cutting in very short silence
+            if position - temp_end > min_silence_samples_at_max_speech:
+                prev_end = temp_end
+            if position - temp_end < min_silence_samples:
+                continue
+            current_speech["end"] = temp_end
+            if (current_speech["end"] - current_speech["start"]) > min_speech_samples:
+                speeches.append(current_speech)
+            current_speech = {}
+            prev_end = next_start = temp_end = 0
+            triggered = False
+            continue
+
+    if current_speech and (num_samples - current_speech["start"]) > min_speech_samples:
+        current_speech["end"] = num_samples
+        speeches.append(current_speech)
+
+    for i, speech in enumerate(speeches):
+        if i == 0:
+            speech["start"] = int(max(0, speech["start"] - speech_pad_samples))
+        if i != len(speeches) - 1:
+            silence_duration = speeches[i + 1]["start"] - speech["end"]
+            if silence_duration < 2 * speech_pad_samples:
+                speech["end"] += int(silence_duration // 2)
+                speeches[i + 1]["start"] = int(max(0, speeches[i + 1]["start"] - silence_duration // 2))
+            else:
+                speech["end"] = int(min(num_samples, speech["end"] + speech_pad_samples))
+                speeches[i + 1]["start"] = int(max(0, speeches[i + 1]["start"] - speech_pad_samples))
+        else:
+            speech["end"] = int(min(num_samples, speech["end"] + speech_pad_samples))
+
+    return speeches
+
+
+def backlog_clips(speech_chunks, num_samples, max_samples, min_gap=8000):
+    """
+    Group the speech of a session's backlog into clips for one batched transcription call.
+
+    Chunks less than `min_gap` samples apart go into the same clip and clips are split to at most
+    `max_samples`. Speech still going on at the end of the backlog may continue after it, so it is
+    left to the streaming passes, except for whole `max_samples` pieces of it.
+
+    Args:
+        speech_chunks (list): Chunks with "start" and "end" sample indices, in order.
+        num_samples (int): Length of the backlog.
+        max_samples (int): Maximum length of a clip, the model's window.
+        min_gap (int, optional): Silence (in samples) separating two clips. Defaults to 0.5s at 16kHz.
+
+    Returns:
+        tuple: The clips, with "start" and "end" sample indices, and the number of samples of the
+            backlog they account for, where streaming passes take over.
+    """
+    clips = []
+    for chunk in speech_chunks:
+        if clips and chunk["start"] - clips[-1]["end"] < min_gap:
+            clips[-1]["end"] = max(clips[-1]["end"], chunk["end"])
+        else:
+            clips.append({"start": chunk["start"], "end": chunk["end"]})
+
+    consumed = num_samples
+    if clips and num_samples - clips[-1]["end"] < min_gap:
+        last = clips.pop()
+        whole = (last["end"] - last["start"]) // max_samples * max_samples
+        if whole:
+            clips.append({"start": last["start"], "end": last["start"] + whole})
+        consumed = last["start"] + whole
+
+    split = []
+    for clip in clips:
+        for start in range(clip["start"], clip["end"], max_samples):
+            split.append({"start": start, "end": min(clip["end"], start + max_samples)})
+    return split, consumed
@@ -9,7 +9,7 @@ import zlib
 from dataclasses import asdict, dataclass
 from inspect import signature
 from math import ceil
-from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
+from typing import BinaryIO, Callable, Iterable, List, Optional, Tuple, Union
 from warnings import warn
 
 import ctranslate2
@@ -29,6 +29,8 @@ from faster_whisper.vad import (
     get_speech_timestamps,
 )
 
+from whisper_live.transcriber.feature_cache import align_speech_chunks
+
 # merge_segments is not available in faster-whisper 1.2.1, so we implement it
 def merge_segments(segments: List[dict], vad_options: Optional[VadOptions] = None) -> List[dict]:
     """
@@ -689,6 +691,7 @@ class WhisperModel:
                 local_files_only=local_files_only,
                 cache_dir=download_root,
             )
+        self.model_path = model_path
 
         self.model = ctranslate2.models.Whisper(
             model_path,
@@ -792,6 +795,8 @@ class WhisperModel:
         hotwords: Optional[str] = None,
         language_detection_threshold: Optional[float] = 0.5,
         language_detection_segments: int = 1,
+        features_provider: Optional[Callable] = None,
+        speech_chunks: Optional[List[dict]] = None,
     ) -> Tuple[Iterable[Segment], TranscriptionInfo]:
         """Transcribes an input file.
 
@@ -861,6 +866,12 @@ class WhisperModel:
           language_detection_threshold: If the maximum probability of the language tokens is higher
            than this value, the language is detected.
           language_detection_segments: Number of segments to consider for the language detection.
+          features_provider: Optional callable computing the log-mel features of the (VAD filtered)
+            audio from the audio and its speech chunks, e.g. a streaming feature cache. VAD chunks
+            are aligned to the feature hop grid when it is set.
+          speech_chunks: Optional speech chunks of the audio ("start" and "end" sample indices), e.g.
+            from a session's streaming speech map. Used instead of running the VAD model when
+            vad_filter is set.
         Returns:
           A tuple with:
 
@@ -887,17 +898,13 @@ class WhisperModel:
         )
 
         if vad_filter and clip_timestamps == "0":
-            if vad_parameters is None:
-                vad_parameters = VadOptions()
-            elif isinstance(vad_parameters, dict):
-                # Filter out invalid parameters (like 'onset' from older versions)
-                valid_vad_params = {
-                    'threshold', 'neg_threshold', 'min_speech_duration_ms',
-                    'max_speech_duration_s', 'min_silence_duration_ms', 'speech_pad_ms'
-                }
-                filtered_params = {k: v for k, v in vad_parameters.items() if k in valid_vad_params}
-                vad_parameters = VadOptions(**filtered_params)
-            speech_chunks = get_speech_timestamps(audio, vad_parameters)
+            vad_parameters = self._get_vad_options(vad_parameters)
+            if speech_chunks is None:
+                speech_chunks = get_speech_timestamps(audio, vad_parameters)
+            if features_provider is not None:
+                speech_chunks = align_speech_chunks(
+                    speech_chunks, self.feature_extractor.hop_length, audio.shape[0]
+                )
             audio_chunks, chunks_metadata = collect_chunks(audio, speech_chunks)
             audio = np.concatenate(audio_chunks, axis=0)
             duration_after_vad = audio.shape[0] / sampling_rate
@@ -924,7 +931,10 @@ class WhisperModel:
             speech_chunks = None
         if audio.shape[0] == 0:
             return None, None
-        features = self.feature_extractor(audio, chunk_length=chunk_length)
+        if features_provider is not None and chunk_length is None:
+            features = features_provider(audio, speech_chunks)
+        else:
+            features = self.feature_extractor(audio, chunk_length=chunk_length)
 
         encoder_output = None
         all_language_probs = None
@@ -1032,6 +1042,450 @@ class WhisperModel:
 
         return segments, info
 
+    def transcribe_batch(
+        self,
+        audios: List[np.ndarray],
+        languages: Optional[List[Optional[str]]] = None,
+        task: str = "transcribe",
+        beam_size: int = 5,
+        best_of: int = 5,
+        patience: float = 1,
+        length_penalty: float = 1,
+        repetition_penalty: float = 1,
+        no_repeat_ngram_size: int = 0,
+        temperature: Union[float, List[float], Tuple[float, ...]] = [
+            0.0,
+            0.2,
+            0.4,
+            0.6,
+            0.8,
+            1.0,
+        ],
+        compression_ratio_threshold: Optional[float] = 2.4,
+        log_prob_threshold: Optional[float] = -1.0,
+        no_speech_threshold: Optional[float] = 0.6,
+        initial_prompt: Optional[Union[str, Iterable[int]]] = None,
+        suppress_blank: bool = True,
+        suppress_tokens: Optional[List[int]] = [-1],
+        without_timestamps: bool = False,
+        max_initial_timestamp: float = 1.0,
+        word_timestamps: bool = False,
+        prepend_punctuations: str = "\"'“¿([{-",
+        append_punctuations: str = "\"'.。,，!！?？:：”)]}、",
+        vad_filter: bool = False,
+        vad_parameters: Optional[Union[dict, VadOptions]] = None,
+        max_new_tokens: Optional[int] = None,
+        initial_prompts: Optional[List[Optional[Union[str, Iterable[int]]]]] = None,
+        features_providers: Optional[List[Optional[Callable]]] = None,
+        speech_chunk_lists: Optional[List[Optional[List[dict]]]] = None,
+    ) -> List[Tuple[Optional[List[Segment]], Optional[TranscriptionInfo]]]:
+        """Transcribes several short streaming windows with one batched encoder/decoder pass.
+
+        This is the entry point used by the live server to serve many sessions sharing one
+        model. Each window must fit in a single 30 second chunk after VAD; longer windows fall
+        back to `transcribe`. The first temperature is decoded for the whole batch, windows
+        that need a temperature fallback are re-decoded on their own.
+
+        Arguments:
+          audios: The audio waveforms, one per session.
+          languages: The language of each waveform, None entries are detected from the
+            batched encoder output.
+          initial_prompts: Optional prompt of each waveform, overriding `initial_prompt`. Prompts
+            are truncated to the length of the shortest one, CTranslate2 needs the
+            <|startoftranscript|> token at the same position in the whole batch.
+          features_providers: Optional features provider of each waveform, see `transcribe`.
+          speech_chunk_lists: Optional precomputed speech chunks of each waveform, see `transcribe`.
+          The remaining arguments have the same meaning as in `transcribe` and are shared by
+          every window in the batch.
+
+        Returns:
+          A list with one (segments, info) tuple per input waveform. Both values are None when
+          the waveform is empty after VAD, like `transcribe`.
+        """
+        if languages is None:
+            languages = [None] * len(audios)
+        if features_providers is None:
+            features_providers = [None] * len(audios)
+        if speech_chunk_lists is None:
+            speech_chunk_lists = [None] * len(audios)
+        if initial_prompts is None:
+            initial_prompts = [initial_prompt] * len(audios)
+
+        kwargs = dict(
+            task=task,
+            beam_size=beam_size,
+            best_of=best_of,
+            patience=patience,
+            length_penalty=length_penalty,
+            repetition_penalty=repetition_penalty,
+            no_repeat_ngram_size=no_repeat_ngram_size,
+            temperature=temperature,
+            compression_ratio_threshold=compression_ratio_threshold,
+            log_prob_threshold=log_prob_threshold,
+            no_speech_threshold=no_speech_threshold,
+            suppress_blank=suppress_blank,
+            suppress_tokens=suppress_tokens,
+            without_timestamps=without_timestamps,
+            max_initial_timestamp=max_initial_timestamp,
+            word_timestamps=word_timestamps,
+            prepend_punctuations=prepend_punctuations,
+            append_punctuations=append_punctuations,
+            vad_filter=vad_filter,
+            vad_parameters=vad_parameters,
+            max_new_tokens=max_new_tokens,
+        )
+
+        def transcribe_one(index):
+            segments, info = self.transcribe(
+                audios[index],
+                language=languages[index],
+                initial_prompt=initial_prompts[index],
+                features_provider=features_providers[index],
+                speech_chunks=speech_chunk_lists[index],
+                **kwargs,
+            )
+            return (list(segments) if segments is not None else None), info
+
+        if len(audios) == 1:
+            return [transcribe_one(0)]
+
+        sampling_rate = self.feature_extractor.sampling_rate
+        vad_options = self._get_vad_options(vad_parameters) if vad_filter else None
+
+        results = [None] * len(audios)
+        pending = []
+        for index, audio in enumerate(audios):
+            duration = audio.shape[0] / sampling_rate
+            speech_chunks = None
+            features_provider = features_providers[index]
+            if vad_filter:
+                speech_chunks = speech_chunk_lists[index]
+                if speech_chunks is None:
+                    speech_chunks = get_speech_timestamps(audio, vad_options)
+                if features_provider is not None:
+                    speech_chunks = align_speech_chunks(
+                        speech_chunks, self.feature_extractor.hop_length, audio.shape[0]
+                    )
+                audio_chunks, _ = collect_chunks(audio, speech_chunks)
+                audio = np.concatenate(audio_chunks, axis=0)
+
+            if audio.shape[0] == 0:
+                results[index] = (None, None)
+            elif audio.shape[0] > self.feature_extractor.n_samples:
+                results[index] = transcribe_one(index)
+            else:
+                if features_provider is not None:
+                    features = features_provider(audio, speech_chunks)
+                else:
+                    features = self.feature_extractor(audio)
+                pending.append(
+                    dict(
+                        index=index,
+                        features=features,
+                        content_frames=features.shape[-1] - 1,
+                        speech_chunks=speech_chunks,
+                        duration=duration,
+                        duration_after_vad=audio.shape[0] / sampling_rate,
+                    )
+                )
+
+        if not pending:
+            return results
+
+        batch_languages = []
+        for item in pending:
+            language = languages[item["index"]]
+            if language is not None and not self.model.is_multilingual and language != "en":
+                language = "en"
+            if language is None and not self.model.is_multilingual:
+                language = "en"
+            batch_languages.append(language)
+
+        if word_timestamps and len(set(batch_languages)) > 1:
+            # the alignment heads are driven by a single sot sequence
+            for item in pending:
+                results[item["index"]] = transcribe_one(item["index"])
+            return results
+
+        segments_batch = np.stack(
+            [pad_or_trim(item["features"][:, : item["content_frames"]]) for item in pending]
+        )
+        encoder_output = self.encode(segments_batch)
+
+        all_language_probs = [None] * len(pending)
+        language_probabilities = [1] * len(pending)
+        if any(language is None for language in batch_languages):
+            detected = self.model.detect_language(encoder_output)
+            for i, language in enumerate(batch_languages):
+                if language is None:
+                    all_language_probs[i] = [
+                        (token[2:-2], prob) for (token, prob) in detected[i]
+                    ]
+                    batch_languages[i], language_probabilities[i] = all_language_probs[i][0]
+                    self.logger.info(
+                        "Detected language '%s' with probability %.2f",
+                        batch_languages[i],
+                        language_probabilities[i],
+                    )
+
+        tokenizers = {}
+        for language in batch_languages:
+            if language not in tokenizers:
+                tokenizers[language] = Tokenizer(
+                    self.hf_tokenizer,
+                    self.model.is_multilingual,
+                    task=task,
+                    language=language,
+                )
+        tokenizer = tokenizers[batch_languages[0]]
+
+        options = TranscriptionOptions(
+            beam_size=beam_size,
+            best_of=best_of,
+            patience=patience,
+            length_penalty=length_penalty,
+            repetition_penalty=repetition_penalty,
+            no_repeat_ngram_size=no_repeat_ngram_size,
+            log_prob_threshold=log_prob_threshold,
+            no_speech_threshold=no_speech_threshold,
+            compression_ratio_threshold=compression_ratio_threshold,
+            condition_on_previous_text=False,
+            prompt_reset_on_temperature=0.5,
+            temperatures=(
+                temperature if isinstance(temperature, (list, tuple)) else [temperature]
+            ),
+            initial_prompt=initial_prompt,
+            prefix=None,
+            suppress_blank=suppress_blank,
+            suppress_tokens=(
+                get_suppressed_tokens(tokenizer, list(suppress_tokens))
+                if suppress_tokens
+                else suppress_tokens
+            ),
+            without_timestamps=without_timestamps,
+            max_initial_timestamp=max_initial_timestamp,
+            word_timestamps=word_timestamps,
+            prepend_punctuations=prepend_punctuations,
+            append_punctuations=append_punctuations,
+            multilingual=False,
+            max_new_tokens=max_new_tokens,
+            clip_timestamps="0",
+            hallucination_silence_threshold=None,
+            hotwords=None,
+        )
+
+        batch_previous_tokens = []
+        for item in pending:
+            item_prompt = initial_prompts[item["index"]]
+            if item_prompt is None:
+                batch_previous_tokens.append([])
+            elif isinstance(item_prompt, str):
+                batch_previous_tokens.append(tokenizer.encode(" " + item_prompt.strip()))
+            else:
+                batch_previous_tokens.append(list(item_prompt))
+        # get_prompt keeps at most max_length // 2 - 1 previous tokens, then all prompts are cut to
+        # the same length so they only differ by their language and text tokens
+        num_previous = min(
+            min(len(tokens) for tokens in batch_previous_tokens), self.max_length // 2 - 1
+        )
+        prompts = [
+            self.get_prompt(
+                tokenizers[language],
+                previous_tokens[len(previous_tokens) - num_previous:],
+                without_timestamps=options.without_timestamps,
+            )
+            for language, previous_tokens in zip(batch_languages, batch_previous_tokens)
+        ]
+
+        if options.max_new_tokens is not None:
+            max_length = len(prompts[0]) + options.max_new_tokens
+        else:
+            max_length = self.max_length
+        if max_length > self.max_length:
+            raise ValueError(
+                f"The combined length of the prompt and `max_new_tokens` ({max_length}) "
+                f"exceeds the `max_length` of the Whisper model: {self.max_length}."
+            )
+
+        first_temperature = options.temperatures[0]
+        if first_temperature > 0:
+            sampling_kwargs = {
+                "beam_size": 1,
+                "num_hypotheses": options.best_of,
+                "sampling_topk": 0,
+                "sampling_temperature": first_temperature,
+            }
+        else:
+            sampling_kwargs = {
+                "beam_size": options.beam_size,
+                "patience": options.patience,
+            }
+
+        generated = self.model.generate(
+            encoder_output,
+            prompts,
+            length_penalty=options.length_penalty,
+            repetition_penalty=options.repetition_penalty,
+            no_repeat_ngram_size=options.no_repeat_ngram_size,
+            max_length=max_length,
+            return_scores=True,
+            return_no_speech_prob=True,
+            suppress_blank=options.suppress_blank,
+            suppress_tokens=options.suppress_tokens,
+            max_initial_timestamp_index=int(
+                round(options.max_initial_timestamp / self.time_precision)
+            ),
+            **sampling_kwargs,
+        )
+
+        batch_segments = []
+        for i, (item, result) in enumerate(zip(pending, generated)):
+            item_tokenizer = tokenizers[batch_languages[i]]
+            tokens = result.sequences_ids[0]
+            seq_len = len(tokens)
+            avg_logprob = result.scores[0] * (seq_len**options.length_penalty) / (seq_len + 1)
+            compression_ratio = get_compression_ratio(item_tokenizer.decode(tokens).strip())
+            item_temperature = first_temperature
+
+            if len(options.temperatures) > 1 and self._needs_fallback(
+                options, result.no_speech_prob, avg_logprob, compression_ratio
+            ):
+                (
+                    result,
+                    avg_logprob,
+                    item_temperature,
+                    compression_ratio,
+                ) = self.generate_with_fallback(
+                    self.encode(segments_batch[i]), prompts[i], item_tokenizer, options
+                )
+                tokens = result.sequences_ids[0]
+
+            item.update(
+                result=result,
+                avg_logprob=avg_logprob,
+                temperature=item_temperature,
+                compression_ratio=compression_ratio,
+            )
+
+            current_segments = []
+            skip = (
+                options.no_speech_threshold is not None
+                and result.no_speech_prob > options.no_speech_threshold
+                and not (
+                    options.log_prob_threshold is not None
+                    and avg_logprob > options.log_prob_threshold
+                )
+            )
+            if not skip:
+                current_segments, _, _ = self._split_segments_by_timestamps(
+                    tokenizer=item_tokenizer,
+                    tokens=tokens,
+                    time_offset=0.0,
+                    segment_size=item["content_frames"],
+                    segment_duration=item["content_frames"] * self.feature_extractor.time_per_frame,
+                    seek=0,
+                )
+            if options.word_timestamps and not current_segments:
+                # keep the batch aligned with the encoder output
+                current_segments = [dict(seek=0, start=0.0, end=0.0, tokens=[])]
+            batch_segments.append(current_segments)
+
+        if options.word_timestamps:
+            self.add_word_timestamps(
+                batch_segments,
+                tokenizer,
+                encoder_output,
+                [item["content_frames"] for item in pending],
+                options.prepend_punctuations,
+                options.append_punctuations,
+                last_speech_timestamp=0.0,
+            )
+
+        for i, (item, current_segments) in enumerate(zip(pending, batch_segments)):
+            item_tokenizer = tokenizers[batch_languages[i]]
+            segments = []
+            for segment in current_segments:
+                text = item_tokenizer.decode(segment["tokens"])
+                if segment["start"] == segment["end"] or not text.strip():
+                    continue
+                segments.append(
+                    Segment(
+                        id=len(segments) + 1,
+                        seek=0,
+                        start=segment["start"],
+                        end=segment["end"],
+                        text=text,
+                        tokens=segment["tokens"],
+                        temperature=item["temperature"],
+                        avg_logprob=item["avg_logprob"],
+                        compression_ratio=item["compression_ratio"],
+                        no_speech_prob=item["result"].no_speech_prob,
+                        words=(
+                            [Word(**word) for word in segment["words"]]
+                            if options.word_timestamps
+                            else None
+                        ),
+                    )
+                )
+
+            if item["speech_chunks"]:
+                segments = restore_speech_timestamps(
+                    segments, item["speech_chunks"], sampling_rate
+                )
+
+            info = TranscriptionInfo(
+                language=batch_languages[i],
+                language_probability=language_probabilities[i],
+                duration=item["duration"],
+                duration_after_vad=item["duration_after_vad"],
+                transcription_options=options,
+                vad_options=vad_options,
+                all_language_probs=all_language_probs[i],
+            )
+            results[item["index"]] = (segments, info)
+
+        return results
+
+    @staticmethod
+    def _needs_fallback(
+        options: TranscriptionOptions,
+        no_speech_prob: float,
+        avg_logprob: float,
+        compression_ratio: float,
+    ) -> bool:
+        needs_fallback = False
+        if (
+            options.compression_ratio_threshold is not None
+            and compression_ratio > options.compression_ratio_threshold
+        ):
+            needs_fallback = True  # too repetitive
+        if (
+            options.log_prob_threshold is not None
+            and avg_logprob < options.log_prob_threshold
+        ):
+            needs_fallback = True  # average log probability is too low
+        if (
+            options.no_speech_threshold is not None
+            and no_speech_prob > options.no_speech_threshold
+            and options.log_prob_threshold is not None
+            and avg_logprob < options.log_prob_threshold
+        ):
+            needs_fallback = False  # silence
+        return needs_fallback
+
+    @staticmethod
+    def _get_vad_options(vad_parameters: Optional[Union[dict, VadOptions]]) -> VadOptions:
+        if vad_parameters is None:
+            return VadOptions()
+        if isinstance(vad_parameters, dict):
+            # Filter out invalid parameters (like 'onset' from older versions)
+            valid_vad_params = {
+                'threshold', 'neg_threshold', 'min_speech_duration_ms',
+                'max_speech_duration_s', 'min_silence_duration_ms', 'speech_pad_ms'
+            }
+            return VadOptions(**{k: v for k, v in vad_parameters.items() if k in valid_vad_params})
+        return vad_parameters
+
     def _split_segments_by_timestamps(
         self,
         tokenizer: Tokenizer,
@@ -13,11 +13,17 @@ class WhisperOpenVINO(object):
         model_path = os.path.join(cache_dir, model_path)
         if not os.path.exists(model_path):
             hf_hub.snapshot_download(model_id, local_dir=model_path)
+        self.model_path = model_path
         self.model = ov_genai.WhisperPipeline(str(model_path), device=device)
         self.language = language
         self.task = task
 
-    def transcribe(self, input_audio):
-        outputs = self.model.generate(input_audio, return_timestamps=True, language=self.language, task=self.task)
+    def transcribe(self, input_audio, language=None, task=None):
+        outputs = self.model.generate(
+            input_audio,
+            return_timestamps=True,
+            language=language or self.language,
+            task=task or self.task,
+        )
         outputs = [seg for seg in outputs.chunks]
         return outputs
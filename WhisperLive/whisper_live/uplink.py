@@ -0,0 +1,188 @@
+"""
+Encodings of the microphone audio a client streams to the server.
+
+A client picks one with the "audio_encoding" option, and the rate of its audio with "sample_rate":
+  - "float32": little-endian float32 samples, the default;
+  - "int16": little-endian 16-bit PCM, half the bandwidth;
+  - "opus": Opus packets, each prefixed with its length as a little-endian uint16, as many per message
+    as the encoder completed. Opus input rates are 8, 12, 16, 24 or 48 kHz.
+The server decodes and resamples every message to its own rate before preprocessing.
+"""
+import struct
+
+import av
+import numpy as np
+
+UPLINK_ENCODINGS = ("float32", "int16", "opus")
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+OPUS_LENGTH = struct.Struct("<H")
+
+
+def pack_opus_packets(packets):
+    """Concatenate Opus packets into one message, each prefixed with its length."""
+    chunks = []
+    for packet in packets:
+        packet = bytes(packet)
+        chunks.append(OPUS_LENGTH.pack(len(packet)))
+        chunks.append(packet)
+    return b"".join(chunks)
+
+
+def unpack_opus_packets(message):
+    """
+    Split a message built by `pack_opus_packets`.
+
+    Raises:
+        ValueError: The message is truncated.
+    """
+    packets, i = [], 0
+    while i < len(message):
+        if i + OPUS_LENGTH.size > len(message):
+            raise ValueError("Truncated Opus packet length")
+        (n,) = OPUS_LENGTH.unpack_from(message, i)
+        i += OPUS_LENGTH.size
+        if i + n > len(message):
+            raise ValueError("Truncated Opus packet")
+        packets.append(bytes(message[i:i + n]))
+        i += n
+    return packets
+
+
+def _check(encoding, sample_rate):
+    if encoding not in UPLINK_ENCODINGS:
+        raise ValueError(f"Unknown audio encoding '{encoding}', expected one of {UPLINK_ENCODINGS}")
+    if not isinstance(sample_rate, int) or sample_rate <= 0:
+        raise ValueError(f"Invalid sample rate {sample_rate!r}")
+    if encoding == "opus" and sample_rate not in OPUS_SAMPLE_RATES:
+        raise ValueError(f"Opus audio must be sampled at one of {OPUS_SAMPLE_RATES} Hz, not {sample_rate}")
+
+
+class UplinkEncoder(object):
+    """Client side: turns float32 microphone audio into messages of the negotiated encoding."""
+
+    def __init__(self, encoding="float32", sample_rate=16000, bit_rate=24000):
+        """
+        Args:
+            encoding (str, optional): One of `UPLINK_ENCODINGS`. Defaults to "float32".
+            sample_rate (int, optional): Sample rate of the audio. Defaults to 16000.
+            bit_rate (int, optional): Opus bit rate in bits per second. Defaults to 24000.
+
+        Raises:
+            ValueError: The encoding or the sample rate is not supported.
+        """
+        _check(encoding, sample_rate)
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.codec = None
+        self.pts = 0
+        if encoding == "opus":
+            self.codec = av.CodecContext.create("libopus", "w")
+            self.codec.sample_rate = sample_rate
+            self.codec.layout = "mono"
+            self.codec.format = "s16"
+            self.codec.bit_rate = bit_rate
+            self.codec.open()
+
+    def encode(self, samples):
+        """
+        Args:
+            samples (np.ndarray): float32 samples in [-1, 1].
+
+        Returns:
+            bytes: The message to send, empty when the Opus encoder has not completed a packet yet.
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.encoding == "float32":
+            return samples.astype("<f4", copy=False).tobytes()
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+        if self.encoding == "int16":
+            return pcm.tobytes()
+        frame = av.AudioFrame.from_ndarray(pcm[np.newaxis], format="s16", layout="mono")
+        frame.sample_rate = self.sample_rate
+        frame.pts = self.pts
+        self.pts += len(pcm)
+        return pack_opus_packets(self.codec.encode(frame))
+
+    def flush(self):
+        """
+        Returns:
+            bytes: The audio still buffered by the Opus encoder, padded to a packet. Empty for PCM.
+        """
+        if self.codec is None:
+            return b""
+        return pack_opus_packets(self.codec.encode(None))
+
+
+class UplinkDecoder(object):
+    """Server side: turns the messages of one client into float32 audio at the server's rate."""
+
+    OPUS_DECODE_RATE = 48000
+
+    def __init__(self, encoding="float32", sample_rate=16000, target_rate=16000):
+        """
+        Args:
+            encoding (str, optional): One of `UPLINK_ENCODINGS`. Defaults to "float32".
+            sample_rate (int, optional): Sample rate of the client's audio. Defaults to 16000.
+            target_rate (int, optional): Sample rate of the session audio. Defaults to 16000.
+
+        Raises:
+            ValueError: The encoding or the sample rate is not supported.
+        """
+        _check(encoding, sample_rate)
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.target_rate = target_rate
+        self.codec = None
+        if encoding == "opus":
+            self.codec = av.CodecContext.create("opus", "r")
+            self.codec.sample_rate = self.OPUS_DECODE_RATE
+            self.codec.layout = "mono"
+            source_rate = self.OPUS_DECODE_RATE
+        else:
+            source_rate = sample_rate
+        # the resampler keeps its filter state across messages
+        self.resampler = None
+        if source_rate != target_rate:
+            self.resampler = av.AudioResampler(format="flt", layout="mono", rate=target_rate)
+        self.source_rate = source_rate
+
+    def decode(self, message):
+        """
+        Args:
+            message (bytes): One binary websocket message of audio.
+
+        Returns:
+            np.ndarray: float32 samples at `target_rate`, possibly empty while the resampler fills up.
+
+        Raises:
+            ValueError: The message is not valid audio of this encoding.
+        """
+        if self.encoding == "float32":
+            samples = np.frombuffer(message, dtype="<f4")
+        elif self.encoding == "int16":
+            samples = np.frombuffer(message, dtype="<i2").astype(np.float32) * np.float32(1.0 / 32768)
+        else:
+            frames = []
+            try:
+                for packet in unpack_opus_packets(message):
+                    frames.extend(self.codec.decode(av.Packet(packet)))
+            except av.error.FFmpegError as e:
+                raise ValueError(f"Invalid Opus packet: {e}") from e
+            if self.resampler is None:
+                return self._join([frame.to_ndarray().reshape(-1) for frame in frames])
+            return self._join([self._resample(frame) for frame in frames])
+
+        if self.resampler is None or len(samples) == 0:
+            return samples
+        frame = av.AudioFrame.from_ndarray(samples.astype(np.float32, copy=False)[np.newaxis], format="flt", layout="mono")
+        frame.sample_rate = self.sample_rate
+        return self._resample(frame)
+
+    def _resample(self, frame):
+        return self._join([out.to_ndarray().reshape(-1) for out in self.resampler.resample(frame)])
+
+    @staticmethod
+    def _join(chunks):
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
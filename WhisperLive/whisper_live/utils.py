@@ -43,6 +43,28 @@ def create_srt_file(segments, resampled_file):
             segment_number += 1
 
 
+def warmup_audio(sample_rate=16000, seconds=6.0):
+    """
+    Synthetic clip used to warm up models: one second of silence followed by voiced, syllable-rate
+    modulated harmonics with a little noise, so both the VAD and the decoder have work to do.
+
+    Args:
+        sample_rate (int, optional): Sample rate of the clip. Defaults to 16000.
+        seconds (float, optional): Length of the clip. Defaults to 6.0.
+
+    Returns:
+        np.ndarray: float32 samples in [-1, 1].
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (t >= 1.0)
+    audio = 0.1 * voiced * envelope + 0.003 * rng.standard_normal(t.shape[0])
+    return audio.astype(np.float32)
+
+
 def resample(file: str, sr: int = 16000):
     """
     Resample the audio file to 16kHz.
@@ -1,27 +1,21 @@
 import os
 import subprocess
-import torch
+import threading
 import numpy as np
 import onnxruntime
 import warnings
 
 
 class VoiceActivityDetection():
+    _sessions = {}
+    _sessions_lock = threading.Lock()
 
-    def __init__(self, force_onnx_cpu=True):
-        path = self.download()
-
-        opts = onnxruntime.SessionOptions()
-        opts.log_severity_level = 3
-
-        opts.inter_op_num_threads = 1
-        opts.intra_op_num_threads = 1
-
-        if force_onnx_cpu and 'CPUExecutionProvider' in onnxruntime.get_available_providers():
-            self.session = onnxruntime.InferenceSession(path, providers=['CPUExecutionProvider'], sess_options=opts)
-        else:
-            self.session = onnxruntime.InferenceSession(path, providers=['CUDAExecutionProvider'], sess_options=opts)
+    def __init__(self, force_onnx_cpu=True, model_path=None):
+        path = model_path or self.download()
+        self.session = self.shared_session(path, force_onnx_cpu)
+        self._output_names = [output.name for output in self.session.get_outputs()]
 
+        self._input = None
         self.reset_states()
         if '16k' in path:
             warnings.warn('This model support only 16000 sampling rate!')
@@ -29,11 +23,40 @@ class VoiceActivityDetection():
         else:
             self.sample_rates = [8000, 16000]
 
+    @classmethod
+    def shared_session(cls, path, force_onnx_cpu=True):
+        """
+        The ONNX Runtime session of a model file, created once and shared by every detector of the process.
+
+        Sessions are safe to run from several threads; each detector keeps its own input and state buffers.
+
+        Args:
+            path (str): Path to the Silero VAD ONNX model.
+            force_onnx_cpu (bool, optional): Run on the CPU even if CUDA is available. Defaults to True.
+
+        Returns:
+            onnxruntime.InferenceSession: The shared session.
+        """
+        use_cpu = force_onnx_cpu and 'CPUExecutionProvider' in onnxruntime.get_available_providers()
+        providers = ['CPUExecutionProvider'] if use_cpu else ['CUDAExecutionProvider']
+        key = (os.path.abspath(path), providers[0])
+        with cls._sessions_lock:
+            if key not in cls._sessions:
+                opts = onnxruntime.SessionOptions()
+                opts.log_severity_level = 3
+
+                opts.inter_op_num_threads = 1
+                opts.intra_op_num_threads = 1
+
+                cls._sessions[key] = onnxruntime.InferenceSession(path, providers=providers, sess_options=opts)
+            return cls._sessions[key]
+
     def _validate_input(self, x, sr: int):
-        if x.dim() == 1:
-            x = x.unsqueeze(0)
-        if x.dim() > 2:
-            raise ValueError(f"Too many dimensions for input audio chunk {x.dim()}")
+        x = np.asarray(x)
+        if x.ndim == 1:
+            x = x[np.newaxis]
+        if x.ndim > 2:
+            raise ValueError(f"Too many dimensions for input audio chunk {x.ndim}")
 
         if sr != 16000 and (sr % 16000 == 0):
             step = sr // 16000
@@ -48,22 +71,55 @@ class VoiceActivityDetection():
         return x, sr
 
     def reset_states(self, batch_size=1):
-        self._state = torch.zeros((2, batch_size, 128), dtype=torch.float32)
-        self._context = torch.zeros(0, dtype=torch.float32)
+        if self._input is not None and self._last_batch_size == batch_size:
+            # same shapes, start over in the buffers we have
+            self._input.fill(0.0)
+            for state in self._states:
+                state.fill(0.0)
+            self._current = 0
+            return
+        self._input = None
         self._last_sr = 0
         self._last_batch_size = 0
 
+    def _allocate(self, batch_size, sr):
+        """
+        Allocate the model input, output and double-buffered state, and bind them to the session once.
+
+        The input row is the context followed by the window; each call reads one state buffer and the
+        model writes the next state into the other, so no array is created per window.
+        """
+        num_samples = 512 if sr == 16000 else 256
+        context_size = 64 if sr == 16000 else 32
+        self._input = np.zeros((batch_size, context_size + num_samples), dtype=np.float32)
+        self._output = np.zeros((batch_size, 1), dtype=np.float32)
+        self._states = [np.zeros((2, batch_size, 128), dtype=np.float32) for _ in range(2)]
+        self._sr = np.array(sr, dtype=np.int64)
+        self._bindings = []
+        for k in range(2):
+            binding = self.session.io_binding()
+            binding.bind_cpu_input('input', self._input)
+            binding.bind_cpu_input('state', self._states[k])
+            binding.bind_cpu_input('sr', self._sr)
+            for name, buffer in zip(self._output_names, (self._output, self._states[1 - k])):
+                binding.bind_output(name, 'cpu', 0, np.float32, list(buffer.shape), buffer.ctypes.data)
+            self._bindings.append(binding)
+        self._current = 0
+        self._context_size = context_size
+        self._last_sr = sr
+        self._last_batch_size = batch_size
+
     def __call__(self, x, sr: int):
-        # CRITICAL: Ensure float32 torch tensor (ONNX requires float32)
-        if isinstance(x, torch.Tensor):
-            if x.dtype != torch.float32:
-                x = x.float()
-        elif isinstance(x, np.ndarray):
-            if x.dtype != np.float32:
-                x = torch.from_numpy(x.astype(np.float32))
-            else:
-                x = torch.from_numpy(x)
+        """
+        Speech probability of one window per batch row, carrying the state and context from the previous call.
 
+        Args:
+            x (np.ndarray): Window of shape (num_samples,) or (batch, num_samples), any float dtype.
+            sr (int): Sample rate of `x`.
+
+        Returns:
+            np.ndarray: (batch, 1) float32 probabilities. The array is reused, it is overwritten by the next call.
+        """
         x, sr = self._validate_input(x, sr)
         num_samples = 512 if sr == 16000 else 256
 
@@ -71,60 +127,30 @@ class VoiceActivityDetection():
             raise ValueError(f"Provided number of samples is {x.shape[-1]} (Supported values: 256 for 8000 sample rate, 512 for 16000)")
 
         batch_size = x.shape[0]
-        context_size = 64 if sr == 16000 else 32
-
-        if not self._last_batch_size:
-            self.reset_states(batch_size)
-        if (self._last_sr) and (self._last_sr != sr):
-            self.reset_states(batch_size)
-        if (self._last_batch_size) and (self._last_batch_size != batch_size):
-            self.reset_states(batch_size)
-
-        if not len(self._context):
-            self._context = torch.zeros(batch_size, context_size, dtype=torch.float32)
-
-        # Ensure float32 before concatenation
-        if x.dtype != torch.float32:
-            x = x.float()
-        if self._context.dtype != torch.float32:
-            self._context = self._context.float()
-
-        x = torch.cat([self._context, x], dim=1)
-        if sr in [8000, 16000]:
-            # CRITICAL: Ensure float32 for ONNX (convert torch tensor to float32 numpy)
-            x_np = x.float().numpy().astype(np.float32)
-            state_np = self._state.float().numpy().astype(np.float32)
-            ort_inputs = {'input': x_np, 'state': state_np, 'sr': np.array(sr, dtype='int64')}
-            ort_outs = self.session.run(None, ort_inputs)
-            out, state = ort_outs
-            self._state = torch.from_numpy(state)
-        else:
-            raise ValueError()
+        if self._input is None or self._last_sr != sr or self._last_batch_size != batch_size:
+            self._allocate(batch_size, sr)
 
-        self._context = x[..., -context_size:]
-        self._last_sr = sr
-        self._last_batch_size = batch_size
-
-        out = torch.from_numpy(out)
-        return out
+        context_size = self._context_size
+        # the ONNX model requires float32, the copy into the bound input converts
+        np.copyto(self._input[:, context_size:], x, casting='unsafe')
+        self.session.run_with_iobinding(self._bindings[self._current])
+        self._current = 1 - self._current
+        self._input[:, :context_size] = self._input[:, -context_size:]
+        return self._output
 
     def audio_forward(self, x, sr: int):
-        outs = []
         x, sr = self._validate_input(x, sr)
-        self.reset_states()
+        self.reset_states(x.shape[0])
         num_samples = 512 if sr == 16000 else 256
 
-        if x.shape[1] % num_samples:
-            pad_num = num_samples - (x.shape[1] % num_samples)
-            x = torch.nn.functional.pad(x, (0, pad_num), 'constant', value=0.0)
-
-        for i in range(0, x.shape[1], num_samples):
+        num_windows = -(-x.shape[1] // num_samples)
+        outs = np.empty((x.shape[0], num_windows), dtype=np.float32)
+        for j, i in enumerate(range(0, x.shape[1], num_samples)):
             wavs_batch = x[:, i:i+num_samples]
-            out_chunk = self.__call__(wavs_batch, sr)
-            outs.append(out_chunk)
-
-        stacked = torch.cat(outs, dim=1)
-        return stacked.cpu()
+            if wavs_batch.shape[1] < num_samples:
+                wavs_batch = np.pad(wavs_batch, ((0, 0), (0, num_samples - wavs_batch.shape[1])))
+            outs[:, j] = self.__call__(wavs_batch, sr)[:, 0]
+        return outs
 
     @staticmethod
     def download(model_url="https://github.com/snakers4/silero-vad/raw/v5.0/files/silero_vad.onnx"):
@@ -147,16 +173,22 @@ class VoiceActivityDetection():
 
 
 class VoiceActivityDetector:
-    def __init__(self, threshold=0.5, frame_rate=16000):
+    def __init__(self, threshold=0.5, frame_rate=16000, service=None, model_path=None):
         """
         Initializes the VoiceActivityDetector with a voice activity detection model and a threshold.
 
         Args:
             threshold (float, optional): The probability threshold for detecting voice activity. Defaults to 0.5.
+            service (VADService, optional): Server-wide batched VAD. When given, this detector keeps a stream
+                of it, carrying the model state across frames, instead of loading its own model.
+            model_path (str, optional): Silero VAD ONNX model, defaults to the downloaded one.
         """
-        self.model = VoiceActivityDetection()
+        self.service = service
+        self.stream = service.open() if service is not None else None
+        self.model = VoiceActivityDetection(model_path=model_path) if service is None else None
         self.threshold = threshold
         self.frame_rate = frame_rate
+        self.speech = False
 
     def __call__(self, audio_frame):
         """
@@ -171,9 +203,17 @@ class VoiceActivityDetector:
             bool: True if the speech probability exceeds the threshold, indicating the presence of voice activity;
                   False otherwise.
         """
-        # CRITICAL: Ensure float32 before converting to torch (ONNX requires float32)
-        if audio_frame.dtype != np.float32:
-            audio_frame = audio_frame.astype(np.float32)
-        
-        speech_probs = self.model.audio_forward(torch.from_numpy(audio_frame.copy()), self.frame_rate)[0]
-        return torch.any(speech_probs > self.threshold).item()
+        if self.stream is not None:
+            speech_probs = self.stream.submit(audio_frame)
+            # a frame too short to complete a window keeps the previous decision
+            if len(speech_probs):
+                self.speech = bool(np.any(speech_probs > self.threshold))
+            return self.speech
+
+        speech_probs = self.model.audio_forward(audio_frame, self.frame_rate)[0]
+        return bool(np.any(speech_probs > self.threshold))
+
+    def close(self):
+        """Release the stream of the batched VAD service, if any."""
+        if self.stream is not None:
+            self.stream.close()
@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+
+import numpy as np
+
+
+class VADStream(object):
+    """The voice activity detection state of one session, fed with `submit` from the session's thread."""
+
+    def __init__(self, service):
+        self.service = service
+        self.state = np.zeros((2, 128), dtype=np.float32)
+        self.context = np.zeros(service.context_size, dtype=np.float32)
+        self.remainder = np.zeros(service.window_size, dtype=np.float32)
+        self.filled = 0
+        """Samples of the next window received so far, evaluated once the window is complete."""
+        self.pending = []
+        self.probs = None
+        self.error = None
+        self.closed = False
+        self.done = threading.Event()
+
+    def submit(self, audio):
+        """
+        Queue the complete 512-sample windows of a chunk and wait for their speech probabilities.
+
+        Samples that do not fill a window are kept and evaluated with the next chunk, so the recurrent
+        state sees the stream exactly once, whatever the chunk sizes.
+
+        Args:
+            audio (np.ndarray): float32 samples at the service's sample rate.
+
+        Returns:
+            np.ndarray: The speech probability of every window completed by this chunk, possibly empty.
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        n = self.service.window_size
+        windows = []
+        i = 0
+        while i < len(audio):
+            take = min(n - self.filled, len(audio) - i)
+            self.remainder[self.filled:self.filled + take] = audio[i:i + take]
+            self.filled += take
+            i += take
+            if self.filled == n:
+                windows.append(self.remainder.copy())
+                self.filled = 0
+        if not windows:
+            return np.zeros(0, dtype=np.float32)
+        return self.service.evaluate(self, windows)
+
+    def reset(self):
+        """Forget the stream, for a new utterance."""
+        self.state.fill(0.0)
+        self.context.fill(0.0)
+        self.filled = 0
+
+    def close(self):
+        self.service.close(self)
+
+
+class VADService(object):
+    """
+    Server-wide Silero VAD evaluating the windows of all sessions in batched ONNX inferences.
+
+    Each session owns a `VADStream` with its recurrent state and context. Sessions submit their windows
+    from their own threads; a single service thread collects what is pending, waiting at most
+    `max_wait_ms` after the first submission for the other open sessions to join (not at all when every
+    one of them is already pending), then steps all of them together:
+    the k-th window of every session goes into row b of one `session.run`, with that session's state and
+    context as row b of the batched inputs. A tick costs as many inferences as the longest pending run of
+    windows instead of one per window of every session.
+    """
+
+    def __init__(self, session, sample_rate=16000, max_batch_size=64, max_wait_ms=5.0):
+        """
+        Initialize the service and start its worker thread.
+
+        Args:
+            session (onnxruntime.InferenceSession): The Silero VAD model, see `VoiceActivityDetection`.
+            sample_rate (int, optional): 16000 or 8000. Defaults to 16000.
+            max_batch_size (int, optional): Maximum number of sessions stepped in one inference. Defaults to 64.
+            max_wait_ms (float, optional): Maximum time to wait for other sessions once one is pending. Defaults to 5.
+        """
+        if sample_rate not in (8000, 16000):
+            raise ValueError("Supported sampling rates: [8000, 16000]")
+        self.session = session
+        self.sample_rate = sample_rate
+        self.window_size = 512 if sample_rate == 16000 else 256
+        self.context_size = 64 if sample_rate == 16000 else 32
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.sr = np.array(sample_rate, dtype=np.int64)
+        self.condition = threading.Condition()
+        self.queue = []
+        """Streams with windows pending, in submission order."""
+        self.open_streams = 0
+        self.exit = False
+        self.inferences = 0
+        self.windows_evaluated = 0
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        logging.info(f"🎙️ VAD service started (max_batch_size={self.max_batch_size}, max_wait_ms={max_wait_ms})")
+
+    def open(self):
+        """Create the VAD state of a new session."""
+        with self.condition:
+            self.open_streams += 1
+        return VADStream(self)
+
+    def close(self, stream):
+        """Drop a session's pending windows, the session is gone."""
+        with self.condition:
+            if not stream.closed:
+                stream.closed = True
+                self.open_streams -= 1
+                # a tick waiting for this stream can go ahead
+                self.condition.notify()
+            if stream in self.queue:
+                self.queue.remove(stream)
+                stream.error = RuntimeError("VAD stream is closed")
+                stream.done.set()
+
+    def evaluate(self, stream, windows):
+        """
+        Queue a session's windows and wait for the tick evaluating them.
+
+        Args:
+            stream (VADStream): The session's stream.
+            windows (list): Complete windows, in stream order.
+
+        Returns:
+            np.ndarray: One speech probability per window.
+        """
+        with self.condition:
+            if self.exit:
+                raise RuntimeError("VAD service is stopped")
+            stream.pending = windows
+            stream.probs = np.zeros(len(windows), dtype=np.float32)
+            stream.error = None
+            stream.done.clear()
+            self.queue.append(stream)
+            self.condition.notify()
+        stream.done.wait()
+        if stream.error is not None:
+            raise stream.error
+        return stream.probs
+
+    def collect(self):
+        """
+        Blocks for the first pending stream, then waits for more until the batch is full, every open stream
+        is pending, or the wait expires.
+
+        Returns:
+            list: The streams to step in this tick, empty when the service is stopping.
+        """
+        with self.condition:
+            while not self.queue and not self.exit:
+                self.condition.wait()
+            deadline = time.monotonic() + self.max_wait
+            while not self.exit and len(self.queue) < min(self.max_batch_size, self.open_streams):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                self.condition.wait(timeout)
+            if self.exit:
+                return []
+            streams = self.queue[:self.max_batch_size]
+            del self.queue[:self.max_batch_size]
+            return streams
+
+    def run(self):
+        """Service loop, runs until `stop` is called."""
+        while not self.exit:
+            streams = self.collect()
+            if streams:
+                self.run_tick(streams)
+
+        with self.condition:
+            for stream in self.queue:
+                stream.error = RuntimeError("VAD service is stopped")
+                stream.done.set()
+            self.queue = []
+
+    def run_tick(self, streams):
+        """
+        Evaluate the pending windows of several sessions, one batched inference per window position.
+
+        Args:
+            streams (list): Streams with pending windows, at most `max_batch_size`.
+        """
+        try:
+            steps = max(len(stream.pending) for stream in streams)
+            for k in range(steps):
+                rows = [stream for stream in streams if k < len(stream.pending)]
+                inputs = np.empty((len(rows), self.context_size + self.window_size), dtype=np.float32)
+                state = np.empty((2, len(rows), 128), dtype=np.float32)
+                for b, stream in enumerate(rows):
+                    inputs[b, :self.context_size] = stream.context
+                    inputs[b, self.context_size:] = stream.pending[k]
+                    state[:, b] = stream.state
+                out, state = self.session.run(None, {"input": inputs, "state": state, "sr": self.sr})
+                self.inferences += 1
+                self.windows_evaluated += len(rows)
+                for b, stream in enumerate(rows):
+                    stream.probs[k] = out[b, 0]
+                    stream.state[:] = state[:, b]
+                    stream.context[:] = inputs[b, -self.context_size:]
+            logging.debug(f"🎙️ VAD tick: {len(streams)} sessions in {steps} inferences")
+        except Exception as e:
+            logging.error(f"[ERROR]: Batched VAD failed for {len(streams)} sessions: {e}")
+            for stream in streams:
+                stream.error = e
+        finally:
+            for stream in streams:
+                stream.pending = []
+                stream.done.set()
+
+    def get_stats(self):
+        return {
+            "inferences": self.inferences,
+            "windows_evaluated": self.windows_evaluated,
+            "mean_batch_size": self.windows_evaluated / self.inferences if self.inferences else 0.0,
+        }
+
+    def stop(self):
+        """Stop the service thread, failing any submission that is still pending."""
+        with self.condition:
+            self.exit = True
+            self.condition.notify_all()